@@ -3,12 +3,15 @@ Answer Generator Agent
 
 Generates AI-powered answers for RFP questions using RAG approach.
 """
+import hashlib
 import logging
 import json
+import re
 from typing import Dict, List, Any, Optional
 
 from .config import get_agent_config, SessionKeys
-from .utils import with_retry, RetryConfig  # NEW
+from .utils import with_retry, RetryConfig, iter_concurrent, PackItem, pack_by_budget, estimate_tokens
+from .utils.prompt_packing import ANSWER_BATCH_TOKEN_BUDGET, ANSWER_BATCH_MAX_QUESTIONS
 
 logger = logging.getLogger(__name__)
 
@@ -148,6 +151,54 @@ Sources Used:
 }}
 """
 
+    BATCH_GENERATION_PROMPT = """You are an expert RFP response writer. Answer each of the questions below accurately, using only the context provided.
+
+## Knowledge Base Items
+{context}
+
+## Similar Approved Answers
+{similar_answers}
+
+## Questions ({category})
+Each question lists the knowledge items [K#] and similar answers [S#] relevant to it.
+{questions}
+
+## Instructions
+{category_instructions}
+
+Requirements:
+- Tone: {tone}
+- Length (per answer): {length_instruction}
+- Answer each question independently, using only the context items listed for it
+- **IMPORTANT: Cite your sources using [Source: Document Name] format**
+- If referring to a previous approved answer, cite: [Source: Similar Answer]
+- For claims without direct source, indicate: [Needs Verification]
+- If information is missing, acknowledge limitations
+- Do NOT include analysis steps, only the final answer text
+
+## Response Format (JSON only)
+{{
+  "answers": [
+    {{
+      "question_id": "Q1",
+      "answer": "Answer text with [Source: X] citations inline",
+      "sources_used": ["Source 1 name"]
+    }}
+  ]
+}}
+
+Include every question_id exactly once.
+Return ONLY valid JSON."""
+
+    # Expected output tokens per answer, reserved in the batch budget
+    ANSWER_TOKEN_RESERVE = {'short': 120, 'medium': 300, 'long': 700}
+
+    LENGTH_INSTRUCTIONS = {
+        'short': 'Keep answer to 2-3 sentences.',
+        'medium': 'Provide balanced answer, 4-6 sentences.',
+        'long': 'Provide detailed answer with examples.'
+    }
+
     def __init__(self, org_id: int = None):
         self.config = get_agent_config(org_id=org_id, agent_type='answer_generation')
         self.name = "AnswerGeneratorAgent"
@@ -158,7 +209,8 @@ Sources Used:
         knowledge_context: Dict = None,
         tone: str = "professional",
         length: str = "medium",
-        session_state: Dict = None
+        session_state: Dict = None,
+        batched: bool = True
     ) -> Dict:
         """
         Generate answers for questions using context.
@@ -169,6 +221,8 @@ Sources Used:
             tone: professional, formal, or friendly
             length: short, medium, or long
             session_state: Shared state
+            batched: Pack questions of the same category with overlapping
+                context into shared requests (False = one request per question)
             
         Returns:
             Generated answers with metadata
@@ -184,7 +238,11 @@ Sources Used:
         
         draft_answers = []
         
-        for question in questions:
+        batched_answers = {}
+        if batched and self.config.client and len(questions) > 1:
+            batched_answers = self._generate_batched(questions, knowledge_context, tone, length)
+        
+        for idx, question in enumerate(questions):
             q_id = question.get("id", 0)
             q_text = question.get("text", "")
             q_category = question.get("category", "general")
@@ -192,21 +250,23 @@ Sources Used:
             # Get context for this question
             q_context = knowledge_context.get(q_id, {})
             
-            try:
-                answer = self._generate_answer(
-                    question=q_text,
-                    category=q_category,
-                    context=q_context,
-                    tone=tone,
-                    length=length
-                )
-            except Exception as e:
-                logger.error(f"Answer generation failed for question {q_id}: {e}")
-                answer = {
-                    "content": f"[Error generating answer: {str(e)}]",
-                    "confidence": 0.0,
-                    "flags": ["generation_error"]
-                }
+            answer = batched_answers.get(idx)
+            if answer is None:
+                try:
+                    answer = self._generate_answer(
+                        question=q_text,
+                        category=q_category,
+                        context=q_context,
+                        tone=tone,
+                        length=length
+                    )
+                except Exception as e:
+                    logger.error(f"Answer generation failed for question {q_id}: {e}")
+                    answer = {
+                        "content": f"[Error generating answer: {str(e)}]",
+                        "confidence": 0.0,
+                        "flags": ["generation_error"]
+                    }
             
             draft_answers.append({
                 "question_id": q_id,
@@ -273,19 +333,12 @@ Sources Used:
             for s in similar
         ]) if similar else "No similar answers available."
         
-        # Length instruction
-        length_map = {
-            'short': 'Keep answer to 2-3 sentences.',
-            'medium': 'Provide balanced answer, 4-6 sentences.',
-            'long': 'Provide detailed answer with examples.'
-        }
-        
         prompt = self.GENERATION_PROMPT.format(
             question=question,
             context=context_text,
             similar_answers=similar_text,
             tone=tone,
-            length_instruction=length_map.get(length, length_map['medium']),
+            length_instruction=self.LENGTH_INSTRUCTIONS.get(length, self.LENGTH_INSTRUCTIONS['medium']),
             category=category,
             category_instructions=self.CATEGORY_INSTRUCTIONS.get(category, "")
         )
@@ -301,24 +354,160 @@ Sources Used:
                 response = client.generate_content(prompt)
                 content = response.text
             
-            # Calculate confidence
-            confidence = self._calculate_confidence(context, similar)
-            flags = []
-            if confidence < 0.5:
-                flags.extend(["low_confidence", "needs_review"])
-            elif confidence < 0.7:
-                flags.append("review_recommended")
-            
-            return {
-                "content": content.strip(),
-                "confidence": confidence,
-                "flags": flags
-            }
+            return self._build_answer(content, context)
             
         except Exception as e:
             logger.error(f"Generation error: {e}")
             return self._placeholder_answer(question)
     
+    def _build_answer(self, content: str, context: Dict) -> Dict:
+        """Wrap generated text with confidence and review flags."""
+        confidence = self._calculate_confidence(context, context.get("similar_answers", []))
+        flags = []
+        if confidence < 0.5:
+            flags.extend(["low_confidence", "needs_review"])
+        elif confidence < 0.7:
+            flags.append("review_recommended")
+        
+        return {
+            "content": content.strip(),
+            "confidence": confidence,
+            "flags": flags
+        }
+    
+    def _generate_batched(
+        self,
+        questions: List[Dict],
+        knowledge_context: Dict,
+        tone: str,
+        length: str
+    ) -> Dict[int, Dict]:
+        """
+        Generate answers with multi-question requests.
+        
+        Questions are packed by category under ANSWER_BATCH_TOKEN_BUDGET, grouping
+        those that share knowledge items; packs run concurrently.
+        
+        Returns:
+            Answers keyed by question index. Questions left out (single-question
+            packs or answers missing from a response) use the per-question path.
+        """
+        reserve = self.ANSWER_TOKEN_RESERVE.get(length, self.ANSWER_TOKEN_RESERVE['medium'])
+        base_cost = estimate_tokens(self.BATCH_GENERATION_PROMPT) + max(
+            (estimate_tokens(text) for text in self.CATEGORY_INSTRUCTIONS.values()), default=0
+        )
+        
+        items = []
+        for idx, question in enumerate(questions):
+            q_context = knowledge_context.get(question.get("id", 0), {})
+            items.append(PackItem(
+                key=idx,
+                group=question.get("category", "general"),
+                cost=estimate_tokens(question.get("text", "")) + reserve,
+                shared={
+                    key: estimate_tokens(text)
+                    for key, text in self._context_blocks(q_context).items()
+                }
+            ))
+        
+        packs = [
+            [item.key for item in pack]
+            for pack in pack_by_budget(items, ANSWER_BATCH_TOKEN_BUDGET, ANSWER_BATCH_MAX_QUESTIONS, base_cost)
+            if len(pack) > 1
+        ]
+        if not packs:
+            return {}
+        
+        results = {}
+        for pack, answers, error in iter_concurrent(
+            lambda pack: self._generate_pack(pack, questions, knowledge_context, tone, length),
+            packs,
+            org_id=self.config.org_id
+        ):
+            if error is None:
+                results.update(answers)
+        
+        logger.info(f"Batched generation answered {len(results)}/{len(questions)} questions in {len(packs)} requests")
+        return results
+    
+    def _generate_pack(
+        self,
+        pack: List[int],
+        questions: List[Dict],
+        knowledge_context: Dict,
+        tone: str,
+        length: str
+    ) -> Dict[int, Dict]:
+        """Answer one pack of questions in a single request."""
+        category = questions[pack[0]].get("category", "general")
+        
+        # Deduplicate context blocks across the pack
+        labels: Dict[str, str] = {}
+        knowledge_blocks, similar_blocks, question_lines = [], [], []
+        for n, idx in enumerate(pack, 1):
+            q_context = knowledge_context.get(questions[idx].get("id", 0), {})
+            refs = []
+            for key, text in self._context_blocks(q_context).items():
+                if key not in labels:
+                    is_similar = key.startswith("similar:")
+                    blocks = similar_blocks if is_similar else knowledge_blocks
+                    labels[key] = f"{'S' if is_similar else 'K'}{len(blocks) + 1}"
+                    blocks.append(f"[{labels[key]}] {text}")
+                refs.append(labels[key])
+            question_lines.append(
+                f"[Q{n}] {questions[idx].get('text', '')} (context: {', '.join(refs) or 'none'})"
+            )
+        
+        prompt = self.BATCH_GENERATION_PROMPT.format(
+            context="\n\n".join(knowledge_blocks) or "No specific context available.",
+            similar_answers="\n\n".join(similar_blocks) or "No similar answers available.",
+            questions="\n".join(question_lines),
+            category=category,
+            category_instructions=self.CATEGORY_INSTRUCTIONS.get(category, ""),
+            tone=tone,
+            length_instruction=self.LENGTH_INSTRUCTIONS.get(length, self.LENGTH_INSTRUCTIONS['medium'])
+        )
+        
+        client = self.config.client
+        if self.config.is_adk_enabled:
+            response = client.models.generate_content(
+                model=self.config.model_name,
+                contents=prompt
+            )
+        else:
+            response = client.generate_content(prompt)
+        
+        response_text = response.text.strip()
+        if response_text.startswith('```'):
+            response_text = re.sub(r'^```(?:json)?\n?', '', response_text)
+            response_text = re.sub(r'\n?```$', '', response_text)
+        result = json.loads(response_text)
+        
+        answers = {}
+        for item in result.get("answers", []):
+            if not isinstance(item, dict):
+                continue
+            match = re.fullmatch(r'Q(\d+)', str(item.get("question_id", "")).strip().upper())
+            content = item.get("answer")
+            if not match or not content or not 1 <= int(match.group(1)) <= len(pack):
+                continue
+            idx = pack[int(match.group(1)) - 1]
+            q_context = knowledge_context.get(questions[idx].get("id", 0), {})
+            answers[idx] = self._build_answer(content, q_context)
+        return answers
+    
+    @staticmethod
+    def _context_blocks(context: Dict) -> Dict[str, str]:
+        """Formatted context blocks keyed by a hash of their content."""
+        blocks = {}
+        for item in context.get("knowledge_items", []):
+            text = f"[{item.get('title', 'Knowledge')}] {item.get('content', '')}"
+            blocks["kb:" + hashlib.sha1(text.encode()).hexdigest()] = text
+        for s in context.get("similar_answers", []):
+            text = f"Q: {s.get('question_text', '')[:100]}...\nA: {s.get('answer_content', '')}"
+            blocks["similar:" + hashlib.sha1(text.encode()).hexdigest()] = text
+        return blocks
+    
     def _calculate_confidence(self, context: Dict, similar: List) -> float:
         """Calculate confidence score based on context quality."""
         score = 0.4  # Base
@@ -4,16 +4,81 @@ Answer Validator Agent
 Cross-verifies AI-generated answers against knowledge base to prevent hallucinations
 and ensure factual accuracy.
 """
+import hashlib
 import logging
 import json
+import os
 import re
-from typing import Dict, List, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
 
 from .config import get_agent_config, SessionKeys
-from .utils import with_retry, RetryConfig
+from .utils import with_retry, RetryConfig, iter_concurrent
 
 logger = logging.getLogger(__name__)
 
+# Answers validated together in one claim extraction + one verification call
+VALIDATION_BATCH_SIZE = int(os.environ.get('VALIDATION_BATCH_SIZE', 5))
+# Max cached claim verifications (per process)
+CLAIM_CACHE_MAX_ENTRIES = int(os.environ.get('CLAIM_CACHE_MAX_ENTRIES', 4096))
+
+
+class ClaimVerificationCache:
+    """
+    LRU cache of claim verifications.
+    
+    Keyed by the normalized claim text and a fingerprint of the exact knowledge
+    content it was verified against, so a result is only reused when both the
+    claim and its evidence are unchanged.
+    """
+    
+    def __init__(self, max_entries: int = CLAIM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(org_id: Optional[int], claim_text: str, context_fingerprint: str) -> str:
+        claim = ' '.join(claim_text.lower().split())
+        return hashlib.sha1(f"{org_id}|{context_fingerprint}|{claim}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+    
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = dict(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_claim_cache = ClaimVerificationCache()
+
+
+def get_claim_cache() -> ClaimVerificationCache:
+    """Get the shared claim verification cache."""
+    return _claim_cache
+
 
 class AnswerValidatorAgent:
     """
@@ -139,6 +204,75 @@ Determine if the claim is:
   "suggested_revision": "How to fix if unverified or contradicted"
 }}
 
+Return ONLY valid JSON."""
+
+    BATCH_CLAIM_EXTRACTION_PROMPT = """Analyze these RFP answers and extract all factual claims that can be verified from each one.
+
+## Generated Answers
+{answers}
+
+## Task
+For every answer, extract each specific, verifiable claim. A claim is a statement that:
+- Asserts a fact about capabilities, features, or compliance
+- Makes a quantitative statement (numbers, percentages, timeframes)
+- References certifications, standards, or regulations
+- States policy or process details
+
+Do NOT include:
+- Generic introductory phrases
+- Transitional language
+- Obvious statements everyone knows
+
+## Response Format (JSON only)
+{{
+  "answers": [
+    {{
+      "answer_id": "A1",
+      "claims": [
+        {{
+          "claim_text": "Exact claim from the answer",
+          "claim_type": "capability|quantitative|certification|policy|process|general",
+          "importance": "critical|high|medium|low",
+          "verification_needed": true/false
+        }}
+      ]
+    }}
+  ]
+}}
+
+Include every answer_id, with an empty claims list if it has none.
+Return ONLY valid JSON."""
+
+    BATCH_VERIFICATION_PROMPT = """Verify whether each claim is supported by the knowledge context it references.
+
+## Knowledge Contexts
+{contexts}
+
+## Claims to Verify
+{claims}
+
+## Task
+Judge each claim ONLY against its referenced context. Determine if the claim is:
+1. VERIFIED - Directly supported by the context
+2. PARTIALLY_VERIFIED - Related information exists but not exact match
+3. UNVERIFIED - No supporting information found
+4. CONTRADICTED - Context contradicts this claim
+
+## Response Format (JSON only)
+{{
+  "verifications": [
+    {{
+      "claim_id": "C1",
+      "status": "verified|partially_verified|unverified|contradicted",
+      "confidence": 0.0-1.0,
+      "supporting_evidence": "Quote from context if found",
+      "explanation": "Why this determination was made",
+      "suggested_revision": "How to fix if unverified or contradicted"
+    }}
+  ]
+}}
+
+Include every claim_id exactly once.
 Return ONLY valid JSON."""
 
     REVISION_PROMPT = """Revise this RFP answer to remove or qualify unverified claims.
@@ -173,7 +307,8 @@ Return ONLY the revised answer text, no JSON or formatting."""
         self,
         answers: List[Dict] = None,
         knowledge_context: Dict = None,
-        session_state: Dict = None
+        session_state: Dict = None,
+        batched: bool = True
     ) -> Dict:
         """
         Validate generated answers against knowledge base.
@@ -182,6 +317,8 @@ Return ONLY the revised answer text, no JSON or formatting."""
             answers: List of generated answers to validate
             knowledge_context: Context from Knowledge Base Agent
             session_state: Shared state
+            batched: Validate several answers per LLM call and run batches
+                concurrently (False = one call per claim, sequentially)
             
         Returns:
             Validated answers with accuracy scores and revisions
@@ -195,49 +332,57 @@ Return ONLY the revised answer text, no JSON or formatting."""
         if not answers:
             return {"success": False, "error": "No answers to validate"}
         
+        if batched and self.config.client:
+            validations = self._validate_batched(answers, knowledge_context)
+        else:
+            validations = []
+            for answer in answers:
+                q_context = knowledge_context.get(answer.get("question_id", 0), {})
+                try:
+                    validations.append(self._validate_single_answer(answer.get("answer", ""), q_context))
+                except Exception as e:
+                    validations.append(e)
+        
         validated_answers = []
         total_claims = 0
         verified_claims = 0
         unverified_claims = 0
+        cached_claims = 0
         
-        for answer in answers:
+        for answer, validation in zip(answers, validations):
             q_id = answer.get("question_id", 0)
             answer_text = answer.get("answer", "")
-            q_context = knowledge_context.get(q_id, {})
             
-            try:
-                validation = self._validate_single_answer(answer_text, q_context)
-                
-                # Track stats
-                claims = validation.get("claims", [])
-                total_claims += len(claims)
-                verified_claims += len([c for c in claims if c.get("status") == "verified"])
-                unverified_claims += len([c for c in claims if c.get("status") == "unverified"])
-                
-                # Add validation results to answer
-                validated_answer = {
-                    **answer,
-                    "validation": {
-                        "accuracy_score": validation.get("accuracy_score", 0.5),
-                        "claims_analyzed": len(claims),
-                        "verified_claims": len([c for c in claims if c.get("status") == "verified"]),
-                        "unverified_claims": len([c for c in claims if c.get("status") == "unverified"]),
-                        "contradicted_claims": len([c for c in claims if c.get("status") == "contradicted"]),
-                        "claims_detail": claims
-                    },
-                    "validated_answer": validation.get("revised_answer", answer_text),
-                    "validation_flags": validation.get("flags", [])
-                }
-                
-                validated_answers.append(validated_answer)
-                
-            except Exception as e:
-                logger.error(f"Validation failed for answer {q_id}: {e}")
+            if isinstance(validation, Exception):
+                logger.error(f"Validation failed for answer {q_id}: {validation}")
                 validated_answers.append({
                     **answer,
-                    "validation": {"error": str(e), "accuracy_score": 0.5},
+                    "validation": {"error": str(validation), "accuracy_score": 0.5},
                     "validation_flags": ["validation_error"]
                 })
+                continue
+            
+            # Track stats
+            claims = validation.get("claims", [])
+            total_claims += len(claims)
+            verified_claims += len([c for c in claims if c.get("status") == "verified"])
+            unverified_claims += len([c for c in claims if c.get("status") == "unverified"])
+            cached_claims += len([c for c in claims if c.get("cached")])
+            
+            # Add validation results to answer
+            validated_answers.append({
+                **answer,
+                "validation": {
+                    "accuracy_score": validation.get("accuracy_score", 0.5),
+                    "claims_analyzed": len(claims),
+                    "verified_claims": len([c for c in claims if c.get("status") == "verified"]),
+                    "unverified_claims": len([c for c in claims if c.get("status") == "unverified"]),
+                    "contradicted_claims": len([c for c in claims if c.get("status") == "contradicted"]),
+                    "claims_detail": claims
+                },
+                "validated_answer": validation.get("revised_answer", answer_text),
+                "validation_flags": validation.get("flags", [])
+            })
         
         # Store in session state
         session_state["validated_answers"] = validated_answers
@@ -260,6 +405,7 @@ Return ONLY the revised answer text, no JSON or formatting."""
                 "total_claims": total_claims,
                 "verified_claims": verified_claims,
                 "unverified_claims": unverified_claims,
+                "cached_claims": cached_claims,
                 "overall_accuracy": round(accuracy, 2)
             },
             "session_state": session_state
@@ -287,6 +433,10 @@ Return ONLY the revised answer text, no JSON or formatting."""
             verification = self._verify_claim(claim, context)
             verified_list.append({**claim, **verification})
         
+        return self._finalize_validation(answer, verified_list, context)
+    
+    def _finalize_validation(self, answer: str, verified_list: List[Dict], context: Dict) -> Dict:
+        """Score verified claims and revise the answer if any failed."""
         # Step 3: Calculate accuracy score
         if verified_list:
             verified_count = len([c for c in verified_list if c.get("status") == "verified"])
@@ -313,6 +463,195 @@ Return ONLY the revised answer text, no JSON or formatting."""
             "flags": flags
         }
     
+    def _validate_batched(self, answers: List[Dict], knowledge_context: Dict) -> List[Any]:
+        """
+        Validate answers in batches of VALIDATION_BATCH_SIZE, batches in parallel.
+        
+        Returns:
+            One validation dict (or the raised exception) per answer, in order
+        """
+        batches = [
+            (start, answers[start:start + VALIDATION_BATCH_SIZE])
+            for start in range(0, len(answers), VALIDATION_BATCH_SIZE)
+        ]
+        results: List[Any] = [None] * len(answers)
+        
+        for (start, batch), validations, error in iter_concurrent(
+            lambda item: self._validate_answer_batch(item[1], knowledge_context),
+            batches,
+            org_id=self.config.org_id
+        ):
+            for offset in range(len(batch)):
+                results[start + offset] = error if error is not None else validations[offset]
+        
+        return results
+    
+    def _validate_answer_batch(self, batch: List[Dict], knowledge_context: Dict) -> List[Dict]:
+        """
+        Validate a batch of answers with one extraction and one verification call.
+        
+        Claims already verified against identical knowledge content are taken
+        from the claim cache instead of being sent to the model again.
+        """
+        answer_texts = [a.get("answer", "") for a in batch]
+        contexts = [knowledge_context.get(a.get("question_id", 0), {}) for a in batch]
+        
+        claims_per_answer = self._extract_claims_batch(answer_texts)
+        if claims_per_answer is None:
+            # Batch extraction failed - validate these answers one by one
+            return [self._validate_single_answer(text, ctx) for text, ctx in zip(answer_texts, contexts)]
+        
+        cache = get_claim_cache()
+        fingerprints = [self._context_fingerprint(ctx) for ctx in contexts]
+        verified = [[None] * len(claims) for claims in claims_per_answer]
+        
+        # Unique (claim, context) pairs still to verify -> where they are used
+        pending: Dict[str, List] = OrderedDict()
+        for a_idx, claims in enumerate(claims_per_answer):
+            for c_idx, claim in enumerate(claims):
+                key = cache.make_key(self.config.org_id, claim.get("claim_text", ""), fingerprints[a_idx])
+                cached = cache.get(key)
+                if cached is not None:
+                    verified[a_idx][c_idx] = {**claim, **cached, "cached": True}
+                else:
+                    pending.setdefault(key, []).append((a_idx, c_idx))
+        
+        if pending:
+            verifications = self._verify_claims_batch(
+                [(claims_per_answer[uses[0][0]][uses[0][1]], uses[0][0]) for uses in pending.values()],
+                contexts,
+                fingerprints
+            )
+            for (key, uses), verification in zip(pending.items(), verifications):
+                if verification is None:
+                    verification = {"status": "unverified", "confidence": 0.0}
+                else:
+                    cache.put(key, verification)
+                for a_idx, c_idx in uses:
+                    verified[a_idx][c_idx] = {**claims_per_answer[a_idx][c_idx], **verification}
+        
+        return [
+            self._finalize_validation(text, verified_list, ctx)
+            for text, verified_list, ctx in zip(answer_texts, verified, contexts)
+        ]
+    
+    def _extract_claims_batch(self, answers: List[str]) -> Optional[List[List[Dict]]]:
+        """
+        Extract claims from several answers in one call.
+        
+        Returns:
+            Claims per answer (in order), or None if the call failed
+        """
+        answers_text = "\n\n".join(
+            f"### Answer A{i}\n{answer}" for i, answer in enumerate(answers, 1)
+        )
+        try:
+            result = self._generate_json(self.BATCH_CLAIM_EXTRACTION_PROMPT.format(answers=answers_text))
+        except Exception as e:
+            logger.error(f"Batch claim extraction error: {e}")
+            return None
+        
+        by_id = {
+            str(item.get("answer_id", "")).strip().upper(): item.get("claims", []) or []
+            for item in result.get("answers", [])
+            if isinstance(item, dict)
+        }
+        return [by_id.get(f"A{i}", []) for i in range(1, len(answers) + 1)]
+    
+    def _verify_claims_batch(
+        self,
+        claims: List[tuple],
+        contexts: List[Dict],
+        fingerprints: List[str]
+    ) -> List[Optional[Dict]]:
+        """
+        Verify claims against their answers' contexts in one call.
+        
+        Args:
+            claims: (claim, answer_index) pairs
+            contexts: Knowledge context per answer
+            fingerprints: Context fingerprint per answer (identical contexts are sent once)
+            
+        Returns:
+            Verification per claim, None where the model returned nothing
+        """
+        context_labels: Dict[str, str] = {}
+        context_blocks = []
+        claim_lines = []
+        for i, (claim, a_idx) in enumerate(claims, 1):
+            fingerprint = fingerprints[a_idx]
+            if fingerprint not in context_labels:
+                label = f"K{len(context_labels) + 1}"
+                context_labels[fingerprint] = label
+                context_blocks.append(f"### Context {label}\n{self._format_verification_context(contexts[a_idx])}")
+            claim_lines.append(f"- [C{i}] (context {context_labels[fingerprint]}) {claim.get('claim_text', '')}")
+        
+        prompt = self.BATCH_VERIFICATION_PROMPT.format(
+            contexts="\n\n".join(context_blocks),
+            claims="\n".join(claim_lines)
+        )
+        try:
+            result = self._generate_json(prompt)
+        except Exception as e:
+            logger.error(f"Batch claim verification error: {e}")
+            return [None] * len(claims)
+        
+        by_id = {}
+        for item in result.get("verifications", []):
+            if isinstance(item, dict) and item.get("claim_id"):
+                claim_id = str(item.pop("claim_id")).strip().upper()
+                by_id[claim_id] = item
+        return [by_id.get(f"C{i}") for i in range(1, len(claims) + 1)]
+    
+    def _generate_json(self, prompt: str) -> Dict:
+        """Run a prompt and parse the JSON response."""
+        client = self.config.client
+        if self.config.is_adk_enabled:
+            response = client.models.generate_content(
+                model=self.config.model_name,
+                contents=prompt
+            )
+        else:
+            response = client.generate_content(prompt)
+        
+        response_text = response.text.strip()
+        if response_text.startswith('```'):
+            response_text = re.sub(r'^```(?:json)?\n?', '', response_text)
+            response_text = re.sub(r'\n?```$', '', response_text)
+        return json.loads(response_text)
+    
+    @staticmethod
+    def _context_fingerprint(context: Dict) -> str:
+        """Hash of the knowledge content a claim is verified against."""
+        digest = hashlib.sha1()
+        for item in context.get("knowledge_items", []):
+            digest.update(f"{item.get('title', '')}\x00{item.get('content', '')}\x01".encode())
+        for similar in context.get("similar_answers", []):
+            digest.update(f"{similar.get('answer_content', '')[:300]}\x02".encode())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _format_verification_context(context: Dict) -> str:
+        """Format knowledge items and similar answers for verification prompts."""
+        knowledge_items = context.get("knowledge_items", [])
+        similar_answers = context.get("similar_answers", [])
+        
+        context_text = "\n\n".join([
+            f"[{item.get('title', 'Knowledge')}]: {item.get('content', '')}"
+            for item in knowledge_items
+        ])
+        
+        if similar_answers:
+            context_text += "\n\n### Similar Approved Answers:\n"
+            context_text += "\n".join([
+                f"- {s.get('answer_content', '')[:300]}"
+                for s in similar_answers
+            ])
+        
+        if not context_text.strip():
+            context_text = "No context available for verification."
+        return context_text
+    
     @with_retry(
         config=RetryConfig(max_attempts=2, initial_delay=0.5),
         fallback_models=['gemini-1.5-pro']
@@ -356,23 +695,7 @@ Return ONLY the revised answer text, no JSON or formatting."""
             return {"status": "unverified", "confidence": 0.0}
         
         # Format context
-        knowledge_items = context.get("knowledge_items", [])
-        similar_answers = context.get("similar_answers", [])
-        
-        context_text = "\n\n".join([
-            f"[{item.get('title', 'Knowledge')}]: {item.get('content', '')}"
-            for item in knowledge_items
-        ])
-        
-        if similar_answers:
-            context_text += "\n\n### Similar Approved Answers:\n"
-            context_text += "\n".join([
-                f"- {s.get('answer_content', '')[:300]}"
-                for s in similar_answers
-            ])
-        
-        if not context_text.strip():
-            context_text = "No context available for verification."
+        context_text = self._format_verification_context(context)
         
         prompt = self.VERIFICATION_PROMPT.format(
             claim=claim.get("claim_text", ""),
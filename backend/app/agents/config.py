@@ -5,7 +5,7 @@ Provides base configuration and utilities for all ADK agents.
 Now with support for LiteLLM proxy and dynamic database-driven configuration.
 """
 import os
-from typing import Optional
+from typing import List, Optional, Union
 from functools import lru_cache
 import logging
 
@@ -44,6 +44,8 @@ class AgentConfig:
         self.max_tokens = 4096
         self._client = None
         self._llm_provider = None
+        self.response_cache = False
+        self.response_cache_ttl = None
         self.org_id = org_id
         self.agent_type = agent_type
         
@@ -77,6 +79,9 @@ class AgentConfig:
                 if 'max_tokens' in metadata:
                     self.max_tokens = metadata['max_tokens']
                 
+                from app.services.llm_response_cache import cache_settings
+                self.response_cache, self.response_cache_ttl = cache_settings(config)
+                
                 logger.info(
                     f"✓ Loaded {agent_type} config from database: "
                     f"{self.provider}/{self.model_name}"
@@ -119,7 +124,7 @@ class AgentConfig:
             # Only pass base_url for providers that need it
             base_url = self.base_url if self.provider in ('litellm', 'azure') else None
             
-            return LLMProviderFactory.create(
+            provider = LLMProviderFactory.create(
                 provider=self.provider,
                 api_key=self.api_key,
                 model=self.model_name,
@@ -127,6 +132,12 @@ class AgentConfig:
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
+            if self.response_cache and provider:
+                from app.services.llm_providers.cached_provider import CachedLLMProvider
+                provider = CachedLLMProvider(
+                    provider, org_id=self.org_id, agent_type=self.agent_type, ttl=self.response_cache_ttl
+                )
+            return provider
         except ImportError as e:
             logger.warning(f"LLM provider factory not available: {e}")
             return None
@@ -149,8 +160,9 @@ class AgentConfig:
         for all provider types.
         """
         if self._client is None and self.api_key:
-            # For LiteLLM, OpenAI, and Azure, use the unified wrapper
-            if self.provider in ('litellm', 'openai', 'azure'):
+            # For LiteLLM, OpenAI, and Azure (and any provider with the response
+            # cache enabled), use the unified wrapper
+            if self.provider in ('litellm', 'openai', 'azure') or self.response_cache:
                 provider = self.llm_provider
                 if provider:
                     self._client = LiteLLMClientWrapper(provider, self.model_name)
@@ -198,7 +210,7 @@ class AgentConfig:
         Returns:
             Generated text content
         """
-        if self.is_litellm_enabled and self.llm_provider:
+        if (self.is_litellm_enabled or self.response_cache) and self.llm_provider:
             return self.llm_provider.generate_content(prompt, **kwargs)
         
         if self.client:
@@ -213,6 +225,48 @@ class AgentConfig:
                 return response.text
         
         raise RuntimeError("No LLM provider configured")
+    
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """
+        Async variant of generate_content, using the providers' async clients.
+        
+        Args:
+            prompt: The input prompt
+            **kwargs: Additional generation parameters
+        
+        Returns:
+            Generated text content
+        """
+        if self.provider == 'google' and not self.response_cache and self.client:
+            if self.is_adk_enabled:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt
+                )
+            else:
+                response = await self.client.generate_content_async(prompt)
+            return response.text
+        
+        if self.llm_provider:
+            return await self.llm_provider.agenerate_content(prompt, **kwargs)
+        
+        raise RuntimeError("No LLM provider configured")
+    
+    def generate_many(self, prompts: List[str], max_concurrency: int = None, **kwargs) -> List[Union[str, Exception]]:
+        """
+        Generate content for many prompts concurrently on the shared event loop.
+        
+        Returns:
+            Generated text per prompt, in order; a failed prompt gets its
+            exception instead
+        """
+        from app.services.llm_providers.base_provider import LLM_ASYNC_MAX_CONCURRENCY
+        from app.utils.async_loop import run_all
+        
+        return run_all(
+            (self.agenerate_content(prompt, **kwargs) for prompt in prompts),
+            max_concurrency=max_concurrency or LLM_ASYNC_MAX_CONCURRENCY
+        )
 
 
 class LiteLLMClientWrapper:
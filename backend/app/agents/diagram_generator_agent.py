@@ -7,14 +7,48 @@ Mermaid.js diagrams for visualization (architecture, flowcharts, timelines, etc.
 import logging
 import json
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
 
 from .config import get_agent_config, SessionKeys
-from .utils import with_retry, RetryConfig
+from .utils import with_retry, RetryConfig, iter_concurrent
 
 logger = logging.getLogger(__name__)
 
 
+# Precompiled patterns for _sanitize_mermaid_syntax (hot path for every diagram)
+_UNICODE_ARROWS = str.maketrans({
+    '→': '-->',
+    '←': '<--',
+    '↔': '<-->',
+    '➡': '-->',
+    '⬅': '<--',
+    '⇒': '-->',
+    '⇐': '<--',
+})
+_NON_ASCII_RE = re.compile(r'[^\x20-\x7E\n\r\t]')
+_COLON_LABEL_RE = re.compile(r'^(\s*)(\S+)\s*(-->|<--|---)\s*(\S+):\s*(.+)$')
+_ARROW_SPLIT_RE = re.compile(r'(-->|<--|---)')
+_LABEL_SPECIAL_RE = re.compile(r'[^\w\s]')
+_PAREN_CONTENT_RE = re.compile(r'\([^)]*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SQUARE_LABEL_RE = re.compile(r'(\[)([^\]]+)(\])')
+_CURLY_LABEL_RE = re.compile(r'(\{)([^\}]+)(\})')
+_ROOT_LABEL_RE = re.compile(r'(\(\()([^)]+)(\)\))')
+_EMPTY_SQUARE_RE = re.compile(r'\[\s*\]')
+_EMPTY_CURLY_RE = re.compile(r'\{\s*\}')
+_EMPTY_SUBGRAPH_LINE_RE = re.compile(r'subgraph\s*\n')
+_EMPTY_SUBGRAPH_END_RE = re.compile(r'subgraph\s*$')
+_NUMERIC_NODE_ID_RE = re.compile(r'^(\s*)(\d+)(\s*[\[\{])', re.MULTILINE)
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+_JSON_FENCE_OPEN_RE = re.compile(r'^```(?:json)?\s*\n?')
+_JSON_FENCE_CLOSE_RE = re.compile(r'\n?```\s*$')
+_JSON_PREFIX_RE = re.compile(r'^json\s*')
+_MERMAID_BLOCK_RE = re.compile(r'```mermaid\n(.*?)```', re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r'```\n?(.*?)```', re.DOTALL)
+_MERMAID_FENCE_OPEN_RE = re.compile(r'^```(?:mermaid)?\n?')
+_MERMAID_FENCE_CLOSE_RE = re.compile(r'\n?```$')
+
+
 class DiagramType:
     """Available diagram types."""
     ARCHITECTURE = "architecture"
@@ -255,6 +289,8 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
         DiagramType.MINDMAP: MINDMAP_PROMPT,
     }
 
+    DEFAULT_DIAGRAM_TYPES = [DiagramType.ARCHITECTURE, DiagramType.FLOWCHART, DiagramType.TIMELINE]
+
     def __init__(self, org_id: int = None, config=None):
         self.org_id = org_id
         self.config = config or get_agent_config(org_id, agent_type='diagram_generation')
@@ -303,8 +339,8 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             # Clean and parse JSON
             response_text = response_text.strip()
             if response_text.startswith('```'):
-                response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text)
-                response_text = re.sub(r'\n?```\s*$', '', response_text)
+                response_text = _JSON_FENCE_OPEN_RE.sub('', response_text)
+                response_text = _JSON_FENCE_CLOSE_RE.sub('', response_text)
             
             result = json.loads(response_text)
             
@@ -385,6 +421,9 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
         """
         Generate multiple diagram types for a document.
         
+        Diagram types are independent LLM calls, so they run concurrently
+        (capped per organization) and are returned in the requested order.
+        
         Args:
             document_text: Extracted text from the RFP document
             diagram_types: List of diagram types to generate (default: all)
@@ -393,18 +432,20 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             Dictionary with all generated diagrams
         """
         if diagram_types is None:
-            diagram_types = [DiagramType.ARCHITECTURE, DiagramType.FLOWCHART, DiagramType.TIMELINE]
+            diagram_types = self.DEFAULT_DIAGRAM_TYPES
+        
+        completed = {}
+        for event in self.iter_diagrams(document_text, diagram_types):
+            completed[event["diagram_type"]] = event
         
-        session_state = {}
         results = []
         errors = []
-        
-        for dtype in diagram_types:
-            result = self.generate_diagram(document_text, dtype, session_state)
-            if result.get("success"):
-                results.append(result["diagram"])
+        for dtype in dict.fromkeys(diagram_types):
+            event = completed.get(dtype, {})
+            if event.get("success"):
+                results.append(event["diagram"])
             else:
-                errors.append({"type": dtype, "error": result.get("error")})
+                errors.append({"type": dtype, "error": event.get("error")})
         
         return {
             "success": len(results) > 0,
@@ -414,6 +455,45 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             "total_failed": len(errors)
         }
     
+    def iter_diagrams(
+        self,
+        document_text: str,
+        diagram_types: List[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Generate diagrams concurrently, yielding each one as soon as it finishes.
+        
+        Args:
+            document_text: Extracted text from the RFP document
+            diagram_types: List of diagram types to generate
+            
+        Yields:
+            Per-diagram result dicts with success, diagram_type and
+            diagram (or error), plus completed/total progress counters
+        """
+        if diagram_types is None:
+            diagram_types = self.DEFAULT_DIAGRAM_TYPES
+        diagram_types = list(dict.fromkeys(diagram_types))
+        total = len(diagram_types)
+        
+        generate = lambda dtype: self.generate_diagram(document_text, dtype, {})
+        completed = 0
+        for dtype, result, error in iter_concurrent(generate, diagram_types, org_id=self.org_id):
+            completed += 1
+            if error is not None:
+                result = {"success": False, "error": str(error)}
+            event = {
+                "success": bool(result.get("success")),
+                "diagram_type": dtype,
+                "completed": completed,
+                "total": total,
+            }
+            if event["success"]:
+                event["diagram"] = result["diagram"]
+            else:
+                event["error"] = result.get("error")
+            yield event
+    
     @with_retry(
         config=RetryConfig(max_attempts=3, initial_delay=1.0),
         fallback_models=['gemini-1.5-pro']
@@ -445,13 +525,13 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             # Remove markdown code fences (```json or ``` at start/end)
             if response_text.startswith('```'):
                 # Remove opening fence with optional language specifier
-                response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text)
+                response_text = _JSON_FENCE_OPEN_RE.sub('', response_text)
                 # Remove closing fence
-                response_text = re.sub(r'\n?```\s*$', '', response_text)
+                response_text = _JSON_FENCE_CLOSE_RE.sub('', response_text)
             
             # Also handle case where response starts with 'json' without backticks
             if response_text.strip().startswith('json'):
-                response_text = re.sub(r'^json\s*', '', response_text.strip())
+                response_text = _JSON_PREFIX_RE.sub('', response_text.strip())
             
             response_text = response_text.strip()
             logger.info(f"Cleaned response (first 200 chars): {response_text[:200]}")
@@ -470,7 +550,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
     def _fallback_parse(self, text: str, diagram_type: str) -> Dict:
         """Try to extract diagram from malformed response."""
         # Look for mermaid code block
-        mermaid_match = re.search(r'```mermaid\n(.*?)```', text, re.DOTALL)
+        mermaid_match = _MERMAID_BLOCK_RE.search(text)
         if mermaid_match:
             return {
                 "title": f"{DIAGRAM_TYPE_INFO[diagram_type]['name']}",
@@ -480,7 +560,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             }
         
         # Look for any code block
-        code_match = re.search(r'```\n?(.*?)```', text, re.DOTALL)
+        code_match = _CODE_BLOCK_RE.search(text)
         if code_match:
             return {
                 "title": f"{DIAGRAM_TYPE_INFO[diagram_type]['name']}",
@@ -503,8 +583,8 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
         code = code.replace('\\\\n', '\n')
         
         # Remove any markdown code fences
-        code = re.sub(r'^```(?:mermaid)?\n?', '', code)
-        code = re.sub(r'\n?```$', '', code)
+        code = _MERMAID_FENCE_OPEN_RE.sub('', code)
+        code = _MERMAID_FENCE_CLOSE_RE.sub('', code)
         
         # Fix common mermaid syntax issues
         code = self._sanitize_mermaid_syntax(code)
@@ -521,16 +601,10 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
         logger.info(f"BEFORE sanitization: {code[:200]}")
         
         # Replace Unicode arrows with Mermaid-compatible arrows
-        code = code.replace('→', '-->')
-        code = code.replace('←', '<--')
-        code = code.replace('↔', '<-->')
-        code = code.replace('➡', '-->')
-        code = code.replace('⬅', '<--')
-        code = code.replace('⇒', '-->')
-        code = code.replace('⇐', '<--')
+        code = code.translate(_UNICODE_ARROWS)
         
         # Remove other problematic Unicode characters (but keep basic punctuation)
-        code = re.sub(r'[^\x20-\x7E\n\r\t]', '', code)
+        code = _NON_ASCII_RE.sub('', code)
         
         # Fix malformed connection lines with multiple arrows
         # e.g., "KU --> WA Accesses KU --> MA" becomes "KU --> WA" and "KU --> MA"
@@ -547,7 +621,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             
             # Fix colon-based labels (invalid syntax like "A --> B: label" should be "A -->|label| B")
             # Pattern: NodeA --> NodeB: Some Label
-            colon_label_match = re.match(r'^(\s*)(\S+)\s*(-->|<--|---)\s*(\S+):\s*(.+)$', stripped)
+            colon_label_match = _COLON_LABEL_RE.match(stripped)
             if colon_label_match:
                 indent = colon_label_match.group(1)
                 node_a = colon_label_match.group(2)
@@ -555,7 +629,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
                 node_b = colon_label_match.group(4)
                 label = colon_label_match.group(5).strip()
                 # Clean the label (remove special chars, limit length)
-                label = re.sub(r'[^\w\s]', '', label)
+                label = _LABEL_SPECIAL_RE.sub('', label)
                 label = label[:30] if len(label) > 30 else label
                 fixed_lines.append(f"{indent}{node_a} {arrow}|{label}| {node_b}")
                 continue
@@ -566,7 +640,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             if arrow_count > 1:
                 # Multiple arrows - try to fix by splitting into valid connections
                 # This handles cases like "A --> B --> C" which should be "A --> B" and "B --> C"
-                parts = re.split(r'(-->|<--|---)', stripped)
+                parts = _ARROW_SPLIT_RE.split(stripped)
                 if len(parts) >= 3:
                     # Try to extract valid pairs
                     current_node = parts[0].strip()
@@ -594,7 +668,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             
             # Clean the label:
             # 1. Remove parentheses and their content
-            label = re.sub(r'\([^)]*\)', '', label)
+            label = _PAREN_CONTENT_RE.sub('', label)
             # 2. Replace colons with dashes (except in URLs)
             if 'http' not in label.lower():
                 label = label.replace(':', ' -')
@@ -609,29 +683,29 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
             if len(label) > 30:
                 label = label[:27] + '...'
             # 7. Remove multiple spaces
-            label = re.sub(r'\s+', ' ', label)
+            label = _WHITESPACE_RE.sub(' ', label)
             
             return f"{prefix}{label}{suffix}"
         
         # Clean square bracket labels: [label]
-        code = re.sub(r'(\[)([^\]]+)(\])', clean_node_label, code)
+        code = _SQUARE_LABEL_RE.sub(clean_node_label, code)
         
         # Clean curly bracket labels: {label}
-        code = re.sub(r'(\{)([^\}]+)(\})', clean_node_label, code)
+        code = _CURLY_LABEL_RE.sub(clean_node_label, code)
         
         # Clean double parentheses labels (mindmap root): ((label))
-        code = re.sub(r'(\(\()([^)]+)(\)\))', clean_node_label, code)
+        code = _ROOT_LABEL_RE.sub(clean_node_label, code)
         
         # Fix empty brackets
-        code = re.sub(r'\[\s*\]', '[Node]', code)
-        code = re.sub(r'\{\s*\}', '{Decision}', code)
+        code = _EMPTY_SQUARE_RE.sub('[Node]', code)
+        code = _EMPTY_CURLY_RE.sub('{Decision}', code)
         
         # Fix empty subgraph names
-        code = re.sub(r'subgraph\s*\n', 'subgraph Group\n', code)
-        code = re.sub(r'subgraph\s*$', 'subgraph Group', code)
+        code = _EMPTY_SUBGRAPH_LINE_RE.sub('subgraph Group\n', code)
+        code = _EMPTY_SUBGRAPH_END_RE.sub('subgraph Group', code)
         
         # Fix invalid node IDs (must start with letter or underscore)
-        code = re.sub(r'^(\s*)(\d+)(\s*[\[\{])', r'\1node_\2\3', code, flags=re.MULTILINE)
+        code = _NUMERIC_NODE_ID_RE.sub(r'\1node_\2\3', code)
         
         # Remove lines with only whitespace
         lines = code.split('\n')
@@ -639,7 +713,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks. Make sure mermaid
         
         # Join back and clean up excessive newlines
         code = '\n'.join(lines)
-        code = re.sub(r'\n{3,}', '\n\n', code)
+        code = _EXCESS_NEWLINES_RE.sub('\n\n', code)
         
         logger.info(f"AFTER sanitization: {code[:200]}")
         
@@ -10,7 +10,8 @@ import re
 from typing import Dict, List, Any, Optional
 
 from .config import get_agent_config, SessionKeys
-from .utils import with_retry, RetryConfig
+from .utils import with_retry, RetryConfig, map_concurrent, split_into_windows
+from app.utils.near_duplicates import NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -399,12 +400,33 @@ Return ONLY valid JSON."""
         fallback_models=['gemini-1.5-pro']
     )
     def _analyze_with_ai(self, text: str) -> Dict:
-        """Use AI to analyze document structure."""
+        """
+        Use AI to analyze document structure.
+        
+        Long documents are analyzed as overlapping windows in parallel
+        (under the org's LLM concurrency cap) and the window analyses are
+        reduced into one.
+        """
         client = self.config.client
         if not client:
             return self._fallback_analysis(text)
         
-        prompt = self.ANALYSIS_PROMPT.format(text=text[:25000])
+        windows = split_into_windows(text)
+        if len(windows) == 1:
+            return self._analyze_window(text)
+        
+        logger.info(f"Analyzing document in {len(windows)} windows ({len(text)} chars)")
+        window_results = map_concurrent(
+            lambda window: self._analyze_window(window.text),
+            windows,
+            org_id=self.config.org_id
+        )
+        return self._reduce_window_analyses(window_results)
+    
+    def _analyze_window(self, text: str) -> Dict:
+        """Analyze a single window of document text."""
+        client = self.config.client
+        prompt = self.ANALYSIS_PROMPT.format(text=text)
         
         try:
             if self.config.is_adk_enabled:
@@ -433,6 +455,96 @@ Return ONLY valid JSON."""
             logger.error(f"AI analysis error: {e}")
             return self._fallback_analysis(text)
     
+    def _reduce_window_analyses(self, window_results: List) -> Dict:
+        """
+        Reduce per-window analyses into a single document analysis.
+        
+        Items repeated across window overlaps are kept once, in document order.
+        
+        Args:
+            window_results: (window, analysis, error) tuples in document order
+        """
+        merged = {
+            "sections": [],
+            "themes": [],
+            "requirements": [],
+            "evaluation_criteria": [],
+            "deliverables": [],
+            "timeline": [],
+            "questions_identified": [],
+            "tables_detected": [],
+            "attachments": [],
+            "key_dates": [],
+            "document_type": "rfp",
+            "complexity_score": 0.0,
+            "estimated_response_time_hours": 0,
+            "issuing_organization": None,
+            "windows_processed": len(window_results)
+        }
+        
+        # Free-text items are matched fuzzily, named items by exact key
+        fuzzy_seen = {
+            "requirements": NearDuplicateIndex(),
+            "questions_identified": NearDuplicateIndex(),
+            "evaluation_criteria": NearDuplicateIndex(),
+            "deliverables": NearDuplicateIndex(),
+        }
+        keyed_fields = {
+            "sections": lambda item: item.get("name"),
+            "tables_detected": lambda item: item.get("name"),
+            "attachments": lambda item: item.get("name"),
+            "timeline": lambda item: (item.get("event"), item.get("date")),
+            "key_dates": lambda item: (item.get("description"), item.get("date")),
+        }
+        keyed_seen = {field: set() for field in keyed_fields}
+        theme_seen = set()
+        document_types = {}
+        
+        for window, analysis, error in window_results:
+            if error is not None or not isinstance(analysis, dict):
+                analysis = self._fallback_analysis(window.text)
+            
+            for field, index in fuzzy_seen.items():
+                for item in analysis.get(field, []) or []:
+                    item_text = item.get("text", "") if isinstance(item, dict) else str(item)
+                    if item_text and index.add_if_new(item_text):
+                        merged[field].append(item)
+            
+            for field, key_func in keyed_fields.items():
+                for item in analysis.get(field, []) or []:
+                    if not isinstance(item, dict):
+                        continue
+                    key = key_func(item)
+                    key = key.lower().strip() if isinstance(key, str) else key
+                    if key and key not in keyed_seen[field]:
+                        keyed_seen[field].add(key)
+                        if field == "sections":
+                            item["position"] = window.position
+                        merged[field].append(item)
+            
+            for theme in analysis.get("themes", []) or []:
+                if str(theme).lower() not in theme_seen:
+                    theme_seen.add(str(theme).lower())
+                    merged["themes"].append(theme)
+            
+            doc_type = analysis.get("document_type")
+            if doc_type:
+                document_types[doc_type] = document_types.get(doc_type, 0) + 1
+            
+            try:
+                merged["complexity_score"] = max(merged["complexity_score"], float(analysis.get("complexity_score") or 0))
+                merged["estimated_response_time_hours"] += float(analysis.get("estimated_response_time_hours") or 0)
+            except (TypeError, ValueError):
+                pass
+            
+            if not merged["issuing_organization"] and analysis.get("issuing_organization"):
+                merged["issuing_organization"] = analysis["issuing_organization"]
+        
+        if document_types:
+            merged["document_type"] = max(document_types, key=document_types.get)
+        
+        return merged
+    
     def _fallback_analysis(self, text: str) -> Dict:
         """Pattern-based analysis fallback."""
         sections = []
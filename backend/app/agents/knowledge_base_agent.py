@@ -5,12 +5,19 @@ Searches and retrieves relevant context from the knowledge base
 for answering RFP questions.
 """
 import logging
+import os
 from typing import Dict, List, Any, Optional
 
 from .config import get_agent_config, SessionKeys
 
 logger = logging.getLogger(__name__)
 
+# Candidates kept after merging query variations, before reranking
+RERANK_CANDIDATES = int(os.environ.get('RERANK_CANDIDATES', 10))
+# Ask the LLM to rerank only when the best local score is below the threshold
+RERANK_LLM_FALLBACK = os.environ.get('RERANK_LLM_FALLBACK', 'false').lower() == 'true'
+RERANK_LLM_THRESHOLD = float(os.environ.get('RERANK_LLM_THRESHOLD', 0.35))
+
 
 class KnowledgeBaseAgent:
     """
@@ -141,7 +148,62 @@ Return only 2 alternative queries, one per line. Keep them concise and focused o
         merged = sorted(seen_ids.values(), key=lambda x: x.get("score", 0), reverse=True)
         return merged[:limit]
     
-    def _rerank_results(self, results: List[Dict], query: str, limit: int = 5) -> List[Dict]:
+    def _rerank_results(
+        self,
+        results: List[Dict],
+        query: str,
+        limit: int = 5,
+        dimensions: Dict = None,
+        with_priors: bool = False
+    ) -> List[Dict]:
+        """
+        Re-rank results locally by fusing dense, lexical and prior signals.
+
+        Falls back to the LLM re-ranker only when RERANK_LLM_FALLBACK is set
+        and the best fused score is below RERANK_LLM_THRESHOLD.
+
+        Args:
+            results: Merged search results
+            query: Original search query
+            limit: Maximum results to return
+            dimensions: Project dimension filters (geography, client_type, industry)
+            with_priors: Attach usage_count/updated_at of knowledge items
+                (only when item_id refers to a KnowledgeItem)
+
+        Returns:
+            Re-ranked results with rerank_score added
+        """
+        if not results:
+            return results
+
+        try:
+            from app.services.rerank_service import get_reranker, load_item_priors
+
+            if with_priors:
+                priors = load_item_priors(r.get("item_id") for r in results)
+                results = [
+                    {**r, **priors.get(self._as_int(r.get("item_id")), {})}
+                    for r in results
+                ]
+            reranked = get_reranker().rerank(query, results, limit=limit, dimensions=dimensions)
+        except Exception as e:
+            logger.warning(f"Local re-ranking failed: {e}")
+            return results[:limit]
+
+        if (RERANK_LLM_FALLBACK and len(results) > 1
+                and reranked[0]["rerank_score"] < RERANK_LLM_THRESHOLD):
+            logger.debug(f"Low rerank confidence ({reranked[0]['rerank_score']}), using LLM re-ranker")
+            return self._llm_rerank_results(results, query, limit=limit)
+        return reranked
+
+    @staticmethod
+    def _as_int(value) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _llm_rerank_results(self, results: List[Dict], query: str, limit: int = 5) -> List[Dict]:
         """
         Use LLM to re-rank results by relevance to query.
         
@@ -321,7 +383,12 @@ Only return the JSON array, nothing else."""
                                 'doc_url': r.doc_url
                             }])
                     
-                    search_results = self._merge_search_results(all_results, limit=5)
+                    search_results = self._rerank_results(
+                        self._merge_search_results(all_results, limit=RERANK_CANDIDATES),
+                        q_text,
+                        limit=5,
+                        dimensions=dimension_filter
+                    )
                     logger.debug(f"Hybrid search returned {len(search_results)} results for question {q_id}")
                     
                 except Exception as e:
@@ -345,8 +412,14 @@ Only return the JSON array, nothing else."""
                         )
                         all_results.append(results)
                     
-                    # Merge and deduplicate results
-                    search_results = self._merge_search_results(all_results, limit=5)
+                    # Merge, deduplicate and re-rank results
+                    search_results = self._rerank_results(
+                        self._merge_search_results(all_results, limit=RERANK_CANDIDATES),
+                        q_text,
+                        limit=5,
+                        dimensions=dimension_filter,
+                        with_priors=True
+                    )
                 except Exception as e:
                     logger.error(f"Qdrant search failed for question {q_id}: {e}")
             
@@ -5,7 +5,10 @@ Main entry point that coordinates all sub-agents in a sequential workflow
 for complete RFP analysis and response generation.
 """
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 
 from .config import get_agent_config, SessionKeys
@@ -20,9 +23,15 @@ from .quality_reviewer_agent import get_quality_reviewer_agent
 from .proposal_quality_gate_agent import get_proposal_quality_gate_agent
 from .executive_editor_agent import get_executive_editor_agent
 from .similarity_validator_agent import get_similarity_validator_agent
+from .utils import PipelineItem, PipelineStage, StagePipeline, micro_batches
+from .utils.pipeline import PIPELINE_MICRO_BATCH
+from app.services.question_dedup_service import get_question_dedup_service
 
 logger = logging.getLogger(__name__)
 
+# Threads per LLM-bound stage of the answer pipeline
+PIPELINE_STAGE_WORKERS = int(os.environ.get('PIPELINE_STAGE_WORKERS', 2))
+
 
 class OrchestratorAgent:
     """
@@ -37,6 +46,13 @@ class OrchestratorAgent:
     4.6. Compliance Checker → Validates compliance claims (NEW)
     5. Clarification Agent → Identifies questions needing clarification
     6. Quality Reviewer → Reviews and validates
+
+    Steps 3-6 run as a pipeline by default: questions move through them in
+    micro-batches, so the first answers are ready long before the last
+    questions have been retrieved (options={"pipelined": False} runs them
+    stage by stage). Before the pipeline, near-duplicate questions are
+    grouped so each group is answered once, and questions matching an
+    approved answer reuse it (options={"deduplicate": False} disables this).
     """
     
     # Workflow step definitions for progress tracking
@@ -84,13 +100,15 @@ class OrchestratorAgent:
         self.compliance_checker = get_compliance_checker_agent(org_id=org_id)
         self.clarification_agent = get_clarification_agent(org_id=org_id)
         self.quality_reviewer = get_quality_reviewer_agent(org_id=org_id)
+        self.question_dedup = get_question_dedup_service(org_id=org_id)
     
     def analyze_rfp(
         self,
         document_text: str,
         org_id: int = None,
         project_id: int = None,  # NEW: Pass to KB agent for dimension filtering
-        options: Dict = None
+        options: Dict = None,
+        on_progress: Callable[[List[Dict], int, int], None] = None
     ) -> Dict:
         """
         Run the complete RFP analysis workflow.
@@ -99,7 +117,9 @@ class OrchestratorAgent:
             document_text: Extracted text from the RFP document
             org_id: Organization ID for knowledge base scoping
             project_id: Project ID for auto-fetching dimensions (NEW)
-            options: Configuration options (tone, length, etc.)
+            options: Configuration options (tone, length, pipelined, etc.)
+            on_progress: Called with (answers, completed, total) each time
+                a batch of questions is fully answered (pipelined mode)
             
         Returns:
             Complete analysis results with answers
@@ -159,6 +179,26 @@ class OrchestratorAgent:
             result["steps_completed"].append("question_extraction")
             session_state = question_result.get("session_state", session_state)
             
+            # Steps 3-6 as a pipeline
+            if options.get("pipelined", True):
+                session_state[SessionKeys.CURRENT_STEP] = "answering_questions"
+                logger.info(f"Steps 3-6: Answering {len(result['questions'])} questions (pipelined)...")
+                
+                pipeline_result = self.answer_questions_pipelined(
+                    questions=result["questions"],
+                    org_id=org_id,
+                    project_id=project_id,
+                    options=options,
+                    on_progress=on_progress
+                )
+                self._apply_pipeline_result(result, session_state, pipeline_result)
+                if not pipeline_result["answers"]:
+                    result["error"] = "Answer generation failed"
+                    return self._finalize_result(result, session_state)
+                
+                result["success"] = True
+                return self._finalize_result(result, session_state)
+            
             # Step 3: Retrieve Knowledge Context
             session_state[SessionKeys.CURRENT_STEP] = "retrieving_knowledge"
             logger.info("Step 3: Retrieving knowledge context...")
@@ -276,6 +316,365 @@ class OrchestratorAgent:
         
         return self._finalize_result(result, session_state)
     
+    def answer_questions_pipelined(
+        self,
+        questions: List[Dict],
+        org_id: int = None,
+        project_id: int = None,
+        options: Dict = None,
+        on_progress: Callable[[List[Dict], int, int], None] = None,
+        checkpoint=None,
+        should_stop: Callable[[], bool] = None
+    ) -> Dict:
+        """
+        Retrieve, generate, validate, check, clarify and review answers as a pipeline.
+        
+        Questions are split into micro-batches that flow through the stages
+        independently, connected by bounded queues. Each stage still sees a
+        batch, so the batched generation and validation calls keep working.
+        
+        Near-duplicate questions are answered once and share the answer, and
+        questions matching an approved answer reuse it without generation.
+        
+        Args:
+            questions: Extracted questions
+            org_id: Organization ID for knowledge base scoping
+            project_id: Project ID for auto-fetching dimensions
+            options: tone, length, micro_batch_size, deduplicate
+            on_progress: Called on this thread with (answers, completed, total)
+                as each micro-batch finishes
+            checkpoint: JobCheckpoint to save each micro-batch to after every
+                stage; batches saved by an earlier attempt resume where they
+                stopped
+            should_stop: Checked between stages; stops the run with
+                PipelineCancelled once it returns True
+            
+        Returns:
+            Answers in question order with merged stats, clarifications,
+            compliance issues, knowledge context, deduplication stats and
+            timing
+        """
+        options = options or {}
+        tone = options.get("tone", "professional")
+        length = options.get("length", "medium")
+        certifications = {}
+        
+        def retrieve(batch):
+            kb_result = self.knowledge_base.retrieve_context(
+                questions=batch["questions"],
+                org_id=org_id,
+                project_id=project_id,
+                session_state={}
+            )
+            batch["knowledge_context"] = kb_result.get("knowledge_context", {})
+            return batch
+        
+        def generate(batch):
+            answer_result = self.answer_generator.generate_answers(
+                questions=batch["questions"],
+                knowledge_context=batch["knowledge_context"],
+                tone=tone,
+                length=length,
+                session_state={}
+            )
+            if not answer_result.get("success"):
+                raise RuntimeError(answer_result.get("error", "Answer generation failed"))
+            batch["answers"] = answer_result["answers"]
+            return batch
+        
+        def validate(batch):
+            validation_result = self.answer_validator.validate_answers(
+                answers=batch["answers"],
+                knowledge_context=batch["knowledge_context"],
+                session_state={}
+            )
+            if not validation_result.get("success"):
+                raise RuntimeError(validation_result.get("error", "Answer validation failed"))
+            batch["answers"] = validation_result.get("validated_answers") or batch["answers"]
+            batch["stats"]["validation"] = validation_result.get("stats", {})
+            return batch
+        
+        def check_compliance(batch):
+            # Certifications are looked up once per run, not per batch
+            if "list" not in certifications:
+                certifications["list"] = self.compliance_checker._get_org_certifications()
+            compliance_result = self.compliance_checker.check_compliance(
+                answers=batch["answers"],
+                org_certifications=certifications["list"],
+                session_state={}
+            )
+            if not compliance_result.get("success"):
+                raise RuntimeError(compliance_result.get("error", "Compliance check failed"))
+            batch["compliance_issues"] = compliance_result.get("compliance_issues", [])
+            batch["stats"]["compliance"] = compliance_result.get("stats", {})
+            return batch
+        
+        def clarify(batch):
+            clarification_result = self.clarification_agent.analyze_questions(
+                draft_answers=batch["answers"],
+                knowledge_context=batch["knowledge_context"],
+                confidence_threshold=0.5,
+                session_state={}
+            )
+            if not clarification_result.get("success"):
+                raise RuntimeError(clarification_result.get("error", "Clarification analysis failed"))
+            batch["clarifications"] = clarification_result.get("clarifications", [])
+            return batch
+        
+        def review(batch):
+            review_result = self.quality_reviewer.review_answers(
+                draft_answers=batch["answers"],
+                session_state={SessionKeys.KNOWLEDGE_CONTEXT: batch["knowledge_context"]}
+            )
+            if not review_result.get("success"):
+                raise RuntimeError(review_result.get("error", "Quality review failed"))
+            batch["answers"] = review_result.get("reviewed_answers", batch["answers"])
+            batch["stats"]["review"] = review_result.get("stats", {})
+            return batch
+        
+        workers = max(1, PIPELINE_STAGE_WORKERS)
+        pipeline = StagePipeline([
+            PipelineStage("knowledge_retrieval", retrieve, workers=workers),
+            PipelineStage("answer_generation", generate, workers=workers, critical=True),
+            PipelineStage("answer_validation", validate, workers=workers),
+            PipelineStage("compliance_check", check_compliance),
+            PipelineStage("clarification_detection", clarify),
+            PipelineStage("quality_review", review, workers=workers),
+        ])
+        
+        # Answer each group of near-duplicate questions once; the plan is
+        # checkpointed so a resumed run keeps the same batches
+        dedup = None
+        if options.get("deduplicate", True) and questions:
+            dedup = checkpoint.get("question_dedup") if checkpoint is not None else None
+            if dedup is None:
+                dedup = self._plan_deduplication(questions)
+                if dedup is not None and checkpoint is not None:
+                    checkpoint.save("question_dedup", dedup)
+        
+        to_generate = questions
+        copies = defaultdict(list)
+        reused_answers = []
+        if dedup is not None:
+            by_id = {q.get("id"): q for q in questions}
+            generate_ids = set(dedup["generate"])
+            to_generate = [q for q in questions if q.get("id") in generate_ids]
+            for question_id, representative_id in dedup["duplicates"]:
+                copies[representative_id].append(by_id[question_id])
+            reused_answers = [self._reused_answer(by_id[match["question_id"]], match) for match in dedup["reused"]]
+        
+        # Batch boundaries must match the checkpointed ones when resuming
+        batch_size = options.get("micro_batch_size") or PIPELINE_MICRO_BATCH
+        restored = {}
+        if checkpoint is not None:
+            batch_size = checkpoint.get("micro_batch_size") or batch_size
+            restored = checkpoint.load_batches()
+        
+        batches = []
+        for index, batch in enumerate(micro_batches(to_generate, batch_size)):
+            if index in restored:
+                saved = restored[index]
+                batches.append(PipelineItem(index=index, payload=saved["payload"], completed=saved["completed"]))
+            else:
+                batches.append(PipelineItem(index=index, payload={
+                    "questions": batch,
+                    "knowledge_context": {},
+                    "answers": [],
+                    "clarifications": [],
+                    "compliance_issues": [],
+                    "stats": {}
+                }))
+        
+        on_stage_done = None
+        if checkpoint is not None:
+            checkpoint.save("micro_batch_size", batch_size)
+            on_stage_done = lambda item, stage: checkpoint.save_batch(item.index, item.payload, item.completed)
+            if restored:
+                logger.info(f"Resuming {len(restored)} of {len(batches)} question batches from checkpoints")
+        
+        started = time.monotonic()
+        first_answer_seconds = None
+        completed = 0
+        done = []
+        errors = []
+        expanded = {}
+        
+        def report(answers):
+            nonlocal completed, first_answer_seconds
+            completed += len(answers)
+            if first_answer_seconds is None:
+                first_answer_seconds = round(time.monotonic() - started, 2)
+            if on_progress:
+                try:
+                    on_progress(answers, completed, len(questions))
+                except Exception as e:
+                    logger.warning(f"Pipeline progress callback failed: {e}")
+        
+        if reused_answers:
+            report(reused_answers)
+        
+        for item in pipeline.run(batches, should_stop=should_stop, on_stage_done=on_stage_done):
+            done.append(item)
+            errors.extend(f"{stage}: {error}" for stage, error in item.errors.items())
+            if item.failed:
+                continue
+            
+            expanded[item.index] = self._expand_duplicates(item.payload["answers"], copies)
+            report(expanded[item.index])
+        
+        done.sort(key=lambda item: item.index)
+        ok = [item for item in done if not item.failed]
+        position = {q.get("id"): i for i, q in enumerate(questions)}
+        answers = [a for item in ok for a in expanded[item.index]] + reused_answers
+        answers.sort(key=lambda a: position.get(a.get("question_id"), len(position)))
+        clarifications = [c for item in ok for c in item.payload["clarifications"]]
+        clarifications.sort(key=lambda c: c.get("priority_score", 0), reverse=True)
+        knowledge_context = {}
+        for item in done:
+            knowledge_context.update(item.payload["knowledge_context"])
+        
+        # A stage counts as completed only if every batch got through it
+        stage_names = [stage.name for stage in pipeline.stages]
+        steps_completed = [
+            name if done and all(name in item.completed for item in done) else f"{name}_skipped"
+            for name in stage_names
+        ]
+        if dedup is not None:
+            steps_completed.insert(0, "question_deduplication")
+        
+        def stats_for(key, count_key):
+            return self._combine_stats(
+                [item.payload["stats"][key] for item in ok if key in item.payload["stats"]],
+                count_key
+            )
+        
+        return {
+            "answers": answers,
+            "clarifications": clarifications,
+            "compliance_issues": [i for item in ok for i in item.payload["compliance_issues"]],
+            "knowledge_context": knowledge_context,
+            "review_stats": stats_for("review", "total"),
+            "validation_stats": stats_for("validation", "total_answers"),
+            "compliance_stats": stats_for("compliance", "total_answers"),
+            "steps_completed": steps_completed,
+            "errors": errors,
+            "deduplication": dedup["stats"] if dedup is not None else None,
+            "pipeline": {
+                "batches": len(batches),
+                "failed_batches": len(done) - len(ok),
+                "resumed_batches": len(restored),
+                "first_answer_seconds": first_answer_seconds,
+                "total_seconds": round(time.monotonic() - started, 2)
+            }
+        }
+    
+    def _plan_deduplication(self, questions: List[Dict]) -> Optional[Dict]:
+        """Deduplication plan for the questions, or None to answer all of them."""
+        try:
+            return self.question_dedup.plan(questions)
+        except Exception as e:
+            logger.warning(f"Question deduplication failed, answering every question: {e}")
+            return None
+    
+    @staticmethod
+    def _expand_duplicates(answers: List[Dict], copies: Dict[Any, List[Dict]]) -> List[Dict]:
+        """Answers followed by a copy for each near-duplicate of the answered question."""
+        expanded = []
+        for answer in answers:
+            expanded.append(answer)
+            for question in copies.get(answer.get("question_id"), []):
+                expanded.append({
+                    **answer,
+                    "question_id": question.get("id"),
+                    "question_text": question.get("text", ""),
+                    "category": question.get("category", answer.get("category")),
+                    "flags": list(answer.get("flags", [])) + ["deduplicated"],
+                    "duplicate_of": answer.get("question_id")
+                })
+        return expanded
+    
+    @staticmethod
+    def _reused_answer(question: Dict, match: Dict) -> Dict:
+        """Answer for a question that closely matches an approved answer."""
+        return {
+            "question_id": question.get("id"),
+            "question_text": question.get("text", ""),
+            "category": question.get("category", "general"),
+            "answer": match["answer_content"],
+            "confidence_score": match["similarity_score"],
+            "flags": ["reused_approved_answer"],
+            "sources": [],
+            "needs_human_review": False,
+            "reused_from": {
+                "answer_id": match["answer_id"],
+                "question_id": match["source_question_id"],
+                "question_text": match["source_question_text"],
+                "similarity_score": match["similarity_score"]
+            }
+        }
+    
+    @staticmethod
+    def _combine_stats(parts: List[Dict], count_key: str) -> Dict:
+        """Merge per-batch stats: sum counts, weight averages by batch size."""
+        if not parts:
+            return {}
+        total = sum(part.get(count_key, 0) for part in parts)
+        combined = {}
+        for part in parts:
+            weight = part.get(count_key, 0)
+            for key, value in part.items():
+                if isinstance(value, bool):
+                    combined[key] = combined.get(key, False) or value
+                elif isinstance(value, int):
+                    combined[key] = combined.get(key, 0) + value
+                elif isinstance(value, float) and total:
+                    combined[key] = combined.get(key, 0.0) + value * weight / total
+        for key, value in combined.items():
+            if isinstance(value, float):
+                combined[key] = round(value, 2)
+        if combined.get("total_claims"):
+            combined["overall_accuracy"] = round(combined["verified_claims"] / combined["total_claims"], 2)
+        return combined
+    
+    def _apply_pipeline_result(self, result: Dict, session_state: Dict, pipeline_result: Dict):
+        """Copy pipeline output into the analyze_rfp result and session state."""
+        result["answers"] = pipeline_result["answers"]
+        result["clarifications"] = pipeline_result["clarifications"]
+        result["compliance_issues"] = pipeline_result["compliance_issues"]
+        result["stats"] = pipeline_result["review_stats"]
+        result["validation_stats"] = pipeline_result["validation_stats"]
+        result["compliance_stats"] = pipeline_result["compliance_stats"]
+        result["pipeline"] = pipeline_result["pipeline"]
+        result["deduplication"] = pipeline_result.get("deduplication")
+        result["steps_completed"].extend(pipeline_result["steps_completed"])
+        
+        session_state[SessionKeys.KNOWLEDGE_CONTEXT] = pipeline_result["knowledge_context"]
+        session_state[SessionKeys.REVIEWED_ANSWERS] = pipeline_result["answers"]
+        session_state[SessionKeys.CLARIFICATION_QUESTIONS] = pipeline_result["clarifications"]
+        session_state.setdefault(SessionKeys.ERRORS, []).extend(pipeline_result["errors"])
+        
+        dedup_stats = pipeline_result.get("deduplication")
+        if dedup_stats:
+            session_state.setdefault(SessionKeys.AGENT_MESSAGES, []).append({
+                "agent": self.name,
+                "action": "questions_deduplicated",
+                "summary": (
+                    f"Generating {dedup_stats['generated']} of {dedup_stats['questions']} answers: "
+                    f"{dedup_stats['duplicates']} near-duplicates share an answer, "
+                    f"{dedup_stats['reused']} reuse approved answers"
+                )
+            })
+        
+        timing = pipeline_result["pipeline"]
+        session_state.setdefault(SessionKeys.AGENT_MESSAGES, []).append({
+            "agent": self.name,
+            "action": "questions_answered",
+            "summary": (
+                f"Answered {len(pipeline_result['answers'])} questions in {timing['batches']} pipelined batches "
+                f"(first answers after {timing['first_answer_seconds']}s, total {timing['total_seconds']}s)"
+            )
+        })
+    
     def _finalize_result(self, result: Dict, session_state: Dict) -> Dict:
         """Finalize the result with session data."""
         result["agent_log"] = session_state.get(SessionKeys.AGENT_MESSAGES, [])
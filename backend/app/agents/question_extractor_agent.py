@@ -9,10 +9,22 @@ import re
 from typing import Dict, List, Any
 
 from .config import get_agent_config, SessionKeys
-from .utils import with_retry, RetryConfig  # NEW
+from .utils import with_retry, RetryConfig, map_concurrent, split_into_windows
+from app.utils.near_duplicates import NearDuplicateIndex
+from app.utils.keyword_classifier import KeywordClassifier
 
 logger = logging.getLogger(__name__)
 
+# Category guess for questions the model did not categorize (first match wins)
+_CATEGORY_CLASSIFIER = KeywordClassifier({
+    'security': ['security', 'encrypt', 'access', 'authentication', 'password'],
+    'compliance': ['compliance', 'regulatory', 'audit', 'gdpr', 'hipaa'],
+    'technical': ['technical', 'api', 'integration', 'architecture', 'system'],
+    'pricing': ['price', 'cost', 'fee', 'budget', 'payment'],
+    'legal': ['legal', 'contract', 'liability', 'indemnity', 'warranty'],
+    'product': ['feature', 'functionality', 'capability', 'product'],
+})
+
 
 class QuestionExtractorAgent:
     """
@@ -198,13 +210,34 @@ Return ONLY valid JSON, no markdown formatting or code blocks."""
         fallback_models=['gemini-1.5-pro']
     )
     def _extract_with_ai(self, text: str, doc_structure: Dict) -> Dict:
-        """Use AI to extract questions."""
+        """
+        Use AI to extract questions.
+        
+        Long documents are split into overlapping windows that are extracted
+        concurrently (under the org's LLM concurrency cap) and merged with a
+        near-duplicate pass, so nothing past the first window is dropped.
+        """
         client = self.config.client
         if not client:
             return self._fallback_extraction(text)
         
+        windows = split_into_windows(text)
+        if len(windows) == 1:
+            return self._extract_window(text)
+        
+        logger.info(f"Extracting questions from {len(windows)} windows ({len(text)} chars)")
+        window_results = map_concurrent(
+            lambda window: self._extract_window(window.text),
+            windows,
+            org_id=self.config.org_id
+        )
+        return self._merge_window_results(window_results)
+    
+    def _extract_window(self, text: str) -> Dict:
+        """Extract questions from a single window of text."""
+        client = self.config.client
         prompt = self.EXTRACTION_PROMPT.format(
-            text=text[:25000],
+            text=text,
             few_shot_examples=self.FEW_SHOT_EXAMPLES
         )
         
@@ -231,6 +264,45 @@ Return ONLY valid JSON, no markdown formatting or code blocks."""
             logger.error(f"AI extraction error: {e}")
             return self._fallback_extraction(text)
     
+    def _merge_window_results(self, window_results: List) -> Dict:
+        """
+        Reduce per-window extractions into one result.
+        
+        Questions repeated across window overlaps (or phrased near-identically)
+        are kept once, in document order.
+        
+        Args:
+            window_results: (window, result, error) tuples in document order
+        """
+        seen = NearDuplicateIndex(threshold=0.8)
+        questions = []
+        
+        for window, result, error in window_results:
+            if error is not None:
+                result = self._fallback_extraction(window.text)
+            for q in (result or {}).get("questions", []):
+                if not q.get("text") or not seen.add_if_new(q["text"]):
+                    continue
+                q["id"] = len(questions) + 1
+                q["document_position"] = window.position
+                questions.append(q)
+        
+        category_breakdown = {}
+        for q in questions:
+            cat = q.get("category", "general")
+            category_breakdown[cat] = category_breakdown.get(cat, 0) + 1
+        mandatory_count = sum(1 for q in questions if q.get("mandatory"))
+        
+        return {
+            "questions": questions,
+            "total_count": len(questions),
+            "category_breakdown": category_breakdown,
+            "mandatory_count": mandatory_count,
+            "optional_count": len(questions) - mandatory_count,
+            "table_questions_count": sum(1 for q in questions if q.get("requires_table_response")),
+            "windows_processed": len(window_results)
+        }
+    
     def _fallback_extraction(self, text: str) -> Dict:
         """Pattern-based question extraction fallback."""
         questions = []
@@ -402,22 +474,7 @@ Return ONLY valid JSON, no markdown formatting or code blocks."""
     
     def _guess_category(self, text: str) -> str:
         """Guess question category based on keywords."""
-        text_lower = text.lower()
-        
-        categories = {
-            'security': ['security', 'encrypt', 'access', 'authentication', 'password'],
-            'compliance': ['compliance', 'regulatory', 'audit', 'gdpr', 'hipaa'],
-            'technical': ['technical', 'api', 'integration', 'architecture', 'system'],
-            'pricing': ['price', 'cost', 'fee', 'budget', 'payment'],
-            'legal': ['legal', 'contract', 'liability', 'indemnity', 'warranty'],
-            'product': ['feature', 'functionality', 'capability', 'product'],
-        }
-        
-        for category, keywords in categories.items():
-            if any(kw in text_lower for kw in keywords):
-                return category
-        
-        return 'general'
+        return _CATEGORY_CLASSIFIER.first_match(text, default='general')
 
 
 def get_question_extractor_agent(org_id: int = None) -> QuestionExtractorAgent:
@@ -5,9 +5,45 @@ from .retry_decorator import (
     with_graceful_degradation,
     RetryConfig
 )
+from .concurrency import (
+    get_org_semaphore,
+    org_llm_slot,
+    iter_concurrent,
+    map_concurrent
+)
+from .windowing import (
+    TextWindow,
+    split_into_windows
+)
+from .prompt_packing import (
+    PackItem,
+    pack_by_budget,
+    estimate_tokens
+)
+from .pipeline import (
+    PipelineStage,
+    PipelineItem,
+    StagePipeline,
+    PipelineCancelled,
+    micro_batches
+)
 
 __all__ = [
     'with_retry',
     'with_graceful_degradation',
     'RetryConfig',
+    'get_org_semaphore',
+    'org_llm_slot',
+    'iter_concurrent',
+    'map_concurrent',
+    'TextWindow',
+    'split_into_windows',
+    'PackItem',
+    'pack_by_budget',
+    'estimate_tokens',
+    'PipelineStage',
+    'PipelineItem',
+    'StagePipeline',
+    'PipelineCancelled',
+    'micro_batches',
 ]
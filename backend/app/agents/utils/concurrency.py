@@ -0,0 +1,130 @@
+"""
+Concurrency helpers for agents.
+
+Runs independent LLM calls concurrently in a thread pool while capping the
+number of in-flight calls per organization, so one tenant's large job cannot
+exhaust the provider quota for everyone else in the same process.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent LLM calls per organization (per process)
+LLM_CONCURRENCY_PER_ORG = int(os.environ.get('LLM_CONCURRENCY_PER_ORG', 4))
+
+_org_semaphores: Dict[Any, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def get_org_semaphore(org_id: Optional[int]) -> threading.BoundedSemaphore:
+    """Get the shared semaphore limiting concurrent LLM calls for an org."""
+    key = org_id or 'default'
+    with _semaphores_lock:
+        semaphore = _org_semaphores.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(LLM_CONCURRENCY_PER_ORG)
+            _org_semaphores[key] = semaphore
+        return semaphore
+
+
+@contextmanager
+def org_llm_slot(org_id: Optional[int]):
+    """
+    Hold one of the org's LLM concurrency slots for the duration of a call.
+
+    Usage:
+        with org_llm_slot(self.org_id):
+            response = client.generate_content(prompt)
+    """
+    semaphore = get_org_semaphore(org_id)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def _with_app_context(func: Callable) -> Callable:
+    """Propagate the Flask app context (if any) into worker threads."""
+    try:
+        from flask import current_app, has_app_context
+        if not has_app_context():
+            return func
+        app = current_app._get_current_object()
+    except ImportError:
+        return func
+
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def iter_concurrent(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    org_id: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Run ``func(item)`` for every item concurrently, yielding as each finishes.
+
+    Each call holds one of the org's LLM slots, so at most
+    LLM_CONCURRENCY_PER_ORG calls run at once for an org across all callers
+    in this process.
+
+    Args:
+        func: Callable invoked with a single item
+        items: Work items
+        org_id: Organization whose concurrency cap applies
+        max_workers: Thread pool size (default: the per-org cap)
+
+    Yields:
+        (item, result, error) tuples in completion order; ``error`` is the
+        raised exception (and ``result`` None) if the call failed
+    """
+    items = list(items)
+    if not items:
+        return
+
+    def run(item):
+        with org_llm_slot(org_id):
+            return func(item)
+
+    run = _with_app_context(run)
+    workers = max(1, min(max_workers or LLM_CONCURRENCY_PER_ORG, len(items)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='agent-llm') as executor:
+        futures = {executor.submit(run, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                logger.error(f"Concurrent agent call failed for {item!r}: {e}")
+                yield item, None, e
+
+
+def map_concurrent(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    org_id: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Like iter_concurrent, but returns all results in input order.
+    """
+    items = list(items)
+    results: List[Tuple[Any, Any, Optional[Exception]]] = [None] * len(items)
+    indexed = iter_concurrent(
+        lambda pair: func(pair[1]), list(enumerate(items)),
+        org_id=org_id, max_workers=max_workers
+    )
+    for (i, item), result, error in indexed:
+        results[i] = (item, result, error)
+    return results
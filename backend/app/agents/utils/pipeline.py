@@ -0,0 +1,204 @@
+"""
+Pipelined stage execution.
+
+Runs a sequence of stages over a stream of work items (e.g. micro-batches
+of questions) so that each item moves to the next stage as soon as the
+previous one finishes with it, instead of every stage waiting for the
+whole run. Stages are connected by bounded queues, so a slow stage applies
+back-pressure rather than letting work pile up in memory.
+
+Finished items are handed back on the calling thread, which is where
+progress reporting (Celery update_state, socket events) should happen.
+
+Items that already went through some stages (e.g. restored from a
+checkpoint) skip those stages, and a stop check between stages lets a
+run be cancelled without abandoning a stage halfway.
+"""
+import logging
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .concurrency import _with_app_context
+
+logger = logging.getLogger(__name__)
+
+# Questions per item flowing through the answer pipeline
+PIPELINE_MICRO_BATCH = int(os.environ.get('PIPELINE_MICRO_BATCH', 4))
+# Max items waiting between two stages
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', 4))
+
+_POLL_SECONDS = 0.1
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised by StagePipeline.run when the stop check asked to stop."""
+
+
+@dataclass
+class PipelineStage:
+    """One stage of a pipeline."""
+    name: str
+    func: Callable[[Any], Any]  # payload -> payload
+    workers: int = 1
+    # A failing critical stage stops the item; otherwise it passes through unchanged
+    critical: bool = False
+
+
+@dataclass
+class PipelineItem:
+    """A work item and what happened to it on the way through."""
+    index: int
+    payload: Any
+    completed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    failed: bool = False
+
+
+class StagePipeline:
+    """
+    Execute stages over items with one thread pool per stage.
+
+    Usage:
+        pipeline = StagePipeline([
+            PipelineStage('retrieve', retrieve, workers=2),
+            PipelineStage('generate', generate, workers=2, critical=True),
+        ])
+        for item in pipeline.run(batches):
+            report(item)
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = None):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size or PIPELINE_QUEUE_SIZE
+
+    def run(
+        self,
+        payloads: Iterable[Any],
+        should_stop: Callable[[], bool] = None,
+        on_stage_done: Callable[[PipelineItem, str], None] = None,
+    ) -> Iterator[PipelineItem]:
+        """
+        Push payloads through all stages.
+
+        Args:
+            payloads: Work items, fed lazily in order. A PipelineItem is used
+                as is, so stages listed in its ``completed`` are skipped
+            should_stop: Checked before each stage runs; once it returns
+                True no new stage work starts and PipelineCancelled is raised
+            on_stage_done: Called from the worker thread after a stage
+                finished an item (e.g. to checkpoint it)
+
+        Yields:
+            PipelineItem for each payload, in completion order
+
+        Raises:
+            PipelineCancelled: If should_stop returned True
+        """
+        stop = threading.Event()
+        cancelled = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        queues.append(queue.Queue())  # finished items, drained by the caller
+        threads = []
+
+        def put(q: queue.Queue, value) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(value, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            try:
+                for index, payload in enumerate(payloads):
+                    item = payload if isinstance(payload, PipelineItem) else PipelineItem(index=index, payload=payload)
+                    if not put(queues[0], item):
+                        return
+            except Exception as e:
+                logger.error(f"Pipeline feed failed: {e}")
+                put(queues[-1], e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put(queues[0], _DONE)
+
+        for position, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            next_workers = self.stages[position + 1].workers if position + 1 < len(self.stages) else 1
+
+            def work(stage=stage, inbox=queues[position], outbox=queues[position + 1],
+                     remaining=remaining, lock=lock, next_workers=next_workers):
+                while not stop.is_set():
+                    try:
+                        item = inbox.get(timeout=_POLL_SECONDS)
+                    except queue.Empty:
+                        continue
+                    if item is _DONE:
+                        break
+                    if not item.failed and stage.name not in item.completed:
+                        if should_stop is not None and should_stop():
+                            cancelled.set()
+                            stop.set()
+                            return
+                        try:
+                            item.payload = stage.func(item.payload)
+                            item.completed.append(stage.name)
+                        except Exception as e:
+                            logger.error(f"Pipeline stage '{stage.name}' failed for item {item.index}: {e}")
+                            item.errors[stage.name] = str(e)
+                            item.failed = stage.critical
+                        if on_stage_done is not None and stage.name in item.completed:
+                            try:
+                                on_stage_done(item, stage.name)
+                            except Exception as e:
+                                logger.warning(f"Pipeline stage hook failed for item {item.index}: {e}")
+                    if not put(outbox, item):
+                        return
+                # The last worker of a stage to finish closes the next stage
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for _ in range(next_workers):
+                        put(outbox, _DONE)
+
+            work = _with_app_context(work)
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=work, name=f'pipeline-{stage.name}-{n}', daemon=True
+                ))
+
+        threads.append(threading.Thread(target=_with_app_context(feed), name='pipeline-feed', daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                try:
+                    item = queues[-1].get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    if cancelled.is_set():
+                        raise PipelineCancelled()
+                    continue
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+
+def micro_batches(items: List[Any], size: Optional[int] = None) -> List[List[Any]]:
+    """Split items into consecutive batches of at most ``size``."""
+    size = max(1, size or PIPELINE_MICRO_BATCH)
+    return [items[i:i + size] for i in range(0, len(items), size)]
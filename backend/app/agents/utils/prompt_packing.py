@@ -0,0 +1,90 @@
+"""
+Token-budget packing for multi-item prompts.
+
+Groups work items (e.g. questions) into batches that fit a token budget,
+preferring to put items that share context blocks together so each shared
+block is sent once per batch instead of once per item.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# Token budget per batched request (prompt + expected output)
+ANSWER_BATCH_TOKEN_BUDGET = int(os.environ.get('ANSWER_BATCH_TOKEN_BUDGET', 8000))
+# Max questions packed into one request
+ANSWER_BATCH_MAX_QUESTIONS = int(os.environ.get('ANSWER_BATCH_MAX_QUESTIONS', 8))
+
+# Rough chars-per-token ratio for English prose (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(text or '') // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class PackItem:
+    """One item to pack."""
+    key: Any
+    group: str
+    cost: int  # tokens used by the item itself
+    shared: Dict[str, int] = field(default_factory=dict)  # shared block key -> tokens
+
+
+def pack_by_budget(
+    items: List[PackItem],
+    budget: int,
+    max_items: int,
+    base_cost: int = 0,
+) -> List[List[PackItem]]:
+    """
+    Greedily pack items into batches under a token budget.
+
+    Items are only packed with items of the same group. Each batch starts
+    from the earliest unpacked item and repeatedly adds the item that shares
+    the most context tokens with the batch so far, as long as it fits.
+    An item that does not fit the budget on its own gets a batch of one.
+
+    Args:
+        items: Items in their preferred order
+        budget: Max tokens per batch
+        max_items: Max items per batch
+        base_cost: Fixed tokens per batch (instructions, format spec)
+
+    Returns:
+        Batches of items
+    """
+    groups: Dict[str, List[PackItem]] = {}
+    for item in items:
+        groups.setdefault(item.group, []).append(item)
+
+    batches = []
+    for remaining in groups.values():
+        while remaining:
+            seed = remaining.pop(0)
+            batch = [seed]
+            used = set(seed.shared)
+            tokens = base_cost + seed.cost + sum(seed.shared.values())
+
+            while len(batch) < max_items and remaining:
+                best_idx, best_saved = None, -1
+                for idx, candidate in enumerate(remaining):
+                    added = candidate.cost + sum(
+                        t for k, t in candidate.shared.items() if k not in used
+                    )
+                    if tokens + added > budget:
+                        continue
+                    saved = sum(t for k, t in candidate.shared.items() if k in used)
+                    if saved > best_saved:
+                        best_idx, best_saved = idx, saved
+                if best_idx is None:
+                    break
+
+                chosen = remaining.pop(best_idx)
+                tokens += chosen.cost + sum(t for k, t in chosen.shared.items() if k not in used)
+                used.update(chosen.shared)
+                batch.append(chosen)
+
+            batches.append(batch)
+    return batches
@@ -0,0 +1,97 @@
+"""
+Document windowing for map-reduce LLM extraction.
+
+Splits long documents into overlapping windows that end on structural
+boundaries (headings, then paragraphs, then lines) so a question or
+requirement is rarely cut in half. The overlap catches the ones that are.
+"""
+import bisect
+import os
+import re
+from dataclasses import dataclass
+from typing import List
+
+# Characters per window sent to the model (the old single-shot limit)
+EXTRACTION_WINDOW_CHARS = int(os.environ.get('EXTRACTION_WINDOW_CHARS', 25000))
+# Characters repeated at the start of each following window
+EXTRACTION_WINDOW_OVERLAP = int(os.environ.get('EXTRACTION_WINDOW_OVERLAP', 1500))
+
+# A window may end early (down to this fraction of its size) to land on a boundary
+_MIN_FILL = 0.6
+
+_HEADING_RE = re.compile(
+    r'^[ \t]*(?:'
+    r'\d+(?:\.\d+)*[.)]?[ \t]+[A-Z]'                                        # 1. / 2.3 Numbered heading
+    r'|(?i:section|part|chapter|appendix|annex|schedule|article)\b'         # Section 4 / Appendix B
+    r'|[A-Z][A-Z0-9 &/,()-]{3,}$'                                           # ALL CAPS line
+    r')',
+    re.MULTILINE
+)
+
+
+@dataclass
+class TextWindow:
+    """A slice of a document."""
+    index: int
+    start: int
+    end: int
+    text: str
+    position: str = 'beginning'  # beginning/middle/end of the document
+
+
+def _best_cut(text: str, headings: List[int], lo: int, hi: int) -> int:
+    """Pick the last structural boundary in (lo, hi], else hi."""
+    i = bisect.bisect_right(headings, hi) - 1
+    if i >= 0 and headings[i] > lo:
+        return headings[i]
+    for sep in ('\n\n', '\n', '. '):
+        cut = text.rfind(sep, lo, hi)
+        if cut != -1:
+            return cut + len(sep)
+    return hi
+
+
+def split_into_windows(
+    text: str,
+    window_chars: int = None,
+    overlap_chars: int = None,
+) -> List[TextWindow]:
+    """
+    Split text into overlapping, structure-aware windows.
+
+    Args:
+        text: Document text
+        window_chars: Max characters per window (default EXTRACTION_WINDOW_CHARS)
+        overlap_chars: Characters shared with the previous window
+            (default EXTRACTION_WINDOW_OVERLAP)
+
+    Returns:
+        Windows in document order; a single window if the text fits
+    """
+    window_chars = window_chars or EXTRACTION_WINDOW_CHARS
+    overlap_chars = EXTRACTION_WINDOW_OVERLAP if overlap_chars is None else overlap_chars
+    overlap_chars = min(overlap_chars, window_chars // 4)
+    length = len(text)
+    headings = [m.start() for m in _HEADING_RE.finditer(text)]
+
+    spans = []
+    start = 0
+    while start < length:
+        hard_end = start + window_chars
+        if hard_end >= length:
+            spans.append((start, length))
+            break
+        end = _best_cut(text, headings, start + int(window_chars * _MIN_FILL), hard_end)
+        spans.append((start, end))
+
+        # Start the next window a little before the cut, on a line boundary
+        next_start = max(end - overlap_chars, start + 1)
+        line_break = text.find('\n', next_start, end)
+        start = line_break + 1 if line_break != -1 else next_start
+
+    windows = []
+    for i, (s, e) in enumerate(spans):
+        midpoint = (s + e) / 2 / max(length, 1)
+        position = 'beginning' if midpoint < 1 / 3 else 'middle' if midpoint < 2 / 3 else 'end'
+        windows.append(TextWindow(index=i, start=s, end=e, text=text[s:e], position=position))
+    return windows
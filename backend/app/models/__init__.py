@@ -5,6 +5,7 @@ from .organization_ai_config import OrganizationAIConfig
 from .agent_ai_config import AgentAIConfig
 from .project import Project, project_reviewers
 from .document import Document
+from .document_chunk_manifest import DocumentChunkManifest
 from .question import Question
 from .answer import Answer, AnswerComment
 from .knowledge import KnowledgeItem
@@ -17,6 +18,7 @@ from .feedback import AnswerEdit, AnswerFeedback, AgentPerformance
 from .feedback_learning import FeedbackLearning  # NEW
 from .invitation import Invitation
 from .proposal_version import ProposalVersion
+from .content_blob import ContentBlob
 from .section_version import SectionVersion, save_section_version
 from .compliance_item import ComplianceItem
 from .answer_library import AnswerLibraryItem
@@ -36,6 +38,13 @@ from .document_chat import DocumentChatSession, DocumentChatMessage
 # Webhooks (Enterprise feature)
 from .webhook import WebhookConfig, WebhookDelivery, WEBHOOK_EVENTS
 
+# Background knowledge ingestion
+from .ingestion_batch import IngestionBatch, IngestionFile
+
+# Incremental freshness scores for library and knowledge items
+from .freshness import register_freshness_events
+register_freshness_events(AnswerLibraryItem, KnowledgeItem)
+
 __all__ = [
     'User',
     'Organization',
@@ -44,6 +53,7 @@ __all__ = [
     'Project',
     'project_reviewers',
     'Document',
+    'DocumentChunkManifest',
     'Question',
     'Answer',
     'AnswerComment',
@@ -70,6 +80,7 @@ __all__ = [
     'Invitation',
     # Proposal Versions
     'ProposalVersion',
+    'ContentBlob',
     # Section Versions
     'SectionVersion',
     'save_section_version',
@@ -92,4 +103,7 @@ __all__ = [
     'ExportTemplate',
     # Project Strategy
     'ProjectStrategy',
+    # Knowledge Ingestion
+    'IngestionBatch',
+    'IngestionFile',
 ]
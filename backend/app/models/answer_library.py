@@ -40,6 +40,12 @@ class AnswerLibraryItem(db.Model):
     times_used = db.Column(db.Integer, default=0)
     times_helpful = db.Column(db.Integer, default=0)  # Positive feedback count
     
+    # Freshness (maintained incrementally, see models/freshness.py)
+    staleness_score = db.Column(db.Float, nullable=True)  # 0 = fresh, 1 = stale
+    staleness_computed_at = db.Column(db.DateTime, nullable=True)
+    staleness_next_check_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Next sweep rescore
+    content_updated_at = db.Column(db.DateTime, nullable=True)  # Last content edit (age reference)
+    
     # Metadata
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     updated_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -54,6 +60,11 @@ class AnswerLibraryItem(db.Model):
     reviewer_user = db.relationship('User', foreign_keys=[reviewed_by])
     source_project = db.relationship('Project', backref='library_items')
     
+    __table_args__ = (
+        # Freshness range scans per organization
+        db.Index('ix_answer_library_items_org_staleness', 'organization_id', 'staleness_score'),
+    )
+    
     def to_dict(self):
         """Serialize to dictionary."""
         return {
@@ -76,6 +87,7 @@ class AnswerLibraryItem(db.Model):
             'source_answer_id': self.source_answer_id,
             'times_used': self.times_used,
             'times_helpful': self.times_helpful,
+            'staleness_score': self.staleness_score,
             'created_by': self.created_by,
             'creator_name': self.creator.name if self.creator else None,
             'updated_by': self.updated_by,
@@ -0,0 +1,27 @@
+"""Content-addressed blob storage for version snapshots."""
+from datetime import datetime
+from ..extensions import db
+
+
+class ContentBlob(db.Model):
+    """
+    Compressed text stored once per distinct content.
+
+    Proposal version snapshots reference section bodies by their SHA-256
+    hash, so unchanged sections are shared by every snapshot containing them.
+    """
+    __tablename__ = 'content_blobs'
+
+    hash = db.Column(db.String(64), primary_key=True)  # SHA-256 of the UTF-8 text
+    data = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed UTF-8 text
+    size = db.Column(db.Integer, nullable=False)  # Uncompressed bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Refreshed when stored again (prune grace)
+
+    def to_dict(self):
+        """Serialize blob metadata (without content)."""
+        return {
+            'hash': self.hash,
+            'size': self.size,
+            'stored_size': len(self.data) if self.data else 0,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
@@ -42,7 +42,7 @@ class Document(db.Model):
     error_message = db.Column(db.Text, nullable=True)
     
     # Relationships
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Timestamps
@@ -55,6 +55,8 @@ class Document(db.Model):
     project = db.relationship('Project', back_populates='documents')
     uploader = db.relationship('User', foreign_keys=[uploaded_by])
     questions = db.relationship('Question', back_populates='document')
+    chunk_manifest = db.relationship('DocumentChunkManifest', back_populates='document', lazy='dynamic',
+                                     cascade='all, delete-orphan')
     
     def to_dict(self):
         """Serialize document to dictionary."""
@@ -0,0 +1,44 @@
+"""
+Document Chunk Manifest
+
+Records what is indexed in the vector database for each document: one row
+per chunk with its content hash and the embedding model that produced its
+vectors. Reindexing diffs freshly chunked content against the manifest
+(see app/services/document_index_service.py), so only new or changed
+chunks are re-embedded and only removed chunks are deleted.
+"""
+from datetime import datetime
+from ..extensions import db
+
+
+class DocumentChunkManifest(db.Model):
+    """A chunk of a document as currently indexed in Qdrant."""
+    __tablename__ = 'document_chunk_manifests'
+
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('documents.id', ondelete='CASCADE'), nullable=False)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id'), nullable=False, index=True)
+
+    chunk_id = db.Column(db.String(64), nullable=False)  # Deterministic per file, page and position
+    content_hash = db.Column(db.String(64), nullable=False)  # SHA256 of the chunk content and payload
+    page_number = db.Column(db.Integer, nullable=True)
+    embedding_model = db.Column(db.String(200), nullable=False, index=True)
+
+    indexed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('document_id', 'chunk_id', name='uq_document_chunk_manifest_chunk'),
+    )
+
+    # Relationships
+    document = db.relationship('Document', back_populates='chunk_manifest')
+
+    def to_dict(self):
+        """Serialize manifest entry to dictionary."""
+        return {
+            'chunk_id': self.chunk_id,
+            'content_hash': self.content_hash,
+            'page_number': self.page_number,
+            'embedding_model': self.embedding_model,
+            'indexed_at': self.indexed_at.isoformat() if self.indexed_at else None,
+        }
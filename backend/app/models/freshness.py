@@ -0,0 +1,139 @@
+"""
+Incremental staleness scores for answer library and knowledge items.
+
+Each item stores a staleness score (0 = fresh, 1 = stale), when it was
+computed, and when it next needs recomputing. Scores are refreshed by mapper
+events on insert/update (content edits, reviews, usage feedback) and by the
+periodic sweep in app/services/freshness_service.py, which only loads items
+whose ``staleness_next_check_at`` has passed.
+
+Age is measured from ``content_updated_at``, which only moves when one of
+CONTENT_FIELDS changes (``updated_at`` moves on every write, including usage
+counters and the staleness columns themselves).
+
+Score of an item:
+    age weight * min(1, days since last content edit or review / max age)
+    + feedback weight * share of unhelpful uses (library items only)
+An overdue review (next_review_due passed) lifts the score to at least the
+stale threshold.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from ..extensions import db
+
+FRESHNESS_MAX_AGE_DAYS = float(os.environ.get('FRESHNESS_MAX_AGE_DAYS', 365))
+FRESHNESS_STALE_THRESHOLD = float(os.environ.get('FRESHNESS_STALE_THRESHOLD', 0.7))
+
+# Age decay is re-evaluated each time it can have moved the score this much
+FRESHNESS_SCORE_STEP = 0.05
+AGE_WEIGHT = 0.8
+# Uses needed before helpful/unhelpful feedback counts
+MIN_FEEDBACK_USES = 3
+
+# Columns whose change counts as a content update (age resets)
+CONTENT_FIELDS = {
+    'answer_library_items': ('question_text', 'answer_text'),
+    'knowledge_items': ('title', 'content'),
+}
+
+
+def compute_staleness(
+    reference_time: Optional[datetime],
+    now: datetime,
+    review_due: Optional[datetime] = None,
+    times_used: int = 0,
+    times_helpful: int = 0,
+    age_weight: float = AGE_WEIGHT,
+) -> Tuple[float, Optional[datetime]]:
+    """
+    Staleness score and the time it next needs recomputing.
+
+    Args:
+        reference_time: Last content update or review
+        now: Current time
+        review_due: When the item is due for review, if scheduled
+        times_used: Number of uses
+        times_helpful: Uses marked helpful
+        age_weight: Weight of the age component (1.0 when there is no feedback)
+
+    Returns:
+        (score, next check time or None if only an item change can move
+        the score)
+    """
+    reference_time = reference_time or now
+    age_days = max((now - reference_time).total_seconds() / 86400, 0.0)
+    age_part = min(age_days / FRESHNESS_MAX_AGE_DAYS, 1.0)
+
+    feedback_part = 0.0
+    if times_used and times_used >= MIN_FEEDBACK_USES:
+        feedback_part = 1.0 - min((times_helpful or 0) / times_used, 1.0)
+
+    score = age_weight * age_part + (1.0 - age_weight) * feedback_part
+    overdue = review_due is not None and review_due <= now
+    if overdue:
+        score = max(score, FRESHNESS_STALE_THRESHOLD)
+
+    next_check = None
+    if age_part < 1.0:
+        # Linear decay: time for the age component to move the score one step
+        step = timedelta(days=FRESHNESS_SCORE_STEP * FRESHNESS_MAX_AGE_DAYS / age_weight)
+        next_check = min(now + step, reference_time + timedelta(days=FRESHNESS_MAX_AGE_DAYS))
+    if review_due is not None and not overdue:
+        next_check = min(next_check, review_due) if next_check else review_due
+
+    return round(min(score, 1.0), 4), next_check
+
+
+def compute_item_staleness(item, now: datetime) -> Tuple[float, Optional[datetime]]:
+    """Staleness score and next check time of a library or knowledge item."""
+    content_updated_at = item.content_updated_at or item.created_at
+
+    if item.__tablename__ == 'answer_library_items':
+        times = [t for t in (content_updated_at, item.last_reviewed_at) if t]
+        return compute_staleness(
+            max(times) if times else None, now,
+            review_due=item.next_review_due,
+            times_used=item.times_used or 0,
+            times_helpful=item.times_helpful or 0,
+        )
+    return compute_staleness(content_updated_at, now, age_weight=1.0)
+
+
+def refresh_item_staleness(item, now: datetime = None, content_changed: bool = False):
+    """
+    Recompute and store the staleness fields of a library or knowledge item.
+
+    Args:
+        item: AnswerLibraryItem or KnowledgeItem
+        now: Current time
+        content_changed: The content is being edited now (age resets)
+    """
+    now = now or datetime.utcnow()
+    if content_changed or item.content_updated_at is None:
+        item.content_updated_at = now if content_changed else (item.updated_at or item.created_at or now)
+
+    score, next_check = compute_item_staleness(item, now)
+    item.staleness_score = score
+    item.staleness_computed_at = now
+    item.staleness_next_check_at = next_check
+
+
+def _on_insert(mapper, connection, item):
+    refresh_item_staleness(item)
+
+
+def _on_update(mapper, connection, item):
+    state = db.inspect(item)
+    content_changed = any(
+        state.attrs[name].history.has_changes() for name in CONTENT_FIELDS[item.__tablename__]
+    )
+    refresh_item_staleness(item, content_changed=content_changed)
+
+
+def register_freshness_events(*models):
+    """Keep the staleness scores of the given models current on insert/update."""
+    for model in models:
+        if not db.event.contains(model, 'before_insert', _on_insert):
+            db.event.listen(model, 'before_insert', _on_insert)
+            db.event.listen(model, 'before_update', _on_update)
@@ -0,0 +1,101 @@
+"""
+Knowledge Ingestion Batch Models
+
+Track folder uploads that are chunked and indexed by background workers,
+with a status per uploaded file.
+"""
+import uuid
+from datetime import datetime
+from ..extensions import db
+
+
+class IngestionBatch(db.Model):
+    """A set of files uploaded to a knowledge folder in one request."""
+    __tablename__ = 'ingestion_batches'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id'), nullable=False, index=True)
+    folder_id = db.Column(db.Integer, db.ForeignKey('knowledge_folders.id'), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    # queued, processing, indexing, completed, completed_with_errors, failed
+    status = db.Column(db.String(30), default='queued')
+    # Dimensions applied to every item: geography, client_type, industry, knowledge_profile_id
+    options = db.Column(db.JSON, default=dict)
+    task_id = db.Column(db.String(100), nullable=True)  # Celery chord id
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    # Relationships
+    files = db.relationship('IngestionFile', backref='batch', lazy='dynamic',
+                            cascade='all, delete-orphan', order_by='IngestionFile.id')
+    folder = db.relationship('KnowledgeFolder')
+
+    def to_dict(self, include_files=True):
+        """Serialize batch with per-file progress."""
+        files = self.files.all()
+        counts = {}
+        for f in files:
+            counts[f.status] = counts.get(f.status, 0) + 1
+        finished = counts.get('indexed', 0) + counts.get('failed', 0)
+        data = {
+            'id': self.id,
+            'folder_id': self.folder_id,
+            'status': self.status,
+            'options': self.options or {},
+            'total_files': len(files),
+            'status_counts': counts,
+            'progress_percent': int(finished * 100 / len(files)) if files else 100,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+        if include_files:
+            data['files'] = [f.to_dict() for f in files]
+        return data
+
+
+class IngestionFile(db.Model):
+    """One uploaded file of an ingestion batch."""
+    __tablename__ = 'ingestion_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(36), db.ForeignKey('ingestion_batches.id'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    file_size = db.Column(db.Integer, nullable=True)
+    file_data = db.Column(db.LargeBinary, nullable=True)  # Cleared once the file is processed
+
+    # queued, processing, chunked, indexed, failed
+    status = db.Column(db.String(20), default='queued')
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    knowledge_item_id = db.Column(db.Integer, db.ForeignKey('knowledge_items.id'), nullable=True)
+    chunk_data = db.Column(db.JSON, nullable=True)  # Chunks waiting for the batch embedding step
+    chunk_count = db.Column(db.Integer, default=0)
+    page_count = db.Column(db.Integer, default=0)
+    indexed_chunks = db.Column(db.Integer, default=0)
+
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Serialize file status (without file content)."""
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'file_size': self.file_size,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'knowledge_item_id': self.knowledge_item_id,
+            'chunks': self.chunk_count,
+            'pages': self.page_count,
+            'indexed_chunks': self.indexed_chunks,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
@@ -16,6 +16,11 @@ class KnowledgeItem(db.Model):
     parent_id = db.Column(db.Integer, db.ForeignKey('knowledge_items.id'), nullable=True)  # Parent item for chunks
     usage_count = db.Column(db.Integer, default=0)  # Track how often used in answers
     last_used_at = db.Column(db.DateTime, nullable=True)  # Last time used for answer generation
+    # Freshness (maintained incrementally, see models/freshness.py)
+    staleness_score = db.Column(db.Float, nullable=True)  # 0 = fresh, 1 = stale
+    staleness_computed_at = db.Column(db.DateTime, nullable=True)
+    staleness_next_check_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Next sweep rescore
+    content_updated_at = db.Column(db.DateTime, nullable=True)  # Last content edit (age reference)
     source_type = db.Column(db.String(50), default='manual')  # document, csv, manual, file, approved_answer
     source_file = db.Column(db.String(255), nullable=True)  # Original file if imported
     file_path = db.Column(db.String(512), nullable=True)  # Path to uploaded file (optional)
@@ -49,6 +54,11 @@ class KnowledgeItem(db.Model):
     parent = db.relationship('KnowledgeItem', remote_side=[id], backref='chunks')
     profile = db.relationship('KnowledgeProfile', back_populates='knowledge_items')
     
+    __table_args__ = (
+        # Freshness range scans per organization
+        db.Index('ix_knowledge_items_org_staleness', 'organization_id', 'staleness_score'),
+    )
+    
     def to_dict(self):
         """Serialize knowledge item to dictionary."""
         return {
@@ -62,6 +72,7 @@ class KnowledgeItem(db.Model):
             'parent_id': self.parent_id,
             'usage_count': self.usage_count,
             'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
+            'staleness_score': self.staleness_score,
             'source_type': self.source_type,
             'source_file': self.source_file,
             'file_path': self.file_path,
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Dict, Iterable
+from sqlalchemy import and_, case, func
 from ..extensions import db
 
 
@@ -51,6 +53,14 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Project list ordering (updated_at DESC NULLS LAST, id DESC) and cursor pagination;
+        # SQLite cannot declare NULLS LAST in an index, see migration project_list_indexes_001
+        db.Index(
+            'ix_projects_org_updated', 'organization_id', updated_at.desc().nullslast(), id.desc()
+        ).ddl_if(dialect='postgresql'),
+    )
+    
     # Relationships
     organization = db.relationship('Organization', back_populates='projects')
     created_by_user = db.relationship('User', back_populates='projects', foreign_keys=[created_by])
@@ -73,8 +83,125 @@ class Project(db.Model):
         answered = sum(1 for q in self.questions if q.status in ['answered', 'approved'])
         return (answered / len(self.questions)) * 100
     
-    def to_dict(self, include_stats=False):
-        """Serialize project to dictionary."""
+    @staticmethod
+    def load_list_stats(project_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Stats of many projects from grouped aggregate queries.
+        
+        Runs a fixed number of queries regardless of the number of
+        projects, without loading documents, sections or questions.
+        
+        Args:
+            project_ids: Projects to compute stats for
+            
+        Returns:
+            {project_id: stats} to pass to to_dict(include_stats=True, stats=...)
+        """
+        from .document import Document
+        from .question import Question
+        from .rfp_section import RFPSection
+        from .knowledge import KnowledgeItem
+        from .knowledge_profile import KnowledgeProfile, project_knowledge_profiles
+        
+        project_ids = list(project_ids)
+        stats = {
+            pid: {
+                'document_count': 0,
+                'section_count': 0, 'sections_answered': 0, 'sections_approved': 0,
+                'question_count': 0, 'questions_answered': 0, 'questions_approved': 0,
+                'reviewer_ids': [], 'knowledge_profiles': []
+            }
+            for pid in project_ids
+        }
+        if not project_ids:
+            return stats
+        
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+        
+        for pid, count in db.session.query(
+            Document.project_id, func.count(Document.id)
+        ).filter(Document.project_id.in_(project_ids)).group_by(Document.project_id):
+            stats[pid]['document_count'] = count
+        
+        for pid, total, answered, approved in db.session.query(
+            RFPSection.project_id,
+            func.count(RFPSection.id),
+            count_if(and_(RFPSection.content.isnot(None), RFPSection.content != '')),
+            count_if(RFPSection.status.in_(['approved', 'reviewed']))
+        ).filter(RFPSection.project_id.in_(project_ids)).group_by(RFPSection.project_id):
+            stats[pid].update(section_count=total, sections_answered=answered, sections_approved=approved)
+        
+        for pid, total, answered, approved in db.session.query(
+            Question.project_id,
+            func.count(Question.id),
+            count_if(Question.status.in_(['answered', 'approved'])),
+            count_if(Question.status == 'approved')
+        ).filter(Question.project_id.in_(project_ids)).group_by(Question.project_id):
+            stats[pid].update(question_count=total, questions_answered=answered, questions_approved=approved)
+        
+        for pid, user_id in db.session.query(
+            project_reviewers.c.project_id, project_reviewers.c.user_id
+        ).filter(project_reviewers.c.project_id.in_(project_ids)):
+            stats[pid]['reviewer_ids'].append(user_id)
+        
+        profile_links = db.session.query(
+            project_knowledge_profiles.c.project_id, KnowledgeProfile
+        ).join(
+            KnowledgeProfile, KnowledgeProfile.id == project_knowledge_profiles.c.knowledge_profile_id
+        ).filter(project_knowledge_profiles.c.project_id.in_(project_ids)).all()
+        
+        if profile_links:
+            profile_ids = {profile.id for _, profile in profile_links}
+            items_counts = dict(db.session.query(
+                KnowledgeItem.knowledge_profile_id, func.count(KnowledgeItem.id)
+            ).filter(
+                KnowledgeItem.knowledge_profile_id.in_(profile_ids),
+                KnowledgeItem.is_active == True
+            ).group_by(KnowledgeItem.knowledge_profile_id).all())
+            
+            for pid, profile in profile_links:
+                profile_data = profile.to_dict()
+                profile_data['items_count'] = items_counts.get(profile.id, 0)
+                stats[pid]['knowledge_profiles'].append(profile_data)
+        
+        return stats
+    
+    def _load_stats(self) -> Dict:
+        """Stats of this project from its loaded relationships."""
+        sections_list = list(self.sections) if hasattr(self, 'sections') else []
+        questions = self.questions or []
+        return {
+            'document_count': len(self.documents) if self.documents else 0,
+            'section_count': len(sections_list),
+            # Sections with content = answered
+            'sections_answered': sum(1 for s in sections_list if s.content),
+            # Sections with status 'approved' or 'reviewed' = approved
+            'sections_approved': sum(1 for s in sections_list if s.status in ['approved', 'reviewed']),
+            'question_count': len(questions),
+            'questions_answered': sum(1 for q in questions if q.status in ['answered', 'approved']),
+            'questions_approved': sum(1 for q in questions if q.status == 'approved'),
+            'reviewer_ids': [r.id for r in self.reviewers] if self.reviewers else [],
+            'knowledge_profiles': [p.to_dict(include_items_count=True) for p in self.knowledge_profiles] if self.knowledge_profiles else []
+        }
+    
+    def to_dict(self, include_stats=False, stats: Dict = None):
+        """
+        Serialize project to dictionary.
+        
+        Args:
+            include_stats: Include document/question counts, reviewers and profiles
+            stats: Precomputed stats from load_list_stats (avoids loading
+                the project's relationships)
+        """
+        if include_stats and stats is None:
+            stats = self._load_stats()
+        
+        if stats is not None:
+            profile_ids = [p['id'] for p in stats['knowledge_profiles']]
+        else:
+            profile_ids = [p.id for p in self.knowledge_profiles] if self.knowledge_profiles else []
+        
         data = {
             'id': self.id,
             'name': self.name,
@@ -103,7 +230,7 @@ class Project(db.Model):
             'contract_value': self.contract_value,
             'loss_reason': self.loss_reason,
             # Knowledge profiles
-            'knowledge_profile_ids': [p.id for p in self.knowledge_profiles] if self.knowledge_profiles else [],
+            'knowledge_profile_ids': profile_ids,
             'organization_id': self.organization_id,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -111,31 +238,22 @@ class Project(db.Model):
         }
         
         if include_stats:
-            data['document_count'] = len(self.documents) if self.documents else 0
+            data['document_count'] = stats['document_count']
             
             # Prioritize RFP sections (current content model) over legacy questions
-            sections_list = list(self.sections) if hasattr(self, 'sections') else []
-            questions = self.questions or []
-            
-            if sections_list:
+            if stats['section_count']:
                 # RFP sections-based counting (primary content model)
-                data['question_count'] = len(sections_list)
-                # Sections with content = answered
-                data['answered_count'] = sum(1 for s in sections_list if s.content)
-                # Sections with status 'approved' or 'reviewed' = approved
-                data['approved_count'] = sum(1 for s in sections_list if s.status in ['approved', 'reviewed'])
-            elif questions:
-                # Legacy questions-based counting (fallback)
-                data['question_count'] = len(questions)
-                data['answered_count'] = sum(1 for q in questions if q.status in ['answered', 'approved'])
-                data['approved_count'] = sum(1 for q in questions if q.status == 'approved')
+                data['question_count'] = stats['section_count']
+                data['answered_count'] = stats['sections_answered']
+                data['approved_count'] = stats['sections_approved']
             else:
-                data['question_count'] = 0
-                data['answered_count'] = 0
-                data['approved_count'] = 0
+                # Legacy questions-based counting (fallback)
+                data['question_count'] = stats['question_count']
+                data['answered_count'] = stats['questions_answered']
+                data['approved_count'] = stats['questions_approved']
             
-            data['reviewer_ids'] = [r.id for r in self.reviewers] if self.reviewers else []
-            data['knowledge_profiles'] = [p.to_dict(include_items_count=True) for p in self.knowledge_profiles] if self.knowledge_profiles else []
+            data['reviewer_ids'] = stats['reviewer_ids']
+            data['knowledge_profiles'] = stats['knowledge_profiles']
             
             # Update completion_percent dynamically
             if data['question_count'] > 0:
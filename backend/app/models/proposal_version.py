@@ -12,10 +12,14 @@ class ProposalVersion(db.Model):
     version_number = db.Column(db.Integer, nullable=False)  # Auto-incremented per project
     title = db.Column(db.String(255), nullable=False)  # e.g., "Draft v1", "Final Review"
     description = db.Column(db.Text, nullable=True)  # Optional notes
-    file_data = db.Column(db.LargeBinary, nullable=False)  # DOCX binary content
+    file_data = db.Column(db.LargeBinary, nullable=True)  # Legacy inline DOCX (new versions use file_id)
+    file_id = db.Column(db.String(100), nullable=True)  # DOCX in object storage
+    file_checksum = db.Column(db.String(64), nullable=True)  # SHA-256 of the DOCX
     file_type = db.Column(db.String(10), default='docx')
     file_size = db.Column(db.Integer)
-    # Sections snapshot for restoration - stores all section data as JSON
+    export_options = db.Column(db.JSON, nullable=True)  # Options to regenerate the DOCX (include_qa)
+    # Sections snapshot for restoration - stores all section data as JSON;
+    # section bodies are referenced by content_hash (see version_storage_service)
     sections_snapshot = db.Column(db.JSON, nullable=True)  # Section content for restore
     is_restoration_point = db.Column(db.Boolean, default=False)  # True if created by restore
     restored_from_version = db.Column(db.Integer, nullable=True)  # Source version if restored
@@ -17,7 +17,7 @@ class Question(db.Model):
     status = db.Column(db.String(50), default='pending')  # pending, answered, review, approved, rejected
     original_text = db.Column(db.Text, nullable=True)  # Before any edits
     notes = db.Column(db.Text, nullable=True)  # Internal notes
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
     document_id = db.Column(db.Integer, db.ForeignKey('documents.id'), nullable=True)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     due_date = db.Column(db.DateTime, nullable=True)
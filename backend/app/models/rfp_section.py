@@ -60,7 +60,7 @@ class RFPSection(db.Model):
     __tablename__ = 'rfp_sections'
     
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
     section_type_id = db.Column(db.Integer, db.ForeignKey('rfp_section_types.id'), nullable=False)
     title = db.Column(db.String(255))  # Custom title override
     order = db.Column(db.Integer, default=0)  # Display order in proposal
@@ -1,19 +1,33 @@
 """Section Version model for tracking section edit history."""
+import os
 from datetime import datetime
+from typing import Dict, Optional
 from ..extensions import db
+from ..utils.text_delta import apply_delta, decode_delta, encode_delta, make_delta
+
+# Every Nth version of a section stores its full content; the versions in
+# between store a delta against the previous version
+SECTION_KEYFRAME_INTERVAL = int(os.environ.get('SECTION_KEYFRAME_INTERVAL', 10))
 
 
 class SectionVersion(db.Model):
     """
     Stores historical versions of section content.
     Created automatically when section content is modified.
+    
+    Content is stored as a delta chain: keyframes hold the full content,
+    other versions hold a line delta against their base version (the
+    previous version of the section). Use get_content() to read it.
     """
     __tablename__ = 'section_versions'
     
     id = db.Column(db.Integer, primary_key=True)
     section_id = db.Column(db.Integer, db.ForeignKey('rfp_sections.id', ondelete='CASCADE'), nullable=False)
     version_number = db.Column(db.Integer, nullable=False)  # Matches section.version at time of save
-    content = db.Column(db.Text)  # Content at this version
+    content = db.Column(db.Text)  # Content at this version (keyframes only)
+    content_delta = db.Column(db.Text, nullable=True)  # JSON line delta against base_version
+    base_version_id = db.Column(db.Integer, db.ForeignKey('section_versions.id', ondelete='CASCADE'), nullable=True)
+    delta_depth = db.Column(db.Integer, default=0)  # Deltas since the last keyframe (0 = keyframe)
     title = db.Column(db.String(255))  # Title at this version
     status = db.Column(db.String(50))  # Status at this version
     confidence_score = db.Column(db.Float)  # Confidence at this version
@@ -25,14 +39,44 @@ class SectionVersion(db.Model):
     # Relationships
     section = db.relationship('RFPSection', backref=db.backref('history', lazy='dynamic', order_by='SectionVersion.version_number.desc()'))
     changed_by_user = db.relationship('User', foreign_keys=[changed_by])
+    base_version = db.relationship('SectionVersion', remote_side=[id])
+    
+    @property
+    def is_keyframe(self) -> bool:
+        """Whether the full content is stored on this version."""
+        return self.content_delta is None
     
-    def to_dict(self):
+    def get_content(self, cache: Dict[int, Optional[str]] = None) -> Optional[str]:
+        """
+        Content at this version, rebuilt from the nearest keyframe.
+        
+        Args:
+            cache: Optional {version id: content} shared across calls, so
+                reading a whole history applies each delta once
+        """
+        cache = cache if cache is not None else {}
+        chain = []
+        version = self
+        while version.id not in cache and not version.is_keyframe:
+            chain.append(version)
+            version = version.base_version
+        content = cache[version.id] if version.id in cache else version.content
+        if version.id is not None:
+            cache[version.id] = content
+        
+        for delta_version in reversed(chain):
+            content = apply_delta(content, decode_delta(delta_version.content_delta))
+            if delta_version.id is not None:
+                cache[delta_version.id] = content
+        return content
+    
+    def to_dict(self, content_cache: Dict[int, Optional[str]] = None):
         """Serialize version to dictionary."""
         return {
             'id': self.id,
             'section_id': self.section_id,
             'version_number': self.version_number,
-            'content': self.content,
+            'content': self.get_content(content_cache),
             'title': self.title,
             'status': self.status,
             'confidence_score': self.confidence_score,
@@ -58,10 +102,25 @@ def save_section_version(section, user_id, change_type='edit', change_summary=No
     Returns:
         SectionVersion object
     """
+    content = section.content
+    content_delta = None
+    base_version = SectionVersion.query.filter_by(section_id=section.id)\
+        .order_by(SectionVersion.id.desc()).first()
+    
+    # Store a delta unless a keyframe is due or the delta would not be smaller
+    if (content is not None and base_version is not None
+            and (base_version.delta_depth or 0) + 1 < SECTION_KEYFRAME_INTERVAL):
+        encoded = encode_delta(make_delta(base_version.get_content() or '', content))
+        if len(encoded) < len(content):
+            content, content_delta = None, encoded
+    
     version = SectionVersion(
         section_id=section.id,
         version_number=section.version,
-        content=section.content,
+        content=content,
+        content_delta=content_delta,
+        base_version_id=base_version.id if content_delta is not None else None,
+        delta_depth=(base_version.delta_depth or 0) + 1 if content_delta is not None else 0,
         title=section.title,
         status=section.status,
         confidence_score=section.confidence_score,
@@ -3,7 +3,8 @@ Agent API Routes
 
 Provides REST API endpoints for the multi-agent RFP analysis system.
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+import json
 import logging
 
 from app.agents import (
@@ -241,7 +242,8 @@ def check_freshness():
     Request body:
     {
         "project_id": int,
-        "library_item_ids": [int] (optional, defaults to all in org),
+        "library_item_ids": [int] (optional, defaults to the org's stalest items),
+        "min_staleness": float (optional, threshold for the default selection),
         "org_id": int (optional)
     }
     """
@@ -273,12 +275,17 @@ def check_freshness():
         if not project_context:
              return jsonify({"error": "No content found in documents"}), 400
 
-        # Get library items
-        query = AnswerLibraryItem.query.filter_by(organization_id=org_id, is_active=True)
+        # Get library items: the requested ones, or the stalest by stored score
         if library_item_ids:
-            query = query.filter(AnswerLibraryItem.id.in_(library_item_ids))
-        
-        library_items = query.all()
+            library_items = AnswerLibraryItem.query.filter_by(organization_id=org_id, is_active=True)\
+                .filter(AnswerLibraryItem.id.in_(library_item_ids)).all()
+        else:
+            from app.services.freshness_service import get_stale_items, FRESHNESS_AUDIT_LIMIT
+            library_items = get_stale_items(
+                AnswerLibraryItem, org_id,
+                min_score=data.get('min_staleness'),
+                limit=FRESHNESS_AUDIT_LIMIT
+            )
         if not library_items:
             return jsonify({"success": True, "audits": [], "message": "No library items found"}), 200
 
@@ -377,7 +384,7 @@ def job_status(job_id):
     Returns:
         {
             "job_id": "uuid",
-            "status": "PENDING|PROGRESS|SUCCESS|FAILURE",
+            "status": "PENDING|PROGRESS|SUCCESS|FAILURE|CANCELLED",
             "result": {...},  // if SUCCESS
             "error": "...",   // if FAILURE
             "progress": {...}  // if PROGRESS
@@ -402,6 +409,8 @@ def job_status(job_id):
             response['result'] = task.result
         elif task.state == 'FAILURE':
             response['error'] = str(task.info)
+        elif task.state == 'CANCELLED':
+            response['progress'] = task.info
         else:
             response['info'] = str(task.info)
         
@@ -417,20 +426,27 @@ def cancel_job(job_id):
     """
     Cancel a running async job.
     
+    Running RFP analyses stop at their next checkpoint (between stages or
+    question batches) and can be continued later with /resume-job.
+    
     Returns:
         {"job_id": "uuid", "status": "CANCELLED"}
     """
     try:
         from app.extensions import celery
         from celery.result import AsyncResult
+        from app.services.job_checkpoint_service import get_job_checkpoint_store
+        
+        get_job_checkpoint_store().request_cancel(job_id)
         
+        # Drop the job if it has not started; running jobs stop cooperatively
         task = AsyncResult(job_id, app=celery)
-        task.revoke(terminate=True)
+        task.revoke()
         
         return jsonify({
             "job_id": job_id,
             "status": "CANCELLED",
-            "message": "Task cancellation requested"
+            "message": "Task will stop at its next checkpoint"
         })
         
     except Exception as e:
@@ -438,6 +454,57 @@ def cancel_job(job_id):
         return jsonify({"error": str(e)}), 500
 
 
+@agents_bp.route('/resume-job/<job_id>', methods=['POST'])
+def resume_job(job_id):
+    """
+    Resume a cancelled or failed async RFP analysis from its checkpoints.
+    
+    Starts a new job that reuses the stage and question checkpoints of the
+    original one, so only unfinished work is sent to the LLM again.
+    
+    Returns:
+        {"job_id": "new uuid", "resumed_from": "uuid", "status_url": "..."}
+    """
+    try:
+        from app.extensions import celery
+        from celery.result import AsyncResult
+        from app.services.job_checkpoint_service import get_job_checkpoint_store
+        
+        store = get_job_checkpoint_store()
+        task = AsyncResult(job_id, app=celery)
+        if task.state in ('PROGRESS', 'STARTED', 'RETRY') or \
+                (task.state == 'PENDING' and not store.is_cancel_requested(job_id)):
+            return jsonify({"error": "Job is still running"}), 409
+        if task.state == 'SUCCESS':
+            return jsonify({"error": "Job already completed"}), 409
+        
+        job_input = store.load_input(job_id)
+        if not job_input:
+            return jsonify({"error": "No checkpoints found for this job"}), 404
+        
+        new_task = celery.send_task(
+            'agents.analyze_rfp_async',
+            args=[job_input['document_text']],
+            kwargs={
+                'org_id': job_input.get('org_id'),
+                'project_id': job_input.get('project_id'),
+                'options': job_input.get('options') or {},
+                'resume_from': job_input.get('resume_from') or job_id
+            }
+        )
+        
+        return jsonify({
+            "job_id": new_task.id,
+            "resumed_from": job_id,
+            "status_url": f"/api/agents/job-status/{new_task.id}",
+            "status": "PENDING"
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Failed to resume job: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @agents_bp.route('/health', methods=['GET'])
 def health_check():
     """Check agent system health and configuration."""
@@ -550,7 +617,8 @@ def generate_all_diagrams():
     {
         "document_id": int,  // OR
         "document_text": string,
-        "diagram_types": ["architecture", "flowchart", "timeline"]  // optional, defaults to these 3
+        "diagram_types": ["architecture", "flowchart", "timeline"],  // optional, defaults to these 3
+        "stream": bool  // optional, stream each diagram as a server-sent event when it finishes
     }
     
     Returns list of generated diagrams.
@@ -581,6 +649,23 @@ def generate_all_diagrams():
     
     try:
         agent = get_diagram_generator_agent(org_id=org_id)
+        
+        if data.get('stream'):
+            def generate():
+                for event in agent.iter_diagrams(document_text, diagram_types):
+                    yield f"data: {json.dumps(event)}\n\n"
+                yield "data: [DONE]\n\n"
+            
+            return Response(
+                stream_with_context(generate()),
+                mimetype='text/event-stream',
+                headers={
+                    'Cache-Control': 'no-cache',
+                    'Connection': 'keep-alive',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
+        
         result = agent.generate_all_diagrams(
             document_text=document_text,
             diagram_types=diagram_types
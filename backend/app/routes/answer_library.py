@@ -6,6 +6,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
 from ..models import AnswerLibraryItem, Question, Answer, User
 from ..services.library_service import library_service
+from ..services.keyword_search_service import text_search, highlight
 
 
 bp = Blueprint('answer_library', __name__)
@@ -35,12 +36,11 @@ def list_library_items():
         query = query.filter_by(category=category)
     
     if search:
-        query = query.filter(
-            db.or_(
-                AnswerLibraryItem.question_text.ilike(f'%{search}%'),
-                AnswerLibraryItem.answer_text.ilike(f'%{search}%'),
-            )
-        )
+        # Indexed full-text / trigram search, best matches first
+        criterion, rank = text_search(AnswerLibraryItem, search)
+        query = query.filter(criterion)
+        if rank is not None:
+            query = query.order_by(rank.desc())
     
     # Order by usage (most helpful first)
     items = query.order_by(
@@ -52,9 +52,16 @@ def list_library_items():
     if tag:
         items = [i for i in items if tag in (i.tags or [])]
     
+    results = []
+    for item in items:
+        item_dict = item.to_dict()
+        if search:
+            item_dict['highlight'] = highlight(item.answer_text, search)
+        results.append(item_dict)
+    
     return jsonify({
-        'items': [item.to_dict() for item in items],
-        'total': len(items),
+        'items': results,
+        'total': len(results),
     })
 
 
@@ -316,26 +323,26 @@ def search_library():
     if not query_text:
         return jsonify({'items': []}), 200
     
-    # Basic text search (could be enhanced with vector similarity)
+    # Indexed full-text / trigram search (could be enhanced with vector similarity)
+    criterion, rank = text_search(AnswerLibraryItem, query_text)
     items = AnswerLibraryItem.query.filter(
         AnswerLibraryItem.organization_id == user.organization_id,
         AnswerLibraryItem.is_active == True,
-        db.or_(
-            AnswerLibraryItem.question_text.ilike(f'%{query_text}%'),
-            AnswerLibraryItem.answer_text.ilike(f'%{query_text}%'),
-        )
+        criterion
     )
     
     if category:
         items = items.filter(AnswerLibraryItem.category == category)
     
+    if rank is not None:
+        items = items.order_by(rank.desc())
     items = items.order_by(
         AnswerLibraryItem.times_helpful.desc(),
         AnswerLibraryItem.times_used.desc(),
     ).limit(limit).all()
     
     return jsonify({
-        'items': [item.to_dict() for item in items],
+        'items': [{**item.to_dict(), 'highlight': highlight(item.answer_text, query_text)} for item in items],
         'total': len(items),
     })
 
@@ -370,6 +377,30 @@ def record_usage(item_id):
     })
 
 
+@bp.route('/stale', methods=['GET'])
+@jwt_required()
+def get_stale_items():
+    """List the stalest library items and freshness counts (from stored scores)."""
+    from ..services.freshness_service import get_freshness_summary
+    
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    if not user or not user.organization_id:
+        return jsonify({'items': []}), 200
+    
+    min_score = request.args.get('min_score', type=float)
+    limit = request.args.get('limit', 100, type=int)
+    
+    items = library_service.get_stale_items(user.organization_id, min_score=min_score, limit=limit)
+    
+    return jsonify({
+        'items': [item.to_dict() for item in items],
+        'total': len(items),
+        'summary': get_freshness_summary(user.organization_id),
+    })
+
+
 @bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_categories():
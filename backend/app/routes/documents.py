@@ -5,11 +5,107 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from ..extensions import db
 from ..models import Document, Project, User
+from ..utils.keyword_classifier import KeywordClassifier
 
 bp = Blueprint('documents', __name__)
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'xlsx', 'doc', 'xls', 'ppt', 'pptx'}
 
+# Questions are inserted in batches to keep each transaction short
+QUESTION_INSERT_BATCH_SIZE = 500
+
+# Question category classification keywords (first matching category wins)
+QUESTION_CATEGORY_KEYWORDS = {
+    'security': ['security', 'encryption', 'authentication', 'password', 'access control', 
+                'firewall', 'vulnerability', 'penetration', 'gdpr', 'hipaa', 'soc', 'iso 27001',
+                'data protection', 'privacy', 'compliance', 'audit'],
+    'technical': ['technical', 'architecture', 'infrastructure', 'api', 'integration',
+                 'database', 'platform', 'cloud', 'mobile', 'system', 'software', 'hardware'],
+    'pricing': ['pricing', 'cost', 'fee', 'budget', 'payment', 'license', 'commercial'],
+    'implementation': ['implementation', 'timeline', 'schedule', 'phase', 'milestone', 
+                      'deployment', 'go-live', 'rollout', 'project plan'],
+    'support': ['support', 'maintenance', 'sla', 'service level', 'helpdesk', 'availability'],
+    'team': ['team', 'staff', 'resource', 'personnel', 'experience', 'qualification', 'resume'],
+    'training': ['training', 'documentation', 'manual', 'knowledge transfer', 'user guide'],
+    'references': ['reference', 'case study', 'past performance', 'similar project', 'client'],
+}
+
+# Map category to appropriate section name
+QUESTION_CATEGORY_SECTIONS = {
+    'security': 'Security & Compliance',
+    'technical': 'Technical Approach',
+    'pricing': 'Pricing & Commercial',
+    'implementation': 'Implementation Plan',
+    'support': 'Support & Maintenance',
+    'team': 'Team & Qualifications',
+    'training': 'Training & Documentation',
+    'references': 'References & Experience',
+}
+
+# All category keywords compiled into one scanner at import
+_QUESTION_CATEGORY_CLASSIFIER = KeywordClassifier(QUESTION_CATEGORY_KEYWORDS)
+
+
+def classify_question_category(text, default_section='Q&A / Questionnaire'):
+    """Classify a question into (category, section) using keyword matching."""
+    category = _QUESTION_CATEGORY_CLASSIFIER.first_match(text)
+    if category is None:
+        return 'general', default_section
+    return category, QUESTION_CATEGORY_SECTIONS.get(category, default_section)
+
+
+def _bulk_insert_questions(document, questions_data, progress_callback=None):
+    """
+    Insert extracted questions in batches, committing after each batch.
+    
+    If a batch fails, the questions already written by this call are deleted
+    again, so a document never keeps part of its questions.
+    """
+    from ..models import Question
+    
+    last_id = db.session.query(db.func.max(Question.id)).scalar() or 0
+    try:
+        _insert_question_batches(document, questions_data, progress_callback)
+    except Exception:
+        db.session.rollback()
+        Question.query.filter(
+            Question.document_id == document.id,
+            Question.id > last_id
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        raise
+
+
+def _insert_question_batches(document, questions_data, progress_callback):
+    from ..models import Question
+    
+    total = len(questions_data)
+    for start in range(0, total, QUESTION_INSERT_BATCH_SIZE):
+        batch = questions_data[start:start + QUESTION_INSERT_BATCH_SIZE]
+        mappings = []
+        for q_data in batch:
+            category, section = classify_question_category(
+                q_data['text'],
+                default_section=q_data.get('section', 'Q&A / Questionnaire')
+            )
+            mappings.append({
+                'text': q_data['text'],
+                'section': section,
+                'category': category,
+                'order': q_data.get('order', 0),
+                'status': 'pending',
+                'project_id': document.project_id,
+                'document_id': document.id,
+            })
+        db.session.bulk_insert_mappings(Question, mappings)
+        db.session.commit()
+        
+        if progress_callback:
+            progress_callback('saving_questions', {
+                'questions_saved': min(start + len(batch), total),
+                'questions_total': total,
+            })
+
 
 @bp.route('', methods=['GET'])
 @jwt_required()
@@ -162,29 +258,31 @@ def upload_document():
     db.session.add(document)
     db.session.commit()
     
-    # Auto-trigger document parsing
+    # Auto-trigger document parsing, in the background unless async_parse=false
+    # (or the task cannot be queued); poll status_url for progress
     parse_result = None
-    try:
-        from .documents import _parse_document_internal
-        parse_result = _parse_document_internal(document)
-    except Exception as e:
-        parse_result = {'error': str(e)}
+    parse_job = None
+    if str(request.form.get('async_parse', 'true')).lower() not in ('0', 'false', 'no'):
+        parse_job = _start_async_parse(document)
+    if parse_job is None:
+        try:
+            from .documents import _parse_document_internal
+            parse_result = _parse_document_internal(document)
+        except Exception as e:
+            parse_result = {'error': str(e)}
     
     # Trigger background embedding task
-    try:
-        from app.tasks import process_document_embeddings_task
-        process_document_embeddings_task.delay(document.id, user.organization_id)
-        embedding_triggered = True
-    except Exception as e:
-        current_app.logger.warning(f"Failed to trigger embedding task: {e}")
-        embedding_triggered = False
+    embedding_triggered = _start_reindex(document, user.organization_id) is not None
     
-    return jsonify({
+    response = {
         'message': 'Document uploaded and processing started',
         'document': document.to_dict(),
         'parse_result': parse_result,
         'embedding_triggered': embedding_triggered
-    }), 201
+    }
+    if parse_job:
+        response.update(parse_job)
+    return jsonify(response), 201
 
 
 @bp.route('/<int:document_id>', methods=['GET'])
@@ -222,6 +320,16 @@ def parse_document(document_id):
     if document.project.organization_id != user.organization_id:
         return jsonify({'error': 'Access denied'}), 403
     
+    # Parsed in the background unless {"async": false} (or the task cannot be queued)
+    data = request.get_json(silent=True) or {}
+    parse_job = _start_async_parse(document) if data.get('async', True) else None
+    if parse_job:
+        return jsonify({
+            'message': 'Document parsing started',
+            'document': document.to_dict(),
+            **parse_job
+        }), 202
+    
     result = _parse_document_internal(document)
     
     if 'error' in result:
@@ -230,13 +338,61 @@ def parse_document(document_id):
     return jsonify(result), 200
 
 
-def _parse_document_internal(document):
-    """Internal function to parse document and extract questions."""
+def _start_async_parse(document):
+    """
+    Queue background parsing for a document.
+    
+    Returns:
+        Dict with job_id/status_url, or None if the task could not be queued
+    """
+    try:
+        from ..extensions import celery
+        task = celery.send_task('documents.parse_document_async', args=[document.id])
+    except Exception as e:
+        current_app.logger.warning(f"Failed to queue parse task for document {document.id}: {e}")
+        return None
+    
+    return {
+        'job_id': task.id,
+        'status_url': f"/api/agents/job-status/{task.id}",
+    }
+
+
+def _start_reindex(document, org_id):
+    """
+    Queue embedding of a document's new or changed chunks.
+    
+    Returns:
+        Celery task id, or None if the task could not be queued
+    """
+    try:
+        from ..extensions import celery
+        task = celery.send_task('documents.reindex_document_embeddings', args=[document.id, org_id])
+    except Exception as e:
+        current_app.logger.warning(f"Failed to trigger embedding task for document {document.id}: {e}")
+        return None
+    return task.id
+
+
+def _parse_document_internal(document, progress_callback=None):
+    """
+    Internal function to parse document and extract questions.
+    
+    Args:
+        document: Document to parse
+        progress_callback: Optional callable(stage, meta) for progress reporting
+            (used by the async parse task)
+    """
     import tempfile
     from datetime import datetime
     from ..services.document_service import DocumentService
     from ..services.extraction_service import QuestionExtractor
-    from ..models import Question
+    
+    def report(stage, **meta):
+        if progress_callback:
+            progress_callback(stage, meta)
+    
+    report('loading_file')
     
     # Update status
     document.status = 'processing'
@@ -311,6 +467,7 @@ def _parse_document_internal(document):
 
         
         # Extract text from document
+        report('extracting_text')
         doc_service = DocumentService()
         extracted_text = doc_service.extract_text(temp_file_path, document.file_type)
         
@@ -335,61 +492,17 @@ def _parse_document_internal(document):
             'char_count': len(extracted_text),
         }
         
+        # Commit extracted text before the (slow) question extraction
+        db.session.commit()
+        
         # Extract questions
+        report('extracting_questions')
         extractor = QuestionExtractor()
         questions_data = extractor.extract_questions(extracted_text, use_ai=True)
+        report('saving_questions', questions_saved=0, questions_total=len(questions_data))
         
-        # Question category classification keywords
-        category_keywords = {
-            'security': ['security', 'encryption', 'authentication', 'password', 'access control', 
-                        'firewall', 'vulnerability', 'penetration', 'gdpr', 'hipaa', 'soc', 'iso 27001',
-                        'data protection', 'privacy', 'compliance', 'audit'],
-            'technical': ['technical', 'architecture', 'infrastructure', 'api', 'integration',
-                         'database', 'platform', 'cloud', 'mobile', 'system', 'software', 'hardware'],
-            'pricing': ['pricing', 'cost', 'fee', 'budget', 'payment', 'license', 'commercial'],
-            'implementation': ['implementation', 'timeline', 'schedule', 'phase', 'milestone', 
-                              'deployment', 'go-live', 'rollout', 'project plan'],
-            'support': ['support', 'maintenance', 'sla', 'service level', 'helpdesk', 'availability'],
-            'team': ['team', 'staff', 'resource', 'personnel', 'experience', 'qualification', 'resume'],
-            'training': ['training', 'documentation', 'manual', 'knowledge transfer', 'user guide'],
-            'references': ['reference', 'case study', 'past performance', 'similar project', 'client'],
-        }
-        
-        # Create Question records with category classification
-        for q_data in questions_data:
-            # Classify question category based on content
-            q_text_lower = q_data['text'].lower()
-            detected_category = 'general'
-            detected_section = q_data.get('section', 'Q&A / Questionnaire')
-            
-            for category, keywords in category_keywords.items():
-                if any(kw in q_text_lower for kw in keywords):
-                    detected_category = category
-                    # Map category to appropriate section name  
-                    section_map = {
-                        'security': 'Security & Compliance',
-                        'technical': 'Technical Approach',
-                        'pricing': 'Pricing & Commercial',
-                        'implementation': 'Implementation Plan',
-                        'support': 'Support & Maintenance',
-                        'team': 'Team & Qualifications',
-                        'training': 'Training & Documentation',
-                        'references': 'References & Experience',
-                    }
-                    detected_section = section_map.get(category, detected_section)
-                    break
-            
-            question = Question(
-                text=q_data['text'],
-                section=detected_section,
-                category=detected_category,
-                order=q_data.get('order', 0),
-                status='pending',
-                project_id=document.project_id,
-                document_id=document.id
-            )
-            db.session.add(question)
-
+        # Create Question records with category classification (batched)
+        _bulk_insert_questions(document, questions_data, progress_callback)
         
         # Update document status
         document.status = 'completed'
@@ -397,6 +510,7 @@ def _parse_document_internal(document):
         db.session.commit()
         
         # AUTO-ANALYZE RFP AND CREATE SECTIONS
+        report('recommending_sections', questions_extracted=len(questions_data))
         analysis_result = None
         sections_created = []
         try:
@@ -456,6 +570,7 @@ def _parse_document_internal(document):
         }
         
     except Exception as e:
+        db.session.rollback()
         document.status = 'failed'
         document.error_message = str(e)
         db.session.commit()
@@ -1071,7 +1186,8 @@ def reindex_document(document_id):
     Trigger re-indexing of a document's embeddings.
     
     Useful when document chunking or embedding has failed
-    and needs to be retried.
+    and needs to be retried. Only new or changed chunks are re-embedded
+    and the indexed chunks stay searchable until their replacements exist.
     """
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
@@ -1084,19 +1200,48 @@ def reindex_document(document_id):
     if project.organization_id != user.organization_id:
         return jsonify({'error': 'Access denied'}), 403
     
-    try:
-        from app.tasks import reprocess_document_embeddings_task
-        
-        reprocess_document_embeddings_task.delay(document.id, user.organization_id)
-        
-        document.embedding_status = 'pending'
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Document reindexing triggered',
-            'document': document.to_dict()
-        }), 200
-        
-    except Exception as e:
-        current_app.logger.error(f"Failed to trigger reindex for document {document_id}: {e}")
-        return jsonify({'error': str(e)}), 500
+    task_id = _start_reindex(document, user.organization_id)
+    if task_id is None:
+        return jsonify({'error': 'Failed to queue document reindexing'}), 500
+    
+    document.embedding_status = 'pending'
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Document reindexing triggered',
+        'document': document.to_dict(),
+        'job_id': task_id
+    }), 200
+
+
+@bp.route('/<int:document_id>/embedding-status', methods=['GET'])
+@jwt_required()
+def get_embedding_status(document_id):
+    """
+    Get a document's embedding status and chunk manifest summary.
+    
+    Returns:
+        {
+            "embedding_status": "completed",
+            "manifest_chunks": 25,
+            "embedding_models": {"all-MiniLM-L6-v2+Qdrant/bm25": 25},
+            "outdated_chunks": 0,
+            ...
+        }
+    """
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    document = Document.query.get(document_id)
+    if not document:
+        return jsonify({'error': 'Document not found'}), 404
+    
+    project = Project.query.get(document.project_id)
+    if project.organization_id != user.organization_id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    from app.services.document_index_service import get_embedding_status as get_status
+    from app.services.hybrid_search_service import get_hybrid_search_service
+    
+    model_version = get_hybrid_search_service(user.organization_id).embedding_model_version
+    return jsonify(get_status(document, model_version)), 200
@@ -7,9 +7,10 @@ Provides endpoints for:
 - Batch export
 - Streaming responses
 """
-from flask import Blueprint, jsonify, request, Response, send_file, current_app
+import itertools
+
+from flask import Blueprint, jsonify, request, Response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import io
 
 from app.models import User
 
@@ -72,28 +73,52 @@ def clear_cache():
 # Batch Export
 # ============================================================================
 
+EXPORT_FORMATS = ('csv', 'excel', 'json', 'ndjson')
+
+
+def _stream_download(chunks, filename, content_type):
+    """
+    Chunked download response for an export generator.
+    
+    The first chunk is built before the response starts, so an export that
+    fails on its first rows is an error response rather than a cut-off file.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, b'')
+    return Response(
+        stream_with_context(itertools.chain([first], chunks)),
+        mimetype=content_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
 @bp.route('/projects/<int:project_id>/export/answers', methods=['GET'])
 @jwt_required()
 def export_project_answers(project_id):
-    """Export all answers for a project."""
+    """Export all answers for a project (streamed)."""
+    from app.models import Project
+    
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    
     format = request.args.get('format', 'csv')
     
-    if format not in ('csv', 'excel', 'json'):
-        return jsonify({'error': 'Invalid format. Use csv, excel, or json'}), 400
+    if format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Use csv, excel, json, or ndjson'}), 400
+    
+    project = Project.query.get(project_id)
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    if not user or project.organization_id != user.organization_id:
+        return jsonify({'error': 'Access denied'}), 403
     
     try:
         from app.services.batch_export import BatchExportService
         
-        file_bytes, filename, content_type = BatchExportService.export_project_answers(
+        chunks, filename, content_type = BatchExportService.export_project_answers(
             project_id, format=format
         )
-        
-        return send_file(
-            io.BytesIO(file_bytes),
-            mimetype=content_type,
-            as_attachment=True,
-            download_name=filename
-        )
+        return _stream_download(chunks, filename, content_type)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -110,19 +135,42 @@ def export_answer_library():
     
     format = request.args.get('format', 'csv')
     
+    if format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Use csv, excel, json, or ndjson'}), 400
+    
     try:
         from app.services.batch_export import BatchExportService
         
-        file_bytes, filename, content_type = BatchExportService.export_answer_library(
+        chunks, filename, content_type = BatchExportService.export_answer_library(
             user.organization_id, format=format
         )
+        return _stream_download(chunks, filename, content_type)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/knowledge-base/export', methods=['GET'])
+@jwt_required()
+def export_knowledge_base():
+    """Export the organization's knowledge base (streamed, NDJSON by default)."""
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    
+    if not user or not user.organization_id:
+        return jsonify({'error': 'Organization not found'}), 404
+    
+    format = request.args.get('format', 'ndjson')
+    
+    if format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Use csv, excel, json, or ndjson'}), 400
+    
+    try:
+        from app.services.batch_export import BatchExportService
         
-        return send_file(
-            io.BytesIO(file_bytes),
-            mimetype=content_type,
-            as_attachment=True,
-            download_name=filename
+        chunks, filename, content_type = BatchExportService.export_knowledge_base(
+            user.organization_id, format=format
         )
+        return _stream_download(chunks, filename, content_type)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -130,7 +178,12 @@ def export_answer_library():
 @bp.route('/answer-library/import', methods=['POST'])
 @jwt_required()
 def import_answer_library():
-    """Import answers from CSV/Excel file."""
+    """
+    Import answers from CSV/Excel file.
+    
+    Rows are parsed one at a time and inserted in batches; the response
+    reports the rows that could not be imported.
+    """
     user_id = get_jwt_identity()
     user = User.query.get(user_id)
     
@@ -144,37 +197,23 @@ def import_answer_library():
     filename = file.filename.lower()
     
     try:
-        content = file.read()
+        from app.services.batch_export import (
+            iter_answers_from_csv, iter_answers_from_excel, import_answers_to_library
+        )
         
         if filename.endswith('.csv'):
-            from app.services.batch_export import import_answers_from_csv
-            answers = import_answers_from_csv(content)
-        elif filename.endswith('.xlsx') or filename.endswith('.xls'):
-            from app.services.batch_export import import_answers_from_excel
-            answers = import_answers_from_excel(content)
+            rows = iter_answers_from_csv(file.stream)
+        elif filename.endswith('.xlsx'):
+            rows = iter_answers_from_excel(file.stream)
         else:
-            return jsonify({'error': 'Unsupported file format. Use CSV or Excel'}), 400
+            return jsonify({'error': 'Unsupported file format. Use CSV or Excel (.xlsx)'}), 400
         
         # Import to answer library
-        from app.models import AnswerLibraryItem
-        from app import db
-        
-        imported = 0
-        for answer_data in answers:
-            item = AnswerLibraryItem(
-                org_id=user.organization_id,
-                question_text=answer_data['question_text'],
-                answer_text=answer_data['answer_text'],
-                category=answer_data.get('category', 'general')
-            )
-            db.session.add(item)
-            imported += 1
-        
-        db.session.commit()
+        report = import_answers_to_library(rows, user.organization_id, user.id)
         
         return jsonify({
-            'success': True,
-            'imported': imported
+            'success': report['failed'] == 0,
+            **report
         })
         
     except Exception as e:
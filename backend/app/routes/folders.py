@@ -186,7 +186,17 @@ def delete_folder(folder_id):
 @bp.route('/<int:folder_id>/upload', methods=['POST'])
 @jwt_required()
 def upload_to_folder(folder_id):
-    """Upload files to a folder with Docling chunking and hybrid search."""
+    """
+    Upload files to a folder.
+    
+    The files are stored as an ingestion batch and returned immediately;
+    background workers chunk and index them (Docling chunking and hybrid
+    search). Poll the batch's status_url for per-file progress.
+    """
+    from ..services.knowledge_ingestion_service import (
+        create_ingestion_batch, start_ingestion_batch, run_ingestion_batch
+    )
+    
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     
@@ -205,246 +215,96 @@ def upload_to_folder(folder_id):
         return jsonify({'error': 'No files provided'}), 400
     
     # Read dimension data from form
-    geography = request.form.get('geography')
-    client_type = request.form.get('client_type')
-    industry = request.form.get('industry')
     knowledge_profile_id = request.form.get('knowledge_profile_id')
-    if knowledge_profile_id:
-        knowledge_profile_id = int(knowledge_profile_id)
-    
-    files = request.files.getlist('files')
-    uploaded = []
+    options = {
+        'geography': request.form.get('geography'),
+        'client_type': request.form.get('client_type'),
+        'industry': request.form.get('industry'),
+        'knowledge_profile_id': int(knowledge_profile_id) if knowledge_profile_id else None,
+    }
+    
+    files = []
     errors = []
-    
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    for file in files:
+    for file in request.files.getlist('files'):
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            
-            # Read file content into memory
-            file_content = file.read()
-            file_size = len(file_content)
-            
-            # Create temp file for processing
-            import tempfile
-            temp_path = None
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
-                    temp_file.write(file_content)
-                    temp_path = temp_file.name
-                
-                # Use Docling for page-based chunking
-                chunks = []
-                full_text = ""
-                try:
-                    from ..services.docling_chunking_service import get_docling_chunking_service
-                    
-                    chunking_service = get_docling_chunking_service()
-                    file_id = str(uuid.uuid4())
-                    file_type = os.path.splitext(filename)[1].lstrip('.').lower()
-                    
-                    chunking_result = chunking_service.chunk_document(
-                        file_path=temp_path,
-                        file_id=file_id,
-                        original_filename=filename,
-                        file_type=file_type
-                    )
-                    
-                    chunks = chunking_result.chunks
-                    full_text = "\n\n".join([c.content for c in chunks[:5]])  # First 5 chunks for summary
-                    
-                    logger.info(f"Chunked {filename}: {len(chunks)} chunks, {chunking_result.total_pages} pages")
-                    
-                except Exception as e:
-                    logger.warning(f"Docling chunking failed for {filename}, using fallback: {e}")
-                    # Fallback to basic extraction
-                    from ..services.extraction_text_service import extract_text_from_file
-                    full_text = extract_text_from_file(temp_path, file.content_type)
-                    if not full_text or len(full_text.strip()) < 10:
-                        full_text = f"File: {filename}\n\n[Content could not be extracted. Download to view.]"
-                    chunks = []
-                
-                # Upload to cloud storage if configured, otherwise store in DB
-                storage_type = 'database'
-                file_id = None
-                file_url = None
-                
-                try:
-                    from ..services.storage_service import get_storage_service
-                    storage = get_storage_service()
-                    
-                    # Check if using cloud storage (not local/database)
-                    if storage.storage_type == 'gcp':
-                        # Get knowledge prefix from env
-                        knowledge_prefix = os.environ.get('GCP_KNOWLEDGE_PREFIX', 'knowledge')
-                        
-                        # Use folder name as subfolder for organization
-                        folder_name = folder.name.replace(' ', '_').lower() if folder else 'default'
-                        
-                        # Reset file position for upload
-                        file.seek(0)
-                        storage_metadata = storage.provider.upload_with_path(
-                            file=file,
-                            original_filename=filename,
-                            prefix=knowledge_prefix,
-                            subfolder=folder_name,
-                            content_type=file.content_type,
-                            metadata={'folder_id': folder_id, 'organization_id': user.organization_id}
-                        )
-                        file_id = storage_metadata.file_id
-                        file_url = storage_metadata.file_url
-                        storage_type = 'gcp'
-                        logger.info(f"Uploaded {filename} to GCP: {file_url}")
-                except Exception as e:
-                    logger.warning(f"Cloud storage upload failed, falling back to DB storage: {e}")
-                    storage_type = 'database'
-                
-                # Create parent knowledge item (stores the full document)
-                parent_item = KnowledgeItem(
-                    title=filename,
-                    content=full_text[:50000] if full_text else '',  # Always store extracted text for AI summaries
-                    source_type='file',
-                    source_file=filename,
-                    file_type=file.content_type,
-                    file_data=file_content if storage_type == 'database' else None,  # Only store if not using cloud
-                    file_size=file_size,
-                    folder_id=folder_id,
-                    geography=geography,
-                    client_type=client_type,
-                    industry=industry,
-                    knowledge_profile_id=knowledge_profile_id,
-                    organization_id=user.organization_id,
-                    created_by=user_id,
-                    item_metadata={
-                        'total_chunks': len(chunks),
-                        'total_pages': chunking_result.total_pages if chunks else 1,
-                        'total_words': chunking_result.total_words if chunks else len(full_text.split()) if full_text else 0,
-                        'chunking_method': 'docling' if chunks else 'basic',
-                        'storage_type': storage_type,
-                        'file_id': file_id,
-                        'file_url': file_url
-                    }
-                )
-                db.session.add(parent_item)
-                db.session.flush()  # Get parent_item.id
-                
-                # Index using hybrid search (combines dense + sparse vectors)
-                try:
-                    from ..services.hybrid_search_service import get_hybrid_search_service
-                    
-                    hybrid_search = get_hybrid_search_service(user.organization_id)
-                    
-                    if hybrid_search.enabled:
-                        if chunks:
-                            # Index each chunk with hybrid vectors
-                            for chunk in chunks:
-                                chunk.doc_url = f"knowledge://{parent_item.id}"
-                                chunk.original_filename = filename
-                            
-                            indexed_count = hybrid_search.upsert_document_chunks(
-                                chunks=chunks,
-                                org_id=user.organization_id
-                            )
-                            
-                            parent_item.embedding_id = f"hybrid:{file_id}"
-                            parent_item.item_metadata['indexed_chunks'] = indexed_count
-                            logger.info(f"Indexed {indexed_count} chunks for {filename}")
-                        else:
-                            # Index full content as single chunk
-                            success = hybrid_search.upsert_document_chunk(
-                                chunk_id=f"{parent_item.id}-0",
-                                file_id=str(parent_item.id),
-                                page_number=1,
-                                content=full_text[:5000],
-                                org_id=user.organization_id,
-                                doc_url=f"knowledge://{parent_item.id}",
-                                original_filename=filename
-                            )
-                            if success:
-                                parent_item.embedding_id = f"hybrid:{parent_item.id}"
-                except Exception as e:
-                    logger.warning(f"Failed to index item {parent_item.id} in hybrid search: {e}")
-                    # Fallback to regular Qdrant service
-                    try:
-                        from ..services.qdrant_service import get_qdrant_service
-                        qdrant = get_qdrant_service(user.organization_id)
-                        parent_item.embedding_id = qdrant.upsert_item(
-                            item_id=parent_item.id,
-                            org_id=user.organization_id,
-                            title=parent_item.title,
-                            content=parent_item.content,
-                            folder_id=folder_id,
-                            geography=geography,
-                            client_type=client_type,
-                            industry=industry,
-                            knowledge_profile_id=knowledge_profile_id
-                        )
-                    except Exception as e2:
-                        logger.warning(f"Fallback Qdrant indexing also failed: {e2}")
-                
-                # Create child knowledge items for each chunk (optional - for UI display)
-                if chunks and len(chunks) > 1:
-                    for i, chunk in enumerate(chunks):
-                        chunk_item = KnowledgeItem(
-                            title=f"{filename} - Page {chunk.page_number}",
-                            content=chunk.content,
-                            source_type='chunk',
-                            source_file=filename,
-                            chunk_index=i,
-                            parent_id=parent_item.id,
-                            folder_id=folder_id,
-                            geography=geography,
-                            client_type=client_type,
-                            industry=industry,
-                            knowledge_profile_id=knowledge_profile_id,
-                            organization_id=user.organization_id,
-                            created_by=user_id,
-                            item_metadata={
-                                'page_number': chunk.page_number,
-                                'chunk_index': chunk.chunk_index,
-                                'word_count': chunk.word_count,
-                                'has_tables': chunk.has_tables,
-                                'has_images': chunk.has_images,
-                                'headings': chunk.headings
-                            }
-                        )
-                        db.session.add(chunk_item)
-                
-                uploaded.append({
-                    'filename': filename,
-                    'id': parent_item.id,
-                    'chunks': len(chunks),
-                    'pages': chunking_result.total_pages if chunks else 1
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {e}")
-                errors.append({
-                    'filename': filename,
-                    'error': str(e)
-                })
-            finally:
-                # Clean up temp file
-                if temp_path:
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
+            files.append(file)
         else:
             errors.append({
                 'filename': file.filename if file else 'unknown',
                 'error': 'Invalid file type'
             })
     
-    db.session.commit()
+    if not files:
+        return jsonify({'uploaded': [], 'errors': errors, 'count': 0}), 400
+    
+    batch = create_ingestion_batch(folder, user, files, options)
+    
+    queued = start_ingestion_batch(batch)
+    if not queued:
+        # No Celery worker reachable: process in this request instead
+        current_app.logger.warning(f"Processing ingestion batch {batch.id} inline")
+        run_ingestion_batch(batch.id)
     
     return jsonify({
-        'uploaded': uploaded,
+        'batch_id': batch.id,
+        'status_url': f"/api/folders/ingestion/{batch.id}",
+        'batch': batch.to_dict(),
         'errors': errors,
-        'count': len(uploaded)
-    }), 201
+        'count': len(files)
+    }), 202 if queued else 201
+
+
+def _get_ingestion_batch(batch_id):
+    """Load an ingestion batch of the current user's organization, or an error response."""
+    from ..models import IngestionBatch
+    
+    user = User.query.get(int(get_jwt_identity()))
+    batch = db.session.get(IngestionBatch, batch_id)
+    
+    if not batch:
+        return None, user, (jsonify({'error': 'Ingestion batch not found'}), 404)
+    
+    if batch.organization_id != user.organization_id:
+        return None, user, (jsonify({'error': 'Access denied'}), 403)
+    
+    return batch, user, None
+
+
+@bp.route('/ingestion/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_ingestion_batch(batch_id):
+    """Get the status of an ingestion batch and each of its files."""
+    batch, _, error = _get_ingestion_batch(batch_id)
+    if error:
+        return error
+    
+    return jsonify({'batch': batch.to_dict()}), 200
+
+
+@bp.route('/ingestion/<batch_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_ingestion_batch(batch_id):
+    """Process the failed files of an ingestion batch again."""
+    from ..services.knowledge_ingestion_service import (
+        retry_failed_files, start_ingestion_batch, run_ingestion_batch
+    )
+    
+    batch, user, error = _get_ingestion_batch(batch_id)
+    if error:
+        return error
+    
+    if user.role not in ['admin', 'editor']:
+        return jsonify({'error': 'Insufficient permissions'}), 403
+    
+    files = retry_failed_files(batch)
+    if not files:
+        return jsonify({'error': 'No failed files to retry'}), 400
+    
+    queued = start_ingestion_batch(batch, files)
+    if not queued:
+        run_ingestion_batch(batch.id)
+    
+    return jsonify({'batch': batch.to_dict(), 'retried': len(files)}), 202 if queued else 200
 
 
 @bp.route('/move-item', methods=['POST'])
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
 from ..models import KnowledgeItem, User
 from ..services.qdrant_service import get_qdrant_service
+from ..services.keyword_search_service import text_search, text_match_score, highlight
 import logging
 
 logger = logging.getLogger(__name__)
@@ -80,17 +81,23 @@ def list_knowledge():
         query = query.filter_by(knowledge_profile_id=int(knowledge_profile_id))
     
     if search:
-        query = query.filter(
-            db.or_(
-                KnowledgeItem.title.ilike(f'%{search}%'),
-                KnowledgeItem.content.ilike(f'%{search}%')
-            )
-        )
+        # Indexed full-text / trigram search, best matches first
+        criterion, rank = text_search(KnowledgeItem, search)
+        query = query.filter(criterion)
+        if rank is not None:
+            query = query.order_by(rank.desc())
     
     items = query.order_by(KnowledgeItem.updated_at.desc()).all()
     
+    results = []
+    for item in items:
+        item_dict = item.to_dict()
+        if search:
+            item_dict['highlight'] = highlight(item.content, search)
+        results.append(item_dict)
+    
     return jsonify({
-        'items': [item.to_dict() for item in items]
+        'items': results
     }), 200
 
 
@@ -296,10 +303,9 @@ def delete_knowledge(item_id):
     if not _try_async_embedding(item.id, user.organization_id, 'delete'):
         # Sync fallback
         try:
-            qdrant = get_qdrant_service()
-            if qdrant.enabled:
-                qdrant.delete_item(item_id=item.id, org_id=user.organization_id)
-                logger.info(f"Deleted embedding for knowledge item {item.id}")
+            from ..services.qdrant_service import delete_knowledge_item_vectors
+            delete_knowledge_item_vectors(item)
+            logger.info(f"Deleted embedding for knowledge item {item.id}")
         except Exception as e:
             logger.error(f"Failed to delete embedding: {e}")
     
@@ -497,20 +503,22 @@ def search_knowledge():
     except Exception as e:
         logger.error(f"Qdrant search failed, falling back to SQL: {e}")
     
-    # Fallback - basic text search
+    # Fallback - indexed full-text search
+    criterion, rank = text_search(KnowledgeItem, query)
     items = KnowledgeItem.query.filter(
         KnowledgeItem.organization_id == user.organization_id,
         KnowledgeItem.is_active == True,
-        db.or_(
-            KnowledgeItem.title.ilike(f'%{query}%'),
-            KnowledgeItem.content.ilike(f'%{query}%')
-        )
-    ).limit(limit).all()
+        criterion
+    )
+    if rank is not None:
+        items = items.order_by(rank.desc())
+    items = items.limit(limit).all()
     
     return jsonify({
         'results': [{
             'item': item.to_dict(),
-            'score': 0.9,  # Placeholder relevance score
+            'score': text_match_score(query, [item.title, item.content or '']),
+            'highlight': highlight(item.content, query),
             'search_type': 'text'
         } for item in items],
         'search_type': 'text'
@@ -160,6 +160,16 @@ def delete_organization(org_id):
     db.session.delete(organization)
     db.session.commit()
     
+    # Vector data is not covered by the cascades
+    try:
+        from ..services.qdrant_service import get_qdrant_service
+        from ..services.hybrid_search_service import get_hybrid_search_service
+        get_qdrant_service().delete_organization(org_id)
+        get_hybrid_search_service().delete_organization(org_id)
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).warning(f"Vector cleanup for organization {org_id} failed: {e}")
+    
     return jsonify({'message': 'Organization deleted successfully'}), 200
 
 
@@ -1,15 +1,43 @@
+import base64
+import json
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, or_
 from ..extensions import db
 from ..models import Project, User
 
 bp = Blueprint('projects', __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(project):
+    """Opaque cursor pointing after a project in list order."""
+    raw = json.dumps([project.updated_at.isoformat() if project.updated_at else None, project.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """(updated_at, id) from a cursor; raises ValueError if malformed."""
+    try:
+        updated_at, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(updated_at) if updated_at else None), int(project_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
 
 @bp.route('', methods=['GET'])
 @jwt_required()
 def list_projects():
-    """List all projects for user's organization."""
+    """
+    List all projects for user's organization, most recently updated first.
+    
+    Query params:
+        limit: Page size (max 200); without limit or cursor all projects are returned
+        cursor: next_cursor of the previous page
+    """
     user_id = int(get_jwt_identity())  # JWT stores as string
     user = User.query.get(user_id)
     
@@ -20,13 +48,47 @@ def list_projects():
     if not user.organization_id:
         return jsonify({'projects': []}), 200
     
-    projects = Project.query.filter_by(
+    query = Project.query.filter_by(
         organization_id=user.organization_id
-    ).order_by(Project.updated_at.desc()).all()
+    ).order_by(Project.updated_at.desc().nullslast(), Project.id.desc())
+    
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    paginate = cursor is not None or limit is not None
+    
+    if cursor:
+        try:
+            updated_at, last_id = _decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if updated_at is None:
+            query = query.filter(Project.updated_at.is_(None), Project.id < last_id)
+        else:
+            query = query.filter(or_(
+                Project.updated_at < updated_at,
+                and_(Project.updated_at == updated_at, Project.id < last_id),
+                Project.updated_at.is_(None)
+            ))
+    
+    if paginate:
+        limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        projects = query.limit(limit + 1).all()
+        has_more = len(projects) > limit
+        projects = projects[:limit]
+    else:
+        projects = query.all()
     
-    return jsonify({
-        'projects': [p.to_dict(include_stats=True) for p in projects]
-    }), 200
+    # Counts for all projects of the page in a few grouped queries
+    stats = Project.load_list_stats(p.id for p in projects)
+    response = {
+        'projects': [p.to_dict(include_stats=True, stats=stats[p.id]) for p in projects]
+    }
+    
+    if paginate:
+        response['has_more'] = has_more
+        response['next_cursor'] = _encode_cursor(projects[-1]) if has_more else None
+    
+    return jsonify(response), 200
 
 
 @bp.route('', methods=['POST'])
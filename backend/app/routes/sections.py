@@ -470,10 +470,12 @@ def get_section_history(section_id):
     versions = SectionVersion.query.filter_by(section_id=section_id)\
         .order_by(SectionVersion.version_number.desc()).all()
     
+    # Delta-encoded versions share their reconstructed chain contents
+    content_cache = {}
     return jsonify({
         'section_id': section_id,
         'current_version': section.version,
-        'history': [v.to_dict() for v in versions],
+        'history': [v.to_dict(content_cache) for v in versions],
         'total': len(versions)
     })
 
@@ -513,7 +515,7 @@ def restore_section_version(section_id, version_number):
     )
     
     # Restore the section
-    section.content = version.content
+    section.content = version.get_content()
     section.title = version.title or section.title
     section.status = version.status or section.status
     section.confidence_score = version.confidence_score
@@ -691,7 +693,6 @@ def generate_section_content(section_id):
     
     # Retrieve context from knowledge base with project dimension filtering
     from app.services.qdrant_service import get_qdrant_service
-    from app.models import KnowledgeItem
     qdrant = get_qdrant_service(user.organization_id)
     context = []
     
@@ -723,90 +724,19 @@ def generate_section_content(section_id):
             print(f"[SOURCES DEBUG]   - {c.get('title', 'Unknown')}: score={c.get('score', 0)}")
     except Exception as e:
         print(f"[SOURCES DEBUG] Qdrant search failed: {e}")
-        # Fallback: Smart keyword-based search with calculated relevance
+        # Fallback: Indexed keyword search with calculated relevance
         try:
-            from sqlalchemy import or_, func
+            from app.services.keyword_search_service import (
+                build_section_search_terms, search_knowledge_by_keywords
+            )
             
-            # Get ALL knowledge items for this organization (we'll score and rank them)
-            all_items = KnowledgeItem.query.filter_by(
-                organization_id=user.organization_id
-            ).all()
+            search_terms = build_section_search_terms(section_type, search_query)
+            print(f"[SOURCES DEBUG] Section '{section_type.name}' search terms: {search_terms}")
             
-            if not all_items:
-                print("[SOURCES DEBUG] No knowledge items found in database")
-            else:
-                # Build search terms from section type, title, and search query
-                search_terms = set()
-                # From section type name (e.g., "Functional Requirements" -> ["functional", "requirements"])
-                for word in section_type.name.lower().split():
-                    if len(word) > 2:
-                        search_terms.add(word)
-                # From section type slug (e.g., "functional_requirements")
-                for word in section_type.slug.replace('_', ' ').split():
-                    if len(word) > 2:
-                        search_terms.add(word)
-                # From search query
-                for word in search_query.lower().split():
-                    if len(word) > 3:  # Slightly longer for query terms
-                        search_terms.add(word)
-                
-                print(f"[SOURCES DEBUG] Section '{section_type.name}' search terms: {search_terms}")
-                
-                # Score each knowledge item based on keyword matches
-                scored_items = []
-                for item in all_items:
-                    title_lower = (item.title or '').lower()
-                    content_lower = (item.content or '')[:2000].lower()  # First 2000 chars
-                    
-                    # Calculate relevance score based on matches
-                    score = 0.0
-                    matches = 0
-                    for term in search_terms:
-                        # Title matches are worth more
-                        if term in title_lower:
-                            score += 0.15
-                            matches += 1
-                        # Content matches
-                        term_count = content_lower.count(term)
-                        if term_count > 0:
-                            score += min(0.05 * term_count, 0.2)  # Cap at 0.2 per term
-                            matches += 1
-                    
-                    # Normalize score based on number of search terms
-                    if len(search_terms) > 0:
-                        score = score / len(search_terms)
-                    
-                    # Only include items with some relevance
-                    if score > 0.05:
-                        scored_items.append({
-                            'item': item,
-                            'score': min(score, 0.95),  # Cap at 95%
-                            'matches': matches
-                        })
-                
-                # Sort by score (highest first) and take top 5
-                scored_items.sort(key=lambda x: x['score'], reverse=True)
-                
-                print(f"[SOURCES DEBUG] Found {len(scored_items)} relevant items for '{section_type.name}'")
-                for si in scored_items:  # Return all relevant sources, not limited to 5
-                    print(f"[SOURCES DEBUG]   - {si['item'].title}: score={si['score']:.2f}, matches={si['matches']}")
-                    context.append({
-                        'item_id': si['item'].id,
-                        'title': si['item'].title,
-                        'content_preview': (si['item'].content or '')[:500],
-                        'score': round(si['score'], 2),
-                    })
-                
-                # If no scored items, fall back to first 5 with low score
-                if not scored_items:
-                    print("[SOURCES DEBUG] No relevant matches, using generic fallback")
-                    for item in all_items[:5]:
-                        context.append({
-                            'item_id': item.id,
-                            'title': item.title,
-                            'content_preview': (item.content or '')[:500],
-                            'score': 0.2,  # Low score indicating no specific match
-                        })
+            context = search_knowledge_by_keywords(user.organization_id, search_terms)
+            print(f"[SOURCES DEBUG] Keyword index returned {len(context)} items for '{section_type.name}'")
+            for c in context:
+                print(f"[SOURCES DEBUG]   - {c['title']}: score={c['score']:.2f}")
         except Exception as e2:
             print(f"[SOURCES DEBUG] Fallback also failed: {e2}")
     
@@ -1046,76 +976,18 @@ def regenerate_section(section_id):
         print(f"[SOURCES DEBUG] Regenerate: Qdrant returned {len(context)} results")
     except Exception as e:
         print(f"[SOURCES DEBUG] Regenerate: Qdrant search failed: {e}")
-        # Fallback: Smart keyword-based search with calculated relevance
+        # Fallback: Indexed keyword search with calculated relevance
         try:
-            from app.models import KnowledgeItem
+            from app.services.keyword_search_service import (
+                build_section_search_terms, search_knowledge_by_keywords
+            )
             
             section_type = section.section_type
+            search_terms = build_section_search_terms(section_type)
+            print(f"[SOURCES DEBUG] Regenerate: Section '{section_type.name}' search terms: {search_terms}")
             
-            # Get ALL knowledge items for this organization
-            all_items = KnowledgeItem.query.filter_by(
-                organization_id=user.organization_id
-            ).all()
-            
-            if all_items:
-                # Build search terms from section type
-                search_terms = set()
-                for word in section_type.name.lower().split():
-                    if len(word) > 2:
-                        search_terms.add(word)
-                for word in section_type.slug.replace('_', ' ').split():
-                    if len(word) > 2:
-                        search_terms.add(word)
-                
-                print(f"[SOURCES DEBUG] Regenerate: Section '{section_type.name}' search terms: {search_terms}")
-                
-                # Score each item
-                scored_items = []
-                for item in all_items:
-                    title_lower = (item.title or '').lower()
-                    content_lower = (item.content or '')[:2000].lower()
-                    
-                    score = 0.0
-                    matches = 0
-                    for term in search_terms:
-                        if term in title_lower:
-                            score += 0.15
-                            matches += 1
-                        term_count = content_lower.count(term)
-                        if term_count > 0:
-                            score += min(0.05 * term_count, 0.2)
-                            matches += 1
-                    
-                    if len(search_terms) > 0:
-                        score = score / len(search_terms)
-                    
-                    if score > 0.05:
-                        scored_items.append({
-                            'item': item,
-                            'score': min(score, 0.95),
-                            'matches': matches
-                        })
-                
-                scored_items.sort(key=lambda x: x['score'], reverse=True)
-                
-                print(f"[SOURCES DEBUG] Regenerate: Found {len(scored_items)} relevant items for '{section_type.name}'")
-                for si in scored_items:  # Return all relevant sources, not limited to 5
-                    print(f"[SOURCES DEBUG]   - {si['item'].title}: score={si['score']:.2f}")
-                    context.append({
-                        'item_id': si['item'].id,
-                        'title': si['item'].title,
-                        'content_preview': (si['item'].content or '')[:500],
-                        'score': round(si['score'], 2),
-                    })
-                
-                if not scored_items:
-                    for item in all_items[:5]:
-                        context.append({
-                            'item_id': item.id,
-                            'title': item.title,
-                            'content_preview': (item.content or '')[:500],
-                            'score': 0.2,
-                        })
+            context = search_knowledge_by_keywords(user.organization_id, search_terms)
+            print(f"[SOURCES DEBUG] Regenerate: Keyword index returned {len(context)} items for '{section_type.name}'")
         except Exception as e2:
             print(f"[SOURCES DEBUG] Regenerate: Fallback failed: {e2}")
     
@@ -3,8 +3,8 @@ Smart Search routes for AI-powered unified search.
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
 from ..models import User, Project, AnswerLibraryItem, KnowledgeItem
+from ..services.keyword_search_service import text_search, text_match_score, highlight
 
 bp = Blueprint('smart_search', __name__)
 
@@ -66,14 +66,14 @@ def _search_projects(org_id: int, query: str, limit: int = 5):
     """Search projects by name, description, and client name."""
     query_lower = query.lower()
     
+    criterion, rank = text_search(Project, query)
     projects = Project.query.filter(
         Project.organization_id == org_id,
-        db.or_(
-            Project.name.ilike(f'%{query_lower}%'),
-            Project.description.ilike(f'%{query_lower}%'),
-            Project.client_name.ilike(f'%{query_lower}%'),
-        )
-    ).limit(limit).all()
+        criterion
+    )
+    if rank is not None:
+        projects = projects.order_by(rank.desc())
+    projects = projects.limit(limit).all()
     
     return [{
         'type': 'project',
@@ -81,7 +81,8 @@ def _search_projects(org_id: int, query: str, limit: int = 5):
         'title': p.name,
         'description': p.description or f'Client: {p.client_name or "N/A"}',
         'status': p.status,
-        'score': _calculate_text_score(query_lower, [p.name, p.description or '', p.client_name or '']),
+        'score': text_match_score(query_lower, [p.name, p.description or '', p.client_name or '']),
+        'highlight': highlight(p.description or p.client_name, query),
         'url': f'/projects/{p.id}',
         'metadata': {
             'status': p.status,
@@ -141,14 +142,15 @@ def _search_answers(org_id: int, query: str, limit: int = 8):
     # Fallback to text search if semantic search didn't return enough
     if len(results) < limit:
         query_lower = query.lower()
+        criterion, rank = text_search(AnswerLibraryItem, query)
         text_items = AnswerLibraryItem.query.filter(
             AnswerLibraryItem.organization_id == org_id,
             AnswerLibraryItem.is_active == True,
-            db.or_(
-                AnswerLibraryItem.question_text.ilike(f'%{query_lower}%'),
-                AnswerLibraryItem.answer_text.ilike(f'%{query_lower}%'),
-            )
-        ).limit(limit - len(results)).all()
+            criterion
+        )
+        if rank is not None:
+            text_items = text_items.order_by(rank.desc())
+        text_items = text_items.limit(limit - len(results)).all()
         
         existing_ids = {r['id'] for r in results}
         for item in text_items:
@@ -158,7 +160,8 @@ def _search_answers(org_id: int, query: str, limit: int = 8):
                     'id': item.id,
                     'title': item.question_text[:100] + ('...' if len(item.question_text) > 100 else ''),
                     'description': item.answer_text[:200] + ('...' if len(item.answer_text) > 200 else ''),
-                    'score': _calculate_text_score(query_lower, [item.question_text, item.answer_text]),
+                    'score': text_match_score(query_lower, [item.question_text, item.answer_text]),
+                    'highlight': highlight(item.answer_text, query),
                     'url': f'/answer-library?highlight={item.id}',
                     'metadata': {
                         'category': item.category,
@@ -207,14 +210,15 @@ def _search_knowledge(org_id: int, query: str, limit: int = 7):
     # Fallback to text search
     if len(results) < limit:
         query_lower = query.lower()
+        criterion, rank = text_search(KnowledgeItem, query)
         text_items = KnowledgeItem.query.filter(
             KnowledgeItem.organization_id == org_id,
             KnowledgeItem.is_active == True,
-            db.or_(
-                KnowledgeItem.title.ilike(f'%{query_lower}%'),
-                KnowledgeItem.content.ilike(f'%{query_lower}%'),
-            )
-        ).limit(limit - len(results)).all()
+            criterion
+        )
+        if rank is not None:
+            text_items = text_items.order_by(rank.desc())
+        text_items = text_items.limit(limit - len(results)).all()
         
         existing_ids = {r['id'] for r in results}
         for item in text_items:
@@ -224,7 +228,8 @@ def _search_knowledge(org_id: int, query: str, limit: int = 7):
                     'id': item.id,
                     'title': item.title,
                     'description': (item.content or '')[:200] + ('...' if len(item.content or '') > 200 else ''),
-                    'score': _calculate_text_score(query_lower, [item.title, item.content or '']),
+                    'score': text_match_score(query_lower, [item.title, item.content or '']),
+                    'highlight': highlight(item.content, query),
                     'url': '/knowledge',
                     'metadata': {
                         'folder_id': item.folder_id,
@@ -234,28 +239,3 @@ def _search_knowledge(org_id: int, query: str, limit: int = 7):
     
     return results[:limit]
 
-
-def _calculate_text_score(query: str, texts: list) -> float:
-    """Calculate a simple relevance score based on text matching."""
-    query_lower = query.lower()
-    words = query_lower.split()
-    
-    total_score = 0.0
-    for text in texts:
-        if not text:
-            continue
-        text_lower = text.lower()
-        
-        # Exact phrase match
-        if query_lower in text_lower:
-            total_score += 0.5
-        
-        # Word matches
-        word_matches = sum(1 for word in words if word in text_lower)
-        total_score += (word_matches / len(words)) * 0.3 if words else 0
-        
-        # Title boost (first text is usually title)
-        if text == texts[0] and query_lower in text_lower:
-            total_score += 0.2
-    
-    return min(1.0, total_score)
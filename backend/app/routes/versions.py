@@ -5,6 +5,10 @@ from flask import Blueprint, request, jsonify, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
 from ..models import ProposalVersion, Project, User, RFPSection, Question, SectionVersion
+from ..services.version_storage_service import (
+    build_snapshot, expand_snapshot, store_version_file, load_version_file,
+    delete_version_file, get_version_storage_stats
+)
 
 bp = Blueprint('versions', __name__)
 
@@ -78,22 +82,8 @@ def create_version(project_id):
     except Exception as e:
         return jsonify({'error': f'Failed to generate document: {str(e)}'}), 500
     
-    # Create sections snapshot for restoration
-    sections_snapshot = []
-    for section in sections:
-        snapshot = {
-            'section_type_id': section.section_type_id,
-            'title': section.title,
-            'content': section.content,
-            'order': section.order,
-            'status': section.status,
-            'inputs': section.inputs,
-            'ai_generation_params': section.ai_generation_params,
-            'confidence_score': section.confidence_score,
-            'sources': section.sources,
-            'flags': section.flags,
-        }
-        sections_snapshot.append(snapshot)
+    # Create sections snapshot for restoration (section bodies stored as shared blobs)
+    sections_snapshot = build_snapshot(sections)
     
     # Create the version record
     version = ProposalVersion(
@@ -101,14 +91,15 @@ def create_version(project_id):
         version_number=next_version,
         title=title,
         description=description,
-        file_data=file_data,
         file_type='docx',
         file_size=file_size,
+        export_options={'include_qa': include_qa},
         sections_snapshot=sections_snapshot,
         created_by=user_id,
     )
     
     db.session.add(version)
+    store_version_file(version, file_data)
     db.session.commit()
     
     return jsonify({
@@ -117,6 +108,23 @@ def create_version(project_id):
     }), 201
 
 
+@bp.route('/projects/<int:project_id>/versions/storage-stats', methods=['GET'])
+@jwt_required()
+def version_storage_stats(project_id):
+    """Logical versus stored size of the project's versions and section history."""
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    project = Project.query.get(project_id)
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if project.organization_id != user.organization_id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify(get_version_storage_stats(project_id)), 200
+
+
 @bp.route('/versions/<int:version_id>', methods=['GET'])
 @jwt_required()
 def get_version(version_id):
@@ -151,7 +159,8 @@ def preview_version(version_id):
     if version.project.organization_id != user.organization_id:
         return jsonify({'error': 'Access denied'}), 403
     
-    if not version.file_data:
+    file_data = load_version_file(version)
+    if not file_data:
         return jsonify({'error': 'No file data available'}), 404
     
     # Convert DOCX to HTML using mammoth
@@ -161,7 +170,7 @@ def preview_version(version_id):
             
             # Write to temp file
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.docx')
-            temp_file.write(version.file_data)
+            temp_file.write(file_data)
             temp_file.close()
             
             # Convert to HTML
@@ -249,7 +258,8 @@ def download_version(version_id):
     if version.project.organization_id != user.organization_id:
         return jsonify({'error': 'Access denied'}), 403
     
-    if not version.file_data:
+    file_data = load_version_file(version)
+    if not file_data:
         return jsonify({'error': 'No file data available'}), 404
     
     # Determine filename
@@ -257,7 +267,7 @@ def download_version(version_id):
     filename = f'{project_name}_v{version.version_number}.docx'
     
     return Response(
-        version.file_data,
+        file_data,
         mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         headers={
             'Content-Disposition': f'attachment; filename="{filename}"'
@@ -282,6 +292,7 @@ def delete_version(version_id):
     if version.project.organization_id != user.organization_id:
         return jsonify({'error': 'Access denied'}), 403
     
+    delete_version_file(version)
     db.session.delete(version)
     db.session.commit()
     
@@ -321,21 +332,7 @@ def restore_version(version_id):
         .order_by(RFPSection.order).all()
     
     # Create backup snapshot
-    backup_snapshot = []
-    for section in current_sections:
-        snapshot = {
-            'section_type_id': section.section_type_id,
-            'title': section.title,
-            'content': section.content,
-            'order': section.order,
-            'status': section.status,
-            'inputs': section.inputs,
-            'ai_generation_params': section.ai_generation_params,
-            'confidence_score': section.confidence_score,
-            'sources': section.sources,
-            'flags': section.flags,
-        }
-        backup_snapshot.append(snapshot)
+    backup_snapshot = build_snapshot(current_sections)
     
     # Generate backup DOCX
     try:
@@ -357,15 +354,16 @@ def restore_version(version_id):
         version_number=next_version,
         title=f'Auto-backup before restore (from v{version.version_number})',
         description=f'Automatic backup created before restoring to version "{version.title}"',
-        file_data=backup_file_data,
         file_type='docx',
         file_size=backup_file_size,
+        export_options={'include_qa': True},
         sections_snapshot=backup_snapshot,
         is_restoration_point=True,
         restored_from_version=version.version_number,
         created_by=user_id,
     )
     db.session.add(backup_version)
+    store_version_file(backup_version, backup_file_data)
     
     # Step 2: Delete current sections
     for section in current_sections:
@@ -373,7 +371,7 @@ def restore_version(version_id):
     
     # Step 3: Restore sections from snapshot
     restored_sections = []
-    for order, section_data in enumerate(version.sections_snapshot):
+    for order, section_data in enumerate(expand_snapshot(version.sections_snapshot)):
         new_section = RFPSection(
             project_id=project_id,
             section_type_id=section_data.get('section_type_id'),
@@ -427,8 +425,8 @@ def compare_versions(version_id, other_version_id):
         return jsonify({'error': 'Access denied'}), 403
     
     # Get section snapshots (default to empty list if not available)
-    snapshot_a = version_a.sections_snapshot or []
-    snapshot_b = version_b.sections_snapshot or []
+    snapshot_a = expand_snapshot(version_a.sections_snapshot)
+    snapshot_b = expand_snapshot(version_b.sections_snapshot)
     
     # Build lookup by title for matching sections
     sections_a = {s.get('title', f"Section {i}"): s for i, s in enumerate(snapshot_a)}
@@ -576,7 +574,7 @@ def branch_version(version_id):
     
     # Step 2: Create new sections from the version snapshot
     created_sections = []
-    for i, section_data in enumerate(version.sections_snapshot):
+    for i, section_data in enumerate(expand_snapshot(version.sections_snapshot)):
         new_section = RFPSection(
             project_id=project_id,
             section_type_id=section_data.get('section_type_id'),
@@ -2,102 +2,217 @@
 Batch Export Service
 
 Provides export functionality for answers, knowledge base, and proposals.
+
+Exports are generators of bytes so large libraries can be sent as chunked
+HTTP responses: rows are read with a server-side cursor (yield_per) and
+written as CSV, NDJSON, JSON or an openpyxl write-only workbook without
+holding the whole result in memory. Imports iterate CSV rows or a read-only
+workbook and insert in batches, reporting errors per row.
 """
 import io
 import csv
 import json
 import logging
+import os
+import tempfile
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, BinaryIO
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per server-side cursor round trip, and written per chunk
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+# Rows inserted per commit on import
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+# Row errors returned in an import report (the count is always complete)
+IMPORT_MAX_REPORTED_ERRORS = 100
 
-def export_answers_to_csv(answers: List[Dict]) -> bytes:
+FILE_CHUNK_SIZE = 64 * 1024
+
+ANSWER_FIELDS = [
+    'question_id', 'question_text', 'answer_text',
+    'confidence', 'status', 'category', 'created_at'
+]
+ANSWER_HEADERS = ['Question ID', 'Question', 'Answer', 'Confidence', 'Status', 'Category', 'Created At']
+
+LIBRARY_FIELDS = ['question_text', 'answer_text', 'category', 'tags', 'usage_count', 'created_at']
+LIBRARY_HEADERS = ['Question', 'Answer', 'Category', 'Tags', 'Usage Count', 'Created At']
+
+KNOWLEDGE_FIELDS = [
+    'id', 'title', 'content', 'category', 'tags', 'source_type', 'geography',
+    'client_type', 'industry', 'folder_id', 'created_at', 'updated_at'
+]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'json': 'json', 'ndjson': 'ndjson'}
+
+
+# ============================================================================
+# Stream writers
+# ============================================================================
+
+def _batched(rows: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(rows: Iterable[Dict], fieldnames: List[str]) -> Iterator[bytes]:
     """
-    Export answers to CSV format.
+    Write rows as CSV, one chunk per EXPORT_BATCH_SIZE rows.
     
     Args:
-        answers: List of answer dictionaries
-        
-    Returns:
-        CSV file as bytes
+        rows: Row dictionaries (missing fields are written empty)
+        fieldnames: Column order
+    
+    Yields:
+        UTF-8 encoded CSV chunks, the header with the first batch
     """
     output = io.StringIO()
-    
-    fieldnames = [
-        'question_id', 'question_text', 'answer_text', 
-        'confidence', 'status', 'category', 'created_at'
-    ]
-    
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore', restval='')
     writer.writeheader()
     
-    for answer in answers:
-        writer.writerow({
-            'question_id': answer.get('question_id', ''),
-            'question_text': answer.get('question_text', ''),
-            'answer_text': answer.get('answer_text', ''),
-            'confidence': answer.get('confidence', ''),
-            'status': answer.get('status', ''),
-            'category': answer.get('category', ''),
-            'created_at': answer.get('created_at', '')
-        })
+    for batch in _batched(rows, EXPORT_BATCH_SIZE):
+        writer.writerows(batch)
+        yield output.getvalue().encode('utf-8')
+        output.seek(0)
+        output.truncate()
+    if output.tell():
+        # No rows: header only
+        yield output.getvalue().encode('utf-8')
+
+
+def stream_ndjson(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """Write rows as newline-delimited JSON, one chunk per EXPORT_BATCH_SIZE rows."""
+    for batch in _batched(rows, EXPORT_BATCH_SIZE):
+        yield ''.join(json.dumps(row, default=str) + '\n' for row in batch).encode('utf-8')
+
+
+def stream_json_document(rows: Iterable[Dict], key: str = 'items') -> Iterator[bytes]:
+    """
+    Write rows as one JSON document {export_date, <key>: [...], item_count}.
     
-    return output.getvalue().encode('utf-8')
+    The count comes after the list since it is only known at the end; the
+    opening goes out with the first batch.
+    """
+    opening = '{\n  "export_date": ' + json.dumps(datetime.utcnow().isoformat()) + ',\n  "' + key + '": ['
+    count = 0
+    for batch in _batched(rows, EXPORT_BATCH_SIZE):
+        parts = [opening]
+        opening = ''
+        for row in batch:
+            parts.append(('\n    ' if count == 0 else ',\n    ') + json.dumps(row, default=str))
+            count += 1
+        yield ''.join(parts).encode('utf-8')
+    yield (opening + '\n  ],\n  "item_count": ' + str(count) + '\n}\n').encode('utf-8')
 
 
-def export_answers_to_excel(answers: List[Dict]) -> bytes:
+def stream_excel(rows: Iterable[Dict], fieldnames: List[str], headers: List[str],
+                 title: str = 'Answers') -> Iterator[bytes]:
     """
-    Export answers to Excel format.
+    Write rows to an openpyxl write-only workbook and stream the file.
     
-    Args:
-        answers: List of answer dictionaries
-        
-    Returns:
-        Excel file as bytes
+    Write-only worksheets spool rows to disk as they are appended, so memory
+    stays flat; the xlsx (a zip) is streamed once the last row is written.
+    
+    Yields:
+        Chunks of the .xlsx file
     """
     try:
         import openpyxl
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill
     except ImportError:
         raise ImportError("openpyxl required: pip install openpyxl")
     
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Answers"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+    
+    # Column widths must be set before rows in write-only mode
+    for col, field in enumerate(fieldnames, 1):
+        letter = openpyxl.utils.get_column_letter(col)
+        ws.column_dimensions[letter].width = 50 if field.endswith('_text') or field == 'content' else 15
     
     # Header style
     header_font = Font(bold=True)
     header_fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-    
-    # Headers
-    headers = ['Question ID', 'Question', 'Answer', 'Confidence', 'Status', 'Category', 'Created At']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = header_font
         cell.fill = header_fill
+        header_cells.append(cell)
+    ws.append(header_cells)
     
-    # Data
-    for row, answer in enumerate(answers, 2):
-        ws.cell(row=row, column=1, value=answer.get('question_id', ''))
-        ws.cell(row=row, column=2, value=answer.get('question_text', ''))
-        ws.cell(row=row, column=3, value=answer.get('answer_text', ''))
-        ws.cell(row=row, column=4, value=answer.get('confidence', ''))
-        ws.cell(row=row, column=5, value=answer.get('status', ''))
-        ws.cell(row=row, column=6, value=answer.get('category', ''))
-        ws.cell(row=row, column=7, value=answer.get('created_at', ''))
+    try:
+        for row in rows:
+            ws.append([row.get(field, '') for field in fieldnames])
+    except Exception:
+        # Finish the write-only worksheet (discarding it) before the error propagates
+        with tempfile.TemporaryFile() as discarded:
+            wb.save(discarded)
+        raise
     
-    # Adjust column widths
-    for col in ws.columns:
-        max_length = max(len(str(cell.value or '')) for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_length + 2, 50)
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_rows(rows: Iterable[Dict], format: str, fieldnames: List[str],
+                headers: List[str] = None, title: str = 'Export') -> Iterator[bytes]:
+    """Stream rows in the requested format ('csv', 'excel', 'json', 'ndjson')."""
+    if format == 'excel':
+        return stream_excel(rows, fieldnames, headers or fieldnames, title=title)
+    if format == 'json':
+        return stream_json_document(rows)
+    if format == 'ndjson':
+        return stream_ndjson(rows)
+    return stream_csv(rows, fieldnames)
+
+
+# ============================================================================
+# In-memory helpers (small exports)
+# ============================================================================
+
+def export_answers_to_csv(answers: List[Dict]) -> bytes:
+    """
+    Export answers to CSV format.
     
-    # Save to bytes
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.read()
+    Args:
+        answers: List of answer dictionaries
+    
+    Returns:
+        CSV file as bytes
+    """
+    return b''.join(stream_csv(answers, ANSWER_FIELDS))
+
+
+def export_answers_to_excel(answers: List[Dict]) -> bytes:
+    """
+    Export answers to Excel format.
+    
+    Args:
+        answers: List of answer dictionaries
+    
+    Returns:
+        Excel file as bytes
+    """
+    return b''.join(stream_excel(answers, ANSWER_FIELDS, ANSWER_HEADERS))
 
 
 def export_knowledge_base_to_json(items: List[Dict]) -> bytes:
@@ -106,17 +221,91 @@ def export_knowledge_base_to_json(items: List[Dict]) -> bytes:
     
     Args:
         items: List of knowledge base items
-        
+    
     Returns:
         JSON file as bytes
     """
-    export_data = {
-        'export_date': datetime.utcnow().isoformat(),
-        'item_count': len(items),
-        'items': items
+    return b''.join(stream_json_document(items))
+
+
+# ============================================================================
+# Imports
+# ============================================================================
+
+def _parse_answer_row(row: Dict) -> Dict:
+    """Validate and normalize one imported row; raises ValueError."""
+    question_text = row.get('question_text') or row.get('question') or ''
+    answer_text = row.get('answer_text') or row.get('answer') or ''
+    if not str(question_text).strip():
+        raise ValueError('Missing question')
+    if not str(answer_text).strip():
+        raise ValueError('Missing answer')
+    
+    confidence = row.get('confidence')
+    try:
+        confidence = float(confidence) if confidence not in (None, '') else 0.7
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid confidence: {confidence!r}')
+    
+    return {
+        'question_text': str(question_text).strip(),
+        'answer_text': str(answer_text).strip(),
+        'category': row.get('category') or 'general',
+        'confidence': confidence
     }
+
+
+def iter_answers_from_csv(file: BinaryIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Parse answers from a CSV file one row at a time.
+    
+    Args:
+        file: Binary file object (e.g. an upload stream)
     
-    return json.dumps(export_data, indent=2, default=str).encode('utf-8')
+    Yields:
+        (row number, parsed answer or None, error or None); row 1 is the header
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    for row_number, row in enumerate(reader, 2):
+        try:
+            yield row_number, _parse_answer_row(row), None
+        except ValueError as e:
+            yield row_number, None, str(e)
+
+
+def iter_answers_from_excel(file: BinaryIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Parse answers from the first sheet of an Excel file one row at a time.
+    
+    Uses a read-only workbook, which streams rows from the file.
+    
+    Yields:
+        (row number, parsed answer or None, error or None); row 1 is the header
+    """
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("openpyxl required: pip install openpyxl")
+    
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        headers = [str(value).lower().replace(' ', '_') if value else f'col_{i}'
+                   for i, value in enumerate(first)]
+        
+        for row_number, row in enumerate(rows, 2):
+            if all(value in (None, '') for value in row):
+                continue  # Trailing blank rows
+            try:
+                yield row_number, _parse_answer_row(dict(zip(headers, row))), None
+            except ValueError as e:
+                yield row_number, None, str(e)
+    finally:
+        wb.close()
 
 
 def import_answers_from_csv(file_content: bytes) -> List[Dict]:
@@ -125,23 +314,11 @@ def import_answers_from_csv(file_content: bytes) -> List[Dict]:
     
     Args:
         file_content: CSV file content as bytes
-        
+    
     Returns:
-        List of parsed answer dictionaries
+        List of parsed answer dictionaries (invalid rows are skipped)
     """
-    content = file_content.decode('utf-8')
-    reader = csv.DictReader(io.StringIO(content))
-    
-    answers = []
-    for row in reader:
-        answers.append({
-            'question_text': row.get('question_text', row.get('question', '')),
-            'answer_text': row.get('answer_text', row.get('answer', '')),
-            'category': row.get('category', 'general'),
-            'confidence': float(row.get('confidence', 0.7)) if row.get('confidence') else 0.7
-        })
-    
-    return answers
+    return [answer for _, answer, _ in iter_answers_from_csv(io.BytesIO(file_content)) if answer]
 
 
 def import_answers_from_excel(file_content: bytes) -> List[Dict]:
@@ -150,39 +327,172 @@ def import_answers_from_excel(file_content: bytes) -> List[Dict]:
     
     Args:
         file_content: Excel file content as bytes
-        
+    
     Returns:
-        List of parsed answer dictionaries
+        List of parsed answer dictionaries (invalid rows are skipped)
     """
-    try:
-        import openpyxl
-    except ImportError:
-        raise ImportError("openpyxl required: pip install openpyxl")
+    return [answer for _, answer, _ in iter_answers_from_excel(io.BytesIO(file_content)) if answer]
+
+
+def import_answers_to_library(parsed_rows: Iterable[Tuple[int, Optional[Dict], Optional[str]]],
+                              org_id: int, user_id: int) -> Dict[str, Any]:
+    """
+    Insert parsed answers into the answer library in batches.
+    
+    Each batch is committed on its own; a batch that fails to insert is
+    reported against its rows and the import continues.
     
-    wb = openpyxl.load_workbook(io.BytesIO(file_content))
-    ws = wb.active
+    Args:
+        parsed_rows: Output of iter_answers_from_csv / iter_answers_from_excel
+        org_id: Organization ID
+        user_id: Importing user ID
     
-    # Get headers from first row
-    headers = [cell.value.lower().replace(' ', '_') if cell.value else f'col_{i}' 
-               for i, cell in enumerate(ws[1])]
+    Returns:
+        Report with imported / failed counts and row-level errors
+    """
+    from app.extensions import db
+    from app.models import AnswerLibraryItem
     
-    answers = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        row_dict = dict(zip(headers, row))
-        
-        answers.append({
-            'question_text': row_dict.get('question_text') or row_dict.get('question', ''),
-            'answer_text': row_dict.get('answer_text') or row_dict.get('answer', ''),
-            'category': row_dict.get('category', 'general'),
-            'confidence': float(row_dict.get('confidence', 0.7)) if row_dict.get('confidence') else 0.7
-        })
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    
+    def add_error(row_number, error):
+        report['failed'] += 1
+        if len(report['errors']) < IMPORT_MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': row_number, 'error': error})
+    
+    def flush(batch):
+        if not batch:
+            return
+        now = datetime.utcnow()
+        try:
+            db.session.bulk_insert_mappings(AnswerLibraryItem, [{
+                'organization_id': org_id,
+                'question_text': answer['question_text'],
+                'answer_text': answer['answer_text'],
+                'category': answer['category'],
+                'tags': [],
+                'item_metadata': {'import_confidence': answer['confidence']},
+                'status': 'approved',
+                'created_by': user_id,
+                'is_active': True,
+                'times_used': 0,
+                'times_helpful': 0,
+                'created_at': now,
+                'updated_at': now,
+            } for _, answer in batch])
+            db.session.commit()
+            report['imported'] += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Answer import batch failed: {e}")
+            for row_number, _ in batch:
+                add_error(row_number, f'Insert failed: {e}')
+    
+    batch = []
+    for row_number, answer, error in parsed_rows:
+        if error:
+            add_error(row_number, error)
+            continue
+        batch.append((row_number, answer))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush(batch)
+            batch = []
+    flush(batch)
+    
+    return report
+
+
+# ============================================================================
+# Row sources (server-side cursor)
+# ============================================================================
+
+def _isoformat(value) -> str:
+    return value.isoformat() if value else ''
+
+
+def iter_project_answer_rows(project_id: int) -> Iterator[Dict]:
+    """Answers of a project with their questions, streamed from the database."""
+    from app.extensions import db
+    from app.models import Answer, Question
+    
+    query = db.session.query(
+        Answer.question_id, Question.text, Answer.content, Answer.confidence_score,
+        Answer.status, Question.category, Answer.created_at
+    ).join(Question, Answer.question_id == Question.id)\
+        .filter(Question.project_id == project_id)\
+        .order_by(Answer.id)\
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
     
-    return answers
+    for question_id, question_text, answer_text, confidence, status, category, created_at in query:
+        yield {
+            'question_id': question_id,
+            'question_text': question_text or '',
+            'answer_text': answer_text,
+            'confidence': confidence,
+            'status': status,
+            'category': category or '',
+            'created_at': _isoformat(created_at)
+        }
+
+
+def iter_answer_library_rows(org_id: int) -> Iterator[Dict]:
+    """Active answer library items of an organization, streamed from the database."""
+    from app.extensions import db
+    from app.models import AnswerLibraryItem
+    
+    query = db.session.query(
+        AnswerLibraryItem.question_text, AnswerLibraryItem.answer_text, AnswerLibraryItem.category,
+        AnswerLibraryItem.tags, AnswerLibraryItem.times_used, AnswerLibraryItem.created_at
+    ).filter(
+        AnswerLibraryItem.organization_id == org_id,
+        AnswerLibraryItem.is_active == True
+    ).order_by(AnswerLibraryItem.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    for question_text, answer_text, category, tags, times_used, created_at in query:
+        yield {
+            'question_text': question_text,
+            'answer_text': answer_text,
+            'category': category,
+            'tags': ','.join(tags) if tags else '',
+            'usage_count': times_used or 0,
+            'created_at': _isoformat(created_at)
+        }
+
+
+def iter_knowledge_rows(org_id: int, join_tags: bool = False) -> Iterator[Dict]:
+    """
+    Active knowledge items of an organization (without file data), streamed.
+    
+    Args:
+        org_id: Organization ID
+        join_tags: Tags as one comma-separated string (for CSV and Excel cells)
+    """
+    from app.extensions import db
+    from app.models import KnowledgeItem
+    
+    columns = [getattr(KnowledgeItem, field) for field in KNOWLEDGE_FIELDS]
+    query = db.session.query(*columns).filter(
+        KnowledgeItem.organization_id == org_id,
+        KnowledgeItem.is_active == True
+    ).order_by(KnowledgeItem.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    for values in query:
+        row = dict(zip(KNOWLEDGE_FIELDS, values))
+        row['created_at'] = _isoformat(row['created_at'])
+        row['updated_at'] = _isoformat(row['updated_at'])
+        if join_tags:
+            row['tags'] = ','.join(row['tags']) if row['tags'] else ''
+        yield row
 
 
 class BatchExportService:
     """Service for batch export operations."""
     
+    @staticmethod
+    def _filename(prefix: str, format: str) -> str:
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        return f'{prefix}_{timestamp}.{EXTENSIONS.get(format, "csv")}'
+    
     @staticmethod
     def export_project_answers(project_id: int, format: str = 'csv') -> tuple:
         """
@@ -190,50 +500,17 @@ class BatchExportService:
         
         Args:
             project_id: Project ID
-            format: Export format ('csv', 'excel', 'json')
-            
+            format: Export format ('csv', 'excel', 'json', 'ndjson')
+        
         Returns:
-            Tuple of (file_bytes, filename, content_type)
+            Tuple of (chunk generator, filename, content_type)
         """
-        from app.models import Answer, Question
-        
-        # Get answers with questions
-        answers = Answer.query.join(Question).filter(
-            Question.project_id == project_id
-        ).all()
-        
-        answer_dicts = []
-        for answer in answers:
-            answer_dicts.append({
-                'question_id': answer.question_id,
-                'question_text': answer.question.question_text if answer.question else '',
-                'answer_text': answer.answer_text,
-                'confidence': answer.confidence,
-                'status': answer.status,
-                'category': answer.question.category if answer.question else '',
-                'created_at': answer.created_at.isoformat() if answer.created_at else ''
-            })
-        
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        
-        if format == 'excel':
-            return (
-                export_answers_to_excel(answer_dicts),
-                f'answers_project_{project_id}_{timestamp}.xlsx',
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-        elif format == 'json':
-            return (
-                json.dumps(answer_dicts, indent=2, default=str).encode('utf-8'),
-                f'answers_project_{project_id}_{timestamp}.json',
-                'application/json'
-            )
-        else:  # csv
-            return (
-                export_answers_to_csv(answer_dicts),
-                f'answers_project_{project_id}_{timestamp}.csv',
-                'text/csv'
-            )
+        return (
+            stream_rows(iter_project_answer_rows(project_id), format, ANSWER_FIELDS,
+                        ANSWER_HEADERS, title='Answers'),
+            BatchExportService._filename(f'answers_project_{project_id}', format),
+            CONTENT_TYPES.get(format, 'text/csv')
+        )
     
     @staticmethod
     def export_answer_library(org_id: int, format: str = 'csv') -> tuple:
@@ -242,35 +519,33 @@ class BatchExportService:
         
         Args:
             org_id: Organization ID
-            format: Export format
-            
+            format: Export format ('csv', 'excel', 'json', 'ndjson')
+        
         Returns:
-            Tuple of (file_bytes, filename, content_type)
+            Tuple of (chunk generator, filename, content_type)
         """
-        from app.models import AnswerLibraryItem
-        
-        items = AnswerLibraryItem.query.filter_by(org_id=org_id).all()
-        
-        item_dicts = [{
-            'question_text': item.question_text,
-            'answer_text': item.answer_text,
-            'category': item.category,
-            'tags': ','.join(item.tags) if item.tags else '',
-            'usage_count': item.usage_count,
-            'created_at': item.created_at.isoformat() if item.created_at else ''
-        } for item in items]
+        return (
+            stream_rows(iter_answer_library_rows(org_id), format, LIBRARY_FIELDS,
+                        LIBRARY_HEADERS, title='Answer Library'),
+            BatchExportService._filename('answer_library', format),
+            CONTENT_TYPES.get(format, 'text/csv')
+        )
+    
+    @staticmethod
+    def export_knowledge_base(org_id: int, format: str = 'ndjson') -> tuple:
+        """
+        Export the knowledge base of an organization.
         
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        Args:
+            org_id: Organization ID
+            format: Export format ('csv', 'excel', 'json', 'ndjson')
         
-        if format == 'excel':
-            return (
-                export_answers_to_excel(item_dicts),
-                f'answer_library_{timestamp}.xlsx',
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-        else:
-            return (
-                export_answers_to_csv(item_dicts),
-                f'answer_library_{timestamp}.csv',
-                'text/csv'
-            )
+        Returns:
+            Tuple of (chunk generator, filename, content_type)
+        """
+        return (
+            stream_rows(iter_knowledge_rows(org_id, join_tags=format in ('csv', 'excel')), format,
+                        KNOWLEDGE_FIELDS, title='Knowledge Base'),
+            BatchExportService._filename('knowledge_base', format),
+            CONTENT_TYPES.get(format, 'application/x-ndjson')
+        )
@@ -9,6 +9,8 @@ import re
 import logging
 from typing import List, Dict, Optional
 
+from app.utils.keyword_classifier import KeywordClassifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +60,9 @@ class ChunkingService:
             'customization', 'configuration'
         ]
     }
+    
+    # Compiled from CATEGORY_KEYWORDS on first use
+    _category_classifier = None
 
     def chunk_document(
         self,
@@ -238,16 +243,17 @@ class ChunkingService:
 
     def _detect_categories(self, text: str) -> List[str]:
         """Auto-detect categories based on content keywords."""
-        text_lower = text.lower()
-        categories = []
-        
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            matches = sum(1 for kw in keywords if kw in text_lower)
-            if matches >= 2:  # Need at least 2 keyword matches
-                categories.append(category)
-        
+        # Need at least 2 keyword matches
+        categories = self._get_category_classifier().matching(text, min_score=2)
         return categories if categories else ['general']
 
+    @classmethod
+    def _get_category_classifier(cls) -> KeywordClassifier:
+        """Classifier over CATEGORY_KEYWORDS, compiled once."""
+        if cls._category_classifier is None:
+            cls._category_classifier = KeywordClassifier(cls.CATEGORY_KEYWORDS)
+        return cls._category_classifier
+
     def chunk_for_knowledge_base(
         self,
         title: str,
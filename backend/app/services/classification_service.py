@@ -9,6 +9,8 @@ import logging
 from typing import Dict, List, Optional
 from flask import current_app
 
+from app.utils.keyword_classifier import KeywordClassifier, best_label
+
 logger = logging.getLogger(__name__)
 
 
@@ -116,6 +118,9 @@ class ClassificationService:
         }
     }
     
+    # Compiled from CATEGORIES on first use
+    _keyword_classifier = None
+    
     # Sensitive question patterns that should be flagged
     SENSITIVE_PATTERNS = [
         r'liability',
@@ -201,7 +206,10 @@ class ClassificationService:
         Uses batch AI classification for better consistency.
         """
         # First pass: keyword classification
-        results = [self._keyword_classification(q) for q in questions]
+        results = [
+            self._classification_from_scores(scores)
+            for scores in self._get_keyword_classifier().scores_batch(questions)
+        ]
         
         # Find low-confidence questions for AI re-classification
         low_confidence_indices = [
@@ -222,29 +230,28 @@ class ClassificationService:
         
         return results
 
+    @classmethod
+    def _get_keyword_classifier(cls) -> KeywordClassifier:
+        """Classifier over all category and sub-category keywords, compiled once."""
+        if cls._keyword_classifier is None:
+            keyword_sets = {}
+            for category, data in cls.CATEGORIES.items():
+                keyword_sets[category] = data['keywords']
+                for sub_cat, sub_keywords in data.get('sub_categories', {}).items():
+                    keyword_sets[(category, sub_cat)] = sub_keywords
+            cls._keyword_classifier = KeywordClassifier(keyword_sets)
+        return cls._keyword_classifier
+
     def _keyword_classification(self, text: str) -> Dict:
         """Fast keyword-based classification."""
-        text_lower = text.lower()
-        scores = {}
-        sub_category_matches = {}
-        
-        for category, data in self.CATEGORIES.items():
-            # Count keyword matches
-            matches = sum(1 for kw in data['keywords'] if kw in text_lower)
-            
-            if matches > 0:
-                scores[category] = matches
-                
-                # Find best sub-category
-                for sub_cat, sub_keywords in data.get('sub_categories', {}).items():
-                    sub_matches = sum(1 for kw in sub_keywords if kw in text_lower)
-                    if sub_matches > 0:
-                        if category not in sub_category_matches:
-                            sub_category_matches[category] = (sub_cat, sub_matches)
-                        elif sub_matches > sub_category_matches[category][1]:
-                            sub_category_matches[category] = (sub_cat, sub_matches)
+        return self._classification_from_scores(self._get_keyword_classifier().scores(text))
+
+    @staticmethod
+    def _classification_from_scores(scores: Dict) -> Dict:
+        """Turn per-category/sub-category keyword counts into a classification."""
+        category_scores = {label: n for label, n in scores.items() if isinstance(label, str)}
         
-        if not scores:
+        if not category_scores:
             return {
                 'category': 'general',
                 'sub_category': None,
@@ -252,17 +259,20 @@ class ClassificationService:
             }
         
         # Get best category
-        best_category = max(scores, key=scores.get)
+        best_category = best_label(category_scores)
         
         # Calculate confidence (normalize by expected matches)
         max_expected = 5  # Expect at least 5 keyword matches for high confidence
-        confidence = min(scores[best_category] / max_expected, 1.0)
+        confidence = min(category_scores[best_category] / max_expected, 1.0)
         confidence = 0.4 + (confidence * 0.5)  # Scale to 0.4 - 0.9
         
         # Get sub-category if available
-        sub_category = None
-        if best_category in sub_category_matches:
-            sub_category = sub_category_matches[best_category][0]
+        sub_scores = {
+            label[1]: n for label, n in scores.items()
+            if isinstance(label, tuple) and label[0] == best_category
+        }
+        sub_category = best_label(sub_scores)
+        if sub_category:
             confidence += 0.05  # Boost for having sub-category match
         
         return {
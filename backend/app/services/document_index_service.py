@@ -0,0 +1,260 @@
+"""
+Document Index Service
+
+Keeps a document's chunks in the vector database in sync with its chunk
+manifest (see app/models/document_chunk_manifest.py). Reindexing a document:
+
+1. chunks the file again (chunk IDs are deterministic per page/position),
+2. re-embeds only chunks that are new, whose content hash changed, or that
+   were embedded by another embedding model version, upserting them in place,
+3. deletes only chunks that are no longer produced, and
+4. commits the new manifest and document status in one transaction.
+
+Vectors are never deleted before their replacements are written, so a
+failure at any step leaves the previously indexed chunks searchable and the
+manifest unchanged; running the reindex again picks up where it failed.
+
+When the embedding model version changes (EMBEDDING_MODEL_VERSION in
+hybrid_search_service.py), find_outdated_documents returns the
+documents with chunks embedded by another version; the Celery Beat job in
+app/tasks/document_tasks.py re-embeds them in the background, rate-limited.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from ..extensions import db
+from ..models import Document, DocumentChunkManifest
+
+logger = logging.getLogger(__name__)
+
+# Documents queued per run of the outdated-embeddings sweep
+DOCUMENT_REEMBED_BATCH_SIZE = int(os.environ.get('DOCUMENT_REEMBED_BATCH_SIZE', 20))
+DOCUMENT_REEMBED_INTERVAL_MINUTES = int(os.environ.get('DOCUMENT_REEMBED_INTERVAL_MINUTES', 15))
+# Celery rate limit of reindex tasks per worker (e.g. "10/m"); empty for none
+DOCUMENT_REINDEX_RATE_LIMIT = os.environ.get('DOCUMENT_REINDEX_RATE_LIMIT', '10/m') or None
+
+
+class DocumentIndexError(Exception):
+    """Chunks of a document could not be written to or removed from the vector database."""
+
+
+def chunk_content_hash(chunk, org_id: int) -> str:
+    """SHA256 of a chunk's content and stored payload (a payload change also needs an upsert)."""
+    payload = json.dumps(chunk.to_qdrant_metadata(org_id), sort_keys=True, default=str)
+    return hashlib.sha256(f"{payload}\n{chunk.content}".encode()).hexdigest()
+
+
+def diff_chunks(
+    chunks: List,
+    manifest: Dict[str, DocumentChunkManifest],
+    hashes: Dict[str, str],
+    model_version: str
+) -> Tuple[List, List, List[str]]:
+    """
+    Compare freshly chunked content with the manifest.
+
+    Args:
+        chunks: DocumentChunk list from the chunking service
+        manifest: Manifest entries by chunk ID
+        hashes: Content hash by chunk ID
+        model_version: Embedding model version in use
+
+    Returns:
+        (chunks to embed, unchanged chunks, removed chunk IDs)
+    """
+    to_embed, unchanged = [], []
+    for chunk in chunks:
+        entry = manifest.get(chunk.chunk_id)
+        if (entry is None or entry.content_hash != hashes[chunk.chunk_id]
+                or entry.embedding_model != model_version):
+            to_embed.append(chunk)
+        else:
+            unchanged.append(chunk)
+
+    current = {chunk.chunk_id for chunk in chunks}
+    removed = [chunk_id for chunk_id in manifest if chunk_id not in current]
+    return to_embed, unchanged, removed
+
+
+def sync_document_chunks(document: Document, chunks: List, org_id: int, hybrid_search) -> Dict:
+    """
+    Bring a document's indexed chunks and manifest in line with its chunks.
+
+    Args:
+        document: Document
+        chunks: DocumentChunk list from the chunking service
+        org_id: Organization ID
+        hybrid_search: QdrantHybridSearchService
+
+    Returns:
+        Counts of embedded, unchanged and removed chunks
+
+    Raises:
+        DocumentIndexError: if chunks could not be written or removed (the
+            manifest and the previously indexed chunks are left as they were)
+    """
+    # Later duplicates of a chunk ID would overwrite the same point
+    chunks = list({chunk.chunk_id: chunk for chunk in chunks}.values())
+    model_version = hybrid_search.embedding_model_version
+    manifest = {entry.chunk_id: entry for entry in document.chunk_manifest}
+    hashes = {chunk.chunk_id: chunk_content_hash(chunk, org_id) for chunk in chunks}
+    to_embed, unchanged, removed = diff_chunks(chunks, manifest, hashes, model_version)
+
+    if to_embed:
+        indexed = hybrid_search.upsert_document_chunks(to_embed, org_id)
+        if indexed < len(to_embed):
+            raise DocumentIndexError(f"Indexed {indexed} of {len(to_embed)} chunks")
+
+    if removed and not hybrid_search.delete_chunks(removed, org_id):
+        raise DocumentIndexError(f"Failed to delete {len(removed)} removed chunks")
+    if not manifest and document.chunk_count and document.file_id:
+        # Indexed before manifests existed: drop whatever this run did not write
+        if not hybrid_search.delete_document_chunks(document.file_id, org_id, keep_chunk_ids=list(hashes)):
+            raise DocumentIndexError("Failed to delete previously indexed chunks")
+
+    now = datetime.utcnow()
+    for chunk in to_embed:
+        entry = manifest.get(chunk.chunk_id)
+        if entry is None:
+            entry = DocumentChunkManifest(
+                document_id=document.id,
+                organization_id=org_id,
+                chunk_id=chunk.chunk_id
+            )
+            db.session.add(entry)
+        entry.content_hash = hashes[chunk.chunk_id]
+        entry.page_number = chunk.page_number
+        entry.embedding_model = model_version
+        entry.indexed_at = now
+    for chunk_id in removed:
+        db.session.delete(manifest[chunk_id])
+
+    document.chunk_count = len(chunks)
+    document.embedding_status = 'completed'
+    document.embedding_completed_at = now
+    document.error_message = None
+    db.session.commit()
+
+    logger.info(
+        f"Synced document {document.id}: {len(to_embed)} embedded, "
+        f"{len(unchanged)} unchanged, {len(removed)} removed"
+    )
+    return {'embedded': len(to_embed), 'unchanged': len(unchanged), 'removed': len(removed)}
+
+
+def _get_file_path(document: Document) -> str:
+    if document.file_id:
+        from .storage_service import get_storage_service
+        file_path = get_storage_service().get_local_path(document.file_id)
+        if file_path:
+            return file_path
+    if document.file_path:
+        return document.file_path
+    raise ValueError("No file path or file_id available")
+
+
+def reindex_document(document_id: int, org_id: int, hybrid_search=None) -> Dict:
+    """
+    Chunk a document and sync its indexed chunks with the result.
+
+    Document status moves to 'processing' and then 'completed', or 'failed'
+    with error_message set; a failed reindex keeps the previous chunks.
+
+    Args:
+        document_id: Document ID
+        org_id: Organization ID
+        hybrid_search: Hybrid search service (defaults to the org's)
+
+    Returns:
+        Sync result with status
+    """
+    from .docling_chunking_service import get_docling_chunking_service
+    from .hybrid_search_service import get_hybrid_search_service
+
+    document = db.session.get(Document, document_id)
+    if not document:
+        return {'status': 'not_found', 'document_id': document_id}
+
+    hybrid_search = hybrid_search or get_hybrid_search_service(org_id)
+    if not hybrid_search.enabled:
+        document.embedding_status = 'failed'
+        document.error_message = "Vector database not available"
+        db.session.commit()
+        return {'status': 'qdrant_unavailable', 'document_id': document_id}
+
+    document.embedding_status = 'processing'
+    document.embedding_started_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        chunking_result = get_docling_chunking_service().chunk_document(
+            file_path=_get_file_path(document),
+            file_id=document.file_id or str(document.id),
+            doc_url=document.file_url,
+            original_filename=document.original_filename,
+            file_type=document.file_type
+        )
+        document.page_count = chunking_result.total_pages
+        document.word_count = chunking_result.total_words
+        result = sync_document_chunks(document, chunking_result.chunks, org_id, hybrid_search)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to reindex document {document_id}: {e}")
+        document = db.session.get(Document, document_id)
+        document.embedding_status = 'failed'
+        document.error_message = f"Indexing failed: {e}"
+        db.session.commit()
+        raise
+
+    return {'status': 'success', 'document_id': document_id, **result}
+
+
+def find_outdated_documents(model_version: str, limit: int = None) -> List[Tuple[int, int]]:
+    """
+    Documents with chunks embedded by another embedding model version.
+
+    Least recently attempted documents come first, so documents whose
+    reindex keeps failing do not hold the batch from the others.
+
+    Args:
+        model_version: Embedding model version in use
+        limit: Maximum documents returned
+
+    Returns:
+        (document_id, organization_id) pairs
+    """
+    query = db.session.query(DocumentChunkManifest.document_id, DocumentChunkManifest.organization_id)\
+        .join(Document, Document.id == DocumentChunkManifest.document_id)\
+        .filter(DocumentChunkManifest.embedding_model != model_version)\
+        .group_by(DocumentChunkManifest.document_id, DocumentChunkManifest.organization_id,
+                  Document.embedding_started_at)\
+        .order_by(Document.embedding_started_at.asc().nullsfirst(), DocumentChunkManifest.document_id)
+    return [tuple(row) for row in query.limit(limit or DOCUMENT_REEMBED_BATCH_SIZE).all()]
+
+
+def get_embedding_status(document: Document, model_version: str = None) -> Dict:
+    """Embedding status of a document with its manifest summary."""
+    entries = document.chunk_manifest.all()
+    models = {}
+    for entry in entries:
+        models[entry.embedding_model] = models.get(entry.embedding_model, 0) + 1
+    status = {
+        'document_id': document.id,
+        'embedding_status': document.embedding_status,
+        'chunk_count': document.chunk_count,
+        'manifest_chunks': len(entries),
+        'embedding_models': models,
+        'embedding_started_at': document.embedding_started_at.isoformat() if document.embedding_started_at else None,
+        'embedding_completed_at': (
+            document.embedding_completed_at.isoformat() if document.embedding_completed_at else None
+        ),
+        'error_message': document.error_message,
+    }
+    if model_version:
+        status['embedding_model'] = model_version
+        status['outdated_chunks'] = len(entries) - models.get(model_version, 0)
+    return status
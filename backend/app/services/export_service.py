@@ -853,6 +853,19 @@ def generate_proposal_docx(project, sections, include_qa=True, questions=None, o
     # Count sections with content
     sections_with_content = [(i, s) for i, s in enumerate(sections, 1) if s.content]
     
+    # Render all diagrams concurrently up front so assembly below hits the cache
+    try:
+        from .mermaid_service import prefetch_diagrams_in_content
+        diagram_sources = [s.content for _, s in sections_with_content]
+        if include_qa and questions:
+            diagram_sources.extend(
+                q.current_answer.content for q in questions
+                if q.current_answer and q.current_answer.content
+            )
+        prefetch_diagrams_in_content(diagram_sources)
+    except Exception as e:
+        logger.warning(f"Diagram prefetch failed, rendering inline: {e}")
+    
     for idx, (num, section) in enumerate(sections_with_content):
         toc_item = doc.add_paragraph()
         toc_item.paragraph_format.tab_stops.add_tab_stop(Inches(5.5))
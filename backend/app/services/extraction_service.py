@@ -9,6 +9,8 @@ import logging
 from typing import List, Dict, Optional
 from flask import current_app
 
+from app.utils.near_duplicates import NearDuplicateIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -327,40 +329,19 @@ Extract ALL questions, requirements, and information requests. Include:
         pattern_questions: List[Dict],
         ai_questions: List[Dict]
     ) -> List[Dict]:
-        """Merge pattern and AI extracted questions, removing duplicates."""
+        """Merge pattern and AI extracted questions, removing near duplicates."""
         merged = pattern_questions.copy()
-        seen = {q['text'].lower().strip() for q in pattern_questions}
+        seen = NearDuplicateIndex(threshold=0.8)
+        for q in pattern_questions:
+            seen.add(q['text'])
         
         for q in ai_questions:
-            normalized = q['text'].lower().strip()
-            # Check for similar questions (not exact match)
-            is_duplicate = False
-            for existing in seen:
-                if self._similarity(normalized, existing) > 0.8:
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
+            # Skip questions similar (not just identical) to ones already kept
+            if seen.add_if_new(q['text']):
                 merged.append(q)
-                seen.add(normalized)
         
         return merged
 
-    def _similarity(self, s1: str, s2: str) -> float:
-        """Calculate simple similarity ratio between strings."""
-        if not s1 or not s2:
-            return 0.0
-        
-        # Simple word overlap similarity
-        words1 = set(s1.split())
-        words2 = set(s2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        overlap = len(words1 & words2)
-        return 2 * overlap / (len(words1) + len(words2))
-
 
 # Singleton instance getter with org_id support
 def get_extractor(org_id: int = None) -> QuestionExtractor:
@@ -0,0 +1,124 @@
+"""
+Content Freshness Service
+
+Queries and maintenance for the incremental staleness scores of answer
+library and knowledge items (see app/models/freshness.py):
+- sweep_staleness: periodic Celery Beat job that rescores only the items
+  whose score can have changed (staleness_next_check_at passed).
+- get_stale_items / get_freshness_summary: indexed range scans over the
+  stored scores instead of request-time evaluation of whole tables.
+"""
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List
+
+from ..extensions import db
+from ..models.freshness import FRESHNESS_STALE_THRESHOLD, compute_item_staleness
+
+logger = logging.getLogger(__name__)
+
+FRESHNESS_SWEEP_INTERVAL_MINUTES = int(os.environ.get('FRESHNESS_SWEEP_INTERVAL_MINUTES', 60))
+FRESHNESS_SWEEP_BATCH_SIZE = int(os.environ.get('FRESHNESS_SWEEP_BATCH_SIZE', 1000))
+# Library items sent to the freshness agent when no ids are given
+FRESHNESS_AUDIT_LIMIT = int(os.environ.get('FRESHNESS_AUDIT_LIMIT', 50))
+
+# Score bands reported by get_freshness_summary (upper bounds, exclusive)
+FRESH_BELOW = 0.3
+
+
+def sweep_staleness(now: datetime = None, batch_size: int = None, max_batches: int = 100) -> Dict[str, int]:
+    """
+    Rescore the items whose staleness can have changed since it was stored.
+
+    Only rows with staleness_next_check_at in the past are loaded (indexed),
+    in batches committed one by one. Scores are written with Core UPDATEs,
+    so the sweep does not touch updated_at.
+
+    Args:
+        now: Current time
+        batch_size: Items loaded per batch
+        max_batches: Batches per table per sweep (the rest waits for the next one)
+
+    Returns:
+        Number of items rescored per table
+    """
+    from ..models import AnswerLibraryItem, KnowledgeItem
+
+    now = now or datetime.utcnow()
+    batch_size = batch_size or FRESHNESS_SWEEP_BATCH_SIZE
+    counts = {}
+    for model in (AnswerLibraryItem, KnowledgeItem):
+        counts[model.__tablename__] = 0
+        for _ in range(max_batches):
+            items = model.query.filter(model.staleness_next_check_at <= now)\
+                .order_by(model.staleness_next_check_at)\
+                .limit(batch_size).all()
+            if not items:
+                break
+            rows = []
+            for item in items:
+                score, next_check = compute_item_staleness(item, now)
+                rows.append({'item_id': item.id, 'score': score, 'next_check': next_check})
+            table = model.__table__
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('item_id')).values(
+                    staleness_score=db.bindparam('score'),
+                    staleness_computed_at=now,
+                    staleness_next_check_at=db.bindparam('next_check'),
+                    # Keep updated_at (its onupdate also applies to Core UPDATEs)
+                    updated_at=table.c.updated_at,
+                ),
+                rows
+            )
+            db.session.commit()
+            counts[model.__tablename__] += len(items)
+            if len(items) < batch_size:
+                break
+
+    logger.info(f"Freshness sweep rescored {counts}")
+    return counts
+
+
+def get_stale_items(model, org_id: int, min_score: float = None, limit: int = None) -> List:
+    """
+    Active items of an organization at or above a staleness score, stalest first.
+
+    Args:
+        model: AnswerLibraryItem or KnowledgeItem
+        org_id: Organization ID
+        min_score: Minimum score (defaults to FRESHNESS_STALE_THRESHOLD)
+        limit: Optional maximum number of items
+
+    Returns:
+        List of items
+    """
+    min_score = FRESHNESS_STALE_THRESHOLD if min_score is None else min_score
+    query = model.query.filter(
+        model.organization_id == org_id,
+        model.staleness_score >= min_score,
+        model.is_active == True
+    ).order_by(model.staleness_score.desc(), model.id)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_freshness_summary(org_id: int) -> Dict:
+    """Item counts per staleness band (fresh / aging / stale) for an organization."""
+    from ..models import AnswerLibraryItem, KnowledgeItem
+
+    summary = {'stale_threshold': FRESHNESS_STALE_THRESHOLD}
+    for key, model in (('answer_library', AnswerLibraryItem), ('knowledge', KnowledgeItem)):
+        band = db.case(
+            (model.staleness_score < FRESH_BELOW, 'fresh'),
+            (model.staleness_score < FRESHNESS_STALE_THRESHOLD, 'aging'),
+            else_='stale'
+        )
+        rows = db.session.query(band, db.func.count(model.id)).filter(
+            model.organization_id == org_id,
+            model.is_active == True,
+            model.staleness_score.isnot(None)
+        ).group_by(band).all()
+        summary[key] = {'fresh': 0, 'aging': 0, 'stale': 0, **dict(rows)}
+    return summary
@@ -10,12 +10,49 @@ Provides hybrid search combining:
 import os
 import logging
 import hashlib
+import threading
+import zlib
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Chunks embedded and upserted per batch by upsert_document_chunks
+HYBRID_EMBED_BATCH_SIZE = int(os.environ.get('HYBRID_EMBED_BATCH_SIZE', 64))
+
+# Embedding models; their names are part of the version recorded in chunk manifests
+DENSE_MODEL_NAME = 'all-MiniLM-L6-v2'
+SPARSE_MODEL_NAME = 'Qdrant/bm25'
+# Version recorded in chunk manifests; changing it re-embeds every document in the background
+EMBEDDING_MODEL_VERSION = os.environ.get('EMBEDDING_MODEL_VERSION') or f"{DENSE_MODEL_NAME}+{SPARSE_MODEL_NAME}"
+
+# Embedding models are loaded once per process and shared by all organizations
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
+def _shared_model(name: str, loader):
+    """Model loaded once per process; None if its package is missing."""
+    if name not in _models:
+        with _models_lock:
+            if name not in _models:
+                try:
+                    _models[name] = loader()
+                except ImportError:
+                    _models[name] = None
+    return _models[name]
+
+
+def _load_dense_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(DENSE_MODEL_NAME)
+
+
+def _load_sparse_model():
+    from fastembed import SparseTextEmbedding
+    return SparseTextEmbedding(model_name=SPARSE_MODEL_NAME)
+
 
 @dataclass
 class HybridSearchResult:
@@ -94,24 +131,20 @@ class QdrantHybridSearchService:
         self.sparse_provider = None
         
         # Dense embeddings - use sentence transformers or other provider
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.dense_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.dense_model = _shared_model('dense', _load_dense_model)
+        if self.dense_model is not None:
             self.dense_provider = 'sentence-transformers'
             logger.info("Dense embeddings: sentence-transformers")
-        except ImportError:
+        else:
             logger.warning("sentence-transformers not available for dense embeddings")
-            self.dense_model = None
         
         # Sparse embeddings (BM25) - use fastembed if available
-        try:
-            from fastembed import SparseTextEmbedding
-            self.sparse_model = SparseTextEmbedding(model_name="Qdrant/bm25")
+        self.sparse_model = _shared_model('sparse', _load_sparse_model)
+        if self.sparse_model is not None:
             self.sparse_provider = 'fastembed-bm25'
             logger.info("Sparse embeddings: fastembed BM25")
-        except ImportError:
+        else:
             logger.warning("fastembed not available, using simple TF-IDF for sparse vectors")
-            self.sparse_model = None
             self.sparse_provider = 'tfidf'
     
     def ensure_collection(self):
@@ -120,38 +153,34 @@ class QdrantHybridSearchService:
             return False
         
         try:
-            from qdrant_client.models import (
-                Distance, VectorParams, SparseVectorParams,
-                Modifier
-            )
-            
-            collections = self.client.get_collections()
-            collection_names = [c.name for c in collections.collections]
-            
-            if self.DOCUMENTS_COLLECTION not in collection_names:
-                # Create collection with both dense and sparse vectors
-                self.client.create_collection(
-                    collection_name=self.DOCUMENTS_COLLECTION,
-                    vectors_config={
-                        "dense": VectorParams(
-                            size=self.DENSE_DIMENSION,
-                            distance=Distance.COSINE
-                        )
-                    },
-                    sparse_vectors_config={
-                        "sparse": SparseVectorParams(
-                            modifier=Modifier.IDF  # Enable BM25-style IDF weighting
-                        )
-                    }
-                )
-                logger.info(f"Created collection: {self.DOCUMENTS_COLLECTION}")
+            from .vectordb.provisioning import ensure_collection, DOCUMENT_CHUNKS
             
+            # Dense + sparse (IDF-weighted) vectors, quantized and payload-indexed
+            ensure_collection(self.client, DOCUMENT_CHUNKS, self.DENSE_DIMENSION)
             return True
             
         except Exception as e:
             logger.error(f"Failed to ensure collection: {e}")
             return False
     
+    @property
+    def router(self):
+        """Tenant routing (shared, per-tenant shard, or dedicated collection)."""
+        from .vectordb.provisioning import DOCUMENT_CHUNKS
+        from .vectordb.tenancy import get_tenant_router
+        
+        return get_tenant_router(self.client, DOCUMENT_CHUNKS)
+    
+    @property
+    def embedding_model_version(self) -> str:
+        """
+        Configured embedding model version; chunks embedded by another version are re-embedded.
+
+        Taken from configuration rather than from which models loaded, so that
+        every process (including Celery Beat) agrees on it.
+        """
+        return EMBEDDING_MODEL_VERSION
+    
     def _generate_point_id(self, chunk_id: str, org_id: int) -> str:
         """Generate unique point ID for Qdrant."""
         raw = f"{org_id}:{chunk_id}"
@@ -193,6 +222,24 @@ class QdrantHybridSearchService:
         # Fallback: Simple TF-IDF-like sparse representation
         return self._simple_tfidf(text)
     
+    def _get_dense_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate dense embeddings for many texts in one model call."""
+        if self.dense_model is not None:
+            return self.dense_model.encode(texts, batch_size=HYBRID_EMBED_BATCH_SIZE).tolist()
+        return [self._get_dense_embedding(text) for text in texts]
+    
+    def _get_sparse_embeddings(self, texts: List[str]) -> List[Tuple[List[int], List[float]]]:
+        """Generate sparse embeddings for many texts in one model call."""
+        if self.sparse_model is not None:
+            try:
+                return [
+                    (sparse.indices.tolist(), sparse.values.tolist())
+                    for sparse in self.sparse_model.embed(texts, batch_size=HYBRID_EMBED_BATCH_SIZE)
+                ]
+            except Exception as e:
+                logger.warning(f"FastEmbed sparse embedding failed: {e}")
+        return [self._simple_tfidf(text) for text in texts]
+    
     def _simple_tfidf(self, text: str) -> Tuple[List[int], List[float]]:
         """Simple TF-IDF-like sparse representation as fallback."""
         import re
@@ -210,8 +257,8 @@ class QdrantHybridSearchService:
         indices = []
         values = []
         for word, count in word_counts.items():
-            # Hash word to get sparse index
-            word_hash = hash(word) % 100000  # Limit to reasonable range
+            # Hash word to get sparse index (stable across worker processes)
+            word_hash = zlib.crc32(word.encode('utf-8')) % 100000  # Limit to reasonable range
             tf = count / total_words
             indices.append(abs(word_hash))
             values.append(tf)
@@ -290,10 +337,11 @@ class QdrantHybridSearchService:
             )
             
             # Upsert to Qdrant
-            self.client.upsert(
-                collection_name=self.DOCUMENTS_COLLECTION,
-                points=[point]
-            )
+            self.router.run(org_id, lambda route: self.client.upsert(
+                collection_name=route.collection,
+                points=[point],
+                shard_key_selector=route.shard_key
+            ), write=True)
             
             logger.debug(f"Indexed chunk {chunk_id} for file {file_id}")
             return True
@@ -310,6 +358,9 @@ class QdrantHybridSearchService:
         """
         Bulk upsert document chunks.
         
+        Chunks are embedded and upserted in batches of HYBRID_EMBED_BATCH_SIZE,
+        so chunks of several documents can share embedding model calls.
+        
         Returns:
             Number of successfully indexed chunks
         """
@@ -321,40 +372,47 @@ class QdrantHybridSearchService:
         try:
             from qdrant_client.models import PointStruct, SparseVector
             
-            points = []
-            for chunk in chunks:
-                # Generate embeddings
-                dense_vector = self._get_dense_embedding(chunk.content)
-                sparse_indices, sparse_values = self._get_sparse_embedding(chunk.content)
+            indexed = 0
+            for start in range(0, len(chunks), HYBRID_EMBED_BATCH_SIZE):
+                batch = chunks[start:start + HYBRID_EMBED_BATCH_SIZE]
+                texts = [chunk.content for chunk in batch]
                 
-                # Build payload from chunk
-                payload = chunk.to_qdrant_metadata(org_id)
-                payload['content'] = chunk.content[:5000]
-                payload['indexed_at'] = datetime.utcnow().isoformat()
+                # Generate embeddings for the whole batch
+                dense_vectors = self._get_dense_embeddings(texts)
+                sparse_vectors = self._get_sparse_embeddings(texts)
                 
-                point_id = self._generate_point_id(chunk.chunk_id, org_id)
+                points = []
+                for chunk, dense_vector, (sparse_indices, sparse_values) in zip(batch, dense_vectors, sparse_vectors):
+                    # Build payload from chunk
+                    payload = chunk.to_qdrant_metadata(org_id)
+                    payload['chunk_id'] = chunk.chunk_id
+                    payload['content'] = chunk.content[:5000]
+                    payload['indexed_at'] = datetime.utcnow().isoformat()
+                    
+                    point_id = self._generate_point_id(chunk.chunk_id, org_id)
+                    
+                    point = PointStruct(
+                        id=point_id,
+                        vector={
+                            'dense': dense_vector,
+                            'sparse': SparseVector(
+                                indices=sparse_indices,
+                                values=sparse_values
+                            )
+                        },
+                        payload=payload
+                    )
+                    points.append(point)
                 
-                point = PointStruct(
-                    id=point_id,
-                    vector={
-                        'dense': dense_vector,
-                        'sparse': SparseVector(
-                            indices=sparse_indices,
-                            values=sparse_values
-                        )
-                    },
-                    payload=payload
-                )
-                points.append(point)
-            
-            # Batch upsert
-            self.client.upsert(
-                collection_name=self.DOCUMENTS_COLLECTION,
-                points=points
-            )
+                self.router.run(org_id, lambda route: self.client.upsert(
+                    collection_name=route.collection,
+                    points=points,
+                    shard_key_selector=route.shard_key
+                ), write=True)
+                indexed += len(points)
             
-            logger.info(f"Indexed {len(points)} chunks for org {org_id}")
-            return len(points)
+            logger.info(f"Indexed {indexed} chunks for org {org_id}")
+            return indexed
             
         except Exception as e:
             logger.error(f"Failed to bulk upsert chunks: {e}")
@@ -395,6 +453,7 @@ class QdrantHybridSearchService:
                 Prefetch, FusionQuery, Fusion,
                 SparseVector
             )
+            from .vectordb.provisioning import get_search_params
             
             # Generate query embeddings
             dense_query = self._get_dense_embedding(query)
@@ -424,12 +483,14 @@ class QdrantHybridSearchService:
             
             # Use Qdrant's query API with prefetch for hybrid search
             # Prefetch from both dense and sparse, then fuse
-            results = self.client.query_points(
-                collection_name=self.DOCUMENTS_COLLECTION,
+            results = self.router.run(org_id, lambda route: self.client.query_points(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
                 prefetch=[
                     Prefetch(
                         query=dense_query,
                         using="dense",
+                        params=get_search_params(),
                         limit=limit * 2
                     ),
                     Prefetch(
@@ -445,7 +506,7 @@ class QdrantHybridSearchService:
                 filter=query_filter,
                 limit=limit,
                 with_payload=True
-            )
+            ))
             
             # Convert to results
             search_results = []
@@ -486,6 +547,7 @@ class QdrantHybridSearchService:
         """Fallback to simple dense vector search if hybrid fails."""
         try:
             from qdrant_client.models import Filter, FieldCondition, MatchValue
+            from .vectordb.provisioning import get_search_params
             
             dense_query = self._get_dense_embedding(query)
             
@@ -498,14 +560,16 @@ class QdrantHybridSearchService:
                     FieldCondition(key="file_id", match=MatchValue(value=file_id))
                 )
             
-            results = self.client.search(
-                collection_name=self.DOCUMENTS_COLLECTION,
+            results = self.router.run(org_id, lambda route: self.client.search(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
                 query_vector=("dense", dense_query),
                 query_filter=Filter(must=filter_conditions),
+                search_params=get_search_params(),
                 limit=limit,
                 with_payload=True,
                 score_threshold=score_threshold
-            )
+            ))
             
             search_results = []
             for point in results:
@@ -528,23 +592,31 @@ class QdrantHybridSearchService:
             logger.error(f"Fallback dense search failed: {e}")
             return []
     
-    def delete_document_chunks(self, file_id: str, org_id: int) -> bool:
-        """Delete all chunks for a document."""
+    def delete_document_chunks(self, file_id: str, org_id: int, keep_chunk_ids: List[str] = None) -> bool:
+        """Delete all chunks for a document (except keep_chunk_ids, if given)."""
         if not self.enabled:
             return False
         
         try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
+            from qdrant_client.models import Filter, FieldCondition, MatchValue, HasIdCondition
+            
+            must_not = None
+            if keep_chunk_ids:
+                must_not = [HasIdCondition(has_id=[
+                    self._generate_point_id(chunk_id, org_id) for chunk_id in keep_chunk_ids
+                ])]
             
-            self.client.delete(
-                collection_name=self.DOCUMENTS_COLLECTION,
+            self.router.run(org_id, lambda route: self.client.delete(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
                 points_selector=Filter(
                     must=[
                         FieldCondition(key="file_id", match=MatchValue(value=file_id)),
                         FieldCondition(key="org_id", match=MatchValue(value=org_id))
-                    ]
+                    ],
+                    must_not=must_not
                 )
-            )
+            ))
             
             logger.info(f"Deleted chunks for file {file_id}")
             return True
@@ -553,6 +625,39 @@ class QdrantHybridSearchService:
             logger.error(f"Failed to delete chunks for {file_id}: {e}")
             return False
     
+    def delete_chunks(self, chunk_ids: List[str], org_id: int) -> bool:
+        """Delete specific chunks (by chunk ID) of an organization."""
+        if not self.enabled:
+            return False
+        if not chunk_ids:
+            return True
+        
+        try:
+            self.router.run(org_id, lambda route: self.client.delete(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
+                points_selector=[self._generate_point_id(chunk_id, org_id) for chunk_id in chunk_ids],
+                wait=True
+            ))
+            
+            logger.info(f"Deleted {len(chunk_ids)} chunks for org {org_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete chunks for org {org_id}: {e}")
+            return False
+    
+    def delete_organization(self, org_id: int) -> bool:
+        """Delete all chunks of an organization (drops its shard or dedicated collection)."""
+        if not self.enabled:
+            return False
+        
+        try:
+            return self.router.delete_tenant(org_id)
+        except Exception as e:
+            logger.error(f"Failed to delete chunks for org {org_id}: {e}")
+            return False
+    
     def get_document_chunks(
         self,
         file_id: str,
@@ -566,8 +671,9 @@ class QdrantHybridSearchService:
         try:
             from qdrant_client.models import Filter, FieldCondition, MatchValue
             
-            results, _ = self.client.scroll(
-                collection_name=self.DOCUMENTS_COLLECTION,
+            results, _ = self.router.run(org_id, lambda route: self.client.scroll(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
                 scroll_filter=Filter(
                     must=[
                         FieldCondition(key="file_id", match=MatchValue(value=file_id)),
@@ -576,7 +682,7 @@ class QdrantHybridSearchService:
                 ),
                 limit=limit,
                 with_payload=True
-            )
+            ))
             
             chunks = []
             for point in results:
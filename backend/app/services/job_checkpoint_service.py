@@ -0,0 +1,252 @@
+"""
+Job Checkpoint Service.
+
+Persists the intermediate results of long-running agent jobs so that a
+retried, restarted or resumed job continues from the last completed unit of
+work instead of repeating LLM calls that already succeeded. Checkpoints are
+keyed by job ID and a hash of the job input, so a job restarted with a
+different document or options never picks up stale results.
+
+Redis layout (all keys expire after JOB_CHECKPOINT_TTL):
+- agent_job:<job_id>:input           JSON job input, used to resume the job
+- agent_job:<job_id>:<input_hash>    hash  checkpoint name -> JSON value
+- agent_job:<job_id>:cancel          set while cancellation is requested
+
+Falls back to an in-memory store (single process only) without Redis.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get('REDIS_URL', os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+JOB_CHECKPOINT_TTL = int(os.environ.get('JOB_CHECKPOINT_TTL', 7 * 24 * 3600))  # seconds
+
+BATCH_PREFIX = 'batch:'
+
+
+def compute_input_hash(document_text: str, org_id: int = None, project_id: int = None,
+                       options: Dict = None) -> str:
+    """Stable hash of everything that determines a job's results."""
+    digest = hashlib.sha256()
+    digest.update((document_text or '').encode('utf-8'))
+    digest.update(json.dumps(
+        {'org_id': org_id, 'project_id': project_id, 'options': options or {}},
+        sort_keys=True, default=str
+    ).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def _checkpoint_key(job_id: str, input_hash: str) -> str:
+    return f"agent_job:{job_id}:{input_hash}"
+
+
+def _input_key(job_id: str) -> str:
+    return f"agent_job:{job_id}:input"
+
+
+def _cancel_key(job_id: str) -> str:
+    return f"agent_job:{job_id}:cancel"
+
+
+class JobCheckpointStore:
+    """Redis-backed checkpoint store with in-memory fallback."""
+
+    def __init__(self, redis_url: str = None, ttl: int = JOB_CHECKPOINT_TTL):
+        self.ttl = ttl
+        self.redis = None
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        try:
+            import redis
+            client = redis.from_url(redis_url or REDIS_URL, decode_responses=True)
+            client.ping()
+            self.redis = client
+        except Exception as e:
+            logger.warning(f"Redis not available for job checkpoints, using in-memory store: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether checkpoints survive a worker restart."""
+        return self.redis is not None
+
+    def save(self, job_id: str, input_hash: str, name: str, value: Any):
+        """Store one checkpoint."""
+        key = _checkpoint_key(job_id, input_hash)
+        serialized = json.dumps(value, default=str)
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hset(key, name, serialized)
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        else:
+            with self._lock:
+                self._data.setdefault(key, {})[name] = serialized
+
+    def load_all(self, job_id: str, input_hash: str) -> Dict[str, Any]:
+        """All checkpoints of a job run, by name."""
+        key = _checkpoint_key(job_id, input_hash)
+        if self.redis:
+            raw = self.redis.hgetall(key)
+        else:
+            with self._lock:
+                raw = dict(self._data.get(key, {}))
+        return {name: json.loads(value) for name, value in raw.items()}
+
+    def clear(self, job_id: str, input_hash: str = None):
+        """Drop a job's checkpoints (all input hashes if none is given)."""
+        if self.redis:
+            keys = [_checkpoint_key(job_id, input_hash)] if input_hash else \
+                [k for k in self.redis.scan_iter(f"agent_job:{job_id}:*") if not k.endswith((':input', ':cancel'))]
+            if keys:
+                self.redis.delete(*keys)
+        else:
+            prefix = _checkpoint_key(job_id, input_hash) if input_hash else f"agent_job:{job_id}:"
+            with self._lock:
+                for key in [k for k in self._data if k.startswith(prefix)
+                            and not k.endswith((':input', ':cancel'))]:
+                    del self._data[key]
+
+    def save_input(self, job_id: str, job_input: Dict):
+        """Remember a job's arguments so it can be resumed later."""
+        serialized = json.dumps(job_input, default=str)
+        if self.redis:
+            self.redis.setex(_input_key(job_id), self.ttl, serialized)
+        else:
+            with self._lock:
+                self._data[_input_key(job_id)] = serialized
+
+    def load_input(self, job_id: str) -> Optional[Dict]:
+        """Arguments of a previously started job, if still stored."""
+        if self.redis:
+            raw = self.redis.get(_input_key(job_id))
+        else:
+            with self._lock:
+                raw = self._data.get(_input_key(job_id))
+        return json.loads(raw) if raw else None
+
+    def request_cancel(self, job_id: str):
+        """Ask a running job to stop at its next checkpoint."""
+        if self.redis:
+            self.redis.setex(_cancel_key(job_id), self.ttl, '1')
+        else:
+            with self._lock:
+                self._data[_cancel_key(job_id)] = '1'
+
+    def clear_cancel(self, job_id: str):
+        """Withdraw a cancellation request (e.g. when resuming)."""
+        if self.redis:
+            self.redis.delete(_cancel_key(job_id))
+        else:
+            with self._lock:
+                self._data.pop(_cancel_key(job_id), None)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation was requested for a job."""
+        try:
+            if self.redis:
+                return bool(self.redis.exists(_cancel_key(job_id)))
+            with self._lock:
+                return _cancel_key(job_id) in self._data
+        except Exception as e:
+            logger.warning(f"Could not check cancellation of job {job_id}: {e}")
+            return False
+
+    def for_job(self, job_id: str, input_hash: str, cancel_job_id: str = None) -> 'JobCheckpoint':
+        """
+        Checkpoint handle bound to one job run.
+
+        Args:
+            job_id: Job whose checkpoints are read and written
+            input_hash: Hash of the job input (see compute_input_hash)
+            cancel_job_id: Job whose cancellation flag applies, when a new
+                job resumes an earlier job's checkpoints (default job_id)
+        """
+        return JobCheckpoint(self, job_id, input_hash, cancel_job_id=cancel_job_id)
+
+
+class JobCheckpoint:
+    """
+    Checkpoints of one job run.
+
+    Stage outputs are stored by stage name; per-question work is stored per
+    micro-batch ("batch:<index>") together with the stages it completed.
+    Write failures are logged and never fail the job itself.
+    """
+
+    def __init__(self, store: JobCheckpointStore, job_id: str, input_hash: str,
+                 cancel_job_id: str = None):
+        self.store = store
+        self.job_id = job_id
+        self.input_hash = input_hash
+        self.cancel_job_id = cancel_job_id or job_id
+        try:
+            self._loaded = store.load_all(job_id, input_hash)
+        except Exception as e:
+            logger.warning(f"Could not load checkpoints of job {job_id}: {e}")
+            self._loaded = {}
+        # Whether an earlier attempt left checkpoints for this run
+        self.resumed = bool(self._loaded)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Checkpoint stored by an earlier attempt of this run."""
+        return self._loaded.get(name, default)
+
+    def save(self, name: str, value: Any):
+        """Store a checkpoint."""
+        self._loaded[name] = value
+        try:
+            self.store.save(self.job_id, self.input_hash, name, value)
+        except Exception as e:
+            logger.warning(f"Could not save checkpoint '{name}' of job {self.job_id}: {e}")
+
+    def load_batches(self) -> Dict[int, Dict]:
+        """
+        Micro-batch checkpoints by batch index.
+
+        Returns:
+            {index: {"payload": ..., "completed": [stage names]}}
+        """
+        batches = {}
+        for name, value in self._loaded.items():
+            if name.startswith(BATCH_PREFIX):
+                payload = value.get('payload', {})
+                # JSON turns integer question ids into strings
+                context = payload.get('knowledge_context') or {}
+                payload['knowledge_context'] = {
+                    int(k) if isinstance(k, str) and k.isdigit() else k: v for k, v in context.items()
+                }
+                batches[int(name[len(BATCH_PREFIX):])] = value
+        return batches
+
+    def save_batch(self, index: int, payload: Dict, completed: List[str]):
+        """Store a micro-batch after one of its stages finished."""
+        self.save(f"{BATCH_PREFIX}{index}", {'payload': payload, 'completed': list(completed)})
+
+    def clear(self):
+        """Drop this run's checkpoints once the job has finished."""
+        try:
+            self.store.clear(self.job_id, self.input_hash)
+        except Exception as e:
+            logger.warning(f"Could not clear checkpoints of job {self.job_id}: {e}")
+
+    def cancel_requested(self) -> bool:
+        """Whether the job was asked to stop."""
+        return self.store.is_cancel_requested(self.cancel_job_id)
+
+
+# Singleton getter
+_store_instance = None
+
+
+def get_job_checkpoint_store() -> JobCheckpointStore:
+    """Get the shared job checkpoint store."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = JobCheckpointStore()
+    return _store_instance
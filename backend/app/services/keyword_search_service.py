@@ -0,0 +1,434 @@
+"""
+Keyword Search Service.
+
+Indexed keyword search over knowledge items, used as the fallback when
+vector search (Qdrant) is unavailable.
+
+Two backends share one interface:
+- PostgreSQL: full-text search over the trigger-maintained search_vector
+  column and its GIN index (see migration search_vectors_001), ranked
+  with ts_rank.
+- Other databases (SQLite in tests/dev): an in-process inverted index per
+  organization, synced incrementally from updated_at and the active id set.
+
+text_search() / highlight() provide the same indexes to the list and search
+endpoints (knowledge, answer library, smart search): tsvector and pg_trgm
+title matching on PostgreSQL, ILIKE elsewhere.
+"""
+import heapq
+import html
+import logging
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Only the head of each item is indexed, matching the old fallback behaviour
+INDEXED_CONTENT_CHARS = 2000
+PREVIEW_CHARS = 500
+
+# Trigger-maintained tsvector column (migration search_vectors_001), which
+# replaced the expression index of migration knowledge_fts_001
+PG_SEARCH_VECTOR = 'search_vector'
+
+# Tables with a search_vector column and a trigram index on their title
+# column: table -> (title column, body columns). Must match
+# SEARCH_TABLES in migration search_vectors_001.
+TEXT_SEARCH_TABLES = {
+    'knowledge_items': ('title', ('content',)),
+    'answer_library_items': ('question_text', ('answer_text',)),
+    'projects': ('name', ('client_name', 'description')),
+}
+
+# Minimum pg_trgm word similarity for fuzzy title matches (operator <%),
+# set per transaction as pg_trgm.word_similarity_threshold
+TRIGRAM_MATCH_THRESHOLD = 0.6
+HIGHLIGHT_CHARS = 200
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize_token(token: str) -> str:
+    """Lowercase and strip a plural 's' so 'requirements' matches 'requirement'."""
+    token = token.lower()
+    if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+        token = token[:-1]
+    return token
+
+
+def tokenize(value: str) -> List[str]:
+    """Split text into normalized tokens."""
+    return [normalize_token(t) for t in _TOKEN_RE.findall((value or '').lower())]
+
+
+def _tsquery_text(search: str) -> Optional[str]:
+    """to_tsquery input matching all words, the last one as a prefix (search as you type)."""
+    words = _TOKEN_RE.findall((search or '').lower())
+    if not words:
+        return None
+    return ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+
+
+def _set_trigram_threshold():
+    """Apply TRIGRAM_MATCH_THRESHOLD to <% for the rest of the current transaction."""
+    db.session.execute(
+        db.text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {'threshold': str(TRIGRAM_MATCH_THRESHOLD)}
+    )
+
+
+def text_search(model, search: str) -> Tuple[object, Optional[object]]:
+    """
+    Filter and rank expression for a free-text search over a model.
+
+    On PostgreSQL, matches the model's search_vector (GIN) or a fuzzy title
+    match (pg_trgm), ranked by ts_rank plus title word similarity. The
+    fuzzy match threshold is set for the current transaction, so run the
+    query in the same transaction. Other databases fall back to ILIKE over
+    the same columns without a rank.
+
+    Args:
+        model: Model whose table is in TEXT_SEARCH_TABLES
+        search: User search text
+
+    Returns:
+        (filter criterion, rank expression or None)
+    """
+    table = model.__tablename__
+    title_name, body_names = TEXT_SEARCH_TABLES[table]
+    title = getattr(model, title_name)
+    columns = [title] + [getattr(model, name) for name in body_names]
+
+    tsquery_text = _tsquery_text(search)
+    if not KeywordSearchService._is_postgres() or not tsquery_text:
+        return db.or_(*[column.ilike(f'%{search}%') for column in columns]), None
+
+    _set_trigram_threshold()
+    vector = db.literal_column(f'{table}.{PG_SEARCH_VECTOR}')
+    query = db.func.to_tsquery('english', tsquery_text)
+    search_param = db.literal(search)
+    criterion = db.or_(
+        vector.op('@@')(query),
+        search_param.op('<%')(title),
+    )
+    rank = db.func.ts_rank(vector, query, 32) + db.func.word_similarity(search_param, title)
+    return criterion, rank
+
+
+def text_match_score(search: str, texts: Sequence[str]) -> float:
+    """Relevance score in [0, 1] of texts (title first) for a search."""
+    query_lower = search.lower()
+    words = query_lower.split()
+
+    total_score = 0.0
+    for i, value in enumerate(texts):
+        if not value:
+            continue
+        value_lower = value.lower()
+
+        # Exact phrase match, with a title boost
+        if query_lower in value_lower:
+            total_score += 0.7 if i == 0 else 0.5
+
+        # Word matches
+        if words:
+            total_score += sum(1 for word in words if word in value_lower) / len(words) * 0.3
+
+    return min(1.0, total_score)
+
+
+def highlight(value: str, search: str, max_chars: int = HIGHLIGHT_CHARS) -> str:
+    """
+    HTML snippet of a text around the first match, matches wrapped in <mark>.
+
+    Words match on prefix ('secur' marks 'Security'). Without a match the
+    start of the text is returned.
+    """
+    value = value or ''
+    words = sorted(set(_TOKEN_RE.findall((search or '').lower())), key=len, reverse=True)
+    pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\w*', re.IGNORECASE) if words else None
+
+    first = pattern.search(value) if pattern else None
+    start = max(0, first.start() - max_chars // 4) if first else 0
+    snippet = value[start:start + max_chars]
+
+    parts = []
+    position = 0
+    for match in (pattern.finditer(snippet) if pattern else ()):
+        parts.append(html.escape(snippet[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(html.escape(snippet[position:]))
+
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if start + max_chars < len(value) else ''
+    return prefix + ''.join(parts) + suffix
+
+
+def build_section_search_terms(section_type, search_query: str = None) -> Set[str]:
+    """
+    Build keyword search terms for a section.
+
+    Args:
+        section_type: RFPSectionType (name and slug are used)
+        search_query: Optional free-text query built from section inputs
+
+    Returns:
+        Set of search terms
+    """
+    terms = set()
+    # From section type name (e.g., "Functional Requirements" -> ["functional", "requirements"])
+    for word in section_type.name.lower().split():
+        if len(word) > 2:
+            terms.add(word)
+    # From section type slug (e.g., "functional_requirements")
+    for word in section_type.slug.replace('_', ' ').split():
+        if len(word) > 2:
+            terms.add(word)
+    # From search query (slightly longer words only)
+    for word in (search_query or '').lower().split():
+        if len(word) > 3:
+            terms.add(word)
+    return terms
+
+
+class _OrgIndex:
+    """Inverted index for one organization's knowledge items."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.item_terms: Dict[int, Set[str]] = {}
+        self.titles: Dict[int, str] = {}
+        self.previews: Dict[int, str] = {}
+        self.synced_at: Optional[datetime] = None
+        self.lock = threading.Lock()
+
+    def remove(self, item_id: int):
+        for term in self.item_terms.pop(item_id, ()):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(item_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.titles.pop(item_id, None)
+        self.previews.pop(item_id, None)
+
+    def add(self, item_id: int, title: str, content_head: str, preview: str):
+        self.remove(item_id)
+
+        weights: Dict[str, float] = defaultdict(float)
+        # Title matches are worth more
+        for term in set(tokenize(title)):
+            weights[term] += 0.15
+        # Content matches, capped per term
+        counts: Dict[str, int] = defaultdict(int)
+        for term in tokenize(content_head):
+            counts[term] += 1
+        for term, count in counts.items():
+            weights[term] += min(0.05 * count, 0.2)
+
+        for term, weight in weights.items():
+            self.postings[term][item_id] = weight
+        self.item_terms[item_id] = set(weights)
+        self.titles[item_id] = title
+        self.previews[item_id] = preview
+
+
+class KeywordSearchService:
+    """Top-k keyword search over an organization's knowledge items."""
+
+    def __init__(self):
+        self._indexes: Dict[int, _OrgIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_postgres() -> bool:
+        return db.engine.dialect.name == 'postgresql'
+
+    def search(self, org_id: int, terms: Iterable[str], limit: int = 10) -> List[Dict]:
+        """
+        Find the knowledge items best matching any of the terms.
+
+        Args:
+            org_id: Organization ID
+            terms: Search terms
+            limit: Number of results to return
+
+        Returns:
+            List of context dicts (item_id, title, content_preview, score),
+            best first
+        """
+        norm_terms = sorted({normalize_token(t) for term in terms for t in _TOKEN_RE.findall(term.lower())})
+        if not norm_terms:
+            return []
+
+        if self._is_postgres():
+            try:
+                return self._search_postgres(org_id, norm_terms, limit)
+            except Exception as e:
+                logger.warning(f"Full-text search failed, using in-process index: {e}")
+                db.session.rollback()
+
+        return self._search_in_process(org_id, norm_terms, limit)
+
+    def fallback_items(self, org_id: int, limit: int = 5) -> List[Dict]:
+        """Generic low-score context when nothing matches."""
+        from ..models import KnowledgeItem
+
+        rows = db.session.query(
+            KnowledgeItem.id,
+            KnowledgeItem.title,
+            db.func.substr(KnowledgeItem.content, 1, PREVIEW_CHARS),
+        ).filter(
+            KnowledgeItem.organization_id == org_id,
+            KnowledgeItem.is_active.isnot(False),
+        ).order_by(KnowledgeItem.id).limit(limit).all()
+
+        return [
+            {'item_id': item_id, 'title': title, 'content_preview': preview or '', 'score': 0.2}
+            for item_id, title, preview in rows
+        ]
+
+    def _search_postgres(self, org_id: int, terms: List[str], limit: int) -> List[Dict]:
+        sql = text(f"""
+            SELECT id, title, left(content, :preview_chars) AS preview,
+                   ts_rank({PG_SEARCH_VECTOR}, query, 32) AS rank
+            FROM knowledge_items, to_tsquery('english', :query) AS query
+            WHERE organization_id = :org_id
+              AND is_active IS NOT FALSE
+              AND ({PG_SEARCH_VECTOR}) @@ query
+            ORDER BY rank DESC
+            LIMIT :limit
+        """)
+        rows = db.session.execute(sql, {
+            'query': ' | '.join(terms),
+            'org_id': org_id,
+            'limit': limit,
+            'preview_chars': PREVIEW_CHARS,
+        }).fetchall()
+
+        return [
+            {
+                'item_id': row.id,
+                'title': row.title,
+                'content_preview': row.preview or '',
+                'score': round(min(float(row.rank), 0.95), 2),
+            }
+            for row in rows
+        ]
+
+    def _search_in_process(self, org_id: int, terms: List[str], limit: int) -> List[Dict]:
+        index = self._sync_index(org_id)
+
+        with index.lock:
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                for item_id, weight in index.postings.get(term, {}).items():
+                    scores[item_id] += weight
+
+            # Normalize score based on number of search terms
+            top = heapq.nlargest(limit, (
+                (score / len(terms), item_id) for item_id, score in scores.items()
+            ))
+            return [
+                {
+                    'item_id': item_id,
+                    'title': index.titles[item_id],
+                    'content_preview': index.previews[item_id],
+                    'score': round(min(score, 0.95), 2),
+                }
+                for score, item_id in top
+                if score > 0.05
+            ]
+
+    def _sync_index(self, org_id: int) -> _OrgIndex:
+        """Bring an org's in-process index up to date with the database."""
+        from ..models import KnowledgeItem
+
+        with self._lock:
+            index = self._indexes.setdefault(org_id, _OrgIndex())
+
+        with index.lock:
+            active = (
+                KnowledgeItem.organization_id == org_id,
+                KnowledgeItem.is_active.isnot(False),
+            )
+
+            # Cheap aggregate check: nothing added, removed or edited since last sync
+            count, latest_update = db.session.query(
+                db.func.count(KnowledgeItem.id), db.func.max(KnowledgeItem.updated_at)
+            ).filter(*active).one()
+            if (index.synced_at is not None and count == len(index.item_terms)
+                    and (latest_update is None or latest_update <= index.synced_at)):
+                return index
+
+            active_ids = {row[0] for row in db.session.query(KnowledgeItem.id).filter(*active)}
+
+            # Drop deleted/deactivated items
+            for item_id in set(index.item_terms) - active_ids:
+                index.remove(item_id)
+
+            # Load only new or changed rows, and only the indexed head of content
+            changed = db.session.query(
+                KnowledgeItem.id,
+                KnowledgeItem.title,
+                db.func.substr(KnowledgeItem.content, 1, INDEXED_CONTENT_CHARS),
+                KnowledgeItem.updated_at,
+            ).filter(*active)
+            missing = active_ids - set(index.item_terms)
+            if index.synced_at is not None:
+                changed = changed.filter(db.or_(
+                    KnowledgeItem.updated_at >= index.synced_at,
+                    KnowledgeItem.id.in_(missing) if missing else db.false(),
+                ))
+
+            latest = index.synced_at
+            for item_id, title, content_head, updated_at in changed.all():
+                content_head = content_head or ''
+                index.add(item_id, title or '', content_head, content_head[:PREVIEW_CHARS])
+                if updated_at and (latest is None or updated_at > latest):
+                    latest = updated_at
+            index.synced_at = latest
+
+        return index
+
+    def invalidate(self, org_id: int = None):
+        """Drop the in-process index for an org (or all orgs)."""
+        with self._lock:
+            if org_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(org_id, None)
+
+
+# Singleton getter
+_keyword_search_instance = None
+
+
+def get_keyword_search_service() -> KeywordSearchService:
+    """Get keyword search service instance."""
+    global _keyword_search_instance
+    if _keyword_search_instance is None:
+        _keyword_search_instance = KeywordSearchService()
+    return _keyword_search_instance
+
+
+def search_knowledge_by_keywords(org_id: int, terms: Iterable[str], limit: int = 10) -> List[Dict]:
+    """
+    Keyword fallback retrieval for section generation.
+
+    Returns the top matching items, or a few generic low-score items when
+    nothing matches, so generation always has some context.
+    """
+    service = get_keyword_search_service()
+    results = service.search(org_id, terms, limit=limit)
+    if not results:
+        results = service.fallback_items(org_id)
+    return results
@@ -0,0 +1,435 @@
+"""
+Knowledge Ingestion Service
+
+Background ingestion of files uploaded to a knowledge folder. The upload
+request only stores the files as an IngestionBatch; Celery workers then
+
+1. process each file in parallel (text extraction / Docling chunking, cloud
+   storage upload, knowledge items), retrying failed files individually, and
+2. embed and index the chunks of all files of the batch together, so the
+   embedding model is called with full batches instead of once per chunk.
+
+Every file has its own status (queued, processing, chunked, indexed, failed),
+so a batch's progress is visible per file. Without a Celery broker the batch
+is processed inline instead.
+"""
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..extensions import db
+from ..models import KnowledgeItem, IngestionBatch, IngestionFile
+
+logger = logging.getLogger(__name__)
+
+INGESTION_MAX_RETRIES = int(os.environ.get('INGESTION_MAX_RETRIES', 2))
+INGESTION_RETRY_DELAY = int(os.environ.get('INGESTION_RETRY_DELAY', 10))  # seconds, doubled per retry
+
+# Dimension fields copied from the batch options onto every knowledge item
+DIMENSION_FIELDS = ('geography', 'client_type', 'industry', 'knowledge_profile_id')
+
+FINISHED_FILE_STATUSES = ('indexed', 'failed')
+
+
+def create_ingestion_batch(folder, user, files, options: Dict = None) -> IngestionBatch:
+    """
+    Store uploaded files as a new ingestion batch.
+
+    Args:
+        folder: Target KnowledgeFolder
+        user: Uploading user
+        files: Uploaded werkzeug FileStorage objects (already validated)
+        options: Dimension values applied to every item
+
+    Returns:
+        The committed IngestionBatch
+    """
+    from werkzeug.utils import secure_filename
+
+    batch = IngestionBatch(
+        id=str(uuid.uuid4()),
+        organization_id=user.organization_id,
+        folder_id=folder.id,
+        created_by=user.id,
+        status='queued',
+        options={k: v for k, v in (options or {}).items() if k in DIMENSION_FIELDS}
+    )
+    db.session.add(batch)
+
+    for file in files:
+        content = file.read()
+        db.session.add(IngestionFile(
+            batch_id=batch.id,
+            filename=secure_filename(file.filename),
+            content_type=file.content_type,
+            file_size=len(content),
+            file_data=content,
+            status='queued'
+        ))
+
+    db.session.commit()
+    logger.info(f"Created ingestion batch {batch.id} with {len(files)} files for folder {folder.id}")
+    return batch
+
+
+def start_ingestion_batch(batch: IngestionBatch, files: List[IngestionFile] = None) -> bool:
+    """
+    Queue a batch on the Celery workers: one task per file, then one
+    indexing task for the whole batch.
+
+    Args:
+        batch: Batch to process
+        files: Files to (re)process (default: all files of the batch)
+
+    Returns:
+        False if the tasks could not be queued
+    """
+    try:
+        from celery import chord
+        from ..extensions import celery
+
+        header = [
+            celery.signature('ingestion.process_file', args=[f.id])
+            for f in (files if files is not None else batch.files)
+        ]
+        result = chord(header)(celery.signature('ingestion.index_batch', args=[batch.id]))
+    except Exception as e:
+        logger.warning(f"Failed to queue ingestion batch {batch.id}: {e}")
+        return False
+
+    batch.task_id = result.id
+    db.session.commit()
+    return True
+
+
+def retry_failed_files(batch: IngestionBatch) -> List[IngestionFile]:
+    """
+    Reset the failed files of a batch for another run.
+
+    Returns:
+        The files to process again
+    """
+    files = batch.files.filter_by(status='failed').filter(IngestionFile.file_data.isnot(None)).all()
+    for ingestion_file in files:
+        ingestion_file.status = 'queued'
+        ingestion_file.error = None
+        ingestion_file.completed_at = None
+    if files:
+        batch.status = 'queued'
+        batch.completed_at = None
+    db.session.commit()
+    return files
+
+
+def run_ingestion_batch(batch_id: str) -> Dict:
+    """Process and index a batch's queued files in the current process."""
+    batch = db.session.get(IngestionBatch, batch_id)
+    for ingestion_file in batch.files.filter_by(status='queued').all():
+        try:
+            process_ingestion_file(ingestion_file.id)
+        except Exception as e:
+            mark_file_failed(ingestion_file.id, e)
+    return index_ingestion_batch(batch_id)
+
+
+def _extract(ingestion_file: IngestionFile, temp_path: str) -> Tuple[List, str, Optional[object]]:
+    """Chunk a file with Docling, falling back to plain text extraction."""
+    try:
+        from .docling_chunking_service import get_docling_chunking_service
+
+        chunking_result = get_docling_chunking_service().chunk_document(
+            file_path=temp_path,
+            file_id=str(uuid.uuid4()),
+            original_filename=ingestion_file.filename,
+            file_type=os.path.splitext(ingestion_file.filename)[1].lstrip('.').lower()
+        )
+        chunks = chunking_result.chunks
+        logger.info(
+            f"Chunked {ingestion_file.filename}: {len(chunks)} chunks, {chunking_result.total_pages} pages"
+        )
+        if chunks:
+            full_text = "\n\n".join([c.content for c in chunks[:5]])  # First 5 chunks for summary
+            return chunks, full_text, chunking_result
+    except Exception as e:
+        logger.warning(f"Docling chunking failed for {ingestion_file.filename}, using fallback: {e}")
+
+    # Fallback to basic extraction
+    from .extraction_text_service import extract_text_from_file
+    full_text = extract_text_from_file(temp_path, ingestion_file.content_type)
+    if not full_text or len(full_text.strip()) < 10:
+        full_text = f"File: {ingestion_file.filename}\n\n[Content could not be extracted. Download to view.]"
+    return [], full_text, None
+
+
+def _upload_to_storage(ingestion_file: IngestionFile, batch: IngestionBatch) -> Dict:
+    """Upload the file to cloud storage if configured (otherwise it stays in the DB)."""
+    import io
+
+    try:
+        from .storage_service import get_storage_service
+        storage = get_storage_service()
+
+        if storage.storage_type == 'gcp':
+            knowledge_prefix = os.environ.get('GCP_KNOWLEDGE_PREFIX', 'knowledge')
+            # Use folder name as subfolder for organization
+            folder_name = batch.folder.name.replace(' ', '_').lower() if batch.folder else 'default'
+
+            storage_metadata = storage.provider.upload_with_path(
+                file=io.BytesIO(ingestion_file.file_data),
+                original_filename=ingestion_file.filename,
+                prefix=knowledge_prefix,
+                subfolder=folder_name,
+                content_type=ingestion_file.content_type,
+                metadata={'folder_id': batch.folder_id, 'organization_id': batch.organization_id}
+            )
+            logger.info(f"Uploaded {ingestion_file.filename} to GCP: {storage_metadata.file_url}")
+            return {
+                'storage_type': 'gcp',
+                'file_id': storage_metadata.file_id,
+                'file_url': storage_metadata.file_url
+            }
+    except Exception as e:
+        logger.warning(f"Cloud storage upload failed, falling back to DB storage: {e}")
+
+    return {'storage_type': 'database', 'file_id': None, 'file_url': None}
+
+
+def process_ingestion_file(file_id: int) -> Dict:
+    """
+    Extract, chunk and store one file of a batch.
+
+    Creates the parent knowledge item (and one child item per chunk) and
+    leaves the chunks on the file for index_ingestion_batch. Nothing is
+    committed unless the whole file succeeds, so the step can be retried.
+
+    Returns:
+        File status dict
+    """
+    ingestion_file = db.session.get(IngestionFile, file_id)
+    if ingestion_file is None:
+        raise ValueError(f"Ingestion file {file_id} not found")
+    if ingestion_file.status in ('chunked',) + FINISHED_FILE_STATUSES:
+        return ingestion_file.to_dict()  # Already done by an earlier attempt
+
+    batch = ingestion_file.batch
+    ingestion_file.status = 'processing'
+    ingestion_file.attempts = (ingestion_file.attempts or 0) + 1
+    ingestion_file.started_at = ingestion_file.started_at or datetime.utcnow()
+    if batch.status == 'queued':
+        batch.status = 'processing'
+    db.session.commit()
+
+    filename = ingestion_file.filename
+    options = batch.options or {}
+    temp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as temp_file:
+            temp_file.write(ingestion_file.file_data or b'')
+            temp_path = temp_file.name
+
+        chunks, full_text, chunking_result = _extract(ingestion_file, temp_path)
+        storage = _upload_to_storage(ingestion_file, batch)
+
+        # Create parent knowledge item (stores the full document)
+        parent_item = KnowledgeItem(
+            title=filename,
+            content=full_text[:50000] if full_text else '',  # Always store extracted text for AI summaries
+            source_type='file',
+            source_file=filename,
+            file_type=ingestion_file.content_type,
+            file_data=ingestion_file.file_data if storage['storage_type'] == 'database' else None,
+            file_size=ingestion_file.file_size,
+            folder_id=batch.folder_id,
+            organization_id=batch.organization_id,
+            created_by=batch.created_by,
+            item_metadata={
+                'total_chunks': len(chunks),
+                'total_pages': chunking_result.total_pages if chunks else 1,
+                'total_words': chunking_result.total_words if chunks else len(full_text.split()) if full_text else 0,
+                'chunking_method': 'docling' if chunks else 'basic',
+                'ingestion_batch_id': batch.id,
+                **storage
+            },
+            **{field: options.get(field) for field in DIMENSION_FIELDS}
+        )
+        db.session.add(parent_item)
+        db.session.flush()  # Get parent_item.id
+
+        if chunks:
+            for chunk in chunks:
+                chunk.doc_url = f"knowledge://{parent_item.id}"
+                chunk.original_filename = filename
+        else:
+            # Index full content as single chunk
+            from .docling_chunking_service import DocumentChunk
+            chunks = [DocumentChunk(
+                chunk_id=f"{parent_item.id}-0",
+                file_id=str(parent_item.id),
+                page_number=1,
+                chunk_index=0,
+                content=full_text[:5000],
+                content_type='text',
+                doc_url=f"knowledge://{parent_item.id}",
+                original_filename=filename
+            )]
+
+        # Create child knowledge items for each chunk (optional - for UI display)
+        if len(chunks) > 1:
+            for i, chunk in enumerate(chunks):
+                db.session.add(KnowledgeItem(
+                    title=f"{filename} - Page {chunk.page_number}",
+                    content=chunk.content,
+                    source_type='chunk',
+                    source_file=filename,
+                    chunk_index=i,
+                    parent_id=parent_item.id,
+                    folder_id=batch.folder_id,
+                    organization_id=batch.organization_id,
+                    created_by=batch.created_by,
+                    item_metadata={
+                        'page_number': chunk.page_number,
+                        'chunk_index': chunk.chunk_index,
+                        'word_count': chunk.word_count,
+                        'has_tables': chunk.has_tables,
+                        'has_images': chunk.has_images,
+                        'headings': chunk.headings
+                    },
+                    **{field: options.get(field) for field in DIMENSION_FIELDS}
+                ))
+
+        ingestion_file.knowledge_item_id = parent_item.id
+        ingestion_file.chunk_data = [chunk.to_dict() for chunk in chunks]
+        ingestion_file.chunk_count = len(chunks)
+        ingestion_file.page_count = chunking_result.total_pages if chunking_result else 1
+        ingestion_file.file_data = None  # Now held by the knowledge item or cloud storage
+        ingestion_file.status = 'chunked'
+        ingestion_file.error = None
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        # Clean up temp file
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    return ingestion_file.to_dict()
+
+
+def mark_file_failed(file_id: int, error: Exception, final: bool = True):
+    """Record a failed attempt of a file (final: no retry follows)."""
+    db.session.rollback()
+    ingestion_file = db.session.get(IngestionFile, file_id)
+    if ingestion_file is None:
+        return
+    ingestion_file.error = str(error)
+    if final:
+        # File content is kept so the file can be retried
+        logger.error(f"Ingestion of {ingestion_file.filename} failed: {error}")
+        ingestion_file.status = 'failed'
+        ingestion_file.completed_at = datetime.utcnow()
+    else:
+        ingestion_file.status = 'queued'
+    db.session.commit()
+
+
+def _fallback_index(item: KnowledgeItem) -> bool:
+    """Index a knowledge item with the regular Qdrant service."""
+    try:
+        from .qdrant_service import get_qdrant_service
+        qdrant = get_qdrant_service(item.organization_id)
+        item.embedding_id = qdrant.upsert_item(
+            item_id=item.id,
+            org_id=item.organization_id,
+            title=item.title,
+            content=item.content,
+            folder_id=item.folder_id,
+            geography=item.geography,
+            client_type=item.client_type,
+            industry=item.industry,
+            knowledge_profile_id=item.knowledge_profile_id
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Fallback Qdrant indexing failed for item {item.id}: {e}")
+        return False
+
+
+def index_ingestion_batch(batch_id: str) -> Dict:
+    """
+    Embed and index the chunks of every processed file of a batch.
+
+    All chunks go through one hybrid search upsert, which embeds them in
+    full batches across files. If that fails, files are indexed one by one
+    (falling back to the regular Qdrant service) so one bad file does not
+    fail the others.
+
+    Returns:
+        Batch status dict
+    """
+    from .docling_chunking_service import DocumentChunk
+    from .hybrid_search_service import get_hybrid_search_service
+
+    batch = db.session.get(IngestionBatch, batch_id)
+    if batch is None:
+        raise ValueError(f"Ingestion batch {batch_id} not found")
+
+    pending = batch.files.filter_by(status='chunked').all()
+    if pending:
+        batch.status = 'indexing'
+        db.session.commit()
+
+        chunks_by_file = {
+            f.id: [DocumentChunk(**data) for data in (f.chunk_data or [])] for f in pending
+        }
+        all_chunks = [chunk for chunks in chunks_by_file.values() for chunk in chunks]
+
+        hybrid_search = get_hybrid_search_service(batch.organization_id)
+        indexed_total = 0
+        if hybrid_search.enabled and all_chunks:
+            indexed_total = hybrid_search.upsert_document_chunks(
+                chunks=all_chunks,
+                org_id=batch.organization_id
+            )
+
+        for ingestion_file in pending:
+            chunks = chunks_by_file[ingestion_file.id]
+            item = db.session.get(KnowledgeItem, ingestion_file.knowledge_item_id)
+            if indexed_total == len(all_chunks):
+                indexed = len(chunks)
+            elif hybrid_search.enabled:
+                indexed = hybrid_search.upsert_document_chunks(chunks=chunks, org_id=batch.organization_id)
+            else:
+                indexed = 0
+
+            if indexed and item is not None:
+                item.embedding_id = f"hybrid:{chunks[0].file_id}"
+                item.item_metadata = {**(item.item_metadata or {}), 'indexed_chunks': indexed}
+            elif item is not None and hybrid_search.enabled:
+                _fallback_index(item)
+
+            ingestion_file.indexed_chunks = indexed
+            ingestion_file.chunk_data = None
+            ingestion_file.status = 'indexed'
+            ingestion_file.completed_at = datetime.utcnow()
+
+        logger.info(f"Indexed {indexed_total} chunks of {len(pending)} files for ingestion batch {batch_id}")
+
+    statuses = [f.status for f in batch.files]
+    if statuses and all(s == 'failed' for s in statuses):
+        batch.status = 'failed'
+    elif 'failed' in statuses:
+        batch.status = 'completed_with_errors'
+    else:
+        batch.status = 'completed'
+    batch.completed_at = datetime.utcnow()
+    db.session.commit()
+
+    return batch.to_dict(include_files=False)
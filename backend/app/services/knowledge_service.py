@@ -127,7 +127,22 @@ class KnowledgeService:
             return []
     
     def delete_embedding(self, embedding_id: str) -> bool:
-        """Delete an embedding from Qdrant."""
+        """
+        Delete an embedding from Qdrant.
+        
+        Embeddings of knowledge items go through the routed Qdrant service,
+        so the local vector index and hybrid document chunks are cleaned too.
+        """
+        try:
+            from ..models import KnowledgeItem
+            from .qdrant_service import delete_knowledge_item_vectors
+            
+            item = KnowledgeItem.query.filter_by(embedding_id=embedding_id).first()
+            if item is not None:
+                return delete_knowledge_item_vectors(item)
+        except Exception:
+            pass
+        
         if not self.client:
             return False
         
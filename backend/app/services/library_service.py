@@ -93,12 +93,10 @@ class LibraryService:
         db.session.commit()
         return True
 
-    def get_stale_items(self, organization_id: int) -> List[AnswerLibraryItem]:
-        """Get items that are due for review."""
-        return AnswerLibraryItem.query.filter(
-            AnswerLibraryItem.organization_id == organization_id,
-            AnswerLibraryItem.is_active == True,
-            AnswerLibraryItem.next_review_due <= datetime.utcnow()
-        ).all()
+    def get_stale_items(self, organization_id: int, min_score: float = None,
+                        limit: int = None) -> List[AnswerLibraryItem]:
+        """Get items that are stale or due for review, stalest first (indexed score scan)."""
+        from .freshness_service import get_stale_items
+        return get_stale_items(AnswerLibraryItem, organization_id, min_score=min_score, limit=limit)
 
 library_service = LibraryService()
@@ -12,6 +12,7 @@ from .litellm_provider import LiteLLMProvider
 from .base_provider import BaseLLMProvider, LLMProviderFactory
 from .openai_provider import OpenAIProvider
 from .azure_provider import AzureOpenAIProvider
+from .cached_provider import CachedLLMProvider
 
 __all__ = [
     'LiteLLMProvider',
@@ -19,5 +20,6 @@ __all__ = [
     'LLMProviderFactory',
     'OpenAIProvider',
     'AzureOpenAIProvider',
+    'CachedLLMProvider',
 ]
 
@@ -3,10 +3,12 @@ Azure OpenAI Provider for LLM Integration
 
 Provides access to Azure-hosted OpenAI models.
 """
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 
-from .base_provider import BaseLLMProvider
+from app.utils.async_loop import in_shared_loop
+from .base_provider import BaseLLMProvider, shared_async_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,8 @@ class AzureOpenAIProvider(BaseLLMProvider):
         self.api_version = api_version
         self.deployment_name = deployment_name or model
         self._client = None
+        self._async_client = None
+        self._async_client_loop = None
         
         # Initialize client
         self._init_client()
@@ -62,6 +66,29 @@ class AzureOpenAIProvider(BaseLLMProvider):
             logger.error(f"Failed to initialize Azure OpenAI client: {e}")
             raise
     
+    def _get_async_client(self):
+        """
+        Async Azure OpenAI client for the running event loop.
+        
+        On the shared event loop it uses the connection pool shared by all
+        providers.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            from openai import AsyncAzureOpenAI
+            
+            client_kwargs = {
+                'api_key': self.api_key,
+                'api_version': self.api_version,
+                'azure_endpoint': self.base_url
+            }
+            if in_shared_loop():
+                client_kwargs['http_client'] = shared_async_http_client()
+            
+            self._async_client = AsyncAzureOpenAI(**client_kwargs)
+            self._async_client_loop = loop
+        return self._async_client
+    
     @property
     def provider_name(self) -> str:
         return "azure"
@@ -132,6 +159,32 @@ class AzureOpenAIProvider(BaseLLMProvider):
             logger.error(f"Azure OpenAI chat generation error: {e}")
             raise
     
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """Async variant of generate_content."""
+        return await self.agenerate_chat([{"role": "user", "content": prompt}], **kwargs)
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """Async variant of generate_chat."""
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=self.deployment_name,
+                messages=messages,
+                temperature=kwargs.get('temperature', self.temperature),
+                max_tokens=kwargs.get('max_tokens', self.max_tokens),
+            )
+            
+            content = response.choices[0].message.content
+            logger.debug(f"Azure OpenAI async generated {len(content)} characters")
+            return content
+            
+        except Exception as e:
+            logger.error(f"Azure OpenAI async generation error: {e}")
+            raise
+    
     def test_connection(self) -> Dict[str, Any]:
         """Test the Azure OpenAI connection."""
         try:
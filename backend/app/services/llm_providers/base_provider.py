@@ -2,13 +2,54 @@
 Base LLM Provider Classes
 
 Defines the interface and factory for LLM providers.
+
+Every provider has sync (generate_content, generate_chat) and async
+(agenerate_content, agenerate_chat) variants. Sync callers that need many
+calls at once use generate_many, which runs the async variants concurrently
+on the shared event loop (app.utils.async_loop) instead of a thread per call.
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
+import asyncio
+import functools
 import logging
+import os
+
+from app.utils.async_loop import run_all
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by the async HTTP clients on the shared event loop
+LLM_ASYNC_MAX_CONNECTIONS = int(os.environ.get('LLM_ASYNC_MAX_CONNECTIONS', 100))
+# Max in-flight requests of one generate_many call
+LLM_ASYNC_MAX_CONCURRENCY = int(os.environ.get('LLM_ASYNC_MAX_CONCURRENCY', 16))
+
+_http_client = None
+_http_client_pid = None
+
+
+def shared_async_http_client():
+    """
+    httpx.AsyncClient shared by the async SDK clients of all providers.
+
+    Only use it from the shared event loop; the client's connections belong
+    to the loop that first used them.
+    """
+    global _http_client, _http_client_pid
+    if _http_client is None or _http_client_pid != os.getpid():
+        import httpx
+        # Same timeouts as the OpenAI SDK's default client
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=LLM_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=max(1, LLM_ASYNC_MAX_CONNECTIONS // 5)
+            ),
+            follow_redirects=True
+        )
+        _http_client_pid = os.getpid()
+    return _http_client
+
 
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
@@ -67,6 +108,48 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """
+        Async variant of generate_content.
+        
+        Providers with an async client override this; the default runs the
+        sync call in the event loop's executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.generate_content, prompt, **kwargs))
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """Async variant of generate_chat (see agenerate_content)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.generate_chat, messages, **kwargs))
+    
+    def generate_many(
+        self,
+        prompts: List[str],
+        max_concurrency: int = None,
+        **kwargs
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate content for many prompts concurrently.
+        
+        Args:
+            prompts: Input prompts
+            max_concurrency: Max requests in flight (default LLM_ASYNC_MAX_CONCURRENCY)
+            **kwargs: Additional generation parameters
+            
+        Returns:
+            Generated text per prompt, in order; a failed prompt gets its
+            exception instead
+        """
+        return run_all(
+            (self.agenerate_content(prompt, **kwargs) for prompt in prompts),
+            max_concurrency=max_concurrency or LLM_ASYNC_MAX_CONCURRENCY
+        )
+    
     def test_connection(self) -> Dict[str, Any]:
         """
         Test the provider connection.
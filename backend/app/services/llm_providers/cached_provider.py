@@ -0,0 +1,149 @@
+"""
+Response-caching LLM Provider
+
+Wraps any provider so that a prompt sent again with the same model and
+settings is answered from the LLM response cache instead of the model.
+The async variants run the (blocking) cache reads and writes in the event
+loop's executor, so Redis round trips don't stall the shared loop.
+"""
+import asyncio
+import functools
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+from .base_provider import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLLMProvider(BaseLLMProvider):
+    """Provider decorator backed by app.services.llm_response_cache."""
+    
+    def __init__(
+        self,
+        provider: BaseLLMProvider,
+        org_id: Optional[int] = None,
+        agent_type: str = 'default',
+        ttl: Optional[int] = None
+    ):
+        super().__init__(
+            api_key=provider.api_key,
+            model=provider.model,
+            base_url=provider.base_url,
+            temperature=provider.temperature,
+            max_tokens=provider.max_tokens
+        )
+        self.provider = provider
+        self.org_id = org_id
+        self.agent_type = agent_type
+        self.ttl = ttl
+    
+    @property
+    def provider_name(self) -> str:
+        return self.provider.provider_name
+    
+    def _cache_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        from app.services.llm_response_cache import response_cache_key
+        
+        return response_cache_key(
+            self.provider_name,
+            self.model,
+            kwargs.get('temperature', self.temperature),
+            prompt,
+            max_tokens=kwargs.get('max_tokens', self.max_tokens)
+        )
+    
+    def _lookup(self, prompt: str, kwargs: Dict[str, Any]):
+        """(cache key, cached response or None)."""
+        from app.services.llm_response_cache import get_cached_response, record_cache_event
+        
+        key = self._cache_key(prompt, kwargs)
+        cached = get_cached_response(key)
+        record_cache_event(self.org_id, self.agent_type, self.model, hit=cached is not None,
+                           prompt=prompt, response=cached or '')
+        if cached is not None:
+            logger.debug(f"LLM response cache hit for {self.agent_type} ({self.model})")
+        return key, cached
+    
+    def _store(self, key: str, response: str):
+        from app.services.llm_response_cache import set_cached_response
+        
+        set_cached_response(key, response, self.ttl)
+    
+    async def _alookup(self, prompt: str, kwargs: Dict[str, Any]):
+        """_lookup in the event loop's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._lookup, prompt, kwargs))
+    
+    async def _astore(self, key: str, response: str):
+        """_store in the event loop's executor."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._store, key, response))
+    
+    @staticmethod
+    def _chat_prompt(messages: List[Dict[str, str]]) -> str:
+        return json.dumps([[m.get('role', 'user'), m.get('content', '')] for m in messages])
+    
+    def generate_content(self, prompt: str, **kwargs) -> str:
+        key, cached = self._lookup(prompt, kwargs)
+        if cached is not None:
+            return cached
+        response = self.provider.generate_content(prompt, **kwargs)
+        self._store(key, response)
+        return response
+    
+    def generate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        key, cached = self._lookup(self._chat_prompt(messages), kwargs)
+        if cached is not None:
+            return cached
+        response = self.provider.generate_chat(messages, **kwargs)
+        self._store(key, response)
+        return response
+    
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        key, cached = await self._alookup(prompt, kwargs)
+        if cached is not None:
+            return cached
+        response = await self.provider.agenerate_content(prompt, **kwargs)
+        await self._astore(key, response)
+        return response
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        key, cached = await self._alookup(self._chat_prompt(messages), kwargs)
+        if cached is not None:
+            return cached
+        response = await self.provider.agenerate_chat(messages, **kwargs)
+        await self._astore(key, response)
+        return response
+    
+    def test_connection(self) -> Dict[str, Any]:
+        """Test the wrapped provider (never cached)."""
+        return self.provider.test_connection()
+
+
+def with_response_cache(provider: BaseLLMProvider, agent_config, org_id: Optional[int] = None,
+                        agent_type: str = 'default') -> BaseLLMProvider:
+    """
+    Wrap a provider in the response cache if its AgentAIConfig opted in.
+    
+    Args:
+        provider: Provider created from the config
+        agent_config: AgentAIConfig (config_metadata.response_cache)
+        org_id: Organization the usage stats are counted for
+        agent_type: Agent type the usage stats are counted for
+    """
+    from app.services.llm_response_cache import cache_settings
+    
+    enabled, ttl = cache_settings(agent_config)
+    if not enabled or provider is None:
+        return provider
+    return CachedLLMProvider(provider, org_id=org_id, agent_type=agent_type, ttl=ttl)
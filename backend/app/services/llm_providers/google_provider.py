@@ -92,6 +92,19 @@ class GoogleAIProvider(BaseLLMProvider):
     def provider_name(self) -> str:
         return "google"
     
+    def _generation_config(self, kwargs: Dict[str, Any]):
+        """Build the generation config from defaults and call overrides."""
+        generation_config = genai.GenerationConfig(
+            temperature=kwargs.get('temperature', self.temperature),
+            max_output_tokens=kwargs.get('max_tokens', self.max_tokens),
+        )
+        
+        if 'top_p' in kwargs:
+            generation_config.top_p = kwargs['top_p']
+        if 'top_k' in kwargs:
+            generation_config.top_k = kwargs['top_k']
+        return generation_config
+    
     def generate_content(self, prompt: str, **kwargs) -> str:
         """
         Generate content from a prompt.
@@ -104,16 +117,7 @@ class GoogleAIProvider(BaseLLMProvider):
             Generated text content
         """
         try:
-            # Build generation config
-            generation_config = genai.GenerationConfig(
-                temperature=kwargs.get('temperature', self.temperature),
-                max_output_tokens=kwargs.get('max_tokens', self.max_tokens),
-            )
-            
-            if 'top_p' in kwargs:
-                generation_config.top_p = kwargs['top_p']
-            if 'top_k' in kwargs:
-                generation_config.top_k = kwargs['top_k']
+            generation_config = self._generation_config(kwargs)
             
             logger.debug(f"Google AI request: model={self.model}")
             
@@ -179,6 +183,43 @@ class GoogleAIProvider(BaseLLMProvider):
             logger.error(f"Google AI chat error: {e}")
             raise
     
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """Async variant of generate_content."""
+        try:
+            response = await self._model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(kwargs)
+            )
+            return response.text
+            
+        except Exception as e:
+            logger.error(f"Google AI async generation error: {e}")
+            raise
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """Async variant of generate_chat."""
+        try:
+            chat = self._model.start_chat(history=[])
+            
+            for msg in messages[:-1]:
+                if msg.get('role', 'user') == 'user':
+                    await chat.send_message_async(msg.get('content', ''))
+            
+            last_msg = messages[-1] if messages else {'content': ''}
+            response = await chat.send_message_async(
+                last_msg.get('content', ''),
+                generation_config=self._generation_config(kwargs)
+            )
+            return response.text
+            
+        except Exception as e:
+            logger.error(f"Google AI async chat error: {e}")
+            raise
+    
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
         """Get list of available models."""
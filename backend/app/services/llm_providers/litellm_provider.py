@@ -148,26 +148,9 @@ class LiteLLMProvider(BaseLLMProvider):
             Generated text content
         """
         try:
-            # For custom LiteLLM proxy, use openai/ prefix with api_base
-            # This tells LiteLLM to use OpenAI-compatible API format
-            model_name = f"openai/{self.model}"
+            params = self._completion_params(messages, kwargs)
             
-            # Merge default and override parameters
-            params = {
-                'model': model_name,
-                'messages': messages,
-                'temperature': kwargs.get('temperature', self.temperature),
-                'max_tokens': kwargs.get('max_tokens', self.max_tokens),
-                'api_key': self.api_key,
-                'api_base': self.base_url,  # Custom proxy URL
-            }
-            
-            # Add any extra parameters
-            for key in ['top_p', 'stop', 'presence_penalty', 'frequency_penalty']:
-                if key in kwargs:
-                    params[key] = kwargs[key]
-            
-            logger.debug(f"LiteLLM request: model={model_name}, api_base={self.base_url}")
+            logger.debug(f"LiteLLM request: model={params['model']}, api_base={self.base_url}")
             
             response = litellm.completion(**params)
             
@@ -182,6 +165,55 @@ class LiteLLMProvider(BaseLLMProvider):
             logger.error(f"LiteLLM generation error: {e}")
             raise
     
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """Async variant of generate_content."""
+        return await self.agenerate_chat([{"role": "user", "content": prompt}], **kwargs)
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        Async variant of generate_chat.
+        
+        litellm keeps its async HTTP clients cached per event loop, so calls
+        made on the shared loop reuse their connections.
+        """
+        try:
+            response = await litellm.acompletion(**self._completion_params(messages, kwargs))
+            content = response.choices[0].message.content
+            
+            logger.debug(f"LiteLLM async response: {len(content)} chars")
+            
+            return content
+            
+        except Exception as e:
+            logger.error(f"LiteLLM async generation error: {e}")
+            raise
+    
+    def _completion_params(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Request parameters for litellm.completion / acompletion."""
+        # For custom LiteLLM proxy, use openai/ prefix with api_base
+        # This tells LiteLLM to use OpenAI-compatible API format
+        model_name = f"openai/{self.model}"
+        
+        # Merge default and override parameters
+        params = {
+            'model': model_name,
+            'messages': messages,
+            'temperature': kwargs.get('temperature', self.temperature),
+            'max_tokens': kwargs.get('max_tokens', self.max_tokens),
+            'api_key': self.api_key,
+            'api_base': self.base_url,  # Custom proxy URL
+        }
+        
+        # Add any extra parameters
+        for key in ['top_p', 'stop', 'presence_penalty', 'frequency_penalty']:
+            if key in kwargs:
+                params[key] = kwargs[key]
+        return params
+    
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
         """Get list of available models on the proxy."""
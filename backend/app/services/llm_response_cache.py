@@ -0,0 +1,302 @@
+"""
+LLM Response Cache
+
+Caches LLM responses for prompts that are sent again unchanged, e.g. question
+extraction on a re-uploaded document, re-classifying the same questions or
+expanding a repeated search query.
+
+Entries are keyed by (provider, model, temperature, max_tokens, normalized
+prompt hash) and stored zlib-compressed in two tiers:
+- a size-bounded in-process LRU (LLM_CACHE_MAX_ENTRIES / LLM_CACHE_MAX_BYTES)
+- a shared Redis cache with TTL, trimmed to LLM_CACHE_SHARED_MAX_ENTRIES
+  least recently used entries
+
+Caching is opt-in per agent type: set ``response_cache: true`` (and
+optionally ``response_cache_ttl`` in seconds) in the AgentAIConfig's
+config_metadata. Hits, misses and the tokens they saved are counted per
+organization and agent type and reported by llm_usage.get_usage_summary.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 86400))  # 7 days default
+CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 2048))
+CACHE_MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # compressed
+CACHE_MAX_ENTRY_BYTES = int(os.environ.get('LLM_CACHE_MAX_ENTRY_BYTES', 256 * 1024))
+SHARED_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_SHARED_MAX_ENTRIES', 50000))
+SHARED_CACHE_ENABLED = os.environ.get('LLM_SHARED_CACHE_ENABLED', 'true').lower() == 'true'
+REDIS_URL = os.environ.get('REDIS_URL', os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+
+_INDEX_KEY = 'llmcache:index'
+# Rough chars-per-token ratio, as in the prompt packer
+_CHARS_PER_TOKEN = 4
+
+# key -> (expires_at, compressed response), least recently used first
+_local_cache: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+_local_bytes = 0
+_cache_lock = threading.Lock()
+
+# (org_id, agent_type, model) -> counters, when Redis is unavailable
+_local_stats: Dict[Tuple, Dict[str, int]] = {}
+
+_redis_client = None
+
+
+def _get_redis():
+    """Get binary-safe Redis client for the shared cache (lazy initialization)."""
+    global _redis_client
+    if not SHARED_CACHE_ENABLED:
+        return None
+    if _redis_client is None:
+        try:
+            import redis
+            _redis_client = redis.from_url(REDIS_URL)
+            _redis_client.ping()
+            logger.info("LLM response cache connected to Redis")
+        except Exception as e:
+            logger.warning(f"Redis not available for LLM response cache: {e}")
+            _redis_client = False  # Mark as unavailable
+    return _redis_client if _redis_client else None
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt with whitespace differences removed."""
+    return ' '.join((prompt or '').split())
+
+
+def response_cache_key(provider: str, model: str, temperature: float, prompt: str,
+                       max_tokens: int = None) -> str:
+    """Cache key of one generation request."""
+    digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+    return f"{provider}:{model}:{float(temperature):g}:{max_tokens or ''}:{digest}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(text or '') // _CHARS_PER_TOKEN + 1
+
+
+def _shared_key(cache_key: str) -> str:
+    return f"llmcache:{hashlib.sha1(cache_key.encode('utf-8')).hexdigest()}"
+
+
+def _local_get(cache_key: str) -> Optional[bytes]:
+    global _local_bytes
+    with _cache_lock:
+        entry = _local_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, blob = entry
+        if expires_at < time.time():
+            del _local_cache[cache_key]
+            _local_bytes -= len(blob)
+            return None
+        _local_cache.move_to_end(cache_key)
+        return blob
+
+
+def _local_set(cache_key: str, blob: bytes, ttl: int):
+    global _local_bytes
+    with _cache_lock:
+        previous = _local_cache.pop(cache_key, None)
+        if previous is not None:
+            _local_bytes -= len(previous[1])
+        _local_cache[cache_key] = (time.time() + ttl, blob)
+        _local_bytes += len(blob)
+        while _local_cache and (len(_local_cache) > CACHE_MAX_ENTRIES or _local_bytes > CACHE_MAX_BYTES):
+            _, (_, evicted) = _local_cache.popitem(last=False)
+            _local_bytes -= len(evicted)
+
+
+def get_cached_response(cache_key: str) -> Optional[str]:
+    """Look up a response in the local LRU, then the shared cache."""
+    blob = _local_get(cache_key)
+
+    if blob is None:
+        redis_client = _get_redis()
+        if redis_client:
+            try:
+                shared_key = _shared_key(cache_key)
+                pipe = redis_client.pipeline()
+                pipe.get(shared_key)
+                pipe.ttl(shared_key)
+                blob, ttl = pipe.execute()
+                if blob:
+                    redis_client.zadd(_INDEX_KEY, {shared_key: time.time()})
+                    _local_set(cache_key, blob, max(int(ttl or 0), 1))
+            except Exception as e:
+                logger.warning(f"LLM cache read error: {e}")
+                blob = None
+
+    if not blob:
+        return None
+    try:
+        return zlib.decompress(blob).decode('utf-8')
+    except Exception as e:
+        logger.warning(f"Corrupt LLM cache entry: {e}")
+        return None
+
+
+def set_cached_response(cache_key: str, response: str, ttl: int = None) -> bool:
+    """
+    Store a response in the local LRU and the shared cache.
+
+    Returns:
+        False if the response was not cached (empty or too large)
+    """
+    if not response:
+        return False
+    blob = zlib.compress(response.encode('utf-8'))
+    if len(blob) > CACHE_MAX_ENTRY_BYTES:
+        return False
+    ttl = ttl or CACHE_TTL
+    _local_set(cache_key, blob, ttl)
+
+    redis_client = _get_redis()
+    if redis_client:
+        try:
+            shared_key = _shared_key(cache_key)
+            pipe = redis_client.pipeline()
+            pipe.setex(shared_key, ttl, blob)
+            pipe.zadd(_INDEX_KEY, {shared_key: time.time()})
+            pipe.zcard(_INDEX_KEY)
+            excess = pipe.execute()[-1] - SHARED_CACHE_MAX_ENTRIES
+            if excess > 0:
+                evicted = [key for key, _ in redis_client.zpopmin(_INDEX_KEY, excess)]
+                if evicted:
+                    redis_client.delete(*evicted)
+        except Exception as e:
+            logger.warning(f"LLM cache write error: {e}")
+    return True
+
+
+def _stats_key(org_id) -> str:
+    return f"llmcache:stats:{org_id}"
+
+
+def record_cache_event(org_id: Optional[int], agent_type: str, model: str, hit: bool,
+                       prompt: str = '', response: str = ''):
+    """Count a cache hit or miss; a hit also counts the tokens it saved."""
+    counters = {'hits': 1} if hit else {'misses': 1}
+    if hit:
+        counters['saved_prompt_tokens'] = estimate_tokens(prompt)
+        counters['saved_completion_tokens'] = estimate_tokens(response)
+
+    redis_client = _get_redis()
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline()
+            for name, value in counters.items():
+                pipe.hincrby(_stats_key(org_id), f"{agent_type}|{model}|{name}", value)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"LLM cache stats error: {e}")
+
+    with _cache_lock:
+        stats = _local_stats.setdefault((org_id, agent_type, model), {})
+        for name, value in counters.items():
+            stats[name] = stats.get(name, 0) + value
+
+
+def get_response_cache_stats(org_id: Optional[int]) -> List[Dict]:
+    """
+    Cache counters of an organization.
+
+    Returns:
+        One dict per agent type and model with hits, misses, hit_rate,
+        saved_prompt_tokens and saved_completion_tokens
+    """
+    counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+    redis_client = _get_redis()
+    if redis_client:
+        try:
+            for field, value in redis_client.hgetall(_stats_key(org_id)).items():
+                agent_type, model, name = field.decode('utf-8').rsplit('|', 2)
+                counters.setdefault((agent_type, model), {})[name] = int(value)
+        except Exception as e:
+            logger.warning(f"LLM cache stats read error: {e}")
+    else:
+        with _cache_lock:
+            for (stats_org, agent_type, model), stats in _local_stats.items():
+                if stats_org == org_id:
+                    counters[(agent_type, model)] = dict(stats)
+
+    summary = []
+    for (agent_type, model), stats in sorted(counters.items()):
+        hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+        summary.append({
+            'agent_type': agent_type,
+            'model': model,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'saved_prompt_tokens': stats.get('saved_prompt_tokens', 0),
+            'saved_completion_tokens': stats.get('saved_completion_tokens', 0)
+        })
+    return summary
+
+
+def cache_settings(agent_config) -> Tuple[bool, Optional[int]]:
+    """
+    Whether an AgentAIConfig opted into response caching, and its TTL.
+
+    Returns:
+        (enabled, ttl_seconds or None for the default)
+    """
+    metadata = getattr(agent_config, 'config_metadata', None) or {}
+    ttl = metadata.get('response_cache_ttl')
+    return bool(metadata.get('response_cache')), int(ttl) if ttl else None
+
+
+def clear_cache(shared: bool = False) -> int:
+    """
+    Clear the response cache.
+
+    Args:
+        shared: Also remove entries from the shared Redis cache
+
+    Returns:
+        Number of shared entries removed
+    """
+    global _local_bytes
+    with _cache_lock:
+        _local_cache.clear()
+        _local_bytes = 0
+    logger.info("Cleared LLM response cache")
+
+    if not shared:
+        return 0
+    redis_client = _get_redis()
+    if not redis_client:
+        return 0
+    try:
+        keys = redis_client.zrange(_INDEX_KEY, 0, -1)
+        removed = redis_client.delete(*keys) if keys else 0
+        redis_client.delete(_INDEX_KEY)
+        return removed
+    except Exception as e:
+        logger.error(f"LLM cache clear error: {e}")
+    return 0
+
+
+def get_cache_stats() -> dict:
+    """Get response cache storage statistics."""
+    with _cache_lock:
+        entries, size_bytes = len(_local_cache), _local_bytes
+    return {
+        'local_entries': entries,
+        'local_max_entries': CACHE_MAX_ENTRIES,
+        'local_size_bytes': size_bytes,
+        'local_max_bytes': CACHE_MAX_BYTES,
+        'shared_enabled': _get_redis() is not None,
+        'ttl_seconds': CACHE_TTL,
+    }
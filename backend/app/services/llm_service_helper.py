@@ -31,6 +31,7 @@ def get_llm_provider(org_id: int, agent_type: str = 'default'):
     """
     from app.services.ai_config_service import AIConfigService
     from app.services.llm_providers import LLMProviderFactory
+    from app.services.llm_providers.cached_provider import with_response_cache
     
     try:
         # Get configuration from database
@@ -76,7 +77,9 @@ def get_llm_provider(org_id: int, agent_type: str = 'default'):
         
         print(f"[LLM_HELPER] ✓ Successfully created {type(provider).__name__}")
         logger.info(f"Created {provider_name} provider with model {config.model} for org {org_id}")
-        return provider
+        
+        # Opt-in response cache (config_metadata.response_cache)
+        return with_response_cache(provider, config, org_id=org_id, agent_type=agent_type)
         
     except Exception as e:
         logger.error(f"Failed to get LLM provider for org {org_id}: {e}")
@@ -220,5 +220,27 @@ def get_usage_summary(org_id: int, days: int = 30) -> Dict:
                 'cost': float(m.cost or 0)
             }
             for m in by_model
-        ]
+        ],
+        'response_cache': get_response_cache_summary(org_id)
     }
+
+
+def get_response_cache_summary(org_id: int) -> List[Dict]:
+    """
+    LLM response cache hit rates and the tokens/cost the hits saved.
+    
+    Args:
+        org_id: Organization ID
+        
+    Returns:
+        List of per agent type and model cache stats
+    """
+    from app.services.llm_response_cache import get_response_cache_stats
+    
+    summary = []
+    for entry in get_response_cache_stats(org_id):
+        saved_cost = estimate_cost(
+            entry['model'] or '', entry['saved_prompt_tokens'], entry['saved_completion_tokens']
+        )
+        summary.append({**entry, 'saved_cost': float(saved_cost)})
+    return summary
@@ -1,23 +1,64 @@
 """
 Mermaid Service - Renders Mermaid.js diagrams to PNG images
 
-Uses the mermaid.ink public API for server-side rendering.
+Uses the mermaid.ink public API (or a compatible renderer configured via
+MERMAID_RENDER_URL) for server-side rendering.
+
+Rendered images are kept in two tiers:
+- a size-bounded in-process LRU (MERMAID_CACHE_MAX_ENTRIES)
+- a shared Redis cache so gunicorn and Celery processes reuse each other's renders
 """
 import base64
 import hashlib
 import io
 import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
 import requests
-from typing import Optional
-from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
-# mermaid.ink API base URL
-MERMAID_INK_URL = "https://mermaid.ink/img/"
+# Renderer endpoint (mermaid.ink compatible: GET <url><base64-diagram>)
+MERMAID_INK_URL = os.environ.get('MERMAID_RENDER_URL', 'https://mermaid.ink/img/')
+RENDER_TIMEOUT = int(os.environ.get('MERMAID_RENDER_TIMEOUT', 30))
+
+# Local LRU + shared cache configuration
+CACHE_MAX_ENTRIES = int(os.environ.get('MERMAID_CACHE_MAX_ENTRIES', 128))
+SHARED_CACHE_TTL = int(os.environ.get('MERMAID_CACHE_TTL', 7 * 86400))  # 7 days default
+SHARED_CACHE_ENABLED = os.environ.get('MERMAID_SHARED_CACHE_ENABLED', 'true').lower() == 'true'
+REDIS_URL = os.environ.get('REDIS_URL', os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+PREFETCH_WORKERS = int(os.environ.get('MERMAID_PREFETCH_WORKERS', 4))
+
+# Matches ```mermaid fenced blocks inside markdown content
+MERMAID_BLOCK_PATTERN = re.compile(r'```mermaid[^\n]*\n(.*?)```', re.DOTALL | re.IGNORECASE)
+
+# Cache for rendered diagrams (in-memory, process-scoped, bounded LRU)
+_diagram_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
 
-# Cache for rendered diagrams (in-memory, process-scoped)
-_diagram_cache: dict = {}
+_redis_client = None
+
+
+def _get_redis():
+    """Get binary-safe Redis client for the shared cache (lazy initialization)."""
+    global _redis_client
+    if not SHARED_CACHE_ENABLED:
+        return None
+    if _redis_client is None:
+        try:
+            import redis
+            _redis_client = redis.from_url(REDIS_URL)
+            _redis_client.ping()
+            logger.info("Mermaid diagram cache connected to Redis")
+        except Exception as e:
+            logger.warning(f"Redis not available for mermaid diagram cache: {e}")
+            _redis_client = False  # Mark as unavailable
+    return _redis_client if _redis_client else None
 
 
 def get_diagram_cache_key(mermaid_code: str) -> str:
@@ -25,11 +66,64 @@ def get_diagram_cache_key(mermaid_code: str) -> str:
     return hashlib.md5(mermaid_code.encode('utf-8')).hexdigest()
 
 
+def _shared_key(cache_key: str) -> str:
+    return f"mermaid:png:{cache_key}"
+
+
+def _local_get(cache_key: str) -> Optional[bytes]:
+    with _cache_lock:
+        image_data = _diagram_cache.get(cache_key)
+        if image_data is not None:
+            _diagram_cache.move_to_end(cache_key)
+        return image_data
+
+
+def _local_set(cache_key: str, image_data: bytes):
+    with _cache_lock:
+        _diagram_cache[cache_key] = image_data
+        _diagram_cache.move_to_end(cache_key)
+        while len(_diagram_cache) > CACHE_MAX_ENTRIES:
+            _diagram_cache.popitem(last=False)
+
+
+def _get_cached(cache_key: str) -> Optional[bytes]:
+    """Look up a diagram in the local LRU, then the shared cache."""
+    image_data = _local_get(cache_key)
+    if image_data is not None:
+        return image_data
+
+    redis_client = _get_redis()
+    if not redis_client:
+        return None
+    try:
+        image_data = redis_client.get(_shared_key(cache_key))
+    except Exception as e:
+        logger.warning(f"Mermaid cache read error: {e}")
+        return None
+    if image_data:
+        _local_set(cache_key, image_data)
+        return image_data
+    return None
+
+
+def _set_cached(cache_key: str, image_data: bytes):
+    """Store a diagram in the local LRU and the shared cache."""
+    _local_set(cache_key, image_data)
+
+    redis_client = _get_redis()
+    if not redis_client:
+        return
+    try:
+        redis_client.setex(_shared_key(cache_key), SHARED_CACHE_TTL, image_data)
+    except Exception as e:
+        logger.warning(f"Mermaid cache write error: {e}")
+
+
 def render_mermaid_to_png(mermaid_code: str, use_cache: bool = True) -> Optional[bytes]:
     """
     Render a Mermaid.js diagram to PNG image bytes.
     
-    Uses the mermaid.ink public API for rendering.
+    Uses the configured mermaid.ink compatible endpoint for rendering.
     
     Args:
         mermaid_code: The Mermaid diagram code
@@ -47,9 +141,11 @@ def render_mermaid_to_png(mermaid_code: str, use_cache: bool = True) -> Optional
     
     # Check cache first
     cache_key = get_diagram_cache_key(mermaid_code)
-    if use_cache and cache_key in _diagram_cache:
-        logger.debug(f"Using cached diagram for key {cache_key[:8]}...")
-        return _diagram_cache[cache_key]
+    if use_cache:
+        cached = _get_cached(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached diagram for key {cache_key[:8]}...")
+            return cached
     
     try:
         # Encode the mermaid code as base64 for the mermaid.ink API
@@ -60,12 +156,12 @@ def render_mermaid_to_png(mermaid_code: str, use_cache: bool = True) -> Optional
         # Build the URL
         url = f"{MERMAID_INK_URL}{encoded_diagram}"
         
-        logger.info(f"Rendering mermaid diagram via mermaid.ink...")
+        logger.info(f"Rendering mermaid diagram via {MERMAID_INK_URL}...")
         
         # Make the request with a reasonable timeout
         response = requests.get(
             url,
-            timeout=30,
+            timeout=RENDER_TIMEOUT,
             headers={
                 'Accept': 'image/png',
                 'User-Agent': 'RFP-Proposal-Generator/1.0'
@@ -85,14 +181,14 @@ def render_mermaid_to_png(mermaid_code: str, use_cache: bool = True) -> Optional
                 
                 # Cache the result
                 if use_cache:
-                    _diagram_cache[cache_key] = image_data
+                    _set_cached(cache_key, image_data)
                 
                 return image_data
             else:
                 logger.error("Response was not valid image data (PNG or JPEG)")
                 return None
         else:
-            logger.error(f"mermaid.ink returned status {response.status_code}")
+            logger.error(f"Mermaid renderer returned status {response.status_code}")
             return None
             
     except requests.Timeout:
@@ -106,6 +202,85 @@ def render_mermaid_to_png(mermaid_code: str, use_cache: bool = True) -> Optional
         return None
 
 
+def extract_mermaid_blocks(content: str) -> List[str]:
+    """
+    Extract the bodies of all ```mermaid code blocks from markdown content.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        List of mermaid diagram sources, in document order
+    """
+    if not content or '```' not in content:
+        return []
+    return [block for block in MERMAID_BLOCK_PATTERN.findall(content) if block.strip()]
+
+
+def prefetch_diagrams(mermaid_codes: Iterable[str], max_workers: int = None) -> Dict[str, bytes]:
+    """
+    Render a set of diagrams concurrently and warm the caches.
+
+    Call this before DOCX/PPT assembly so the serial render calls made while
+    building the document are all cache hits.
+
+    Args:
+        mermaid_codes: Mermaid diagram sources (duplicates are rendered once)
+        max_workers: Concurrent render requests (default MERMAID_PREFETCH_WORKERS)
+
+    Returns:
+        Dict mapping cache key to rendered image bytes (failed renders omitted)
+    """
+    unique: Dict[str, str] = {}
+    for code in mermaid_codes:
+        if code and code.strip():
+            code = code.strip()
+            unique.setdefault(get_diagram_cache_key(code), code)
+
+    results: Dict[str, bytes] = {}
+    pending = []
+    for cache_key, code in unique.items():
+        cached = _get_cached(cache_key)
+        if cached is not None:
+            results[cache_key] = cached
+        else:
+            pending.append((cache_key, code))
+
+    if not pending:
+        return results
+
+    workers = max(1, min(max_workers or PREFETCH_WORKERS, len(pending)))
+    logger.info(f"Prefetching {len(pending)} mermaid diagrams with {workers} workers "
+                f"({len(results)} already cached)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mermaid-prefetch') as executor:
+        rendered = executor.map(lambda item: (item[0], render_mermaid_to_png(item[1])), pending)
+        for cache_key, image_data in rendered:
+            if image_data:
+                results[cache_key] = image_data
+
+    return results
+
+
+def prefetch_diagrams_in_content(contents: Iterable[str], max_workers: int = None) -> Dict[str, bytes]:
+    """
+    Prefetch every mermaid block found in a collection of markdown texts.
+
+    Args:
+        contents: Markdown texts (e.g. section contents and answers)
+        max_workers: Concurrent render requests
+
+    Returns:
+        Dict mapping cache key to rendered image bytes
+    """
+    codes = []
+    for content in contents:
+        codes.extend(extract_mermaid_blocks(content))
+    if not codes:
+        return {}
+    return prefetch_diagrams(codes, max_workers=max_workers)
+
+
 def render_mermaid_to_file(mermaid_code: str, output_path: str) -> bool:
     """
     Render a Mermaid.js diagram and save to a file.
@@ -154,8 +329,43 @@ def render_mermaid_to_bytes_io(mermaid_code: str) -> Optional[io.BytesIO]:
     return None
 
 
-def clear_cache():
-    """Clear the diagram cache."""
-    global _diagram_cache
-    _diagram_cache.clear()
+def clear_cache(shared: bool = False) -> int:
+    """
+    Clear the diagram cache.
+
+    Args:
+        shared: Also remove entries from the shared Redis cache
+
+    Returns:
+        Number of shared entries removed
+    """
+    with _cache_lock:
+        _diagram_cache.clear()
     logger.info("Cleared mermaid diagram cache")
+
+    if not shared:
+        return 0
+    redis_client = _get_redis()
+    if not redis_client:
+        return 0
+    try:
+        keys = redis_client.keys(_shared_key('*'))
+        if keys:
+            return redis_client.delete(*keys)
+    except Exception as e:
+        logger.error(f"Mermaid cache clear error: {e}")
+    return 0
+
+
+def get_cache_stats() -> dict:
+    """Get diagram cache statistics."""
+    with _cache_lock:
+        entries = len(_diagram_cache)
+        size_bytes = sum(len(v) for v in _diagram_cache.values())
+    return {
+        'local_entries': entries,
+        'local_max_entries': CACHE_MAX_ENTRIES,
+        'local_size_bytes': size_bytes,
+        'shared_enabled': _get_redis() is not None,
+        'renderer_url': MERMAID_INK_URL,
+    }
@@ -164,6 +164,15 @@ class PPTService:
         # Track if we're using a template
         self._using_template = self.template_path is not None
         
+        # Render all diagrams concurrently before building slides
+        mermaid_codes = [s.get('mermaid_code') for s in slides_data if s.get('mermaid_code')]
+        if mermaid_codes:
+            try:
+                from .mermaid_service import prefetch_diagrams
+                prefetch_diagrams(mermaid_codes)
+            except Exception as e:
+                logger.warning(f"Diagram prefetch failed, rendering inline: {e}")
+        
         for slide_data in slides_data:
             slide_type = slide_data.get('slide_type', 'content')
             
@@ -0,0 +1,313 @@
+"""
+Realtime Presence Service.
+
+Tracks which users are active on a project for the Socket.IO collaboration
+features. Presence lives in Redis so every gunicorn/eventlet worker sees the
+same users, with an in-memory fallback for single-process development.
+
+Redis layout:
+- presence:project:<project_id>  hash  sid -> JSON user entry (incl. last_seen)
+- presence:sid:<sid>             set   project ids the socket has joined
+
+Entries are refreshed by heartbeats; entries whose last_seen is older than
+PRESENCE_TTL are pruned on read, and idle keys expire on their own.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get('REDIS_URL', os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+PRESENCE_TTL = int(os.environ.get('PRESENCE_TTL', 90))  # seconds without heartbeat before a user is dropped
+
+# Content broadcast tuning
+CONTENT_BROADCAST_INTERVAL = float(os.environ.get('CONTENT_BROADCAST_INTERVAL', 0.3))  # seconds
+CONTENT_KEYFRAME_EVERY = int(os.environ.get('CONTENT_KEYFRAME_EVERY', 20))  # full content every N broadcasts
+
+
+def _project_key(project_id) -> str:
+    return f"presence:project:{project_id}"
+
+
+def _sid_key(sid: str) -> str:
+    return f"presence:sid:{sid}"
+
+
+class PresenceStore:
+    """Redis-backed presence store with in-memory fallback."""
+
+    def __init__(self, redis_url: str = None, ttl: int = PRESENCE_TTL):
+        self.ttl = ttl
+        self.redis = None
+        self._projects: Dict[str, Dict[str, dict]] = {}
+        self._sids: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+        try:
+            import redis
+            client = redis.from_url(redis_url or REDIS_URL, decode_responses=True)
+            client.ping()
+            self.redis = client
+        except Exception as e:
+            logger.warning(f"Redis not available for presence, using in-memory store: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether presence is shared across processes."""
+        return self.redis is not None
+
+    def join(self, project_id, sid: str, info: Dict[str, Any]) -> Dict[str, dict]:
+        """Register a socket on a project and return the project's users."""
+        project_id = str(project_id)
+        entry = dict(info, last_seen=time.time())
+
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hset(_project_key(project_id), sid, json.dumps(entry))
+            pipe.expire(_project_key(project_id), self.ttl)
+            pipe.sadd(_sid_key(sid), project_id)
+            pipe.expire(_sid_key(sid), self.ttl)
+            pipe.execute()
+        else:
+            with self._lock:
+                self._projects.setdefault(project_id, {})[sid] = entry
+                self._sids.setdefault(sid, set()).add(project_id)
+
+        return self.get_project_users(project_id)
+
+    def leave(self, project_id, sid: str) -> Dict[str, dict]:
+        """Remove a socket from a project and return the remaining users."""
+        project_id = str(project_id)
+
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hdel(_project_key(project_id), sid)
+            pipe.srem(_sid_key(sid), project_id)
+            pipe.execute()
+        else:
+            with self._lock:
+                self._projects.get(project_id, {}).pop(sid, None)
+                self._sids.get(sid, set()).discard(project_id)
+
+        return self.get_project_users(project_id)
+
+    def remove_sid(self, sid: str) -> List[str]:
+        """
+        Remove a socket from every project it joined.
+
+        Uses the sid -> projects reverse index, so cost is proportional to the
+        socket's own projects rather than all active projects.
+
+        Returns:
+            Project ids the socket was removed from
+        """
+        if self.redis:
+            project_ids = list(self.redis.smembers(_sid_key(sid)))
+            pipe = self.redis.pipeline()
+            for project_id in project_ids:
+                pipe.hdel(_project_key(project_id), sid)
+            pipe.delete(_sid_key(sid))
+            pipe.execute()
+            return project_ids
+
+        with self._lock:
+            project_ids = list(self._sids.pop(sid, set()))
+            for project_id in project_ids:
+                self._projects.get(project_id, {}).pop(sid, None)
+            return project_ids
+
+    def get_entry(self, project_id, sid: str) -> Optional[dict]:
+        """Get a single socket's presence entry on a project."""
+        project_id = str(project_id)
+        if self.redis:
+            raw = self.redis.hget(_project_key(project_id), sid)
+            return json.loads(raw) if raw else None
+        with self._lock:
+            entry = self._projects.get(project_id, {}).get(sid)
+            return dict(entry) if entry else None
+
+    def update_cursor(self, project_id, sid: str, cursor: Any) -> Optional[dict]:
+        """Store a socket's cursor (also counts as a heartbeat)."""
+        entry = self.get_entry(project_id, sid)
+        if entry is None:
+            return None
+        entry['cursor'] = cursor
+        self._store_entry(str(project_id), sid, entry)
+        return entry
+
+    def heartbeat(self, sid: str) -> List[str]:
+        """
+        Refresh last_seen for every project a socket has joined.
+
+        Returns:
+            Project ids that were refreshed
+        """
+        if self.redis:
+            project_ids = list(self.redis.smembers(_sid_key(sid)))
+            if project_ids:
+                self.redis.expire(_sid_key(sid), self.ttl)
+        else:
+            with self._lock:
+                project_ids = list(self._sids.get(sid, set()))
+
+        for project_id in project_ids:
+            entry = self.get_entry(project_id, sid)
+            if entry is not None:
+                self._store_entry(project_id, sid, entry)
+        return project_ids
+
+    def get_project_users(self, project_id) -> Dict[str, dict]:
+        """Get live users on a project, pruning entries without a recent heartbeat."""
+        project_id = str(project_id)
+        cutoff = time.time() - self.ttl
+
+        if self.redis:
+            raw_entries = self.redis.hgetall(_project_key(project_id))
+            entries = {sid: json.loads(raw) for sid, raw in raw_entries.items()}
+        else:
+            with self._lock:
+                entries = {sid: dict(e) for sid, e in self._projects.get(project_id, {}).items()}
+
+        stale = [sid for sid, entry in entries.items() if entry.get('last_seen', 0) < cutoff]
+        if stale:
+            if self.redis:
+                self.redis.hdel(_project_key(project_id), *stale)
+            else:
+                with self._lock:
+                    for sid in stale:
+                        self._projects.get(project_id, {}).pop(sid, None)
+            for sid in stale:
+                entries.pop(sid)
+
+        return entries
+
+    def _store_entry(self, project_id: str, sid: str, entry: dict):
+        entry['last_seen'] = time.time()
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hset(_project_key(project_id), sid, json.dumps(entry))
+            pipe.expire(_project_key(project_id), self.ttl)
+            pipe.execute()
+        else:
+            with self._lock:
+                self._projects.setdefault(project_id, {})[sid] = entry
+
+
+class ContentDeltaEncoder:
+    """
+    Encodes successive versions of a text as splice deltas.
+
+    Each stream (e.g. one socket editing one section) remembers the last text
+    it sent. The next version is encoded as a single splice
+    ``{start, end, text}`` replacing ``previous[start:end]``, which for
+    typing is a few characters instead of the full section. A full keyframe
+    is sent for the first version, every ``keyframe_every`` versions, and
+    whenever the delta would not be smaller than the content itself.
+
+    Delta offsets and lengths are in UTF-16 code units, as JavaScript
+    strings index them, so a client can splice with ``String.slice``.
+    """
+
+    def __init__(self, keyframe_every: int = CONTENT_KEYFRAME_EVERY):
+        self.keyframe_every = keyframe_every
+        self._last: Dict[Any, str] = {}
+        self._counts: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, stream_key: Any, content: str) -> Dict[str, Any]:
+        """
+        Encode the next version of a stream.
+
+        Returns:
+            {'content': str} for a keyframe, or
+            {'delta': {'start', 'end', 'text'}, 'base_length': int, 'length': int}
+            with offsets and lengths in UTF-16 code units
+        """
+        content = content or ''
+        with self._lock:
+            previous = self._last.get(stream_key)
+            count = self._counts.get(stream_key, 0)
+            self._last[stream_key] = content
+            self._counts[stream_key] = count + 1
+
+        if previous is None or count % self.keyframe_every == 0:
+            return {'content': content}
+
+        delta = compute_splice(previous, content)
+        if len(delta['text']) + 32 >= len(content):
+            return {'content': content}
+        return {
+            'delta': {
+                'start': _utf16_length(previous[:delta['start']]),
+                'end': _utf16_length(previous[:delta['end']]),
+                'text': delta['text'],
+            },
+            'base_length': _utf16_length(previous),
+            'length': _utf16_length(content),
+        }
+
+    def latest(self, prefix: tuple) -> Dict[Any, str]:
+        """Last version of each stream whose tuple key starts with ``prefix``."""
+        with self._lock:
+            return {
+                key: content for key, content in self._last.items()
+                if isinstance(key, tuple) and key[:len(prefix)] == prefix
+            }
+
+    def reset(self, stream_key: Any = None):
+        """Forget one stream (or all streams)."""
+        with self._lock:
+            if stream_key is None:
+                self._last.clear()
+                self._counts.clear()
+            else:
+                self._last.pop(stream_key, None)
+                self._counts.pop(stream_key, None)
+
+    def reset_prefix(self, prefix: Any):
+        """Forget all streams whose tuple key starts with ``prefix``."""
+        with self._lock:
+            for key in [k for k in self._last if isinstance(k, tuple) and k[0] == prefix]:
+                self._last.pop(key, None)
+                self._counts.pop(key, None)
+
+
+def compute_splice(old: str, new: str) -> Dict[str, Any]:
+    """Compute the single splice that turns ``old`` into ``new``."""
+    max_prefix = min(len(old), len(new))
+    start = 0
+    while start < max_prefix and old[start] == new[start]:
+        start += 1
+
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    return {'start': start, 'end': old_end, 'text': new[start:new_end]}
+
+
+def apply_splice(old: str, delta: Dict[str, Any]) -> str:
+    """Apply a splice produced by compute_splice."""
+    return old[:delta['start']] + delta['text'] + old[delta['end']:]
+
+
+def _utf16_length(text: str) -> int:
+    """Length of ``text`` in UTF-16 code units (characters beyond the BMP count twice)."""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+# Singleton getter
+_presence_instance = None
+
+
+def get_presence_store() -> PresenceStore:
+    """Get presence store instance."""
+    global _presence_instance
+    if _presence_instance is None:
+        _presence_instance = PresenceStore()
+    return _presence_instance
@@ -2,21 +2,37 @@
 Qdrant Vector Database Service.
 
 Handles embeddings storage and semantic search.
+
+Each organization's points are mirrored into a local NumPy index
+(services/vectordb LocalVectorAdapter) from the same upsert/delete paths.
+Small organizations are searched locally without a Qdrant round trip, and
+any organization with a local index keeps retrieval working while Qdrant
+is unreachable.
 """
 import logging
 import hashlib
+import os
+import time
 from typing import List, Dict, Optional
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+LOCAL_VECTOR_INDEX_ENABLED = os.environ.get('LOCAL_VECTOR_INDEX_ENABLED', 'true').lower() == 'true'
+# Organizations with at most this many points are searched locally
+LOCAL_VECTOR_INDEX_MAX_ITEMS = int(os.environ.get('LOCAL_VECTOR_INDEX_MAX_ITEMS', 2000))
+# Seconds before an organization found too large for the local index is counted again
+LOCAL_VECTOR_INDEX_SKIP_TTL = int(os.environ.get('LOCAL_VECTOR_INDEX_SKIP_TTL', 3600))
+# Payload fields filtered through precomputed masks in the local index
+LOCAL_INDEXED_FIELDS = ['folder_id', 'geography', 'client_type', 'industry', 'knowledge_profile_id']
+
 # Try to import Qdrant client
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.models import (
-        Distance, VectorParams, PointStruct,
-        Filter, FieldCondition, MatchValue
+        PointStruct, Filter, FieldCondition, MatchValue
     )
+    from app.services.vectordb.provisioning import get_search_params
     QDRANT_AVAILABLE = True
 except ImportError:
     QDRANT_AVAILABLE = False
@@ -34,44 +50,41 @@ class QdrantService:
         self.client = None
         self.org_id = org_id
         self.embedding_provider = None
+        self.local_index = _get_local_index() if LOCAL_VECTOR_INDEX_ENABLED else None
         
-        if not QDRANT_AVAILABLE:
+        if QDRANT_AVAILABLE:
+            qdrant_url = current_app.config.get('QDRANT_URL', 'http://localhost:6333')
+            api_key = current_app.config.get('QDRANT_API_KEY')
+            
+            try:
+                self.client = QdrantClient(
+                    url=qdrant_url,
+                    api_key=api_key,
+                    timeout=10
+                )
+                self._ensure_collection()
+                self.enabled = True
+                logger.info("Qdrant connection established")
+            except Exception as e:
+                logger.error(f"Failed to connect to Qdrant: {e}")
+        else:
             logger.warning("Qdrant client not available")
-            return
         
-        qdrant_url = current_app.config.get('QDRANT_URL', 'http://localhost:6333')
-        api_key = current_app.config.get('QDRANT_API_KEY')
-        
-        try:
-            self.client = QdrantClient(
-                url=qdrant_url,
-                api_key=api_key,
-                timeout=10
-            )
-            self._ensure_collection()
-            self.enabled = True
-            logger.info("Qdrant connection established")
-            
-            # Initialize embedding provider if org_id provided
-            if org_id:
+        # Initialize embedding provider if org_id provided
+        if org_id and (self.enabled or self.local_index is not None):
+            try:
                 self._init_embedding_provider(org_id)
-        except Exception as e:
-            logger.error(f"Failed to connect to Qdrant: {e}")
+            except Exception as e:
+                logger.error(f"Failed to initialize embedding provider: {e}")
     
     def _ensure_collection(self):
-        """Create collection if it doesn't exist."""
-        collections = self.client.get_collections().collections
-        exists = any(c.name == self.COLLECTION_NAME for c in collections)
-        
-        if not exists:
-            self.client.create_collection(
-                collection_name=self.COLLECTION_NAME,
-                vectors_config=VectorParams(
-                    size=self.EMBEDDING_DIMENSION,
-                    distance=Distance.COSINE
-                )
-            )
-            logger.info(f"Created collection: {self.COLLECTION_NAME}")
+        """Create collection (quantized, payload-indexed, behind an alias) if it doesn't exist."""
+        from app.services.vectordb.provisioning import ensure_collection, KNOWLEDGE_BASE
+        from app.services.vectordb.tenancy import get_tenant_router
+        
+        ensure_collection(self.client, KNOWLEDGE_BASE, self.EMBEDDING_DIMENSION)
+        # Shared, per-tenant shard, or dedicated collection per organization
+        self.router = get_tenant_router(self.client, KNOWLEDGE_BASE)
     
     def _init_embedding_provider(self, org_id: int):
         """Initialize embedding provider from organization config.
@@ -173,6 +186,82 @@ class QdrantService:
         """Generate unique point ID."""
         return hashlib.md5(f"{org_id}:{item_id}".encode()).hexdigest()
     
+    def _local_collection_name(self, org_id: int) -> str:
+        return f"{self.COLLECTION_NAME}_org_{org_id}"
+    
+    def _ensure_local_collection(self, org_id: int, dimension: int = None) -> Optional[str]:
+        """
+        Local index collection for an organization, created when possible.
+        
+        Existing Qdrant points are copied (vectors included, no re-embedding)
+        for organizations within LOCAL_VECTOR_INDEX_MAX_ITEMS. Without Qdrant
+        an empty collection is started so new items stay searchable offline.
+        
+        Returns:
+            Collection name, or None if the organization is not indexed locally
+        """
+        if self.local_index is None:
+            return None
+        name = self._local_collection_name(org_id)
+        if self.local_index.has_collection(name):
+            return name
+        if _local_skipped_orgs.get(org_id, 0) > time.monotonic():
+            return None
+        
+        if self.enabled:
+            try:
+                return self._bootstrap_local_collection(org_id, name, dimension)
+            except Exception as e:
+                logger.warning(f"Failed to build local vector index for org {org_id}: {e}")
+                return None
+        
+        if dimension and self.local_index.create_collection(
+            name, dimension, indexed_fields=LOCAL_INDEXED_FIELDS
+        ):
+            return name
+        return None
+    
+    def _bootstrap_local_collection(self, org_id: int, name: str, dimension: int = None) -> Optional[str]:
+        """Copy an organization's Qdrant points into a new local collection."""
+        from app.services.vectordb import VectorRecord
+        
+        org_filter = Filter(must=[FieldCondition(key="org_id", match=MatchValue(value=org_id))])
+        route = self.router.route(org_id)
+        total = self.client.count(
+            collection_name=route.collection, count_filter=org_filter, exact=True,
+            shard_key_selector=route.shard_key
+        ).count
+        if total > LOCAL_VECTOR_INDEX_MAX_ITEMS:
+            _local_skipped_orgs[org_id] = time.monotonic() + LOCAL_VECTOR_INDEX_SKIP_TTL
+            return None
+        
+        records, offset = [], None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=route.collection,
+                scroll_filter=org_filter,
+                limit=256,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+                shard_key_selector=route.shard_key
+            )
+            records.extend(
+                VectorRecord(id=str(p.payload.get("item_id")), vector=p.vector, payload=p.payload)
+                for p in points
+            )
+            if offset is None:
+                break
+        
+        dimension = len(records[0].vector) if records else dimension
+        if not dimension or not self.local_index.create_collection(
+            name, dimension, indexed_fields=LOCAL_INDEXED_FIELDS
+        ):
+            return None
+        self.local_index.upsert(name, records)
+        logger.info(f"Built local vector index for org {org_id} ({len(records)} points)")
+        return name
+    
     def upsert_item(
         self,
         item_id: int,
@@ -194,7 +283,7 @@ class QdrantService:
         Returns:
             The point ID (embedding_id)
         """
-        if not self.enabled:
+        if not self.enabled and self.local_index is None:
             logger.debug("Qdrant not enabled, skipping upsert")
             return ""
         
@@ -219,36 +308,64 @@ class QdrantService:
             **(metadata or {})
         }
         
-        self.client.upsert(
-            collection_name=self.COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload=payload
-                )
-            ]
-        )
+        if self.enabled:
+            self.router.run(org_id, lambda route: self.client.upsert(
+                collection_name=route.collection,
+                points=[
+                    PointStruct(
+                        id=point_id,
+                        vector=embedding,
+                        payload=payload
+                    )
+                ],
+                shard_key_selector=route.shard_key
+            ), write=True)
+        
+        local_name = self._ensure_local_collection(org_id, dimension=len(embedding))
+        if local_name:
+            from app.services.vectordb import VectorRecord
+            try:
+                self.local_index.upsert(local_name, [
+                    VectorRecord(id=str(item_id), vector=embedding, payload=payload)
+                ])
+            except Exception as e:
+                logger.error(f"Failed to update local vector index: {e}")
         
         return point_id
     
     def delete_item(self, item_id: int, org_id: int) -> bool:
-        """Delete a knowledge item from Qdrant."""
+        """Delete a knowledge item from Qdrant (and the local index)."""
+        if self.local_index is not None and self.local_index.has_collection(self._local_collection_name(org_id)):
+            self.local_index.delete(self._local_collection_name(org_id), [str(item_id)])
+        
         if not self.enabled:
             return False
         
         point_id = self._generate_point_id(item_id, org_id)
         
         try:
-            self.client.delete(
-                collection_name=self.COLLECTION_NAME,
-                points_selector=[point_id]
-            )
+            self.router.run(org_id, lambda route: self.client.delete(
+                collection_name=route.collection,
+                points_selector=[point_id],
+                shard_key_selector=route.shard_key
+            ))
             return True
         except Exception as e:
             logger.error(f"Failed to delete from Qdrant: {e}")
             return False
     
+    def delete_organization(self, org_id: int) -> bool:
+        """Remove all of an organization's points (drops its shard or dedicated collection)."""
+        if self.local_index is not None:
+            self.local_index.delete_collection(self._local_collection_name(org_id))
+        if not self.enabled:
+            return False
+        try:
+            return self.router.delete_tenant(org_id)
+        except Exception as e:
+            logger.error(f"Failed to delete organization {org_id} from Qdrant: {e}")
+            return False
+    
     def search(
         self,
         query: str,
@@ -274,12 +391,22 @@ class QdrantService:
         Returns:
             List of results with item_id, score, and preview
         """
-        if not self.enabled:
+        if not self.enabled and self.local_index is None:
             return []
         
         # Get query embedding
         query_embedding = self._get_embedding(query)
         
+        # Small organizations are served from the local index; it is also
+        # the fallback for any organization while Qdrant is unavailable
+        local_name = self._ensure_local_collection(org_id)
+        if local_name:
+            local_count = self.local_index.get_collection_info(local_name).count
+            if not self.enabled or local_count <= LOCAL_VECTOR_INDEX_MAX_ITEMS:
+                return self._search_local(local_name, query_embedding, folder_id, limit, score_threshold, filters)
+        if not self.enabled:
+            return []
+        
         # Build filter conditions
         filter_conditions = [
             FieldCondition(key="org_id", match=MatchValue(value=org_id))
@@ -326,33 +453,69 @@ class QdrantService:
                         )
                         logger.warning("MatchAny not available, filtering by first profile only")
         
-        results = self.client.search(
-            collection_name=self.COLLECTION_NAME,
-            query_vector=query_embedding,
-            query_filter=Filter(must=filter_conditions),
-            limit=limit,
+        try:
+            results = self.router.run(org_id, lambda route: self.client.search(
+                collection_name=route.collection,
+                shard_key_selector=route.shard_key,
+                query_vector=query_embedding,
+                query_filter=Filter(must=filter_conditions),
+                search_params=get_search_params(),
+                limit=limit,
+                score_threshold=score_threshold
+            ))
+        except Exception as e:
+            if not local_name:
+                raise
+            logger.warning(f"Qdrant search failed, using local vector index: {e}")
+            return self._search_local(local_name, query_embedding, folder_id, limit, score_threshold, filters)
+        
+        return [self._format_result(r.payload, r.score) for r in results]
+    
+    def _search_local(
+        self,
+        local_name: str,
+        query_embedding: List[float],
+        folder_id: Optional[int],
+        limit: int,
+        score_threshold: float,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """Search an organization's local index with the same filters as Qdrant."""
+        local_filter = {}
+        if folder_id is not None:
+            local_filter['folder_id'] = folder_id
+        for key in ('geography', 'client_type', 'industry'):
+            if filters and filters.get(key):
+                local_filter[key] = filters[key]
+        if filters and filters.get('knowledge_profile_ids'):
+            local_filter['knowledge_profile_id'] = list(filters['knowledge_profile_ids'])
+        
+        results = self.local_index.query(
+            local_name,
+            query_embedding,
+            top_k=limit,
+            filter=local_filter,
             score_threshold=score_threshold
         )
-        
-        return [
-            {
-                "item_id": r.payload.get("item_id"),
-                "title": r.payload.get("title"),
-                "content_preview": r.payload.get("content_preview"),
-                "folder_id": r.payload.get("folder_id"),
-                "tags": r.payload.get("tags", []),
-                "score": round(r.score, 4),
-                "geography": r.payload.get("geography"),
-                "client_type": r.payload.get("client_type"),
-                "industry": r.payload.get("industry"),
-                "knowledge_profile_id": r.payload.get("knowledge_profile_id")
-            }
-            for r in results
-        ]
+        return [self._format_result(r.payload, r.score) for r in results]
+    
+    def _format_result(self, payload: Dict, score: float) -> Dict:
+        return {
+            "item_id": payload.get("item_id"),
+            "title": payload.get("title"),
+            "content_preview": payload.get("content_preview"),
+            "folder_id": payload.get("folder_id"),
+            "tags": payload.get("tags", []),
+            "score": round(score, 4),
+            "geography": payload.get("geography"),
+            "client_type": payload.get("client_type"),
+            "industry": payload.get("industry"),
+            "knowledge_profile_id": payload.get("knowledge_profile_id")
+        }
     
     def reindex_all(self, items: List[Dict], org_id: int) -> int:
         """Reindex all knowledge items for an organization."""
-        if not self.enabled:
+        if not self.enabled and self.local_index is None:
             return 0
         
         count = 0
@@ -375,6 +538,34 @@ class QdrantService:
 
 # Singleton
 _qdrant_instance = None
+# Organizations too large for the local index, until when (time.monotonic())
+_local_skipped_orgs: Dict[int, float] = {}
+
+
+def _get_local_index():
+    """Process-wide local vector index, None if it cannot be opened."""
+    try:
+        from app.services.vectordb import get_vector_adapter
+        return get_vector_adapter("local")
+    except Exception as e:
+        logger.warning(f"Local vector index unavailable: {e}")
+        return None
+
+def delete_knowledge_item_vectors(item) -> bool:
+    """
+    Remove a knowledge item's vectors wherever they are kept: its Qdrant
+    point and local index row (also while Qdrant is down), and its document
+    chunks when it was indexed through hybrid search ("hybrid:<file_id>").
+    """
+    org_id = item.organization_id
+    deleted = get_qdrant_service().delete_item(item_id=item.id, org_id=org_id)
+    embedding_id = item.embedding_id or ''
+    if embedding_id.startswith('hybrid:'):
+        from .hybrid_search_service import get_hybrid_search_service
+        file_id = embedding_id[len('hybrid:'):]
+        deleted = get_hybrid_search_service(org_id).delete_document_chunks(file_id, org_id) or deleted
+    return deleted
+
 
 def get_qdrant_service(org_id: int = None) -> QdrantService:
     """
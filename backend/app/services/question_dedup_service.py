@@ -0,0 +1,265 @@
+"""
+Question Deduplication Service
+
+Groups the questions of a questionnaire into clusters of near-duplicates
+before answers are generated, so each cluster is answered once. Questions
+that closely match a previously approved answer of the organization reuse
+that answer directly instead of being generated at all.
+
+All questions are embedded in one batch (through the embedding cache) and
+compared with cosine similarity. Without an embedding provider only
+questions with identical normalized text are grouped.
+"""
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .answer_reuse_service import AnswerReuseService
+from .embedding_cache import get_cached_embedding, set_cached_embedding
+
+logger = logging.getLogger(__name__)
+
+# Similarity above which two questions of a questionnaire share one answer
+QUESTION_DEDUP_THRESHOLD = float(os.environ.get('QUESTION_DEDUP_THRESHOLD', 0.95))
+# Similarity above which an approved answer is reused without generation
+QUESTION_REUSE_THRESHOLD = float(os.environ.get(
+    'QUESTION_REUSE_THRESHOLD', AnswerReuseService.HIGH_SIMILARITY_THRESHOLD
+))
+# Most recently approved answers compared against
+QUESTION_DEDUP_MAX_APPROVED = int(os.environ.get('QUESTION_DEDUP_MAX_APPROVED', 500))
+
+_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+def normalize_question(text: str) -> str:
+    """Lowercased question text without punctuation or extra whitespace."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def _numbers(text: str) -> frozenset:
+    # "within 4 hours" and "within 24 hours" embed almost identically
+    return frozenset(_NUMBER_PATTERN.findall(text or ''))
+
+
+def _unit_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cluster_by_similarity(vectors, threshold: float, texts: List[str] = None) -> List[int]:
+    """
+    Greedy leader clustering in input order.
+
+    Each row joins the most similar earlier cluster leader with cosine
+    similarity of at least ``threshold``, or becomes a leader itself.
+
+    Args:
+        vectors: One embedding per row
+        threshold: Minimum cosine similarity to join a cluster
+        texts: Optional texts of the rows; rows mentioning different
+            numbers never share a cluster
+
+    Returns:
+        Index of each row's cluster leader (a leader maps to itself)
+    """
+    if len(vectors) == 0:
+        return []
+    unit = _unit_rows(vectors)
+    numbers = [_numbers(t) for t in texts] if texts is not None else None
+    leaders: List[int] = []
+    assignment: List[int] = []
+
+    for i in range(len(unit)):
+        leader = i
+        if leaders:
+            similarities = unit[leaders] @ unit[i]
+            for j in np.argsort(-similarities):
+                if similarities[j] < threshold:
+                    break
+                if numbers is None or numbers[leaders[j]] == numbers[i]:
+                    leader = leaders[j]
+                    break
+        if leader == i:
+            leaders.append(i)
+        assignment.append(leader)
+    return assignment
+
+
+class QuestionDedupService:
+    """Plans which questions need a generated answer."""
+
+    def __init__(
+        self,
+        org_id: int = None,
+        embedding_provider=None,
+        threshold: float = QUESTION_DEDUP_THRESHOLD,
+        reuse_threshold: float = QUESTION_REUSE_THRESHOLD,
+        max_approved: int = QUESTION_DEDUP_MAX_APPROVED
+    ):
+        self.org_id = org_id
+        self.threshold = threshold
+        self.reuse_threshold = reuse_threshold
+        self.max_approved = max_approved
+        self._provider = embedding_provider
+        self._provider_resolved = embedding_provider is not None or org_id is None
+
+    @property
+    def embedding_provider(self):
+        """Embedding provider of the organization (lazy), or None."""
+        if not self._provider_resolved:
+            self._provider_resolved = True
+            try:
+                from .qdrant_service import get_qdrant_service
+                self._provider = get_qdrant_service(org_id=self.org_id).embedding_provider
+            except Exception as e:
+                logger.warning(f"No embedding provider for question deduplication: {e}")
+        return self._provider
+
+    def embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed texts in one batch, serving repeated texts from the cache.
+
+        Returns:
+            Matrix with one row per text, or None without a provider
+        """
+        provider = self.embedding_provider
+        if provider is None or not texts:
+            return None
+        provider_name = getattr(provider, 'provider_name', '')
+        model = getattr(provider, 'model', '')
+
+        vectors: List[Optional[List[float]]] = [get_cached_embedding(t, provider_name, model) for t in texts]
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            embedded = dict(zip(missing, provider.get_batch_embeddings(missing)))
+            for text, vector in embedded.items():
+                set_cached_embedding(text, vector, provider_name, model)
+            vectors = [v if v is not None else embedded[t] for t, v in zip(texts, vectors)]
+        return np.asarray(vectors, dtype=np.float32)
+
+    def load_approved_answers(self) -> List[Dict]:
+        """Most recently approved answers of the organization."""
+        from ..models import Answer, Question
+        from ..extensions import db
+
+        rows = db.session.query(Question, Answer).join(
+            Answer, Answer.question_id == Question.id
+        ).filter(
+            Answer.status == 'approved',
+            Question.project.has(organization_id=self.org_id)
+        ).order_by(Answer.reviewed_at.desc().nullslast()).limit(self.max_approved).all()
+
+        return [
+            {
+                'question_id': question.id,
+                'question_text': question.text,
+                'answer_content': answer.content,
+                'answer_id': answer.id,
+                'category': question.category,
+            }
+            for question, answer in rows
+        ]
+
+    def plan(self, questions: List[Dict]) -> Dict:
+        """
+        Decide which questions to generate, copy or reuse.
+
+        Args:
+            questions: Extracted questions with 'id' and 'text'
+
+        Returns:
+            Dict with:
+            - generate: ids of the questions to generate answers for
+            - duplicates: [question_id, representative_id] pairs answered
+              by copying the representative's answer
+            - reused: approved answer matches, one per reused question
+            - stats: counts, method and timing
+        """
+        started = time.monotonic()
+        texts = [q.get('text', '') for q in questions]
+        method = 'exact'
+        vectors = None
+        try:
+            vectors = self.embed(texts)
+            if vectors is not None:
+                method = 'embedding'
+        except Exception as e:
+            logger.warning(f"Question embedding failed, grouping identical questions only: {e}")
+
+        if vectors is not None:
+            leaders = cluster_by_similarity(vectors, self.threshold, texts)
+        else:
+            first_by_text: Dict[str, int] = {}
+            leaders = [first_by_text.setdefault(normalize_question(t), i) for i, t in enumerate(texts)]
+
+        cluster_leaders = sorted(set(leaders))
+        reused_leaders = self._match_approved(cluster_leaders, texts, vectors)
+
+        generate, duplicates, reused = [], [], []
+        for i, question in enumerate(questions):
+            leader = leaders[i]
+            if leader in reused_leaders:
+                reused.append({**reused_leaders[leader], 'question_id': question.get('id')})
+            elif leader == i:
+                generate.append(question.get('id'))
+            else:
+                duplicates.append([question.get('id'), questions[leader].get('id')])
+
+        stats = {
+            'method': method,
+            'questions': len(questions),
+            'clusters': len(cluster_leaders),
+            'generated': len(generate),
+            'duplicates': len(duplicates),
+            'reused': len(reused),
+            'seconds': round(time.monotonic() - started, 2)
+        }
+        logger.info(
+            f"Question dedup ({method}): {len(questions)} questions -> {len(generate)} to generate, "
+            f"{len(duplicates)} duplicates, {len(reused)} reused approved answers"
+        )
+        return {'generate': generate, 'duplicates': duplicates, 'reused': reused, 'stats': stats}
+
+    def _match_approved(self, leaders: List[int], texts: List[str], vectors) -> Dict[int, Dict]:
+        """Approved answer match for each cluster leader above the reuse threshold."""
+        if vectors is None or not leaders or self.org_id is None:
+            return {}
+        try:
+            approved = self.load_approved_answers()
+            if not approved:
+                return {}
+            approved_vectors = self.embed([a['question_text'] for a in approved])
+        except Exception as e:
+            logger.warning(f"Approved answer lookup failed for question dedup: {e}")
+            return {}
+
+        similarities = _unit_rows(vectors[leaders]) @ _unit_rows(approved_vectors).T
+        matches = {}
+        for row, leader in enumerate(leaders):
+            leader_numbers = _numbers(texts[leader])
+            for col in np.argsort(-similarities[row]):
+                score = float(similarities[row, col])
+                if score < self.reuse_threshold:
+                    break
+                match = approved[col]
+                if _numbers(match['question_text']) == leader_numbers:
+                    matches[leader] = {
+                        'answer_id': match['answer_id'],
+                        'source_question_id': match['question_id'],
+                        'source_question_text': match['question_text'],
+                        'answer_content': match['answer_content'],
+                        'similarity_score': round(score, 4)
+                    }
+                    break
+        return matches
+
+
+def get_question_dedup_service(org_id: int = None) -> QuestionDedupService:
+    """Factory function to get a question dedup service for an organization."""
+    return QuestionDedupService(org_id=org_id)
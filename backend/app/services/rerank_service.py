@@ -0,0 +1,302 @@
+"""
+Rerank Service.
+
+Local, CPU-only reranking of knowledge search candidates by score fusion.
+
+Each candidate gets a feature vector:
+- dense: vector similarity score from the search
+- bm25: BM25 of the query over the candidate set (title + preview)
+- title: fraction of query terms found in the title
+- dimension: fraction of requested project dimensions the candidate matches
+- usage: log-scaled usage_count relative to the other candidates
+- freshness: exponential decay on days since the item was updated
+
+The fused score is a logistic model over these features, computed with
+NumPy for the whole candidate set at once. Weights are learned offline from
+accepted answers (see train_reranker.py) and loaded from RERANK_WEIGHTS_PATH;
+built-in defaults are used until a model has been trained.
+"""
+import json
+import logging
+import math
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('dense', 'bm25', 'title', 'dimension', 'usage', 'freshness')
+
+# Hand-tuned starting point: mostly semantic, lexical as tie-breaker
+DEFAULT_WEIGHTS = {
+    'bias': -2.0,
+    'dense': 3.0,
+    'bm25': 1.5,
+    'title': 0.8,
+    'dimension': 0.6,
+    'usage': 0.3,
+    'freshness': 0.2,
+}
+
+RERANK_WEIGHTS_PATH = os.environ.get('RERANK_WEIGHTS_PATH', '')
+FRESHNESS_HALF_LIFE_DAYS = float(os.environ.get('RERANK_FRESHNESS_HALF_LIFE_DAYS', 180))
+DIMENSION_KEYS = ('geography', 'client_type', 'industry')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset(
+    'a an and are as at be by do does for from has have how in is it of on or '
+    'our please the to what when where which who will with you your'.split()
+)
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if t not in _STOPWORDS]
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def extract_features(
+    query: str,
+    candidates: Sequence[Dict],
+    dimensions: Dict = None,
+    now: datetime = None,
+) -> np.ndarray:
+    """
+    Build the (n_candidates, len(FEATURES)) feature matrix.
+
+    Args:
+        query: Search query (question text)
+        candidates: Search results (title, content_preview, score, dimension
+            fields and optional usage_count/updated_at priors)
+        dimensions: Requested project dimensions (geography, client_type, industry)
+        now: Reference time for freshness
+
+    Returns:
+        Feature matrix with values in [0, 1]
+    """
+    n = len(candidates)
+    features = np.zeros((n, len(FEATURES)), dtype=np.float64)
+    if n == 0:
+        return features
+
+    query_terms = sorted(set(_terms(query)))
+
+    # Dense similarity
+    features[:, 0] = np.clip([float(c.get('score') or 0) for c in candidates], 0.0, 1.0)
+
+    if query_terms:
+        term_index = {t: j for j, t in enumerate(query_terms)}
+        tf = np.zeros((n, len(query_terms)), dtype=np.float64)
+        in_title = np.zeros((n, len(query_terms)), dtype=bool)
+        doc_len = np.zeros(n, dtype=np.float64)
+        for i, c in enumerate(candidates):
+            title_terms = _terms(c.get('title', ''))
+            doc_terms = title_terms + _terms(c.get('content_preview', ''))
+            doc_len[i] = len(doc_terms)
+            for t in doc_terms:
+                j = term_index.get(t)
+                if j is not None:
+                    tf[i, j] += 1
+            for t in title_terms:
+                j = term_index.get(t)
+                if j is not None:
+                    in_title[i, j] = True
+
+        # BM25 with the candidate set as the corpus
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avg_len = max(doc_len.mean(), 1.0)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+        bm25 = (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+        max_bm25 = bm25.max()
+        features[:, 1] = bm25 / max_bm25 if max_bm25 > 0 else 0.0
+
+        features[:, 2] = in_title.mean(axis=1)
+
+    # Dimension match
+    requested = {k: v for k, v in (dimensions or {}).items() if k in DIMENSION_KEYS and v}
+    if requested:
+        features[:, 3] = [
+            sum(1 for k, v in requested.items() if c.get(k) and str(c.get(k)).lower() == str(v).lower())
+            / len(requested)
+            for c in candidates
+        ]
+
+    # Usage prior, relative to the candidate set
+    usage = np.log1p(np.array([max(int(c.get('usage_count') or 0), 0) for c in candidates], dtype=np.float64))
+    if usage.max() > 0:
+        features[:, 4] = usage / usage.max()
+
+    # Freshness prior
+    now = now or datetime.utcnow()
+    ages = np.array([
+        (now - updated).total_seconds() / 86400 if updated else np.inf
+        for updated in (_parse_datetime(c.get('updated_at')) for c in candidates)
+    ], dtype=np.float64)
+    features[:, 5] = np.where(
+        np.isfinite(ages), np.exp(-math.log(2) * np.clip(ages, 0, None) / FRESHNESS_HALF_LIFE_DAYS), 0.0
+    )
+
+    return features
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class Reranker:
+    """Score-fusion reranker with a logistic model over FEATURES."""
+
+    def __init__(self, weights: Dict[str, float] = None):
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.bias = float(weights['bias'])
+        self.weights = np.array([float(weights[f]) for f in FEATURES])
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Reranker':
+        """Load weights saved by train_weights()/save_weights()."""
+        with open(path) as f:
+            return cls(json.load(f).get('weights'))
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Fused relevance in (0, 1) for each feature row."""
+        return _sigmoid(features @ self.weights + self.bias)
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Dict],
+        limit: int = 5,
+        dimensions: Dict = None,
+    ) -> List[Dict]:
+        """
+        Order candidates by fused score.
+
+        Returns:
+            Top `limit` candidates (copies) with rerank_score and
+            original_position added; the original 'score' is kept
+        """
+        if not candidates:
+            return []
+
+        scores = self.score(extract_features(query, candidates, dimensions))
+        order = np.argsort(-scores, kind='stable')[:limit]
+        reranked = []
+        for position, idx in enumerate(order, 1):
+            result = dict(candidates[idx])
+            result['rerank_score'] = round(float(scores[idx]), 4)
+            result['reranked_position'] = position
+            result['original_position'] = int(idx) + 1
+            reranked.append(result)
+        return reranked
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'bias': self.bias, **{f: float(w) for f, w in zip(FEATURES, self.weights)}}
+
+
+def train_weights(
+    features: np.ndarray,
+    labels: np.ndarray,
+    epochs: int = 500,
+    learning_rate: float = 0.5,
+    l2: float = 0.01,
+) -> Dict[str, float]:
+    """
+    Fit the fusion weights with L2-regularized logistic regression.
+
+    Args:
+        features: (n, len(FEATURES)) matrix from extract_features
+        labels: 1 for candidates used by an accepted answer, else 0
+
+    Returns:
+        Weights dict usable by Reranker
+    """
+    x = np.asarray(features, dtype=np.float64)
+    y = np.asarray(labels, dtype=np.float64)
+    if x.ndim != 2 or x.shape[1] != len(FEATURES) or len(x) != len(y) or len(x) == 0:
+        raise ValueError("features must be (n, %d) with one label per row" % len(FEATURES))
+
+    # Start from the defaults so sparse data does not produce a degenerate model
+    w = np.array([DEFAULT_WEIGHTS[f] for f in FEATURES], dtype=np.float64)
+    b = DEFAULT_WEIGHTS['bias']
+    pos = max(y.mean(), 1e-6)
+    # Balance classes: accepted sources are a small share of candidates
+    sample_weight = np.where(y > 0, 0.5 / pos, 0.5 / max(1 - pos, 1e-6))
+
+    for _ in range(epochs):
+        error = (_sigmoid(x @ w + b) - y) * sample_weight
+        w -= learning_rate * (x.T @ error / len(y) + l2 * w)
+        b -= learning_rate * error.mean()
+
+    return {'bias': float(b), **{f: float(v) for f, v in zip(FEATURES, w)}}
+
+
+def save_weights(weights: Dict[str, float], path: str, samples: int = None):
+    """Persist trained weights for Reranker.from_file()."""
+    with open(path, 'w') as f:
+        json.dump({
+            'weights': weights,
+            'features': list(FEATURES),
+            'samples': samples,
+            'trained_at': datetime.utcnow().isoformat(),
+        }, f, indent=2)
+
+
+def load_item_priors(item_ids: Iterable) -> Dict[int, Dict]:
+    """
+    Fetch usage_count/updated_at for knowledge items in one query.
+
+    Returns:
+        {item_id: {'usage_count': int, 'updated_at': datetime}}
+    """
+    ids = {int(i) for i in item_ids if isinstance(i, int) or (isinstance(i, str) and i.isdigit())}
+    if not ids:
+        return {}
+    try:
+        from app.extensions import db
+        from app.models import KnowledgeItem
+
+        rows = db.session.query(
+            KnowledgeItem.id, KnowledgeItem.usage_count, KnowledgeItem.updated_at
+        ).filter(KnowledgeItem.id.in_(ids)).all()
+        return {
+            item_id: {'usage_count': usage_count or 0, 'updated_at': updated_at}
+            for item_id, usage_count, updated_at in rows
+        }
+    except Exception as e:
+        logger.debug(f"Could not load knowledge item priors: {e}")
+        return {}
+
+
+# Singleton getter
+_reranker_instance = None
+
+
+def get_reranker() -> Reranker:
+    """Get the reranker, loading trained weights if configured."""
+    global _reranker_instance
+    if _reranker_instance is None:
+        reranker = None
+        if RERANK_WEIGHTS_PATH and os.path.exists(RERANK_WEIGHTS_PATH):
+            try:
+                reranker = Reranker.from_file(RERANK_WEIGHTS_PATH)
+                logger.info(f"Loaded rerank weights from {RERANK_WEIGHTS_PATH}")
+            except Exception as e:
+                logger.warning(f"Could not load rerank weights, using defaults: {e}")
+        _reranker_instance = reranker or Reranker()
+    return _reranker_instance
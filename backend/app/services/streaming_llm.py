@@ -3,11 +3,12 @@ Streaming LLM Response Support
 
 Provides async generators for streaming LLM responses to clients.
 """
-import asyncio
 import logging
 from typing import AsyncIterator, Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+from app.utils.async_loop import in_shared_loop, iterate_async
+
 logger = logging.getLogger(__name__)
 
 
@@ -95,8 +96,12 @@ async def stream_openai(
     """
     try:
         from openai import AsyncOpenAI
+        from .llm_providers.base_provider import shared_async_http_client
         
-        client = AsyncOpenAI(api_key=api_key)
+        client_kwargs = {'api_key': api_key}
+        if in_shared_loop():
+            client_kwargs['http_client'] = shared_async_http_client()
+        client = AsyncOpenAI(**client_kwargs)
         
         stream = await client.chat.completions.create(
             model=model,
@@ -236,30 +241,19 @@ def create_sse_response(async_generator):
     """
     Create a Flask SSE response from an async generator.
     
+    The generator is driven on the shared event loop, so concurrent streams
+    share one loop (and its connection pools) instead of one loop each.
+    
     Usage in Flask route:
         @app.route('/api/stream')
-        async def stream():
-            async def generate():
-                async for chunk in provider.stream_content(prompt):
-                    yield chunk
-            return create_sse_response(generate())
+        def stream():
+            return create_sse_response(provider.stream_content(prompt))
     """
     from flask import Response
     
     def sync_generator():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            agen = async_generator.__aiter__()
-            while True:
-                try:
-                    chunk = loop.run_until_complete(agen.__anext__())
-                    yield f"data: {chunk}\n\n"
-                except StopAsyncIteration:
-                    break
-        finally:
-            loop.close()
+        for chunk in iterate_async(async_generator):
+            yield f"data: {chunk}\n\n"
         
         yield "data: [DONE]\n\n"
     
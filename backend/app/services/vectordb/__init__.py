@@ -5,6 +5,7 @@ Provides cloud-agnostic vector database abstraction supporting:
 - Qdrant (default)
 - Pinecone
 - PostgreSQL pgvector
+- Local NumPy index (per-org accelerator and offline fallback)
 
 Usage:
     from app.services.vectordb import get_vector_adapter
@@ -25,6 +26,7 @@ from .adapter import (
     QdrantAdapter,
     PineconeAdapter,
     PGVectorAdapter,
+    LocalVectorAdapter,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,7 @@ def get_vector_adapter(
     - QDRANT_URL, QDRANT_API_KEY: Qdrant config
     - PINECONE_API_KEY, PINECONE_ENVIRONMENT: Pinecone config
     - DATABASE_URL: pgvector config (uses existing Postgres)
+    - LOCAL_VECTOR_INDEX_PATH, LOCAL_VECTOR_QUANTIZATION: local index config
     
     Args:
         provider: Provider name (defaults to VECTOR_DB_PROVIDER env var)
@@ -112,4 +115,5 @@ __all__ = [
     "QdrantAdapter",
     "PineconeAdapter",
     "PGVectorAdapter",
+    "LocalVectorAdapter",
 ]
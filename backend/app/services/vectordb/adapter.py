@@ -7,6 +7,7 @@ Abstraction layer over Qdrant with pluggable adapters for alternatives:
 - Pinecone
 - Weaviate
 - SQL fallback (PostgreSQL pgvector)
+- Local in-memory NumPy index (small tenants, offline fallback)
 
 Usage:
     from vectordb_adapter import VectorDBFactory
@@ -27,10 +28,13 @@ Usage:
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
+import json
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -707,6 +711,534 @@ class PGVectorAdapter(VectorDBAdapter):
             }
 
 
+# ============================================================================
+# Local In-Memory Adapter (NumPy, memory-mapped persistence)
+# ============================================================================
+
+class _LocalCollection:
+    """
+    One local collection: a row matrix of normalized vectors, a slot per id,
+    and boolean masks per indexed payload value.
+    
+    Persisted under its own directory:
+    - vectors.npy (float32, or int8 with scales.npy): memory-mapped, grown by doubling
+    - meta.json: dimension, distance, quantization, indexed fields
+    - log.ndjson: append-only put/delete log, compacted when it outgrows the
+      live rows; each compaction starts a new epoch (first line)
+    - lock: flock()ed exclusively by writers and shared by readers
+    
+    Several processes (web and Celery workers) can open the same collection.
+    Before every read or write a process tails the log from the byte offset
+    it last applied (reloading everything when the epoch changed) and remaps
+    vectors.npy if another process grew it, so slots, payloads and masks
+    always match the files. Writers hold the exclusive lock, so slot
+    allocation, growth and compaction always work on the current state.
+    """
+    
+    MIN_CAPACITY = 64
+    
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.meta = meta
+        self.dimension = meta["dimension"]
+        self.quantized = meta.get("quantization") == "int8"
+        self.indexed_fields = set(meta.get("indexed_fields") or [])
+        self.lock = threading.RLock()
+        
+        self.vectors = None
+        self.scales = None
+        self._mapped_size = -1
+        self._epoch = None
+        self._log_offset = None  # None until the log has been loaded
+        self._reset_state()
+        
+        with self.lock, self._file_lock(exclusive=True):
+            if not os.path.exists(self._file("vectors.npy")):
+                self.vectors, self.scales = self._allocate(self.MIN_CAPACITY)
+                self._extend_masks(self.capacity)
+                self.free = list(range(self.capacity - 1, -1, -1))
+                self._write_log([])
+            self._sync()
+    
+    @property
+    def capacity(self) -> int:
+        return self.vectors.shape[0]
+    
+    @property
+    def count(self) -> int:
+        return len(self.slots)
+    
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+    
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Cross-process lock on the collection (no-op where flock is unavailable)."""
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(self._file("lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _reset_state(self):
+        import numpy as np
+        
+        self.slots: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.free: List[int] = []
+        self.masks: Dict[str, Dict[Any, Any]] = {}
+        self.valid = np.zeros(self.capacity if self.vectors is not None else 0, dtype=bool)
+        self.log_lines = 0
+    
+    def _allocate(self, capacity: int):
+        from numpy.lib.format import open_memmap
+        
+        dtype = "int8" if self.quantized else "float32"
+        vectors = open_memmap(
+            self._file("vectors.npy.tmp"), mode="w+", dtype=dtype, shape=(capacity, self.dimension)
+        )
+        scales = None
+        if self.quantized:
+            scales = open_memmap(self._file("scales.npy.tmp"), mode="w+", dtype="float32", shape=(capacity,))
+        return self._install(vectors, scales)
+    
+    def _install(self, vectors, scales):
+        vectors.flush()
+        del vectors
+        os.replace(self._file("vectors.npy.tmp"), self._file("vectors.npy"))
+        if scales is not None:
+            scales.flush()
+            del scales
+            os.replace(self._file("scales.npy.tmp"), self._file("scales.npy"))
+        return self._map()
+    
+    def _map(self):
+        import numpy as np
+        
+        vectors = np.load(self._file("vectors.npy"), mmap_mode="r+")
+        scales = np.load(self._file("scales.npy"), mmap_mode="r+") if self.quantized else None
+        self._mapped_size = os.path.getsize(self._file("vectors.npy"))
+        return vectors, scales
+    
+    def _extend_masks(self, capacity: int):
+        import numpy as np
+        
+        extra = capacity - len(self.valid)
+        if extra <= 0:
+            return
+        self.valid = np.concatenate([self.valid, np.zeros(extra, dtype=bool)])
+        for values in self.masks.values():
+            for value, mask in values.items():
+                values[value] = np.concatenate([mask, np.zeros(extra, dtype=bool)])
+    
+    def _grow(self, capacity: int):
+        old_vectors, old_scales, old_capacity = self.vectors, self.scales, self.capacity
+        self.vectors, self.scales = self._allocate(capacity)
+        self.vectors[:old_capacity] = old_vectors
+        if self.quantized:
+            self.scales[:old_capacity] = old_scales
+        self._extend_masks(capacity)
+        self.free.extend(range(capacity - 1, old_capacity - 1, -1))
+    
+    def _sync(self):
+        """Catch up with writes of other processes (call with a file lock held)."""
+        import numpy as np
+        
+        if os.path.getsize(self._file("vectors.npy")) != self._mapped_size:
+            # Grown by another process: the old mapping no longer sees new writes
+            self.vectors, self.scales = self._map()
+            self._extend_masks(self.capacity)
+        
+        log_path = self._file("log.ndjson")
+        if not os.path.exists(log_path):
+            return
+        changed = False
+        with open(log_path, "rb") as f:
+            header = f.readline()
+            epoch = json.loads(header).get("epoch") if header.startswith(b'{"op": "epoch"') else None
+            if self._log_offset is None or epoch != self._epoch:
+                # Compacted by another process (or first load): replay it whole
+                self._reset_state()
+                self._epoch = epoch
+                self._log_offset = len(header) if epoch else 0
+                changed = True
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._log_offset += len(line)
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.log_lines += 1
+                changed = True
+                if entry["op"] == "put":
+                    self._set_slot(entry["id"], entry["slot"], entry.get("payload") or {})
+                else:
+                    self._clear_slot(entry["id"])
+        if changed:
+            self.free = np.flatnonzero(~self.valid)[::-1].tolist()
+    
+    def refresh(self):
+        """Load writes made by other processes."""
+        with self.lock, self._file_lock(exclusive=False):
+            self._sync()
+    
+    def _index_values(self, value) -> List[Any]:
+        if isinstance(value, (list, tuple, set)):
+            return [v for v in value if isinstance(v, (str, int, float, bool))]
+        if isinstance(value, (str, int, float, bool)):
+            return [value]
+        return []
+    
+    def _set_slot(self, record_id: str, slot: int, payload: Dict[str, Any]):
+        import numpy as np
+        
+        self._clear_slot(record_id)
+        while slot >= len(self.payloads):
+            self.ids.append(None)
+            self.payloads.append(None)
+        self.slots[record_id] = slot
+        self.ids[slot] = record_id
+        self.payloads[slot] = payload
+        self.valid[slot] = True
+        for field in self.indexed_fields:
+            for value in self._index_values(payload.get(field)):
+                values = self.masks.setdefault(field, {})
+                if value not in values:
+                    values[value] = np.zeros(self.capacity, dtype=bool)
+                values[value][slot] = True
+    
+    def _clear_slot(self, record_id: str) -> Optional[int]:
+        slot = self.slots.pop(record_id, None)
+        if slot is None:
+            return None
+        for field in self.indexed_fields:
+            for value in self._index_values(self.payloads[slot].get(field)):
+                self.masks[field][value][slot] = False
+        self.ids[slot] = None
+        self.payloads[slot] = None
+        self.valid[slot] = False
+        return slot
+    
+    def _encode(self, entries: List[Dict[str, Any]]) -> bytes:
+        return "".join(json.dumps(entry, default=str) + "\n" for entry in entries).encode("utf-8")
+    
+    def _append_log(self, entries: List[Dict[str, Any]]):
+        data = self._encode(entries)
+        with open(self._file("log.ndjson"), "ab") as f:
+            f.write(data)
+        self._log_offset += len(data)
+        self.log_lines += len(entries)
+        if self.log_lines > 2 * self.count + self.MIN_CAPACITY:
+            self._compact_log()
+    
+    def _write_log(self, entries: List[Dict[str, Any]]):
+        """Replace the log with a new epoch holding the given entries."""
+        import uuid
+        
+        header = self._encode([{"op": "epoch", "epoch": uuid.uuid4().hex}])
+        data = self._encode(entries)
+        tmp_path = self._file("log.ndjson.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header + data)
+        os.replace(tmp_path, self._file("log.ndjson"))
+        self._epoch = json.loads(header)["epoch"]
+        self._log_offset = len(header) + len(data)
+        self.log_lines = len(entries)
+    
+    def _compact_log(self):
+        self._write_log([
+            {"op": "put", "id": record_id, "slot": slot, "payload": self.payloads[slot]}
+            for record_id, slot in self.slots.items()
+        ])
+    
+    def upsert(self, records: List[VectorRecord]) -> int:
+        import numpy as np
+        
+        if not records:
+            return 0
+        matrix = np.asarray([r.vector for r in records], dtype=np.float32)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d vectors, got {matrix.shape[1]}")
+        if self.meta.get("distance_metric", "cosine") == "cosine":
+            matrix = _normalize_rows(matrix)
+        
+        with self.lock, self._file_lock(exclusive=True):
+            self._sync()
+            new_ids = {str(r.id) for r in records} - set(self.slots)
+            if len(new_ids) > len(self.free):
+                capacity = self.capacity
+                while capacity - self.count < len(new_ids):
+                    capacity *= 2
+                self._grow(capacity)
+            
+            entries = []
+            for row, record in zip(matrix, records):
+                record_id = str(record.id)
+                slot = self.slots.get(record_id)
+                if slot is None:
+                    slot = self.free.pop()
+                if self.quantized:
+                    scale = float(np.abs(row).max()) / 127 or 1.0
+                    self.vectors[slot] = np.round(row / scale).astype(np.int8)
+                    self.scales[slot] = scale
+                else:
+                    self.vectors[slot] = row
+                payload = record.payload or {}
+                self._set_slot(record_id, slot, payload)
+                entries.append({"op": "put", "id": record_id, "slot": slot, "payload": payload})
+            self.vectors.flush()
+            if self.quantized:
+                self.scales.flush()
+            self._append_log(entries)
+        return len(records)
+    
+    def delete(self, ids: List[str]) -> int:
+        with self.lock, self._file_lock(exclusive=True):
+            self._sync()
+            entries = []
+            for record_id in map(str, ids):
+                slot = self._clear_slot(record_id)
+                if slot is not None:
+                    self.free.append(slot)
+                    entries.append({"op": "del", "id": record_id})
+            if entries:
+                self._append_log(entries)
+        return len(entries)
+    
+    def filter_mask(self, filter: Optional[Dict[str, Any]]):
+        """Boolean mask of live rows matching every filter condition (lists match any)."""
+        import numpy as np
+        
+        mask = self.valid.copy()
+        for field, expected in (filter or {}).items():
+            wanted = self._index_values(expected)
+            if field in self.indexed_fields:
+                values = self.masks.get(field, {})
+                field_mask = np.zeros(self.capacity, dtype=bool)
+                for value in wanted:
+                    if value in values:
+                        field_mask |= values[value]
+                mask &= field_mask
+            else:
+                for slot in np.flatnonzero(mask):
+                    if not set(self._index_values(self.payloads[slot].get(field))) & set(wanted):
+                        mask[slot] = False
+        return mask
+    
+    def query(
+        self,
+        query_vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None
+    ) -> List[SearchResult]:
+        import numpy as np
+        
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.meta.get("distance_metric", "cosine") == "cosine":
+            query = _normalize_rows(query[None, :])[0]
+        
+        with self.lock, self._file_lock(exclusive=False):
+            self._sync()
+            rows = np.flatnonzero(self.filter_mask(filter))
+            if not len(rows) or top_k <= 0:
+                return []
+            if self.quantized:
+                scores = (self.vectors[rows].astype(np.float32) @ query) * self.scales[rows]
+            else:
+                scores = self.vectors[rows] @ query
+            
+            if len(rows) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                best = np.arange(len(rows))
+            best = best[np.argsort(-scores[best], kind="stable")]
+            
+            results = []
+            for i in best:
+                score = float(scores[i])
+                if score_threshold is not None and score < score_threshold:
+                    break
+                slot = int(rows[i])
+                results.append(SearchResult(
+                    id=self.ids[slot],
+                    score=score,
+                    payload=dict(self.payloads[slot])
+                ))
+            return results
+
+
+def _normalize_rows(matrix):
+    import numpy as np
+    
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorAdapter(VectorDBAdapter):
+    """
+    In-process vector index over NumPy matrices.
+    
+    Exact (brute force) search over memory-mapped float32 or int8-quantized
+    rows, with payload filters answered from precomputed boolean masks. Meant
+    for collections of up to a few thousand vectors: per-org accelerator for
+    small tenants and local fallback when the remote vector DB is down.
+    """
+    
+    def __init__(
+        self,
+        path: str = None,
+        quantization: str = None,
+        indexed_fields: List[str] = None
+    ):
+        self.path = path or os.environ.get("LOCAL_VECTOR_INDEX_PATH", "vector_index")
+        self.quantization = quantization or os.environ.get("LOCAL_VECTOR_QUANTIZATION", "none")
+        self.indexed_fields = list(indexed_fields or [])
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def provider_name(self) -> str:
+        return "local"
+    
+    def _collection_path(self, name: str) -> str:
+        if not name or os.sep in name or name.startswith("."):
+            raise ValueError(f"Invalid collection name: {name}")
+        return os.path.join(self.path, name)
+    
+    def _get(self, name: str) -> Optional[_LocalCollection]:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                meta_path = os.path.join(self._collection_path(name), "meta.json")
+                if not os.path.exists(meta_path):
+                    return None
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    collection = _LocalCollection(self._collection_path(name), json.load(f))
+                self._collections[name] = collection
+            return collection
+    
+    def has_collection(self, name: str) -> bool:
+        return self._get(name) is not None
+    
+    def create_collection(
+        self,
+        name: str,
+        dimension: int,
+        distance_metric: str = "cosine",
+        **kwargs
+    ) -> bool:
+        if distance_metric not in ("cosine", "dot"):
+            logger.error(f"Local vector index does not support {distance_metric} distance")
+            return False
+        if self.has_collection(name):
+            return True
+        
+        meta = {
+            "dimension": dimension,
+            "distance_metric": distance_metric,
+            "quantization": kwargs.get("quantization", self.quantization),
+            "indexed_fields": kwargs.get("indexed_fields", self.indexed_fields),
+            **kwargs.get("metadata", {}),
+        }
+        try:
+            path = self._collection_path(name)
+            os.makedirs(path, exist_ok=True)
+            collection = _LocalCollection(path, meta)
+            with open(os.path.join(path, "meta.json.tmp"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+            with self._lock:
+                self._collections[name] = collection
+            logger.info(f"Created local vector collection: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create local collection: {e}")
+            return False
+    
+    def delete_collection(self, name: str) -> bool:
+        import shutil
+        
+        with self._lock:
+            self._collections.pop(name, None)
+        path = self._collection_path(name)
+        if not os.path.exists(path):
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+    
+    def get_collection_info(self, name: str) -> Optional[CollectionInfo]:
+        collection = self._get(name)
+        if collection is None:
+            return None
+        collection.refresh()
+        return CollectionInfo(
+            name=name,
+            dimension=collection.dimension,
+            count=collection.count,
+            distance_metric=collection.meta.get("distance_metric", "cosine")
+        )
+    
+    def get_collection_metadata(self, name: str) -> Dict[str, Any]:
+        """Stored collection metadata (dimension, quantization and caller-provided keys)."""
+        collection = self._get(name)
+        return dict(collection.meta) if collection else {}
+    
+    def upsert(
+        self,
+        collection: str,
+        records: List[VectorRecord],
+        **kwargs
+    ) -> int:
+        local = self._get(collection)
+        if local is None:
+            raise KeyError(f"Local collection not found: {collection}")
+        return local.upsert(records)
+    
+    def query(
+        self,
+        collection: str,
+        query_vector: List[float],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+        **kwargs
+    ) -> List[SearchResult]:
+        local = self._get(collection)
+        if local is None:
+            return []
+        return local.query(query_vector, top_k, filter=filter, score_threshold=score_threshold)
+    
+    def delete(
+        self,
+        collection: str,
+        ids: List[str],
+        **kwargs
+    ) -> int:
+        local = self._get(collection)
+        if local is None:
+            return 0
+        return local.delete(ids)
+    
+    def health(self) -> Dict[str, Any]:
+        return {
+            "healthy": True,
+            "provider": "local",
+            "message": f"{len(self._collections)} collections loaded",
+            "path": self.path
+        }
+
+
 # ============================================================================
 # Factory
 # ============================================================================
@@ -718,6 +1250,7 @@ class VectorDBFactory:
         "qdrant": QdrantAdapter,
         "pinecone": PineconeAdapter,
         "pgvector": PGVectorAdapter,
+        "local": LocalVectorAdapter,
     }
     
     @classmethod
@@ -731,7 +1264,7 @@ class VectorDBFactory:
         Create an adapter instance.
         
         Args:
-            provider: Provider name (qdrant, pinecone, pgvector)
+            provider: Provider name (qdrant, pinecone, pgvector, local)
             **kwargs: Provider-specific config
         """
         adapter_class = cls._adapters.get(provider.lower())
@@ -0,0 +1,448 @@
+"""
+Qdrant Collection Provisioning
+
+Creates and migrates the Qdrant collections used by QdrantService and
+QdrantHybridSearchService with:
+- payload indexes for every field the services filter on
+- scalar (int8) or binary quantization, rescored against the full vectors
+- original vectors on disk with the quantized copies kept in RAM
+- a tenancy layout (QDRANT_TENANCY): "shared" builds per-tenant HNSW
+  graphs keyed by org_id, "sharded" stores each tenant in its own custom
+  shard; large tenants can also get a dedicated collection (see tenancy.py)
+
+Collections are served through an alias (the name the services use) that
+points at a physical collection "<alias>_<timestamp>". A migration builds
+a new physical collection with the current settings, copies the points,
+and switches the alias atomically, so searches never see a missing
+collection.
+
+Usage:
+    from app.services.vectordb.provisioning import ensure_collection, KNOWLEDGE_BASE
+
+    ensure_collection(client, KNOWLEDGE_BASE, dimension=768)
+    search_params = get_search_params()
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# none, scalar (int8, ~4x smaller) or binary (~32x smaller, best for >= 1024-d embeddings)
+QDRANT_QUANTIZATION = os.environ.get("QDRANT_QUANTIZATION", "scalar").lower()
+QDRANT_VECTORS_ON_DISK = os.environ.get("QDRANT_VECTORS_ON_DISK", "true").lower() == "true"
+# Candidates fetched per result with quantized vectors before rescoring
+QDRANT_RESCORE_OVERSAMPLING = float(os.environ.get("QDRANT_RESCORE_OVERSAMPLING", 2.0))
+QDRANT_MIGRATION_BATCH_SIZE = int(os.environ.get("QDRANT_MIGRATION_BATCH_SIZE", 256))
+# Wait after an alias switch for writes already sent to the old collection
+QDRANT_MIGRATION_SETTLE_SECONDS = float(os.environ.get("QDRANT_MIGRATION_SETTLE_SECONDS", 5))
+# shared (org_id partitioned HNSW) or sharded (custom shard per tenant, needs distributed mode)
+QDRANT_TENANCY = os.environ.get("QDRANT_TENANCY", "shared").lower()
+# HNSW links per tenant subgraph in shared collections
+QDRANT_TENANT_PAYLOAD_M = int(os.environ.get("QDRANT_TENANT_PAYLOAD_M", 16))
+
+TENANT_FIELD = "org_id"
+
+
+@dataclass
+class CollectionSpec:
+    """Layout of a served collection: vectors and the payload fields filtered on."""
+    alias: str
+    # Payload field -> index type (keyword, integer); includes TENANT_FIELD
+    payload_indexes: Dict[str, str] = field(default_factory=dict)
+    # Name of the dense vector for named-vector collections, None for a single unnamed vector
+    dense_vector: Optional[str] = None
+    sparse_vector: Optional[str] = None
+
+
+KNOWLEDGE_BASE = CollectionSpec(
+    alias="knowledge_base",
+    payload_indexes={
+        "org_id": "integer",
+        "item_id": "integer",
+        "folder_id": "integer",
+        "geography": "keyword",
+        "client_type": "keyword",
+        "industry": "keyword",
+        "knowledge_profile_id": "integer",
+    },
+)
+
+DOCUMENT_CHUNKS = CollectionSpec(
+    alias="document_chunks",
+    payload_indexes={
+        "org_id": "integer",
+        "status": "keyword",
+        "file_id": "keyword",
+    },
+    dense_vector="dense",
+    sparse_vector="sparse",
+)
+
+
+def get_quantization_config(quantization: str = None):
+    """Quantization config for new collections (None when disabled)."""
+    from qdrant_client.models import (
+        ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+        BinaryQuantization, BinaryQuantizationConfig
+    )
+
+    quantization = quantization or QDRANT_QUANTIZATION
+    if quantization == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def get_search_params(quantization: str = None):
+    """Search params rescoring quantized candidates with the original vectors."""
+    from qdrant_client.models import SearchParams, QuantizationSearchParams
+
+    quantization = quantization or QDRANT_QUANTIZATION
+    if quantization not in ("scalar", "binary"):
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=True,
+            oversampling=QDRANT_RESCORE_OVERSAMPLING
+        )
+    )
+
+
+def _payload_schema(index_type: str):
+    from qdrant_client.models import PayloadSchemaType
+
+    return PayloadSchemaType.INTEGER if index_type == "integer" else PayloadSchemaType.KEYWORD
+
+
+def shard_key_for(org_id) -> str:
+    """Custom shard key of a tenant in sharded collections."""
+    return f"org_{org_id}"
+
+
+def _resolve_alias(client, alias: str) -> Optional[str]:
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def _create_physical_collection(
+    client,
+    spec: CollectionSpec,
+    dimension: int,
+    quantization: str = None,
+    tenancy: str = None,
+    alias: str = None
+) -> str:
+    """
+    Create "<alias>_<timestamp>" with the current settings and payload indexes.
+
+    tenancy is "shared", "sharded", or "dedicated" (one tenant, plain HNSW).
+    """
+    from qdrant_client.models import (
+        Distance, VectorParams, SparseVectorParams, SparseIndexParams, Modifier,
+        HnswConfigDiff, ShardingMethod
+    )
+
+    tenancy = tenancy or QDRANT_TENANCY
+    name = f"{alias or spec.alias}_{int(time.time() * 1000)}"
+    dense = VectorParams(size=dimension, distance=Distance.COSINE, on_disk=QDRANT_VECTORS_ON_DISK)
+    vectors_config: Any = {spec.dense_vector: dense} if spec.dense_vector else dense
+    sparse_config = None
+    if spec.sparse_vector:
+        sparse_config = {
+            spec.sparse_vector: SparseVectorParams(
+                index=SparseIndexParams(on_disk=QDRANT_VECTORS_ON_DISK),
+                modifier=Modifier.IDF
+            )
+        }
+
+    tenancy_options = {}
+    if tenancy == "shared":
+        # No global graph: every search filters by tenant, so only per-tenant graphs are built
+        tenancy_options["hnsw_config"] = HnswConfigDiff(m=0, payload_m=QDRANT_TENANT_PAYLOAD_M)
+    elif tenancy == "sharded":
+        tenancy_options["sharding_method"] = ShardingMethod.CUSTOM
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config,
+        sparse_vectors_config=sparse_config,
+        quantization_config=get_quantization_config(quantization),
+        **tenancy_options,
+    )
+    ensure_payload_indexes(client, spec, name)
+    logger.info(
+        f"Created Qdrant collection {name} "
+        f"(quantization={quantization or QDRANT_QUANTIZATION}, tenancy={tenancy})"
+    )
+    return name
+
+
+def is_sharded(client, collection: str) -> bool:
+    """Whether a collection uses custom (per-tenant) sharding."""
+    from qdrant_client.models import ShardingMethod
+
+    return client.get_collection(collection).config.params.sharding_method == ShardingMethod.CUSTOM
+
+
+def ensure_payload_indexes(client, spec: CollectionSpec, collection: str = None):
+    """Create any missing payload index of the spec (existing ones are kept)."""
+    collection = collection or spec.alias
+    existing = client.get_collection(collection).payload_schema or {}
+    for field_name, index_type in spec.payload_indexes.items():
+        if field_name not in existing:
+            client.create_payload_index(
+                collection_name=collection,
+                field_name=field_name,
+                field_schema=_payload_schema(index_type),
+            )
+
+
+def ensure_collection(client, spec: CollectionSpec, dimension: int) -> str:
+    """
+    Make the spec's alias servable, creating it on first use.
+
+    A legacy collection stored directly under the alias name keeps serving
+    (its missing payload indexes are added) until migrate_collection moves
+    it behind an alias.
+
+    Args:
+        client: QdrantClient
+        spec: Collection spec
+        dimension: Dense vector dimension for new collections
+
+    Returns:
+        Name of the physical collection served
+    """
+    physical = _resolve_alias(client, spec.alias)
+    if physical:
+        return physical
+
+    if client.collection_exists(spec.alias):
+        ensure_payload_indexes(client, spec)
+        return spec.alias
+
+    from qdrant_client.models import CreateAliasOperation, CreateAlias
+
+    physical = _create_physical_collection(client, spec, dimension)
+    client.update_collection_aliases(change_aliases_operations=[
+        CreateAliasOperation(create_alias=CreateAlias(collection_name=physical, alias_name=spec.alias))
+    ])
+    return physical
+
+
+def _upsert_points(client, target: str, points, target_sharded: bool, created_keys: set) -> int:
+    """Write scrolled or retrieved points to target, by tenant shard when target_sharded."""
+    from qdrant_client.models import PointStruct
+
+    by_shard: Dict[Optional[str], list] = {}
+    for p in points:
+        key = shard_key_for((p.payload or {}).get(TENANT_FIELD)) if target_sharded else None
+        by_shard.setdefault(key, []).append(PointStruct(id=p.id, vector=p.vector, payload=p.payload))
+    for key, batch in by_shard.items():
+        if key is not None and key not in created_keys:
+            ensure_shard_key(client, target, key)
+            created_keys.add(key)
+        client.upsert(collection_name=target, points=batch, wait=True, shard_key_selector=key)
+    return len(points)
+
+
+def _copy_points(
+    client,
+    source: str,
+    target: str,
+    batch_size: int,
+    scroll_filter=None,
+    source_shard: str = None,
+    target_sharded: bool = False
+) -> int:
+    """Copy points (optionally one tenant's) into target, by tenant shard when target_sharded."""
+    created_keys = set()
+    copied, offset = 0, None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+            shard_key_selector=source_shard,
+        )
+        copied += _upsert_points(client, target, points, target_sharded, created_keys)
+        if offset is None:
+            return copied
+
+
+def ensure_shard_key(client, collection: str, shard_key: str):
+    """Create a custom shard key if it does not exist yet."""
+    try:
+        client.create_shard_key(collection, shard_key)
+    except Exception as e:
+        if "already exists" not in str(e).lower():
+            raise
+
+
+def _point_fingerprints(
+    client, collection: str, batch_size: int, scroll_filter=None, shard_key: str = None
+) -> Dict[Any, str]:
+    """Point id -> digest of its vectors and payload, to tell which points changed."""
+    fingerprints, offset = {}, None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection, scroll_filter=scroll_filter, limit=batch_size, offset=offset,
+            with_payload=True, with_vectors=True, shard_key_selector=shard_key
+        )
+        for p in points:
+            content = json.dumps([p.vector, p.payload], sort_keys=True, default=str)
+            fingerprints[p.id] = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        if offset is None:
+            return fingerprints
+
+
+def _catch_up(
+    client,
+    source: str,
+    target: str,
+    source_before: Dict[Any, str],
+    target_before: Optional[Dict[Any, str]],
+    batch_size: int,
+    source_filter=None,
+    source_shard: str = None,
+    target_filter=None,
+    target_shard: str = None,
+    target_sharded: bool = False
+) -> Dict[Any, str]:
+    """
+    Apply writes and deletes made at source since source_before to target.
+
+    Points rewritten or deleted in target since target_before (writes that
+    already go through the new location) are left alone; target_before is
+    None while nothing but the migration writes to target.
+
+    Returns:
+        The source fingerprints compared against, the baseline of a later pass
+    """
+    source_now = _point_fingerprints(client, source, batch_size, source_filter, source_shard)
+    target_now = _point_fingerprints(client, target, batch_size, target_filter, target_shard)
+    rewritten = set()
+    if target_before is not None:
+        rewritten = {i for i, digest in target_now.items() if target_before.get(i) != digest}
+        rewritten |= target_before.keys() - target_now.keys()
+
+    changed = [
+        i for i, digest in source_now.items()
+        if (source_before.get(i) != digest or i not in target_now) and i not in rewritten
+    ]
+    created_keys = set()
+    for start in range(0, len(changed), batch_size):
+        points = client.retrieve(
+            collection_name=source, ids=changed[start:start + batch_size],
+            with_payload=True, with_vectors=True, shard_key_selector=source_shard
+        )
+        _upsert_points(client, target, points, target_sharded, created_keys)
+
+    deleted = list(target_now.keys() - source_now.keys() - rewritten)
+    if deleted:
+        client.delete(collection_name=target, points_selector=deleted, wait=True, shard_key_selector=target_shard)
+    return source_now
+
+
+def migrate_collection(
+    client,
+    spec: CollectionSpec,
+    quantization: str = None,
+    batch_size: int = None,
+    drop_old: bool = True,
+    tenancy: str = None,
+    settle_seconds: float = None
+) -> Dict[str, Any]:
+    """
+    Rebuild a collection with the current settings and switch its alias.
+
+    Points are copied while the old collection keeps serving; a second
+    pass picks up points written or deleted during the copy before the
+    alias is switched, and a last pass after the switch (and a settle for
+    requests already sent to the old collection) picks up the ones that
+    landed in between, before the old collection is dropped. Alias
+    switches are atomic; a legacy collection stored under the alias name
+    has to be dropped before the alias can take its name, which leaves a
+    gap of one request.
+
+    Args:
+        client: QdrantClient
+        spec: Collection spec
+        quantization: Override QDRANT_QUANTIZATION (none, scalar, binary)
+        batch_size: Points copied per scroll page
+        drop_old: Delete the previous physical collection afterwards
+        tenancy: Override QDRANT_TENANCY (shared, sharded) of the new collection
+        settle_seconds: Wait after the switch (defaults to QDRANT_MIGRATION_SETTLE_SECONDS)
+
+    Returns:
+        Dict with source, target and points copied
+    """
+    from qdrant_client.models import (
+        CreateAliasOperation, CreateAlias, DeleteAliasOperation, DeleteAlias
+    )
+
+    batch_size = batch_size or QDRANT_MIGRATION_BATCH_SIZE
+    settle_seconds = QDRANT_MIGRATION_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+    source = _resolve_alias(client, spec.alias)
+    legacy = source is None
+    if legacy:
+        if not client.collection_exists(spec.alias):
+            raise ValueError(f"Collection not found: {spec.alias}")
+        source = spec.alias
+
+    vectors = client.get_collection(source).config.params.vectors
+    dense = vectors[spec.dense_vector] if spec.dense_vector else vectors
+    tenancy = tenancy or QDRANT_TENANCY
+    target = _create_physical_collection(client, spec, dense.size, quantization, tenancy)
+    target_sharded = tenancy == "sharded"
+
+    source_before = _point_fingerprints(client, source, batch_size)
+    copied = _copy_points(client, source, target, batch_size, target_sharded=target_sharded)
+    # Catch-up pass for writes and deletes that landed during the copy
+    source_before = _catch_up(client, source, target, source_before, None, batch_size, target_sharded=target_sharded)
+    target_before = _point_fingerprints(client, target, batch_size)
+
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=spec.alias))]
+    if legacy:
+        client.delete_collection(source)
+    else:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=spec.alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+    if not legacy:
+        if settle_seconds > 0:
+            time.sleep(settle_seconds)
+        # Writes that reached the old collection since the catch-up pass, unless rewritten since the switch
+        _catch_up(client, source, target, source_before, target_before, batch_size, target_sharded=target_sharded)
+        if drop_old:
+            client.delete_collection(source)
+
+    logger.info(f"Migrated {spec.alias}: {source} -> {target} ({copied} points)")
+    return {"alias": spec.alias, "source": source, "target": target, "points": copied}
+
+
+def estimate_vector_memory(count: int, dimension: int, quantization: str = None, on_disk: bool = None) -> int:
+    """
+    Approximate RAM held for the dense vectors of a collection, in bytes.
+
+    Float32 originals count only when kept in memory; quantized copies are
+    always in RAM.
+    """
+    quantization = quantization or QDRANT_QUANTIZATION
+    on_disk = QDRANT_VECTORS_ON_DISK if on_disk is None else on_disk
+    quantized = {"scalar": dimension, "binary": (dimension + 7) // 8}.get(quantization, 0)
+    original = 0 if (on_disk and quantized) else dimension * 4
+    return count * (original + quantized)
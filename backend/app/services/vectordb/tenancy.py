@@ -0,0 +1,348 @@
+"""
+Qdrant Tenant Routing
+
+Decides where each organization's points live in a served collection
+(see provisioning.py for how collections are laid out):
+- shared: one collection, org_id filtered, per-tenant HNSW graphs
+- sharded: one collection with a custom shard per tenant ("org_<id>")
+- dedicated: a large tenant moved to its own collection, served through the
+  alias "<alias>_org_<id>"; works on top of either layout
+
+TenantRouter resolves the route for an organization from the collection
+config and the dedicated-tenant aliases (cached for QDRANT_ROUTING_CACHE_TTL
+seconds). move_tenant_to_dedicated / move_tenant_to_shared move a tenant
+between collections online: points are copied while the old location
+serves, the alias switches the route, and a catch-up pass runs once every
+process has picked up the new route. A process whose cached route points
+at a collection that no longer exists reloads its routes and retries
+(TenantRouter.run).
+
+Usage:
+    router = TenantRouter(client, KNOWLEDGE_BASE)
+    route = router.route(org_id)          # reads
+    route = router.prepare(org_id)        # writes (creates the tenant shard)
+    client.upsert(route.collection, points, shard_key_selector=route.shard_key)
+
+    # Same, retried on the reloaded route if the tenant was moved meanwhile
+    router.run(org_id, lambda route: client.search(route.collection, ...))
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .provisioning import (
+    CollectionSpec,
+    QDRANT_MIGRATION_BATCH_SIZE,
+    TENANT_FIELD,
+    _catch_up,
+    _copy_points,
+    _create_physical_collection,
+    _point_fingerprints,
+    _resolve_alias,
+    ensure_shard_key,
+    is_sharded,
+    shard_key_for,
+)
+
+logger = logging.getLogger(__name__)
+
+QDRANT_ROUTING_CACHE_TTL = float(os.environ.get("QDRANT_ROUTING_CACHE_TTL", 60))
+# Tenants with at least this many points are candidates for a dedicated collection
+QDRANT_DEDICATED_TENANT_MIN_POINTS = int(os.environ.get("QDRANT_DEDICATED_TENANT_MIN_POINTS", 200000))
+
+
+class TenantRoute(NamedTuple):
+    """Where a tenant's points are read and written."""
+    collection: str
+    shard_key: Optional[str] = None
+
+
+def dedicated_alias(spec: CollectionSpec, org_id: int) -> str:
+    return f"{spec.alias}_org_{org_id}"
+
+
+def is_missing_collection(error: Exception) -> bool:
+    """Whether a Qdrant error means the collection or alias does not exist."""
+    if getattr(error, "status_code", None) == 404:
+        return True
+    message = str(error).lower()
+    return "collection" in message and ("not found" in message or "doesn't exist" in message)
+
+
+def tenant_filter(org_id: int):
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+    return Filter(must=[FieldCondition(key=TENANT_FIELD, match=MatchValue(value=org_id))])
+
+
+class TenantRouter:
+    """Routes an organization's reads and writes for one served collection."""
+
+    def __init__(self, client, spec: CollectionSpec, ttl: float = None):
+        self.client = client
+        self.spec = spec
+        self.ttl = QDRANT_ROUTING_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._dedicated: set = set()
+        self._sharded = False
+        self._shard_keys: set = set()
+
+    def _refresh(self):
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.ttl:
+                return
+            prefix = f"{self.spec.alias}_org_"
+            dedicated = set()
+            for description in self.client.get_aliases().aliases:
+                suffix = description.alias_name[len(prefix):]
+                if description.alias_name.startswith(prefix) and suffix.isdigit():
+                    dedicated.add(int(suffix))
+            self._dedicated = dedicated
+            self._sharded = is_sharded(self.client, self.spec.alias)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Reload the routes on next use."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def is_dedicated(self, org_id: int) -> bool:
+        self._refresh()
+        return org_id in self._dedicated
+
+    def route(self, org_id: int) -> TenantRoute:
+        """Route for searches, scrolls and deletes of an organization."""
+        self._refresh()
+        if org_id in self._dedicated:
+            return TenantRoute(dedicated_alias(self.spec, org_id))
+        if self._sharded:
+            return TenantRoute(self.spec.alias, shard_key_for(org_id))
+        return TenantRoute(self.spec.alias)
+
+    def prepare(self, org_id: int) -> TenantRoute:
+        """Route for writes, creating the tenant's shard on first write."""
+        route = self.route(org_id)
+        if route.shard_key and route.shard_key not in self._shard_keys:
+            ensure_shard_key(self.client, route.collection, route.shard_key)
+            self._shard_keys.add(route.shard_key)
+        return route
+
+    def run(self, org_id: int, operation: Callable[[TenantRoute], Any], write: bool = False) -> Any:
+        """
+        Call operation(route) on the organization's route.
+
+        When the routed collection is gone (another process moved the tenant
+        and this router's cache is stale), the routes are reloaded and the
+        operation is retried once on the new route.
+
+        Args:
+            org_id: Organization ID
+            operation: Called with the TenantRoute
+            write: Route for writes (see prepare)
+        """
+        resolve = self.prepare if write else self.route
+        route = resolve(org_id)
+        try:
+            return operation(route)
+        except Exception as e:
+            if not is_missing_collection(e):
+                raise
+            self.invalidate()
+            fresh = resolve(org_id)
+            if fresh == route:
+                raise
+            logger.info(f"Route of tenant {org_id} changed to {fresh.collection}, retrying")
+            return operation(fresh)
+
+    def delete_tenant(self, org_id: int) -> bool:
+        """
+        Remove all points of an organization.
+
+        Dedicated collections and tenant shards are dropped whole; only the
+        shared layout needs a filtered delete.
+        """
+        route = self.route(org_id)
+        if org_id in self._dedicated:
+            alias = route.collection
+            physical = _resolve_alias(self.client, alias)
+            _delete_alias(self.client, alias)
+            if physical:
+                self.client.delete_collection(physical)
+            self.invalidate()
+        elif route.shard_key:
+            try:
+                self.client.delete_shard_key(route.collection, route.shard_key)
+            except Exception as e:
+                logger.warning(f"Failed to drop shard {route.shard_key}: {e}")
+                return False
+            self._shard_keys.discard(route.shard_key)
+        else:
+            from qdrant_client.models import FilterSelector
+
+            self.client.delete(
+                collection_name=route.collection,
+                points_selector=FilterSelector(filter=tenant_filter(org_id)),
+                wait=True,
+            )
+        logger.info(f"Deleted tenant {org_id} from {self.spec.alias}")
+        return True
+
+
+def _delete_alias(client, alias: str):
+    from qdrant_client.models import DeleteAliasOperation, DeleteAlias
+
+    client.update_collection_aliases(change_aliases_operations=[
+        DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias))
+    ])
+
+
+def _settle(settle_seconds: Optional[float]):
+    """Wait until every process's router has reloaded its routes."""
+    settle_seconds = QDRANT_ROUTING_CACHE_TTL if settle_seconds is None else settle_seconds
+    if settle_seconds > 0:
+        time.sleep(settle_seconds)
+
+
+def _delete_tenant_points(client, collection: str, org_id: int, shard_key: str = None):
+    from qdrant_client.models import FilterSelector
+
+    if shard_key:
+        client.delete_shard_key(collection, shard_key)
+        return
+    client.delete(
+        collection_name=collection,
+        points_selector=FilterSelector(filter=tenant_filter(org_id)),
+        wait=True,
+    )
+
+
+def move_tenant_to_dedicated(
+    client,
+    spec: CollectionSpec,
+    org_id: int,
+    batch_size: int = None,
+    settle_seconds: float = None
+) -> Dict[str, Any]:
+    """
+    Move an organization from the served collection to its own collection.
+
+    The tenant keeps being served from the shared collection until the
+    dedicated alias exists; points written there while routers were still
+    on the old route are copied over by a catch-up pass, and points deleted
+    there are removed from the dedicated copy, before the shared copy is
+    deleted. Points already rewritten through the dedicated alias keep
+    their newer version.
+
+    Args:
+        client: QdrantClient
+        spec: Collection spec
+        org_id: Organization ID
+        batch_size: Points copied per scroll page
+        settle_seconds: Wait for routers to reload (defaults to QDRANT_ROUTING_CACHE_TTL)
+
+    Returns:
+        Dict with the dedicated collection and points copied
+    """
+    from qdrant_client.models import CreateAliasOperation, CreateAlias
+
+    batch_size = batch_size or QDRANT_MIGRATION_BATCH_SIZE
+    alias = dedicated_alias(spec, org_id)
+    if _resolve_alias(client, alias):
+        raise ValueError(f"Organization {org_id} already has a dedicated collection")
+
+    sharded = is_sharded(client, spec.alias)
+    shard_key = shard_key_for(org_id) if sharded else None
+    source_filter = tenant_filter(org_id)
+
+    vectors = client.get_collection(spec.alias).config.params.vectors
+    dense = vectors[spec.dense_vector] if spec.dense_vector else vectors
+    target = _create_physical_collection(client, spec, dense.size, tenancy="dedicated", alias=alias)
+
+    source_before = _point_fingerprints(client, spec.alias, batch_size, source_filter, shard_key)
+    copied = _copy_points(client, spec.alias, target, batch_size, source_filter, source_shard=shard_key)
+    target_before = _point_fingerprints(client, target, batch_size)
+    client.update_collection_aliases(change_aliases_operations=[
+        CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))
+    ])
+    _settle(settle_seconds)
+    # Writes and deletes in the shared collection during the copy and settle,
+    # unless the point was rewritten through the new route since the switch
+    _catch_up(
+        client, spec.alias, target, source_before, target_before, batch_size,
+        source_filter=source_filter, source_shard=shard_key
+    )
+    _delete_tenant_points(client, spec.alias, org_id, shard_key)
+
+    logger.info(f"Moved tenant {org_id} of {spec.alias} to {target} ({copied} points)")
+    return {"org_id": org_id, "collection": target, "alias": alias, "points": copied}
+
+
+def move_tenant_to_shared(
+    client,
+    spec: CollectionSpec,
+    org_id: int,
+    batch_size: int = None,
+    settle_seconds: float = None
+) -> Dict[str, Any]:
+    """
+    Move an organization from its dedicated collection back to the served one.
+
+    Processes whose cached route still names the dedicated alias get a
+    missing-collection error once it is removed and retry on the shared
+    collection (TenantRouter.run). Writes and deletes that reached the
+    dedicated collection before the switch are caught up after the settle.
+
+    Args:
+        client: QdrantClient
+        spec: Collection spec
+        org_id: Organization ID
+        batch_size: Points copied per scroll page
+        settle_seconds: Wait for routers to reload (defaults to QDRANT_ROUTING_CACHE_TTL)
+
+    Returns:
+        Dict with points copied
+    """
+    batch_size = batch_size or QDRANT_MIGRATION_BATCH_SIZE
+    alias = dedicated_alias(spec, org_id)
+    source = _resolve_alias(client, alias)
+    if not source:
+        raise ValueError(f"Organization {org_id} has no dedicated collection")
+
+    sharded = is_sharded(client, spec.alias)
+    shard_key = shard_key_for(org_id) if sharded else None
+    source_before = _point_fingerprints(client, source, batch_size)
+    copied = _copy_points(client, source, spec.alias, batch_size, target_sharded=sharded)
+    target_before = _point_fingerprints(client, spec.alias, batch_size, tenant_filter(org_id), shard_key)
+    _delete_alias(client, alias)
+    _settle(settle_seconds)
+    # Writes and deletes in the dedicated collection during the copy and settle,
+    # unless the point was rewritten through the new route since the switch
+    _catch_up(
+        client, source, spec.alias, source_before, target_before, batch_size,
+        target_filter=tenant_filter(org_id), target_shard=shard_key, target_sharded=sharded
+    )
+    client.delete_collection(source)
+
+    logger.info(f"Moved tenant {org_id} of {spec.alias} back to the shared collection ({copied} points)")
+    return {"org_id": org_id, "collection": spec.alias, "points": copied}
+
+
+def tenant_point_counts(client, spec: CollectionSpec, limit: int = 1000) -> Dict[int, int]:
+    """Points per organization in the served collection (largest first)."""
+    response = client.facet(collection_name=spec.alias, key=TENANT_FIELD, limit=limit, exact=True)
+    return {int(hit.value): hit.count for hit in response.hits}
+
+
+_routers: Dict[str, TenantRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_tenant_router(client, spec: CollectionSpec) -> TenantRouter:
+    """Process-wide router of a served collection (its route cache is shared)."""
+    with _routers_lock:
+        if spec.alias not in _routers:
+            _routers[spec.alias] = TenantRouter(client, spec)
+        return _routers[spec.alias]
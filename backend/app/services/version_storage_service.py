@@ -0,0 +1,337 @@
+"""
+Version Storage Service
+
+Compact storage for proposal versions:
+- Section bodies of version snapshots are stored once per distinct content
+  in ContentBlob (content-addressed by SHA-256), and the snapshot only keeps
+  each section's ``content_hash``. Unchanged sections cost nothing per version.
+- Exported DOCX files go to the configured object storage instead of the
+  database row. A missing file is regenerated from the version's snapshot
+  on first access and stored again.
+
+Section edit history is delta-encoded by save_section_version (see
+app/models/section_version.py). get_version_storage_stats reports the
+logical size of a project's versions against what is actually stored.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from ..extensions import db
+from ..models import ContentBlob, ProposalVersion, RFPSection, RFPSectionType, SectionVersion
+
+logger = logging.getLogger(__name__)
+
+BLOB_CACHE_MAX_ENTRIES = int(os.environ.get('VERSION_BLOB_CACHE_MAX_ENTRIES', 512))
+# Celery Beat interval of prune_unreferenced_blobs
+VERSION_BLOB_PRUNE_INTERVAL_HOURS = int(os.environ.get('VERSION_BLOB_PRUNE_INTERVAL_HOURS', 24))
+# Blobs younger than this are kept (their snapshot may not be committed yet)
+VERSION_BLOB_PRUNE_GRACE_MINUTES = int(os.environ.get('VERSION_BLOB_PRUNE_GRACE_MINUTES', 60))
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Section fields kept in a proposal version snapshot (besides the content)
+SNAPSHOT_FIELDS = (
+    'section_type_id', 'title', 'order', 'status', 'inputs',
+    'ai_generation_params', 'confidence_score', 'sources', 'flags',
+)
+
+# hash -> text, least recently used first
+_blob_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _cache_put(digest: str, text: str):
+    with _cache_lock:
+        _blob_cache[digest] = text
+        _blob_cache.move_to_end(digest)
+        while len(_blob_cache) > BLOB_CACHE_MAX_ENTRIES:
+            _blob_cache.popitem(last=False)
+
+
+def store_content(text: Optional[str]) -> Optional[str]:
+    """
+    Store a text once and return its hash.
+
+    Returns:
+        Content hash, or None for None
+    """
+    if text is None:
+        return None
+    digest = content_hash(text)
+    blob = db.session.get(ContentBlob, digest)
+    now = datetime.utcnow()
+    # Reusing a blob restarts its prune grace period (refreshed at most every half period)
+    refresh_before = now - timedelta(minutes=VERSION_BLOB_PRUNE_GRACE_MINUTES / 2)
+    if blob is None or blob.created_at is None or blob.created_at < refresh_before:
+        encoded = text.encode('utf-8')
+        # Concurrent snapshots may store the same content, and a prune may be deleting it;
+        # the row ends up present with a fresh created_at either way
+        insert = _insert(ContentBlob).values(
+            hash=digest, data=zlib.compress(encoded), size=len(encoded), created_at=now
+        )
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=['hash'], set_={'created_at': insert.excluded.created_at}
+        ))
+    _cache_put(digest, text)
+    return digest
+
+
+def _insert(model):
+    """INSERT supporting ON CONFLICT for the session's database."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def load_contents(hashes: Iterable[str]) -> Dict[str, str]:
+    """Texts of many hashes, loading uncached ones in one query."""
+    wanted = {h for h in hashes if h}
+    with _cache_lock:
+        found = {h: _blob_cache[h] for h in wanted if h in _blob_cache}
+    missing = wanted - found.keys()
+    if missing:
+        for blob in ContentBlob.query.filter(ContentBlob.hash.in_(missing)):
+            text = zlib.decompress(blob.data).decode('utf-8')
+            found[blob.hash] = text
+            _cache_put(blob.hash, text)
+    return found
+
+
+def build_snapshot(sections: List[RFPSection]) -> List[Dict]:
+    """Snapshot of sections for a proposal version, bodies stored as blobs."""
+    snapshot = []
+    for section in sections:
+        entry = {field: getattr(section, field) for field in SNAPSHOT_FIELDS}
+        entry['content_hash'] = store_content(section.content)
+        snapshot.append(entry)
+    return snapshot
+
+
+def expand_snapshot(snapshot: Optional[List[Dict]]) -> List[Dict]:
+    """
+    Snapshot with each section's 'content' filled in.
+
+    Snapshots written before content addressing keep their inline content.
+    """
+    snapshot = snapshot or []
+    contents = load_contents(s.get('content_hash') for s in snapshot if 'content' not in s)
+    expanded = []
+    for entry in snapshot:
+        entry = dict(entry)
+        if 'content' not in entry:
+            entry['content'] = contents.get(entry.pop('content_hash', None))
+        else:
+            entry.pop('content_hash', None)
+        expanded.append(entry)
+    return expanded
+
+
+def store_version_file(version: ProposalVersion, file_data: bytes):
+    """
+    Put a version's DOCX in object storage (once per distinct file).
+
+    Falls back to storing it on the row if the storage is unavailable.
+    """
+    from .storage_service import get_storage_service
+
+    checksum = hashlib.sha256(file_data).hexdigest()
+    version.file_checksum = checksum
+    version.file_size = len(file_data)
+
+    existing = ProposalVersion.query.filter(
+        ProposalVersion.project_id == version.project_id,
+        ProposalVersion.file_checksum == checksum,
+        ProposalVersion.file_id.isnot(None),
+        ProposalVersion.id != version.id
+    ).first()
+    if existing is not None:
+        version.file_id, version.file_data = existing.file_id, None
+        return
+
+    try:
+        metadata = get_storage_service().upload(
+            io.BytesIO(file_data),
+            f"proposal_{version.project_id}_v{version.version_number}.docx",
+            content_type=DOCX_MIMETYPE,
+            metadata={'project_id': version.project_id, 'version_number': version.version_number}
+        )
+        version.file_id, version.file_data = metadata.file_id, None
+    except Exception as e:
+        logger.warning(f"Version file upload failed, storing it in the database: {e}")
+        version.file_id, version.file_data = None, file_data
+
+
+def regenerate_version_file(version: ProposalVersion) -> bytes:
+    """
+    Rebuild a version's DOCX from its sections snapshot.
+
+    The Q&A appendix (if the version included one) uses the project's
+    current questions, which are not part of the snapshot.
+    """
+    from ..models import Question
+    from .export_service import generate_proposal_docx
+
+    project = version.project
+    section_types = {}
+    sections = []
+    for entry in expand_snapshot(version.sections_snapshot):
+        type_id = entry.get('section_type_id')
+        if type_id not in section_types:
+            section_types[type_id] = db.session.get(RFPSectionType, type_id) if type_id else None
+        sections.append(SimpleNamespace(
+            title=entry.get('title') or 'Untitled',
+            content=entry.get('content'),
+            confidence_score=entry.get('confidence_score'),
+            section_type=section_types[type_id]
+        ))
+
+    include_qa = (version.export_options or {}).get('include_qa', True)
+    questions = Question.query.filter_by(project_id=project.id).all() if include_qa else None
+    buffer = generate_proposal_docx(project, sections, include_qa, questions, project.organization)
+    return buffer.getvalue()
+
+
+def load_version_file(version: ProposalVersion) -> Optional[bytes]:
+    """
+    DOCX content of a version.
+
+    Reads the inline file (legacy rows) or the object storage; a file that
+    is missing there is regenerated from the snapshot and stored again.
+
+    Returns:
+        DOCX bytes, or None if the version has neither file nor snapshot
+    """
+    if version.file_data:
+        return version.file_data
+
+    if version.file_id:
+        try:
+            from .storage_service import get_storage_service
+            content, _ = get_storage_service().download(version.file_id)
+            return content
+        except Exception as e:
+            logger.warning(f"Version file {version.file_id} unavailable, regenerating: {e}")
+
+    if not version.sections_snapshot:
+        return None
+    file_data = regenerate_version_file(version)
+    store_version_file(version, file_data)
+    db.session.commit()
+    return file_data
+
+
+def delete_version_file(version: ProposalVersion):
+    """Remove a version's DOCX from object storage unless another version shares it."""
+    if not version.file_id:
+        return
+    shared = ProposalVersion.query.filter(
+        ProposalVersion.file_id == version.file_id,
+        ProposalVersion.id != version.id
+    ).count()
+    if shared:
+        return
+    try:
+        from .storage_service import get_storage_service
+        get_storage_service().delete(version.file_id)
+    except Exception as e:
+        logger.warning(f"Could not delete version file {version.file_id}: {e}")
+
+
+def prune_unreferenced_blobs(grace_minutes: int = None) -> int:
+    """
+    Delete content blobs no proposal version snapshot refers to anymore.
+
+    Runs periodically from Celery Beat (app/tasks/version_tasks.py).
+
+    Args:
+        grace_minutes: Keep blobs created or reused this recently (defaults to
+            VERSION_BLOB_PRUNE_GRACE_MINUTES)
+
+    Returns:
+        Number of blobs deleted
+    """
+    grace_minutes = VERSION_BLOB_PRUNE_GRACE_MINUTES if grace_minutes is None else grace_minutes
+    cutoff = datetime.utcnow() - timedelta(minutes=grace_minutes)
+
+    referenced = set()
+    for (snapshot,) in db.session.query(ProposalVersion.sections_snapshot):
+        referenced.update(s.get('content_hash') for s in (snapshot or []))
+
+    expired = db.or_(ContentBlob.created_at < cutoff, ContentBlob.created_at.is_(None))
+    candidates = db.session.query(ContentBlob.hash).filter(expired)
+    unreferenced = [h for (h,) in candidates if h not in referenced]
+    deleted = 0
+    for start in range(0, len(unreferenced), 500):
+        # Re-check the age: a snapshot may have reused the blob since it was selected
+        deleted += ContentBlob.query.filter(ContentBlob.hash.in_(unreferenced[start:start + 500]), expired)\
+            .delete(synchronize_session=False)
+    db.session.commit()
+    with _cache_lock:
+        for digest in unreferenced:
+            _blob_cache.pop(digest, None)
+    return deleted
+
+
+def get_version_storage_stats(project_id: int) -> Dict:
+    """
+    Logical versus stored size of a project's versions.
+
+    Returns:
+        Dict with proposal and section history byte counts and the overall
+        savings ratio (1 - stored / logical)
+    """
+    versions = ProposalVersion.query.filter_by(project_id=project_id).all()
+
+    logical_snapshots = stored_snapshots = 0
+    hashes = set()
+    for version in versions:
+        snapshot = version.sections_snapshot or []
+        stored_snapshots += len(json.dumps(snapshot, default=str))
+        logical_snapshots += len(json.dumps(expand_snapshot(snapshot), default=str))
+        hashes.update(s.get('content_hash') for s in snapshot if s.get('content_hash'))
+    blob_bytes = sum(
+        len(data) for (data,) in db.session.query(ContentBlob.data).filter(ContentBlob.hash.in_(hashes))
+    ) if hashes else 0
+
+    logical_files = sum(v.file_size or 0 for v in versions)
+    stored_files = sum(len(v.file_data) for v in versions if v.file_data)
+    object_storage_files = sum({v.file_id: v.file_size or 0 for v in versions if v.file_id}.values())
+
+    history = SectionVersion.query.join(RFPSection, SectionVersion.section_id == RFPSection.id)\
+        .filter(RFPSection.project_id == project_id).all()
+    cache = {}
+    logical_history = sum(len(v.get_content(cache) or '') for v in history)
+    stored_history = sum(len(v.content or '') + len(v.content_delta or '') for v in history)
+
+    logical_total = logical_snapshots + logical_files + logical_history
+    stored_total = stored_snapshots + blob_bytes + stored_files + object_storage_files + stored_history
+    return {
+        'proposal_versions': len(versions),
+        'snapshot_bytes': {'logical': logical_snapshots, 'stored': stored_snapshots + blob_bytes},
+        'file_bytes': {
+            'logical': logical_files,
+            'database': stored_files,
+            'object_storage': object_storage_files
+        },
+        'section_versions': len(history),
+        'section_history_bytes': {'logical': logical_history, 'stored': stored_history},
+        'logical_bytes': logical_total,
+        'stored_bytes': stored_total,
+        'savings_ratio': round(1 - stored_total / logical_total, 4) if logical_total else 0.0
+    }
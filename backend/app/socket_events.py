@@ -1,12 +1,31 @@
+import threading
+import time
+
 from flask import request
 from flask_socketio import emit, join_room, leave_room
 from .extensions import socketio, db
 from .models import User, Project
-import json
+from .services.presence_service import (
+    get_presence_store,
+    ContentDeltaEncoder,
+    CONTENT_BROADCAST_INTERVAL,
+)
+
+# Presence is stored in Redis (see services/presence_service.py) so it is shared
+# by every worker; rooms work across workers via the Socket.IO message queue.
+# Entry structure: { sid: { user_id, name, status, cursor: { section_id, field }, last_seen } }
+
+# Content broadcasts are throttled per (sid, project, section) and delta-encoded.
+# Socket.IO sessions are sticky to one worker, so this state is process-local.
+_content_encoder = ContentDeltaEncoder()
+_pending_content = {}
+_last_content_broadcast = {}
+_content_lock = threading.Lock()
+
+
+def _room(project_id):
+    return f"project_{project_id}"
 
-# Presence storage (in-memory for simple hackathon implementation, should use Redis in production)
-# Structure: { project_id: { user_id: { name: str, cursor: { section_id: int, position: int }, last_active: timestamp } } }
-active_users = {}
 
 @socketio.on('connect')
 def handle_connect():
@@ -14,70 +33,145 @@ def handle_connect():
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print(f"Client disconnected: {request.sid}")
-    # Remove user from all projects they were active in
-    for project_id in active_users:
-        if request.sid in active_users[project_id]:
-            del active_users[project_id][request.sid]
-            emit('presence_update', active_users[project_id], room=f"project_{project_id}")
+    sid = request.sid
+    print(f"Client disconnected: {sid}")
+    presence = get_presence_store()
+    # Remove user from all projects they were active in (sid -> projects index)
+    for project_id in presence.remove_sid(sid):
+        emit('presence_update', presence.get_project_users(project_id), room=_room(project_id))
+
+    _content_encoder.reset_prefix(sid)
+    with _content_lock:
+        for key in [k for k in _last_content_broadcast if k[0] == sid]:
+            _last_content_broadcast.pop(key, None)
+            _pending_content.pop(key, None)
 
 @socketio.on('join_project')
 def on_join(data):
     project_id = data.get('project_id')
     user_id = data.get('user_id')
     user_name = data.get('user_name')
-    
+
     if not project_id or not user_id:
         return
-        
-    join_room(f"project_{project_id}")
-    
-    if project_id not in active_users:
-        active_users[project_id] = {}
-        
-    active_users[project_id][request.sid] = {
+
+    join_room(_room(project_id))
+
+    users = get_presence_store().join(project_id, request.sid, {
         'user_id': user_id,
         'name': user_name,
         'status': 'online',
         'cursor': None
-    }
-    
+    })
+
     print(f"User {user_name} joined project {project_id}")
-    emit('presence_update', active_users[project_id], room=f"project_{project_id}")
+    emit('presence_update', users, room=_room(project_id))
+    # Editors may be on other workers; each one's worker sends its latest content (on_content_keyframe)
+    emit('content_keyframe_request', {'sid': request.sid}, room=_room(project_id), include_self=False)
 
 @socketio.on('leave_project')
 def on_leave(data):
     project_id = data.get('project_id')
     if project_id:
-        leave_room(f"project_{project_id}")
-        if project_id in active_users and request.sid in active_users[project_id]:
-            del active_users[project_id][request.sid]
-            emit('presence_update', active_users[project_id], room=f"project_{project_id}")
+        leave_room(_room(project_id))
+        presence = get_presence_store()
+        if presence.get_entry(project_id, request.sid) is not None:
+            users = presence.leave(project_id, request.sid)
+            emit('presence_update', users, room=_room(project_id))
+
+@socketio.on('presence_heartbeat')
+def on_heartbeat(data=None):
+    """Keep the socket's presence entries alive."""
+    get_presence_store().heartbeat(request.sid)
 
 @socketio.on('cursor_move')
 def on_cursor_move(data):
     project_id = data.get('project_id')
     cursor_data = data.get('cursor') # { section_id: int, field: str }
-    
-    if project_id in active_users and request.sid in active_users[project_id]:
-        active_users[project_id][request.sid]['cursor'] = cursor_data
+
+    if not project_id:
+        return
+
+    entry = get_presence_store().update_cursor(project_id, request.sid, cursor_data)
+    if entry:
         emit('cursor_update', {
             'sid': request.sid,
-            'user_id': active_users[project_id][request.sid]['user_id'],
-            'name': active_users[project_id][request.sid]['name'],
+            'user_id': entry['user_id'],
+            'name': entry['name'],
             'cursor': cursor_data
-        }, room=f"project_{project_id}", include_self=False)
+        }, room=_room(project_id), include_self=False)
 
 @socketio.on('content_change')
 def on_content_change(data):
-    """Notify others when content is being edited."""
+    """Notify others when content is being edited (throttled, delta-encoded)."""
     project_id = data.get('project_id')
     section_id = data.get('section_id')
-    content = data.get('content')
-    
-    emit('remote_content_change', {
-        'section_id': section_id,
-        'content': content,
+    if not project_id:
+        return
+
+    sid = request.sid
+    key = (sid, str(project_id), section_id)
+    payload = {
+        'content': data.get('content'),
         'user_id': data.get('user_id'),
         'user_name': data.get('user_name')
-    }, room=f"project_{project_id}", include_self=False)
+    }
+
+    now = time.monotonic()
+    with _content_lock:
+        elapsed = now - _last_content_broadcast.get(key, 0)
+        scheduled = key in _pending_content
+        if elapsed >= CONTENT_BROADCAST_INTERVAL and not scheduled:
+            _last_content_broadcast[key] = now
+            send_now = True
+        else:
+            # Coalesce keystrokes; the latest content is flushed at the end of the window
+            _pending_content[key] = payload
+            send_now = False
+
+    if send_now:
+        _broadcast_content(key, payload)
+    elif not scheduled:
+        socketio.start_background_task(
+            _flush_content, key, max(CONTENT_BROADCAST_INTERVAL - elapsed, 0)
+        )
+
+
+@socketio.on('content_keyframe')
+def on_content_keyframe(data):
+    """Send this socket's latest content in a project, in full, to a client that just joined it."""
+    project_id = data.get('project_id')
+    to = data.get('to')
+    if not project_id or not to or get_presence_store().get_entry(project_id, to) is None:
+        return
+
+    for (sid, _, section_id), content in _content_encoder.latest((request.sid, str(project_id))).items():
+        emit('remote_content_change', {
+            'sid': sid,
+            'section_id': section_id,
+            'user_id': data.get('user_id'),
+            'user_name': data.get('user_name'),
+            'content': content
+        }, room=to)
+
+
+def _flush_content(key, delay):
+    socketio.sleep(delay)
+    with _content_lock:
+        payload = _pending_content.pop(key, None)
+        if payload is None:
+            return
+        _last_content_broadcast[key] = time.monotonic()
+    _broadcast_content(key, payload)
+
+
+def _broadcast_content(key, payload):
+    sid, project_id, section_id = key
+    encoded = _content_encoder.encode(key, payload['content'])
+    socketio.emit('remote_content_change', {
+        'sid': sid,
+        'section_id': section_id,
+        'user_id': payload['user_id'],
+        'user_name': payload['user_name'],
+        **encoded
+    }, room=_room(project_id), skip_sid=sid)
@@ -1,5 +1,10 @@
 """Tasks package."""
 
 from .agent_tasks import create_celery_tasks
+from .document_tasks import create_document_tasks
+from .ingestion_tasks import create_ingestion_tasks
+from .freshness_tasks import create_freshness_tasks
+from .version_tasks import create_version_tasks
 
-__all__ = ['create_celery_tasks']
+__all__ = ['create_celery_tasks', 'create_document_tasks', 'create_ingestion_tasks', 'create_freshness_tasks',
+           'create_version_tasks']
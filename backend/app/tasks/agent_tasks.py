@@ -4,15 +4,24 @@ Celery Tasks for Async Agent Operations
 Provides background task execution for long-running RFP analysis operations.
 """
 import logging
+import os
 from typing import Dict, Any
 from celery import Task, current_task
+from celery.exceptions import Ignore
 from datetime import datetime
 
 from app.extensions import db
 from app.agents import get_orchestrator_agent
+from app.agents.config import SessionKeys
+from app.agents.utils import PipelineCancelled
+from app.services.job_checkpoint_service import compute_input_hash, get_job_checkpoint_store
 
 logger = logging.getLogger(__name__)
 
+# Automatic retries of a failed analysis (each resumes from its checkpoints)
+ANALYSIS_MAX_RETRIES = int(os.environ.get('RFP_ANALYSIS_MAX_RETRIES', 2))
+ANALYSIS_RETRY_DELAY = int(os.environ.get('RFP_ANALYSIS_RETRY_DELAY', 30))  # seconds
+
 
 class ProgressTask(Task):
     """Custom Celery task that reports progress."""
@@ -31,46 +40,89 @@ def create_celery_tasks(celery_app):
         celery_app: Initialized Celery app instance
     """
     
-    @celery_app.task(bind=True, base=ProgressTask, name='agents.analyze_rfp_async')
+    @celery_app.task(
+        bind=True,
+        base=ProgressTask,
+        name='agents.analyze_rfp_async',
+        acks_late=True,
+        reject_on_worker_lost=True
+    )
     def analyze_rfp_async(
         self,
         document_text: str,
         org_id: int = None,
         project_id: int = None,
-        options: Dict = None
+        options: Dict = None,
+        resume_from: str = None
     ) -> Dict:
         """
         Async version of RFP analysis workflow.
         
-        Reports progress updates at each step for real-time tracking.
+        Reports progress updates at each step for real-time tracking, and
+        per-question completion (with the latest answers) while questions
+        are being answered.
+        
+        Every stage output and every question batch is checkpointed under
+        the job ID and a hash of the input, so a retry, a redelivery after a
+        worker restart or /resume-job continues from the last completed unit
+        of work. /cancel-job stops the job at the next checkpoint.
         
         Args:
             document_text: RFP document text
             org_id: Organization ID
             project_id: Project ID for dimension filtering
             options: Analysis options (tone, length, etc.)
+            resume_from: ID of an earlier job whose checkpoints to continue from
             
         Returns:
             Complete analysis results
         """
         options = options or {}
+        job_id = self.request.id
+        
+        checkpoint = None
+        if job_id:
+            try:
+                store = get_job_checkpoint_store()
+                checkpoint_job_id = resume_from or job_id
+                store.save_input(job_id, {
+                    'document_text': document_text,
+                    'org_id': org_id,
+                    'project_id': project_id,
+                    'options': options,
+                    'resume_from': checkpoint_job_id
+                })
+                checkpoint = store.for_job(
+                    checkpoint_job_id,
+                    compute_input_hash(document_text, org_id, project_id, options),
+                    cancel_job_id=job_id
+                )
+            except Exception as e:
+                logger.warning(f"Job checkpoints unavailable for {job_id}: {e}")
+        
+        def should_stop():
+            return checkpoint is not None and checkpoint.cancel_requested()
+        
+        def stop_if_cancelled():
+            if should_stop():
+                raise PipelineCancelled()
         
         try:
             # Initialize orchestrator
-            orchestrator = get_orchestrator_agent()
+            orchestrator = get_orchestrator_agent(org_id=org_id)
+            resumed = checkpoint is not None and checkpoint.resumed
             
             # Update: Starting analysis
             self.update_progress('PROGRESS', {
                 'current_step': 0,
                 'total_steps': 5,
-                'status': 'Starting RFP analysis...',
-                'started_at': datetime.utcnow().isoformat()
+                'status': 'Resuming RFP analysis...' if resumed else 'Starting RFP analysis...',
+                'started_at': datetime.utcnow().isoformat(),
+                'resumed': resumed
             })
             
-            # We'll override the orchestrator to report progress
-            # Wrap each step with progress updates
-            
             # Step 1: Document Analysis
+            stop_if_cancelled()
             self.update_progress('PROGRESS', {
                 'current_step': 1,
                 'total_steps': 5,
@@ -78,17 +130,33 @@ def create_celery_tasks(celery_app):
                 'progress_percent': 20
             })
             
-            doc_result = orchestrator.document_analyzer.analyze(
-                document_text=document_text,
-                session_state={}
-            )
-            
-            if not doc_result.get("success"):
-                raise Exception("Document analysis failed")
-            
-            session_state = doc_result.get("session_state", {})
+            saved = checkpoint.get('document_analysis') if checkpoint else None
+            if saved:
+                analysis = saved['analysis']
+                session_state = {
+                    SessionKeys.DOCUMENT_TEXT: document_text,
+                    SessionKeys.DOCUMENT_STRUCTURE: analysis,
+                    SessionKeys.AGENT_MESSAGES: saved.get('agent_messages', [])
+                }
+            else:
+                doc_result = orchestrator.document_analyzer.analyze(
+                    document_text=document_text,
+                    session_state={}
+                )
+                
+                if not doc_result.get("success"):
+                    raise Exception("Document analysis failed")
+                
+                analysis = doc_result.get("analysis")
+                session_state = doc_result.get("session_state", {})
+                if checkpoint:
+                    checkpoint.save('document_analysis', {
+                        'analysis': analysis,
+                        'agent_messages': session_state.get(SessionKeys.AGENT_MESSAGES, [])
+                    })
             
             # Step 2: Question Extraction
+            stop_if_cancelled()
             self.update_progress('PROGRESS', {
                 'current_step': 2,
                 'total_steps': 5,
@@ -96,98 +164,121 @@ def create_celery_tasks(celery_app):
                 'progress_percent': 40
             })
             
-            question_result = orchestrator.question_extractor.extract(
-                session_state=session_state
-            )
-            
-            if not question_result.get("success"):
-                raise Exception("Question extraction failed")
-            
-            session_state = question_result.get("session_state", session_state)
-            questions = question_result.get("questions", [])
-            
-            # Step 3: Knowledge Retrieval
+            saved = checkpoint.get('question_extraction') if checkpoint else None
+            if saved:
+                questions = saved['questions']
+                session_state[SessionKeys.EXTRACTED_QUESTIONS] = questions
+                session_state[SessionKeys.AGENT_MESSAGES] = saved.get('agent_messages', [])
+            else:
+                question_result = orchestrator.question_extractor.extract(
+                    session_state=session_state
+                )
+                
+                if not question_result.get("success"):
+                    raise Exception("Question extraction failed")
+                
+                session_state = question_result.get("session_state", session_state)
+                questions = question_result.get("questions", [])
+                if checkpoint:
+                    checkpoint.save('question_extraction', {
+                        'questions': questions,
+                        'agent_messages': session_state.get(SessionKeys.AGENT_MESSAGES, [])
+                    })
+            
+            # Steps 3-5: retrieval, generation, validation, compliance,
+            # clarification and review, pipelined per batch of questions
+            stop_if_cancelled()
             self.update_progress('PROGRESS', {
                 'current_step': 3,
                 'total_steps': 5,
-                'status': f'Retrieving knowledge for {len(questions)} questions...',
-                'progress_percent': 60
+                'status': f'Answering {len(questions)} questions...',
+                'progress_percent': 40,
+                'questions_total': len(questions),
+                'questions_completed': 0
             })
             
-            kb_result = orchestrator.knowledge_base.retrieve_context(
+            completed_ids = []
+            
+            def report_answers(answers, completed, total):
+                completed_ids.extend(a.get("question_id") for a in answers)
+                self.update_progress('PROGRESS', {
+                    'current_step': 4 if completed < total else 5,
+                    'total_steps': 5,
+                    'status': f'Answered {completed} of {total} questions...',
+                    'progress_percent': 40 + int(55 * completed / max(total, 1)),
+                    'questions_total': total,
+                    'questions_completed': completed,
+                    'completed_question_ids': list(completed_ids),
+                    'latest_answers': [
+                        {
+                            'question_id': a.get("question_id"),
+                            'answer': a.get("final_answer") or a.get("answer", ""),
+                            'confidence_score': a.get("confidence_score"),
+                            'needs_human_review': a.get("needs_human_review")
+                        }
+                        for a in answers
+                    ]
+                })
+            
+            pipeline_result = orchestrator.answer_questions_pipelined(
+                questions=questions,
                 org_id=org_id,
                 project_id=project_id,
-                session_state=session_state
+                options=options,
+                on_progress=report_answers,
+                checkpoint=checkpoint,
+                should_stop=should_stop
             )
             
-            session_state = kb_result.get("session_state", session_state)
-            
-            # Step 4: Answer Generation
-            self.update_progress('PROGRESS', {
-                'current_step': 4,
-                'total_steps': 5,
-                'status': f'Generating answers to {len(questions)} questions...',
-                'progress_percent': 80
-            })
-            
-            answer_result = orchestrator.answer_generator.generate_answers(
-                tone=options.get("tone", "professional"),
-                length=options.get("length", "medium"),
-                session_state=session_state
-            )
-            
-            if not answer_result.get("success"):
+            if questions and not pipeline_result["answers"]:
                 raise Exception("Answer generation failed")
             
-            session_state = answer_result.get("session_state", session_state)
-            
-            # Step 4.5: Clarification Detection
-            clarification_result = orchestrator.clarification_agent.analyze_questions(
-                confidence_threshold=0.5,
-                session_state=session_state
-            )
-            
-            clarifications = clarification_result.get("clarifications", []) if clarification_result.get("success") else []
-            session_state = clarification_result.get("session_state", session_state)
-            
-            # Step 5: Quality Review
-            self.update_progress('PROGRESS', {
-                'current_step': 5,
-                'total_steps': 5,
-                'status': 'Reviewing answer quality...',
-                'progress_percent': 95
+            agent_log = session_state.get(SessionKeys.AGENT_MESSAGES, [])
+            agent_log.append({
+                "agent": orchestrator.name,
+                "action": "questions_answered",
+                "summary": f"Answered {len(pipeline_result['answers'])} questions in {pipeline_result['pipeline']['batches']} pipelined batches"
             })
             
-            review_result = orchestrator.quality_reviewer.review_answers(
-                session_state=session_state
-            )
-            
-            if review_result.get("success"):
-                answers = review_result.get("reviewed_answers", [])
-                stats = review_result.get("stats", {})
-            else:
-                # Fallback to draft answers
-                from app.agents.config import SessionKeys
-                answers = session_state.get(SessionKeys.DRAFT_ANSWERS, [])
-                stats = {}
-            
             # Complete
             result = {
                 "success": True,
-                "steps_completed": ["document_analysis", "question_extraction", "knowledge_retrieval", 
-                                  "answer_generation", "clarification_detection", "quality_review"],
-                "document_analysis": doc_result.get("analysis"),
+                "steps_completed": ["document_analysis", "question_extraction"] + pipeline_result["steps_completed"],
+                "document_analysis": analysis,
                 "questions": questions,
-                "answers": answers,
-                "clarifications": clarifications,
-                "stats": stats,
-                "agent_log": session_state.get("agent_messages", []),
+                "answers": pipeline_result["answers"],
+                "clarifications": pipeline_result["clarifications"],
+                "compliance_issues": pipeline_result["compliance_issues"],
+                "stats": pipeline_result["review_stats"],
+                "validation_stats": pipeline_result["validation_stats"],
+                "pipeline": pipeline_result["pipeline"],
+                "deduplication": pipeline_result.get("deduplication"),
+                "agent_log": agent_log,
+                "resumed": resumed,
                 "completed_at": datetime.utcnow().isoformat()
             }
             
+            # The result is in the result backend now
+            if checkpoint:
+                checkpoint.clear()
+            
             return result
+        
+        except PipelineCancelled:
+            logger.info(f"RFP analysis {job_id} cancelled at a checkpoint")
+            self.update_progress('CANCELLED', {
+                'status': 'Cancelled',
+                'cancelled_at': datetime.utcnow().isoformat(),
+                'resumable': True
+            })
+            # Keep the CANCELLED state instead of recording a result
+            raise Ignore()
             
         except Exception as e:
+            if checkpoint is not None and self.request.retries < ANALYSIS_MAX_RETRIES:
+                logger.warning(f"Async RFP analysis failed, retrying from checkpoints: {e}")
+                raise self.retry(exc=e, countdown=ANALYSIS_RETRY_DELAY)
+            
             logger.error(f"Async RFP analysis failed: {str(e)}", exc_info=True)
             self.update_progress('FAILURE', {
                 'error': str(e),
@@ -0,0 +1,152 @@
+"""
+Celery Tasks for Document Processing
+
+Runs document parsing (text extraction, question extraction and section
+recommendation) and chunk embedding in the background so uploads return
+immediately. Reindexing only re-embeds chunks that changed since they were
+indexed (see app/services/document_index_service.py).
+"""
+import logging
+from typing import Dict, Any
+from datetime import datetime
+
+from app.extensions import db
+from .agent_tasks import ProgressTask
+
+logger = logging.getLogger(__name__)
+
+# Progress percent reported at the start of each parse stage
+PARSE_STAGE_PROGRESS = {
+    'loading_file': 5,
+    'extracting_text': 15,
+    'extracting_questions': 35,
+    'saving_questions': 60,
+    'recommending_sections': 80,
+}
+
+
+def _emit_parse_progress(project_id: int, payload: Dict[str, Any]):
+    """Push parse progress to the project room (best effort)."""
+    try:
+        from app.extensions import socketio
+        socketio.emit('document_parse_progress', payload, room=f"project_{project_id}")
+    except Exception as e:
+        logger.debug(f"Could not emit parse progress: {e}")
+
+
+def create_document_tasks(celery_app):
+    """
+    Create document processing Celery tasks.
+
+    Args:
+        celery_app: Initialized Celery app instance
+    """
+
+    # Keep the app's Flask-context task base while adding progress reporting
+    class DocumentTask(celery_app.Task, ProgressTask):
+        pass
+
+    @celery_app.task(bind=True, base=DocumentTask, name='documents.parse_document_async')
+    def parse_document_async(self, document_id: int) -> Dict:
+        """
+        Parse a document and extract its questions in the background.
+
+        Reports progress per stage (and per saved batch of questions).
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            Parse result (same shape as the synchronous /parse endpoint)
+        """
+        from app.models import Document
+        from app.routes.documents import _parse_document_internal
+
+        document = db.session.get(Document, document_id)
+        if not document:
+            raise ValueError(f"Document {document_id} not found")
+
+        def on_progress(stage: str, meta: Dict[str, Any]):
+            percent = PARSE_STAGE_PROGRESS.get(stage, 0)
+            if stage == 'saving_questions' and meta.get('questions_total'):
+                # Spread batch progress across the saving stage
+                share = meta.get('questions_saved', 0) / meta['questions_total']
+                percent += int(share * (PARSE_STAGE_PROGRESS['recommending_sections'] - percent))
+            payload = {
+                'document_id': document_id,
+                'stage': stage,
+                'progress_percent': percent,
+                **meta
+            }
+            self.update_progress('PROGRESS', payload)
+            _emit_parse_progress(document.project_id, payload)
+
+        try:
+            result = _parse_document_internal(document, progress_callback=on_progress)
+        except Exception as e:
+            logger.error(f"Async document parse failed: {str(e)}", exc_info=True)
+            self.update_progress('FAILURE', {
+                'error': str(e),
+                'failed_at': datetime.utcnow().isoformat()
+            })
+            raise
+
+        if 'error' in result:
+            raise Exception(result['error'])
+
+        _emit_parse_progress(document.project_id, {
+            'document_id': document_id,
+            'stage': 'completed',
+            'progress_percent': 100,
+            'questions_extracted': result.get('questions_extracted', 0)
+        })
+        result['completed_at'] = datetime.utcnow().isoformat()
+        return result
+
+    from app.services.document_index_service import DOCUMENT_REINDEX_RATE_LIMIT
+
+    @celery_app.task(bind=True, name='documents.reindex_document_embeddings', max_retries=3,
+                     rate_limit=DOCUMENT_REINDEX_RATE_LIMIT, acks_late=True)
+    def reindex_document_embeddings(self, document_id: int, org_id: int) -> Dict:
+        """
+        Chunk a document and re-embed only its new or changed chunks.
+
+        Safe to run repeatedly: a document whose chunks and embedding model
+        are unchanged is not re-embedded.
+
+        Args:
+            document_id: Document ID
+            org_id: Organization ID
+        """
+        from app.services.document_index_service import reindex_document
+
+        try:
+            return reindex_document(document_id, org_id)
+        except Exception as e:
+            raise self.retry(countdown=120, exc=e)
+
+    @celery_app.task(name='documents.reembed_outdated_documents')
+    def reembed_outdated_documents() -> Dict:
+        """
+        Queue reindexing of documents embedded by another model version (Celery Beat).
+
+        At most DOCUMENT_REEMBED_BATCH_SIZE documents are queued per run; the
+        reindex tasks themselves are rate-limited.
+        """
+        from app.services.document_index_service import find_outdated_documents
+        from app.services.hybrid_search_service import get_hybrid_search_service
+
+        model_version = get_hybrid_search_service().embedding_model_version
+        documents = find_outdated_documents(model_version)
+        for document_id, org_id in documents:
+            reindex_document_embeddings.delay(document_id, org_id)
+
+        if documents:
+            logger.info(f"Queued re-embedding of {len(documents)} documents for {model_version}")
+        return {'queued': len(documents), 'embedding_model': model_version}
+
+    return {
+        'parse_document_async': parse_document_async,
+        'reindex_document_embeddings': reindex_document_embeddings,
+        'reembed_outdated_documents': reembed_outdated_documents
+    }
@@ -0,0 +1,27 @@
+"""
+Celery Tasks for Content Freshness
+
+Periodic sweep that rescores the answer library and knowledge items whose
+staleness can have changed since it was last computed.
+"""
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+def create_freshness_tasks(celery_app):
+    """
+    Create content freshness Celery tasks.
+
+    Args:
+        celery_app: Initialized Celery app instance
+    """
+    from app.services.freshness_service import sweep_staleness
+
+    @celery_app.task(name='freshness.sweep', acks_late=True)
+    def sweep() -> Dict[str, int]:
+        """Rescore items whose staleness_next_check_at has passed (Celery Beat)."""
+        return sweep_staleness()
+
+    return sweep
@@ -0,0 +1,54 @@
+"""
+Celery Tasks for Knowledge Ingestion
+
+Processes the files of a folder upload in parallel (one task per file, with
+retries), then indexes all of them in one batched embedding step.
+"""
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def create_ingestion_tasks(celery_app):
+    """
+    Create knowledge ingestion Celery tasks.
+
+    Args:
+        celery_app: Initialized Celery app instance
+    """
+    from app.services.knowledge_ingestion_service import (
+        INGESTION_MAX_RETRIES, INGESTION_RETRY_DELAY,
+        index_ingestion_batch, mark_file_failed, process_ingestion_file
+    )
+
+    @celery_app.task(
+        bind=True,
+        name='ingestion.process_file',
+        max_retries=INGESTION_MAX_RETRIES,
+        acks_late=True,
+        reject_on_worker_lost=True
+    )
+    def process_file(self, file_id: int) -> Dict:
+        """
+        Extract, chunk and store one uploaded file.
+
+        Never fails the batch: after the last retry the file is marked failed
+        and the indexing step still runs for the other files.
+        """
+        try:
+            return process_ingestion_file(file_id)
+        except Exception as e:
+            if self.request.retries < INGESTION_MAX_RETRIES:
+                logger.warning(f"Ingestion of file {file_id} failed, retrying: {e}")
+                mark_file_failed(file_id, e, final=False)
+                raise self.retry(exc=e, countdown=INGESTION_RETRY_DELAY * 2 ** self.request.retries)
+            mark_file_failed(file_id, e)
+            return {'id': file_id, 'status': 'failed', 'error': str(e)}
+
+    @celery_app.task(bind=True, name='ingestion.index_batch', acks_late=True)
+    def index_batch(self, file_results: List[Dict], batch_id: str) -> Dict:
+        """Embed and index the chunks of all processed files of a batch."""
+        return index_ingestion_batch(batch_id)
+
+    return process_file, index_batch
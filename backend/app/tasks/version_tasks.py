@@ -0,0 +1,29 @@
+"""
+Celery Tasks for Proposal Version Storage
+
+Periodic cleanup of content blobs that no proposal version snapshot
+refers to anymore (left behind by deleted versions).
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def create_version_tasks(celery_app):
+    """
+    Create version storage Celery tasks.
+
+    Args:
+        celery_app: Initialized Celery app instance
+    """
+    from app.services.version_storage_service import prune_unreferenced_blobs
+
+    @celery_app.task(name='versions.prune_unreferenced_blobs', acks_late=True)
+    def prune_blobs() -> int:
+        """Delete unreferenced snapshot content blobs (Celery Beat)."""
+        deleted = prune_unreferenced_blobs()
+        if deleted:
+            logger.info(f"Pruned {deleted} unreferenced content blobs")
+        return deleted
+
+    return prune_blobs
@@ -0,0 +1,130 @@
+"""
+Shared asyncio event loop for synchronous callers.
+
+Flask routes, Celery tasks and agent threads are synchronous, but the LLM
+providers' async clients let one thread keep many requests in flight. This
+module runs a single long-lived event loop in a daemon thread; sync code
+submits coroutines to it instead of creating a loop (or a thread) per call.
+Async clients created on this loop keep their connection pools between calls.
+
+The loop is recreated after a fork, so prefork Celery workers each get
+their own.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_pid: Optional[int] = None
+
+
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """The shared event loop, started on first use."""
+    global _loop, _thread, _pid
+    if _loop is not None and _pid == os.getpid() and _thread.is_alive():
+        return _loop
+    with _lock:
+        if _loop is None or _pid != os.getpid() or not _thread.is_alive():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=run, name='shared-event-loop', daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop, _pid = loop, os.getpid()
+            logger.debug("Started shared event loop")
+    return _loop
+
+
+def in_shared_loop() -> bool:
+    """Whether the caller runs on the shared loop's thread."""
+    return _thread is not None and threading.current_thread() is _thread
+
+
+def run_async(coro: Awaitable, timeout: float = None) -> Any:
+    """
+    Run a coroutine on the shared loop and wait for its result.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling it
+
+    Raises:
+        RuntimeError: If called from the shared loop itself (use await)
+    """
+    if in_shared_loop():
+        coro.close()
+        raise RuntimeError("run_async() called from the shared event loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, get_shared_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def run_all(coros: Iterable[Awaitable], max_concurrency: int = None, timeout: float = None,
+            return_exceptions: bool = True) -> List[Any]:
+    """
+    Run coroutines concurrently on the shared loop.
+
+    Args:
+        coros: Coroutines to run
+        max_concurrency: Max coroutines running at once (default: all)
+        timeout: Seconds to wait for all of them
+        return_exceptions: Return a failed coroutine's exception in its
+            place instead of raising it
+
+    Returns:
+        Results in input order
+    """
+    coros = list(coros)
+    if not coros:
+        return []
+
+    async def gather():
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or len(coros)))
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*(limited(c) for c in coros), return_exceptions=return_exceptions)
+
+    return run_async(gather(), timeout)
+
+
+def iterate_async(agen: AsyncIterator) -> Iterator[Any]:
+    """
+    Iterate an async generator from sync code, one step at a time.
+
+    Used to stream LLM output through a regular (WSGI) generator. The async
+    generator is closed on the shared loop when the sync iterator is closed
+    early, e.g. when the client disconnects.
+    """
+    iterator = agen.__aiter__()
+    try:
+        while True:
+            try:
+                yield run_async(iterator.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            try:
+                run_async(aclose())
+            except Exception as e:
+                logger.debug(f"Closing async generator failed: {e}")
@@ -0,0 +1,122 @@
+"""
+Multi-pattern keyword classifier.
+
+Compiles any number of labelled keyword sets into a single regular
+expression shaped like a trie of all keywords, so a text is scanned once no
+matter how many categories and keywords there are (the same idea as an
+Aho-Corasick automaton, executed by the C regex engine).
+
+Matching follows the plain substring semantics of ``keyword in text.lower()``:
+a label's score is the number of its distinct keywords that occur anywhere in
+the text, including keywords inside longer words or overlapping each other.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Set
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex matching the longest keyword that starts at the current position."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True  # end of keyword
+
+    def emit(node: dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional continuation: prefer the longer keyword
+        if terminal:
+            return '(?:' + body + ')?' if len(branches) == 1 else body + '?'
+        return body
+
+    return emit(trie)
+
+
+def best_label(scores: Dict[Hashable, int], min_score: int = 1,
+               default: Hashable = None) -> Optional[Hashable]:
+    """Highest-scoring label (earliest on ties) with at least ``min_score``."""
+    label_found, best_score = default, min_score - 1
+    for label, score in scores.items():
+        if score > best_score:
+            label_found, best_score = label, score
+    return label_found
+
+
+class KeywordClassifier:
+    """
+    Scores texts against labelled keyword sets in one pass.
+
+    Usage:
+        classifier = KeywordClassifier({'security': ['encrypt', 'mfa'], 'pricing': ['cost']})
+        classifier.scores("How do you encrypt backups and what does it cost?")
+        # {'security': 1, 'pricing': 1}
+
+    Labels can be any hashable (e.g. ``('security', 'encryption')`` for a
+    sub-category); a keyword may belong to several labels.
+    """
+
+    def __init__(self, keyword_sets: Dict[Hashable, Iterable[str]]):
+        self.labels: List[Hashable] = list(keyword_sets)
+        self._order = {label: i for i, label in enumerate(self.labels)}
+        self._labels_by_keyword: Dict[str, List[Hashable]] = defaultdict(list)
+        for label, keywords in keyword_sets.items():
+            for keyword in dict.fromkeys(kw.lower() for kw in keywords if kw):
+                self._labels_by_keyword[keyword].append(label)
+
+        keywords = list(self._labels_by_keyword)
+        # The scan reports the longest keyword starting at each position; the
+        # shorter ones starting there are its prefixes
+        self._with_prefixes: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(k for k in keywords if keyword.startswith(k))
+            for keyword in keywords
+        }
+        self._scanner = re.compile('(?=(' + _trie_pattern(keywords) + '))') if keywords else None
+
+    def matched_keywords(self, text: str) -> Set[str]:
+        """Distinct keywords occurring in the text."""
+        found: Set[str] = set()
+        if self._scanner is None or not text:
+            return found
+        seen: Set[str] = set()
+        for match in self._scanner.finditer(text.lower()):
+            longest = match.group(1)
+            if longest not in seen:
+                seen.add(longest)
+                found.update(self._with_prefixes[longest])
+        return found
+
+    def scores(self, text: str) -> Dict[Hashable, int]:
+        """
+        Number of distinct matching keywords per label.
+
+        Returns:
+            Scores for labels with at least one match, in label order
+        """
+        counts: Dict[Hashable, int] = defaultdict(int)
+        for keyword in self.matched_keywords(text):
+            for label in self._labels_by_keyword[keyword]:
+                counts[label] += 1
+        return {label: counts[label] for label in sorted(counts, key=self._order.__getitem__)}
+
+    def scores_batch(self, texts: Iterable[str]) -> List[Dict[Hashable, int]]:
+        """Scores for many texts (e.g. every question of an RFP)."""
+        return [self.scores(text) for text in texts]
+
+    def best(self, text: str, min_score: int = 1, default: Hashable = None) -> Optional[Hashable]:
+        """Highest-scoring label (earliest label on ties), or default."""
+        return best_label(self.scores(text), min_score, default)
+
+    def first_match(self, text: str, default: Hashable = None) -> Optional[Hashable]:
+        """Earliest label (in definition order) with any matching keyword."""
+        scores = self.scores(text)
+        return next(iter(scores), default)
+
+    def matching(self, text: str, min_score: int = 1) -> List[Hashable]:
+        """All labels with at least ``min_score`` matching keywords."""
+        return [label for label, score in self.scores(text).items() if score >= min_score]
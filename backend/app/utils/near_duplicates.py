@@ -0,0 +1,101 @@
+"""
+Near-duplicate text detection.
+
+Finds texts whose word sets have a Dice similarity
+(2 * |A & B| / (|A| + |B|)) above a threshold without comparing every pair.
+Candidates are found through a prefix filter: every word set is sorted in a
+fixed global order and only its first few words are indexed. Two sets that
+are similar enough must share at least one word in those prefixes, so the
+result is identical to a full pairwise scan, at close to linear cost.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional
+
+
+def word_set(text: str) -> FrozenSet[str]:
+    """Lowercased whitespace-separated words of a text."""
+    return frozenset((text or '').lower().split())
+
+
+def dice_similarity(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Word overlap similarity between two word sets."""
+    if not words1 or not words2:
+        return 0.0
+    return 2 * len(words1 & words2) / (len(words1) + len(words2))
+
+
+class NearDuplicateIndex:
+    """
+    Incremental near-duplicate index over short texts (e.g. questions).
+
+    Usage:
+        index = NearDuplicateIndex(threshold=0.8)
+        unique = [q for q in questions if index.add_if_new(q['text'])]
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self._sets: List[FrozenSet[str]] = []
+        self._prefix_index: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _min_overlap(self, size: int) -> int:
+        # Dice > t with |B| >= overlap implies overlap >= t * |A| / (2 - t)
+        t = self.threshold
+        return max(1, math.ceil(t * size / (2 - t) - 1e-9))
+
+    def _prefix(self, words: FrozenSet[str]) -> List[str]:
+        ordered = sorted(words, key=hash)
+        return ordered[:len(ordered) - self._min_overlap(len(ordered)) + 1]
+
+    def find(self, text: str) -> Optional[int]:
+        """
+        Find an indexed text that is a near duplicate of ``text``.
+
+        Returns:
+            Position (in insertion order) of the first match, or None
+        """
+        words = word_set(text)
+        if not words:
+            return None
+
+        t = self.threshold
+        size = len(words)
+        # Sizes outside this range cannot reach the threshold
+        min_size = t * size / (2 - t)
+        max_size = (2 - t) * size / t
+
+        checked = set()
+        for word in self._prefix(words):
+            for idx in self._prefix_index.get(word, ()):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                other = self._sets[idx]
+                other_size = len(other)
+                if min_size <= other_size <= max_size and \
+                        2 * len(words & other) > t * (size + other_size):
+                    return idx
+        return None
+
+    def add(self, text: str) -> int:
+        """Index a text unconditionally and return its position."""
+        words = word_set(text)
+        idx = len(self._sets)
+        self._sets.append(words)
+        if words:
+            for word in self._prefix(words):
+                self._prefix_index[word].append(idx)
+        return idx
+
+    def add_if_new(self, text: str) -> bool:
+        """Index a text unless it near-duplicates one already indexed."""
+        if self.find(text) is not None:
+            return False
+        self.add(text)
+        return True
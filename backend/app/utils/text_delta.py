@@ -0,0 +1,53 @@
+"""
+Line-based text deltas.
+
+A delta describes a target text in terms of a base text: runs of lines copied
+from the base (``[start, end]`` line ranges) and literal inserted text. Edits
+to a long section usually touch a few paragraphs, so the delta of one version
+against the previous one is a small fraction of the full content.
+
+Deltas are plain JSON-compatible lists and round-trip exactly, including line
+endings.
+"""
+import difflib
+import json
+from typing import List, Union
+
+Delta = List[Union[List[int], str]]
+
+
+def make_delta(base: str, target: str) -> Delta:
+    """Delta that turns ``base`` into ``target``."""
+    base_lines = (base or '').splitlines(keepends=True)
+    target_lines = (target or '').splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    delta: Delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j2 > j1:  # replace / insert
+            delta.append(''.join(target_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    """Rebuild the target text from its base and delta."""
+    base_lines = (base or '').splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return ''.join(parts)
+
+
+def encode_delta(delta: Delta) -> str:
+    """Compact JSON form of a delta for storage."""
+    return json.dumps(delta, separators=(',', ':'))
+
+
+def decode_delta(encoded: str) -> Delta:
+    """Delta from its stored JSON form."""
+    return json.loads(encoded)
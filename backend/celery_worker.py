@@ -1,7 +1,11 @@
+from datetime import timedelta
 from celery import Celery
 from celery.schedules import crontab
 from app import create_app
 from app.config import Config
+from app.services.freshness_service import FRESHNESS_SWEEP_INTERVAL_MINUTES
+from app.services.document_index_service import DOCUMENT_REEMBED_INTERVAL_MINUTES
+from app.services.version_storage_service import VERSION_BLOB_PRUNE_INTERVAL_HOURS
 
 def make_celery(app_name=__name__):
     """Create and configure Celery instance."""
@@ -27,6 +31,18 @@ def make_celery(app_name=__name__):
             'task': 'app.tasks.check_deadlines_task',
             'schedule': crontab(hour=9, minute=0),  # Run at 9:00 AM daily
         },
+        'sweep-content-freshness': {
+            'task': 'freshness.sweep',
+            'schedule': timedelta(minutes=FRESHNESS_SWEEP_INTERVAL_MINUTES),
+        },
+        'reembed-outdated-documents': {
+            'task': 'documents.reembed_outdated_documents',
+            'schedule': timedelta(minutes=DOCUMENT_REEMBED_INTERVAL_MINUTES),
+        },
+        'prune-version-blobs': {
+            'task': 'versions.prune_unreferenced_blobs',
+            'schedule': timedelta(hours=VERSION_BLOB_PRUNE_INTERVAL_HOURS),
+        },
     }
     celery.conf.timezone = 'UTC'
     
@@ -38,5 +54,11 @@ celery = make_celery()
 from app import tasks  # noqa: F401, E402
 
 # Register async agent tasks
-from app.tasks import create_celery_tasks
+from app.tasks import (
+    create_celery_tasks, create_document_tasks, create_ingestion_tasks, create_freshness_tasks, create_version_tasks
+)
 create_celery_tasks(celery)
+create_document_tasks(celery)
+create_ingestion_tasks(celery)
+create_freshness_tasks(celery)
+create_version_tasks(celery)
@@ -0,0 +1,156 @@
+"""
+Migrate Qdrant Collections
+
+Rebuilds the knowledge base and document chunk collections with the
+current provisioning settings (payload indexes, QDRANT_QUANTIZATION,
+QDRANT_VECTORS_ON_DISK, QDRANT_TENANCY) and switches their aliases, while
+the old collections keep serving. Reports estimated vector RAM and p95
+search latency before and after.
+
+Tenants can also be moved online between the shared collection and a
+dedicated one (see app/services/vectordb/tenancy.py).
+
+Usage:
+    python migrate_vector_collections.py [knowledge_base|document_chunks ...] [--dry-run]
+        [--tenancy shared|sharded]
+    python migrate_vector_collections.py [collections ...] --dedicate ORG_ID [ORG_ID ...]
+    python migrate_vector_collections.py [collections ...] --dedicate-large
+    python migrate_vector_collections.py [collections ...] --share ORG_ID [ORG_ID ...]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+from app.services.vectordb.provisioning import (
+    KNOWLEDGE_BASE, DOCUMENT_CHUNKS, QDRANT_QUANTIZATION, QDRANT_VECTORS_ON_DISK, QDRANT_TENANCY,
+    estimate_vector_memory, get_search_params, migrate_collection
+)
+from app.services.vectordb.tenancy import (
+    QDRANT_DEDICATED_TENANT_MIN_POINTS, move_tenant_to_dedicated, move_tenant_to_shared,
+    tenant_point_counts
+)
+
+SPECS = {spec.alias: spec for spec in (KNOWLEDGE_BASE, DOCUMENT_CHUNKS)}
+BENCHMARK_QUERIES = 200
+
+
+def _collection_settings(client, spec):
+    info = client.get_collection(spec.alias)
+    vectors = info.config.params.vectors
+    dense = vectors[spec.dense_vector] if spec.dense_vector else vectors
+    quantization = info.config.quantization_config
+    if quantization is None:
+        quantization_name = "none"
+    else:
+        quantization_name = "scalar" if getattr(quantization, "scalar", None) else "binary"
+    return info.points_count or 0, dense.size, quantization_name, bool(dense.on_disk)
+
+
+def benchmark(client, spec, quantization: str):
+    """p95 latency (ms) of org-filtered searches with sampled point vectors as queries."""
+    points, _ = client.scroll(
+        collection_name=spec.alias, limit=BENCHMARK_QUERIES, with_payload=True, with_vectors=True
+    )
+    if not points:
+        return None
+
+    timings = []
+    for point in points:
+        vector = point.vector[spec.dense_vector] if spec.dense_vector else point.vector
+        start = time.perf_counter()
+        client.query_points(
+            collection_name=spec.alias,
+            query=vector,
+            using=spec.dense_vector,
+            query_filter=Filter(must=[
+                FieldCondition(key="org_id", match=MatchValue(value=point.payload.get("org_id")))
+            ]),
+            search_params=get_search_params(quantization),
+            limit=10,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 95))
+
+
+def report(client, spec, label: str):
+    count, dimension, quantization, on_disk = _collection_settings(client, spec)
+    memory = estimate_vector_memory(count, dimension, quantization, on_disk)
+    p95 = benchmark(client, spec, quantization)
+    p95_text = f"{p95:.1f}ms" if p95 is not None else "n/a"
+    print(
+        f"  {label}: {count} points, {dimension}-d, quantization={quantization}, on_disk={on_disk}, "
+        f"vector RAM ~{memory / 1024 / 1024:.1f}MB, p95 search {p95_text}"
+    )
+
+
+def move_tenants(client, spec, args):
+    """Move tenants between the shared collection and dedicated ones."""
+    dedicate = list(args.dedicate or [])
+    if args.dedicate_large:
+        counts = tenant_point_counts(client, spec)
+        dedicate += [org_id for org_id, count in counts.items() if count >= QDRANT_DEDICATED_TENANT_MIN_POINTS]
+
+    for org_id in dedicate:
+        if args.dry_run:
+            print(f"  would move org {org_id} to a dedicated collection")
+            continue
+        result = move_tenant_to_dedicated(client, spec, org_id)
+        print(f"  org {org_id}: {result['points']} points -> {result['collection']}")
+    for org_id in args.share or []:
+        if args.dry_run:
+            print(f"  would move org {org_id} back to the shared collection")
+            continue
+        result = move_tenant_to_shared(client, spec, org_id)
+        print(f"  org {org_id}: {result['points']} points -> {spec.alias}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate Qdrant collections and tenants")
+    parser.add_argument("collections", nargs="*", help=f"Default: {' '.join(SPECS)}")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--tenancy", choices=["shared", "sharded"], help="Rebuild with this tenancy layout")
+    parser.add_argument("--dedicate", type=int, nargs="+", metavar="ORG_ID")
+    parser.add_argument("--dedicate-large", action="store_true",
+                        help=f"Dedicate tenants with >= {QDRANT_DEDICATED_TENANT_MIN_POINTS} points")
+    parser.add_argument("--share", type=int, nargs="+", metavar="ORG_ID")
+    args = parser.parse_args()
+    unknown = set(args.collections) - set(SPECS)
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(sorted(unknown))}")
+
+    client = QdrantClient(
+        url=os.environ.get("QDRANT_URL", "http://localhost:6333"),
+        api_key=os.environ.get("QDRANT_API_KEY"),
+        timeout=300,
+    )
+    tenancy = args.tenancy or QDRANT_TENANCY
+    moving_tenants = bool(args.dedicate or args.dedicate_large or args.share)
+    if not moving_tenants:
+        print(
+            f"Target settings: quantization={QDRANT_QUANTIZATION}, on_disk={QDRANT_VECTORS_ON_DISK}, "
+            f"tenancy={tenancy}"
+        )
+
+    for name in args.collections or list(SPECS):
+        spec = SPECS[name]
+        if not client.collection_exists(spec.alias):
+            print(f"{name}: not found, skipped")
+            continue
+        print(f"{name}:")
+        if moving_tenants:
+            move_tenants(client, spec, args)
+            continue
+        report(client, spec, "before")
+        if args.dry_run:
+            continue
+        result = migrate_collection(client, spec, tenancy=tenancy)
+        print(f"  migrated {result['points']} points: {result['source']} -> {result['target']}")
+        report(client, spec, "after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Add document chunk manifests
+
+Revision ID: document_chunk_manifest_001
+Revises: freshness_scores_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'document_chunk_manifest_001'
+down_revision = 'freshness_scores_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'document_chunk_manifests',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('chunk_id', sa.String(length=64), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('page_number', sa.Integer(), nullable=True),
+        sa.Column('embedding_model', sa.String(length=200), nullable=False),
+        sa.Column('indexed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('document_id', 'chunk_id', name='uq_document_chunk_manifest_chunk')
+    )
+    op.create_index('ix_document_chunk_manifests_organization_id', 'document_chunk_manifests', ['organization_id'])
+    op.create_index('ix_document_chunk_manifests_embedding_model', 'document_chunk_manifests', ['embedding_model'])
+    # Documents indexed before manifests existed get one on their next reindex
+
+
+def downgrade():
+    op.drop_index('ix_document_chunk_manifests_embedding_model', table_name='document_chunk_manifests')
+    op.drop_index('ix_document_chunk_manifests_organization_id', table_name='document_chunk_manifests')
+    op.drop_table('document_chunk_manifests')
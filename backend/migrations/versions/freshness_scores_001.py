@@ -0,0 +1,56 @@
+"""Add incremental staleness scores and content edit times to library and knowledge items
+
+Revision ID: freshness_scores_001
+Revises: search_vectors_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'freshness_scores_001'
+down_revision = 'search_vectors_001'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('answer_library_items', 'knowledge_items')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('staleness_score', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('staleness_computed_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('staleness_next_check_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('content_updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET content_updated_at = COALESCE(updated_at, created_at)")
+        # Existing rows are scored by the first freshness sweep
+        op.execute(f"UPDATE {table} SET staleness_next_check_at = CURRENT_TIMESTAMP")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for table in TABLES:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_org_staleness "
+                    f"ON {table} (organization_id, staleness_score)"
+                )
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_staleness_next_check_at "
+                    f"ON {table} (staleness_next_check_at)"
+                )
+    else:
+        for table in TABLES:
+            op.create_index(f'ix_{table}_org_staleness', table, ['organization_id', 'staleness_score'])
+            op.create_index(f'ix_{table}_staleness_next_check_at', table, ['staleness_next_check_at'])
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_staleness_next_check_at', table_name=table)
+        op.drop_index(f'ix_{table}_org_staleness', table_name=table)
+        op.drop_column(table, 'content_updated_at')
+        op.drop_column(table, 'staleness_next_check_at')
+        op.drop_column(table, 'staleness_computed_at')
+        op.drop_column(table, 'staleness_score')
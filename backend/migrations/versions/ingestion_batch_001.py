@@ -0,0 +1,68 @@
+"""Add knowledge ingestion batch tables
+
+Revision ID: ingestion_batch_001
+Revises: knowledge_fts_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ingestion_batch_001'
+down_revision = 'knowledge_fts_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ingestion_batches',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('folder_id', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=30), nullable=True),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('task_id', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.ForeignKeyConstraint(['folder_id'], ['knowledge_folders.id']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingestion_batches_organization_id', 'ingestion_batches', ['organization_id'])
+
+    op.create_table(
+        'ingestion_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('batch_id', sa.String(length=36), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('file_data', sa.LargeBinary(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('knowledge_item_id', sa.Integer(), nullable=True),
+        sa.Column('chunk_data', sa.JSON(), nullable=True),
+        sa.Column('chunk_count', sa.Integer(), nullable=True),
+        sa.Column('page_count', sa.Integer(), nullable=True),
+        sa.Column('indexed_chunks', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['batch_id'], ['ingestion_batches.id']),
+        sa.ForeignKeyConstraint(['knowledge_item_id'], ['knowledge_items.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingestion_files_batch_id', 'ingestion_files', ['batch_id'])
+
+
+def downgrade():
+    op.drop_index('ix_ingestion_files_batch_id', table_name='ingestion_files')
+    op.drop_table('ingestion_files')
+    op.drop_index('ix_ingestion_batches_organization_id', table_name='ingestion_batches')
+    op.drop_table('ingestion_batches')
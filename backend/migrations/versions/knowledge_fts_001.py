@@ -0,0 +1,41 @@
+"""Add full-text search index on knowledge items
+
+Revision ID: knowledge_fts_001
+Revises: cde26fe8ae80
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'knowledge_fts_001'
+down_revision = 'cde26fe8ae80'
+branch_labels = None
+depends_on = None
+
+
+# Must match PG_SEARCH_VECTOR in app/services/keyword_search_service.py
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', left(coalesce(content, ''), 2000)), 'B')"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # Other databases use the in-process keyword index
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_knowledge_items_search "
+            f"ON knowledge_items USING GIN (({SEARCH_VECTOR}))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_knowledge_items_search")
@@ -0,0 +1,38 @@
+"""Add indexes for the aggregated project list
+
+Revision ID: project_list_indexes_001
+Revises: ingestion_batch_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'project_list_indexes_001'
+down_revision = 'ingestion_batch_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Project list order (updated_at DESC NULLS LAST, id DESC) / cursor pagination
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_projects_org_updated', 'projects', [
+            'organization_id', sa.text('updated_at DESC NULLS LAST'), sa.text('id DESC')
+        ])
+    else:
+        # NULLs sort first, so a backward scan already yields DESC NULLS LAST
+        op.create_index('ix_projects_org_updated', 'projects', ['organization_id', 'updated_at', 'id'])
+    # Grouped per-project counts
+    op.create_index('ix_documents_project_id', 'documents', ['project_id'])
+    op.create_index('ix_questions_project_id', 'questions', ['project_id'])
+    op.create_index('ix_rfp_sections_project_id', 'rfp_sections', ['project_id'])
+
+
+def downgrade():
+    op.drop_index('ix_rfp_sections_project_id', table_name='rfp_sections')
+    op.drop_index('ix_questions_project_id', table_name='questions')
+    op.drop_index('ix_documents_project_id', table_name='documents')
+    op.drop_index('ix_projects_org_updated', table_name='projects')
@@ -0,0 +1,110 @@
+"""Add trigger-maintained search vectors and trigram title indexes
+
+Revision ID: search_vectors_001
+Revises: version_storage_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'search_vectors_001'
+down_revision = 'version_storage_001'
+branch_labels = None
+depends_on = None
+
+
+# table -> (title column, body columns)
+# Must match TEXT_SEARCH_TABLES in app/services/keyword_search_service.py
+SEARCH_TABLES = {
+    'knowledge_items': ('title', ('content',)),
+    'answer_library_items': ('question_text', ('answer_text',)),
+    'projects': ('name', ('client_name', 'description')),
+}
+
+# Longer bodies are indexed by their head only (tsvector size limit)
+MAX_INDEXED_CHARS = 100000
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _vector_expression(title, bodies, row=''):
+    """Weighted tsvector: title (and short fields) A, bodies B."""
+    parts = [f"setweight(to_tsvector('english', coalesce({row}{title}, '')), 'A')"]
+    for column in bodies:
+        weight = 'A' if column == 'client_name' else 'B'
+        parts.append(
+            f"setweight(to_tsvector('english', left(coalesce({row}{column}, ''), {MAX_INDEXED_CHARS})), '{weight}')"
+        )
+    return ' || '.join(parts)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # Other databases search with ILIKE / the in-process keyword index
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, (title, bodies) in SEARCH_TABLES.items():
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector_expression(title, bodies, row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {', '.join((title,) + bodies)} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+
+    with op.get_context().autocommit_block():
+        # Backfill in committed batches so large tables are not locked at once
+        bind = op.get_bind()
+        for table, (title, bodies) in SEARCH_TABLES.items():
+            while True:
+                result = bind.exec_driver_sql(f"""
+                    UPDATE {table} SET search_vector = {_vector_expression(title, bodies)}
+                    WHERE id IN (
+                        SELECT id FROM {table} WHERE search_vector IS NULL LIMIT {BACKFILL_BATCH_SIZE}
+                    )
+                """)
+                if result.rowcount < BACKFILL_BATCH_SIZE:
+                    break
+
+        for table, (title, _) in SEARCH_TABLES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search_vector "
+                f"ON {table} USING GIN (search_vector)"
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{title}_trgm "
+                f"ON {table} USING GIN ({title} gin_trgm_ops)"
+            )
+
+        # Superseded by ix_knowledge_items_search_vector
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_knowledge_items_search")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_knowledge_items_search ON knowledge_items USING GIN (("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', left(coalesce(content, ''), 2000)), 'B')))"
+        )
+        for table, (title, _) in SEARCH_TABLES.items():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{title}_trgm")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search_vector")
+
+    for table in SEARCH_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,57 @@
+"""Add content blobs and compact version storage
+
+Revision ID: version_storage_001
+Revises: project_list_indexes_001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'version_storage_001'
+down_revision = 'project_list_indexes_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'content_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('hash')
+    )
+
+    with op.batch_alter_table('proposal_versions') as batch_op:
+        batch_op.add_column(sa.Column('file_id', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('file_checksum', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('export_options', sa.JSON(), nullable=True))
+        batch_op.alter_column('file_data', existing_type=sa.LargeBinary(), nullable=True)
+
+    with op.batch_alter_table('section_versions') as batch_op:
+        batch_op.add_column(sa.Column('content_delta', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('base_version_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('delta_depth', sa.Integer(), nullable=True, server_default='0'))
+        batch_op.create_foreign_key(
+            'fk_section_versions_base_version_id', 'section_versions',
+            ['base_version_id'], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('section_versions') as batch_op:
+        batch_op.drop_constraint('fk_section_versions_base_version_id', type_='foreignkey')
+        batch_op.drop_column('delta_depth')
+        batch_op.drop_column('base_version_id')
+        batch_op.drop_column('content_delta')
+
+    with op.batch_alter_table('proposal_versions') as batch_op:
+        batch_op.drop_column('export_options')
+        batch_op.drop_column('file_checksum')
+        batch_op.drop_column('file_id')
+
+    op.drop_table('content_blobs')
@@ -3,7 +3,8 @@ Pytest fixtures and configuration for RFP application tests.
 """
 import pytest
 from flask import Flask
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import JWTManager, create_access_token
+from types import SimpleNamespace
 import os
 import sys
 
@@ -35,6 +36,64 @@ def app():
         db.drop_all()
 
 
+@pytest.fixture
+def models_app():
+    """
+    Minimal app with only the database bound (no blueprints or Socket.IO).
+    
+    For service-level tests that need real tables but not the full factory.
+    """
+    from app.extensions import db
+    import app.models  # noqa: F401 - register models on the metadata
+    
+    models_app = Flask(__name__)
+    models_app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite:///:memory:',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(models_app)
+    
+    with models_app.app_context():
+        db.create_all()
+        yield models_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def org(models_app):
+    """Organization with an admin user in models_app (id and user_id)."""
+    from app.extensions import db
+    from app.models import Organization, User
+    
+    org = Organization(name='Test Org', slug='test-org')
+    db.session.add(org)
+    db.session.flush()
+    user = User(email='admin@example.com', name='Admin', organization_id=org.id, role='admin')
+    user.set_password('x')
+    db.session.add(user)
+    db.session.commit()
+    return SimpleNamespace(id=org.id, user_id=user.id)
+
+
+@pytest.fixture
+def models_client(models_app):
+    """
+    Test client factory for models_app with JWT auth.
+    
+    Registers the blueprint under test, e.g. models_client(projects.bp, url_prefix='/api/projects').
+    """
+    models_app.config['JWT_SECRET_KEY'] = 'models-app-test-secret-key-0123456789'
+    JWTManager(models_app)
+    
+    def make_client(blueprint, **options):
+        models_app.register_blueprint(blueprint, **options)
+        return models_app.test_client()
+    
+    return make_client
+
+
 @pytest.fixture
 def client(app):
     """Test client for making requests."""
@@ -5,6 +5,9 @@ Tests the core functionality of each agent with mocked LLM responses.
 """
 import pytest
 import json
+import re
+import time
+import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, List
 
@@ -17,6 +20,8 @@ from app.agents.knowledge_base_agent import KnowledgeBaseAgent, get_knowledge_ba
 from app.agents.quality_reviewer_agent import QualityReviewerAgent, get_quality_reviewer_agent
 from app.agents.clarification_agent import ClarificationAgent, get_clarification_agent
 from app.agents.document_analyzer_agent import DocumentAnalyzerAgent, get_document_analyzer_agent
+from app.agents.diagram_generator_agent import DiagramGeneratorAgent
+from app.services.question_dedup_service import QuestionDedupService
 
 
 class TestQuestionExtractorAgent:
@@ -81,6 +86,33 @@ class TestQuestionExtractorAgent:
         """Test category guessing for compliance questions."""
         assert agent._guess_category("Are you GDPR compliant?") == "compliance"
         assert agent._guess_category("Do you have regulatory certifications?") == "compliance"
+    
+    def test_extract_with_ai_covers_whole_document(self, agent):
+        """Test long documents are extracted window by window and merged."""
+        from app.agents.utils import split_into_windows
+        
+        sections = [
+            f"SECTION {i}\n" + ("Background text for this part of the RFP.\n" * 40)
+            + f"{i}.1 What is your approach to requirement number {i}?\n"
+            for i in range(1, 41)
+        ]
+        text = "\n".join(sections)
+        agent.config = Mock(client=Mock(), org_id=1)
+        
+        def fake_window(window_text):
+            found = [line for line in window_text.splitlines() if line.endswith("?")]
+            return {"questions": [{"text": q, "category": "general", "mandatory": True} for q in found]}
+        
+        small_windows = lambda t: split_into_windows(t, window_chars=8000, overlap_chars=500)
+        with patch('app.agents.question_extractor_agent.split_into_windows', small_windows), \
+                patch.object(agent, '_extract_window', side_effect=fake_window):
+            result = agent._extract_with_ai(text, {})
+        
+        assert result["windows_processed"] > 1
+        assert result["total_count"] == 40
+        assert [q["id"] for q in result["questions"]] == list(range(1, 41))
+        assert "requirement number 40?" in result["questions"][-1]["text"]
+        assert result["questions"][-1]["document_position"] == "end"
 
 
 class TestAnswerGeneratorAgent:
@@ -129,6 +161,52 @@ class TestAnswerGeneratorAgent:
         assert "AI service unavailable" in result["content"]
         assert result["confidence"] == 0.0
         assert "ai_unavailable" in result["flags"]
+    
+    def test_batched_generation_packs_shared_context(self, agent):
+        """Test same-category questions share one request and deduped context."""
+        prompts = []
+        
+        def fake_generate(prompt):
+            prompts.append(prompt)
+            ids = re.findall(r"^\[(Q\d+)\]", prompt, re.MULTILINE)
+            if ids:
+                payload = {"answers": [{"question_id": q, "answer": f"Answer for {q}"} for q in ids]}
+                return Mock(text=json.dumps(payload))
+            return Mock(text="Single answer")
+        
+        agent.config = Mock(client=Mock(generate_content=fake_generate), is_adk_enabled=False, org_id=1)
+        shared = {"title": "Security Policy", "content": "AES-256 at rest, TLS 1.2 in transit.", "relevance": 0.9}
+        questions = [
+            {"id": 1, "text": "How is data encrypted at rest?", "category": "security"},
+            {"id": 2, "text": "What are your pricing tiers?", "category": "pricing"},
+            {"id": 3, "text": "How is data encrypted in transit?", "category": "security"},
+            {"id": 4, "text": "Describe key management.", "category": "security"},
+        ]
+        knowledge = {q["id"]: {"knowledge_items": [shared]} for q in questions}
+        
+        result = agent.generate_answers(questions=questions, knowledge_context=knowledge)
+        answers = {a["question_id"]: a["answer"] for a in result["answers"]}
+        
+        assert len(prompts) == 2  # one security pack + one single pricing question
+        batch_prompt = next(p for p in prompts if "[Q1]" in p)
+        assert batch_prompt.count("AES-256 at rest") == 1
+        assert answers == {1: "Answer for Q1", 2: "Single answer", 3: "Answer for Q2", 4: "Answer for Q3"}
+    
+    def test_pack_by_budget_respects_budget(self):
+        """Test packing groups by category, prefers shared context, and fits the budget."""
+        from app.agents.utils import PackItem, pack_by_budget
+        
+        items = [
+            PackItem(key=1, group="a", cost=100, shared={"k1": 500}),
+            PackItem(key=2, group="a", cost=100, shared={"k2": 500}),
+            PackItem(key=3, group="a", cost=100, shared={"k1": 500}),
+            PackItem(key=4, group="b", cost=100, shared={"k1": 500}),
+            PackItem(key=5, group="a", cost=2000, shared={}),
+        ]
+        
+        batches = pack_by_budget(items, budget=1000, max_items=4)
+        
+        assert [[i.key for i in b] for b in batches] == [[1, 3], [2], [5], [4]]
 
 
 class TestAnswerValidatorAgent:
@@ -159,6 +237,46 @@ class TestAnswerValidatorAgent:
         
         assert result["accuracy_score"] > 0.3
         assert "fallback_validation" in result["flags"]
+    
+    def test_batched_validation_uses_cache(self, agent):
+        """Test claims are extracted/verified per batch and cached by context."""
+        from app.agents.answer_validator_agent import get_claim_cache
+        get_claim_cache().clear()
+        
+        prompts = []
+        
+        def fake_generate(prompt):
+            prompts.append(prompt)
+            if "## Generated Answers" in prompt:
+                ids = re.findall(r"### Answer (A\d+)", prompt)
+                payload = {"answers": [
+                    {"answer_id": a, "claims": [{"claim_text": "We have SOC 2 Type II"}]} for a in ids
+                ]}
+            else:
+                ids = re.findall(r"\[(C\d+)\]", prompt)
+                payload = {"verifications": [
+                    {"claim_id": c, "status": "verified", "confidence": 0.9} for c in ids
+                ]}
+            return Mock(text=json.dumps(payload))
+        
+        agent.config = Mock(client=Mock(generate_content=fake_generate), is_adk_enabled=False, org_id=1)
+        context = {"knowledge_items": [{"title": "SOC", "content": "SOC 2 Type II audited"}]}
+        answers = [{"question_id": i, "answer": f"Answer {i}: We have SOC 2 Type II."} for i in range(3)]
+        knowledge = {i: context for i in range(3)}
+        
+        first = agent.validate_answers(answers=answers, knowledge_context=knowledge)
+        verification_prompts = [p for p in prompts if "## Claims to Verify" in p]
+        
+        # One extraction + one verification call; the shared claim is verified once
+        assert len(prompts) == 2
+        assert verification_prompts[0].count("[C") == 1
+        assert first["stats"]["verified_claims"] == 3
+        assert all(a["validation"]["accuracy_score"] == 1.0 for a in first["validated_answers"])
+        
+        second = agent.validate_answers(answers=answers, knowledge_context=knowledge)
+        
+        assert len(prompts) == 3  # extraction only, verification served from cache
+        assert second["stats"]["cached_claims"] == 3
 
 
 class TestComplianceCheckerAgent:
@@ -269,9 +387,45 @@ class TestKnowledgeBaseAgent:
         ]]
         
         merged = agent._merge_search_results(results, limit=5)
-        
+
         assert len(merged) == 5
 
+    def test_rerank_results_is_local(self, agent):
+        """Test that re-ranking fuses signals without calling the LLM."""
+        llm = Mock()
+        agent.config = Mock(client=llm, is_adk_enabled=False, org_id=1)
+        results = [
+            {"item_id": 1, "title": "Office locations", "content_preview": "We have offices in Berlin.",
+             "score": 0.62},
+            {"item_id": 2, "title": "Data encryption", "content_preview": "All data is encrypted at rest with AES-256.",
+             "score": 0.60, "industry": "finance"},
+            {"item_id": 3, "title": "Holidays", "content_preview": "Support is closed on public holidays.",
+             "score": 0.58},
+        ]
+
+        reranked = agent._rerank_results(
+            results, "How is data encrypted at rest?", limit=2, dimensions={"industry": "finance"}
+        )
+
+        assert [r["item_id"] for r in reranked] == [2, 1]
+        assert reranked[0]["score"] == 0.60  # original relevance is kept
+        assert 0 < reranked[1]["rerank_score"] < reranked[0]["rerank_score"] < 1
+        llm.generate_content.assert_not_called()
+
+    def test_train_rerank_weights_learns_signal(self):
+        """Test that trained weights favour the feature that predicts acceptance."""
+        from app.services.rerank_service import FEATURES, Reranker, train_weights
+
+        rng = np.random.default_rng(0)
+        features = rng.random((400, len(FEATURES)))
+        labels = (features[:, FEATURES.index("bm25")] > 0.7).astype(int)
+
+        weights = train_weights(features, labels)
+        scores = Reranker(weights).score(features)
+
+        assert weights["bm25"] > weights["dense"]
+        assert scores[labels == 1].mean() > scores[labels == 0].mean()
+
 
 class TestQualityReviewerAgent:
     """Tests for QualityReviewerAgent."""
@@ -366,6 +520,41 @@ class TestDocumentAnalyzerAgent:
         
         # Should detect security theme
         assert "security" in result["themes"]
+    
+    def test_reduce_window_analyses_dedupes_overlap(self, agent):
+        """Test window analyses are merged without repeating overlapping items."""
+        from app.agents.utils import TextWindow
+        
+        windows = [TextWindow(0, 0, 10, "a", "beginning"), TextWindow(1, 8, 20, "b", "end")]
+        analyses = [
+            {
+                "sections": [{"name": "Scope", "position": "middle"}],
+                "themes": ["Security"],
+                "requirements": [{"text": "The vendor must provide 24/7 support coverage"}],
+                "document_type": "rfp",
+                "complexity_score": 0.4,
+            },
+            {
+                "sections": [{"name": "scope"}, {"name": "Pricing"}],
+                "themes": ["security", "Pricing"],
+                "requirements": [
+                    {"text": "The vendor must provide 24/7 support coverage."},
+                    {"text": "Pricing must be fixed for three years"},
+                ],
+                "document_type": "rfp",
+                "complexity_score": 0.7,
+            },
+        ]
+        
+        merged = agent._reduce_window_analyses(
+            [(w, a, None) for w, a in zip(windows, analyses)]
+        )
+        
+        assert [s["name"] for s in merged["sections"]] == ["Scope", "Pricing"]
+        assert merged["sections"][1]["position"] == "end"
+        assert merged["themes"] == ["Security", "Pricing"]
+        assert len(merged["requirements"]) == 2
+        assert merged["complexity_score"] == 0.7
 
 
 class TestFeedbackLearningAgent:
@@ -464,6 +653,207 @@ class TestSectionMapperAgent:
         assert all(m.get("section_id") for m in result["mappings"])
 
 
+class TestDiagramGeneratorAgent:
+    """Tests for DiagramGeneratorAgent."""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create agent with mocked config."""
+        return DiagramGeneratorAgent(org_id=1, config=Mock(client=None))
+    
+    def test_sanitize_replaces_unicode_arrows(self, agent):
+        """Test sanitization converts unicode arrows and strips bad labels."""
+        code = agent._sanitize_mermaid_syntax("flowchart TB\n    A[Web (UI)] → B[API: Core]")
+        
+        assert "→" not in code
+        assert code == "flowchart TB\n    A[Web] --> B[API - Core]"
+    
+    def test_generate_all_diagrams_runs_concurrently(self, agent):
+        """Test independent diagram types are generated in parallel."""
+        import time
+        
+        def fake_generate(text, dtype):
+            time.sleep(0.1)
+            return {"title": dtype, "mermaid_code": "flowchart TB\n    A --> B"}
+        
+        with patch.object(agent, '_generate_with_ai', side_effect=fake_generate):
+            start = time.monotonic()
+            result = agent.generate_all_diagrams("doc text")
+            elapsed = time.monotonic() - start
+        
+        assert result["total_generated"] == 3
+        assert [d["diagram_type"] for d in result["diagrams"]] == ["architecture", "flowchart", "timeline"]
+        assert elapsed < 0.25
+    
+    def test_iter_diagrams_reports_failures(self, agent):
+        """Test streamed events include per-diagram errors and progress."""
+        def fake_generate(text, dtype):
+            if dtype == "timeline":
+                raise ValueError("boom")
+            return {"title": dtype, "mermaid_code": "flowchart TB\n    A --> B"}
+        
+        with patch.object(agent, '_generate_with_ai', side_effect=fake_generate):
+            events = list(agent.iter_diagrams("doc text"))
+        
+        assert len(events) == 3
+        assert events[-1]["completed"] == events[-1]["total"] == 3
+        failed = [e for e in events if not e["success"]]
+        assert len(failed) == 1 and failed[0]["diagram_type"] == "timeline"
+
+
+
+class TestOrchestratorPipeline:
+    """Tests for the pipelined answer stages of OrchestratorAgent."""
+    
+    @pytest.fixture
+    def orchestrator(self):
+        """Create orchestrator with mocked sub-agents."""
+        from app.agents.orchestrator_agent import OrchestratorAgent
+        
+        orchestrator = OrchestratorAgent.__new__(OrchestratorAgent)
+        orchestrator.name = "OrchestratorAgent"
+        orchestrator.events = []
+        
+        def retrieve(questions, **kwargs):
+            time.sleep(0.05)
+            orchestrator.events.append(("retrieved", questions[0]["id"]))
+            return {"success": True, "knowledge_context": {q["id"]: {"knowledge_items": []} for q in questions}}
+        
+        def generate(questions, **kwargs):
+            time.sleep(0.02)
+            if any(q["text"] == "fail" for q in questions):
+                raise RuntimeError("provider down")
+            return {"success": True, "answers": [
+                {"question_id": q["id"], "question_text": q["text"], "answer": f"A{q['id']}",
+                 "confidence_score": 0.8, "category": "general"}
+                for q in questions
+            ]}
+        
+        def review(draft_answers, **kwargs):
+            reviewed = [{**a, "quality_score": 0.9, "needs_human_review": False} for a in draft_answers]
+            return {"success": True, "reviewed_answers": reviewed,
+                    "stats": {"total": len(reviewed), "average_quality": 0.9, "needs_human_review": 0}}
+        
+        orchestrator.knowledge_base = Mock(retrieve_context=Mock(side_effect=retrieve))
+        orchestrator.answer_generator = Mock(generate_answers=Mock(side_effect=generate))
+        orchestrator.answer_validator = Mock(validate_answers=Mock(return_value={"success": False, "error": "off"}))
+        orchestrator.compliance_checker = Mock(
+            _get_org_certifications=Mock(return_value=[]),
+            check_compliance=Mock(return_value={"success": True, "compliance_issues": [], "stats": {"total_answers": 1}})
+        )
+        orchestrator.clarification_agent = Mock(analyze_questions=Mock(return_value={"success": True, "clarifications": []}))
+        orchestrator.quality_reviewer = Mock(review_answers=Mock(side_effect=review))
+        orchestrator.question_dedup = QuestionDedupService()
+        return orchestrator
+    
+    def test_answers_stream_before_retrieval_finishes(self, orchestrator):
+        """Test first answers are reported while later questions are still being retrieved."""
+        questions = [{"id": i, "text": f"Question {i}?"} for i in range(1, 13)]
+        
+        def on_progress(answers, completed, total):
+            orchestrator.events.append(("answered", answers[0]["question_id"]))
+        
+        result = orchestrator.answer_questions_pipelined(
+            questions, org_id=1, options={"micro_batch_size": 1}, on_progress=on_progress
+        )
+        
+        kinds = [kind for kind, _ in orchestrator.events]
+        assert kinds.index("answered") < len(kinds) - 1 - kinds[::-1].index("retrieved")
+        assert [a["question_id"] for a in result["answers"]] == list(range(1, 13))
+        assert result["review_stats"]["total"] == 12
+        assert result["pipeline"]["first_answer_seconds"] < result["pipeline"]["total_seconds"]
+        # Certifications are loaded once for the whole run
+        assert orchestrator.compliance_checker._get_org_certifications.call_count == 1
+    
+    def test_stage_failures(self, orchestrator):
+        """Test optional stages are skipped and failed generation drops only its batch."""
+        questions = [{"id": 1, "text": "Question 1?"}, {"id": 2, "text": "fail"}, {"id": 3, "text": "Question 3?"}]
+        
+        result = orchestrator.answer_questions_pipelined(questions, options={"micro_batch_size": 1})
+        
+        assert [a["question_id"] for a in result["answers"]] == [1, 3]
+        assert result["pipeline"]["failed_batches"] == 1
+        assert "answer_validation_skipped" in result["steps_completed"]
+        assert "knowledge_retrieval" in result["steps_completed"]
+        assert any("provider down" in e for e in result["errors"])
+
+    
+    def test_cancel_and_resume_from_checkpoints(self, orchestrator):
+        """Test a cancelled run resumes without redoing finished stages."""
+        from app.agents.utils import PipelineCancelled
+        from app.services.job_checkpoint_service import JobCheckpointStore, compute_input_hash
+        
+        store = JobCheckpointStore(redis_url="redis://localhost:1/0")
+        input_hash = compute_input_hash("rfp text", 1, None, {})
+        questions = [{"id": i, "text": f"Question {i}?"} for i in range(1, 7)]
+        answered = []
+        
+        def cancel_after_first_batch():
+            if answered:
+                store.request_cancel("job-1")
+            return store.is_cancel_requested("job-1")
+        
+        with pytest.raises(PipelineCancelled):
+            orchestrator.answer_questions_pipelined(
+                questions, options={"micro_batch_size": 1},
+                on_progress=lambda answers, *_: answered.extend(answers),
+                checkpoint=store.for_job("job-1", input_hash),
+                should_stop=cancel_after_first_batch
+            )
+        generated_before = orchestrator.answer_generator.generate_answers.call_count
+        assert answered and generated_before < 6
+        
+        store.clear_cancel("job-1")
+        orchestrator.answer_generator.generate_answers.reset_mock()
+        checkpoint = store.for_job("job-1", input_hash, cancel_job_id="job-2")
+        result = orchestrator.answer_questions_pipelined(
+            questions, options={"micro_batch_size": 1}, checkpoint=checkpoint,
+            should_stop=checkpoint.cancel_requested
+        )
+        
+        assert checkpoint.resumed
+        assert [a["question_id"] for a in result["answers"]] == list(range(1, 7))
+        assert result["pipeline"]["resumed_batches"] >= 1
+        # Batches generated before the cancel are not generated again
+        assert orchestrator.answer_generator.generate_answers.call_count == 6 - generated_before
+    
+    def test_duplicate_questions_answered_once(self, orchestrator):
+        """Test near-duplicates share one generated answer and approved matches are reused."""
+        topics = {"encrypt": [1.0, 0.0, 0.0], "sso": [0.0, 1.0, 0.0], "backup": [0.0, 0.0, 1.0]}
+        
+        def embed(texts):
+            return [next(v for k, v in topics.items() if k in t.lower()) for t in texts]
+        
+        provider = Mock(provider_name="test", model="test", get_batch_embeddings=Mock(side_effect=embed))
+        orchestrator.question_dedup = QuestionDedupService(org_id=1, embedding_provider=provider)
+        orchestrator.question_dedup.load_approved_answers = Mock(return_value=[{
+            "question_id": 90, "question_text": "How are backups handled?", "answer_content": "Nightly backups.",
+            "answer_id": 900, "category": "technical"
+        }])
+        questions = [
+            {"id": 1, "text": "Do you encrypt data at rest?"},
+            {"id": 2, "text": "Do you support SSO?"},
+            {"id": 3, "text": "Is customer data encrypted at rest?"},
+            {"id": 4, "text": "Describe your backup process."},
+            {"id": 5, "text": "Which SSO providers do you support?"},
+        ]
+        
+        with patch("app.services.question_dedup_service.get_cached_embedding", return_value=None), \
+             patch("app.services.question_dedup_service.set_cached_embedding"):
+            result = orchestrator.answer_questions_pipelined(questions, org_id=1, options={"micro_batch_size": 1})
+        
+        generated = [q["id"] for call in orchestrator.answer_generator.generate_answers.call_args_list
+                     for q in call.kwargs["questions"]]
+        answers = {a["question_id"]: a for a in result["answers"]}
+        assert sorted(generated) == [1, 2]
+        assert list(answers) == [1, 2, 3, 4, 5]
+        assert answers[3]["answer"] == "A1" and answers[3]["duplicate_of"] == 1
+        assert answers[5]["answer"] == "A2" and "deduplicated" in answers[5]["flags"]
+        assert answers[4]["answer"] == "Nightly backups." and answers[4]["reused_from"]["answer_id"] == 900
+        assert result["deduplication"]["generated"] == 2
+        assert result["steps_completed"][0] == "question_deduplication"
+
+
 # Import new agents for tests
 from app.agents.feedback_learning_agent import get_feedback_learning_agent
 from app.agents.section_mapper_agent import get_section_mapper_agent
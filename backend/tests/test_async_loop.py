@@ -0,0 +1,135 @@
+"""
+Unit tests for the shared event loop and async LLM provider calls.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from flask import Flask
+
+from app.utils.async_loop import get_shared_loop, iterate_async, run_all, run_async
+from app.services.llm_providers.base_provider import BaseLLMProvider
+from app.services.streaming_llm import create_sse_response
+
+
+class SlowProvider(BaseLLMProvider):
+    """Provider whose async calls take 50ms, like a remote model."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "slow"
+
+    def generate_content(self, prompt: str, **kwargs) -> str:
+        return f"sync:{prompt}"
+
+    def generate_chat(self, messages, **kwargs) -> str:
+        return f"sync:{messages[-1]['content']}"
+
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        SlowProvider.in_flight += 1
+        SlowProvider.max_in_flight = max(SlowProvider.max_in_flight, SlowProvider.in_flight)
+        await asyncio.sleep(0.05)
+        SlowProvider.in_flight -= 1
+        if prompt == "fail":
+            raise RuntimeError("rate limited")
+        return f"async:{prompt}"
+
+
+class TestSharedEventLoop:
+    """Tests for app.utils.async_loop."""
+
+    def test_one_loop_serves_all_callers(self):
+        loops = set()
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        def call():
+            loops.add(run_async(current_loop()))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loops == {get_shared_loop()}
+
+    def test_run_all_keeps_order_and_errors(self):
+        async def double(n):
+            await asyncio.sleep(0.01 * (5 - n))
+            if n == 3:
+                raise ValueError("three")
+            return n * 2
+
+        results = run_all(double(n) for n in range(5))
+
+        assert results[:3] == [0, 2, 4] and results[4] == 8
+        assert isinstance(results[3], ValueError)
+        assert run_all([]) == []
+
+    def test_generate_many_runs_concurrently(self):
+        provider = SlowProvider(api_key="key", model="slow")
+        prompts = [f"p{i}" for i in range(20)] + ["fail"]
+
+        start = time.perf_counter()
+        results = provider.generate_many(prompts, max_concurrency=10)
+        elapsed = time.perf_counter() - start
+
+        assert results[:20] == [f"async:p{i}" for i in range(20)]
+        assert isinstance(results[20], RuntimeError)
+        assert SlowProvider.max_in_flight == 10
+        # 21 calls of 50ms at 10 in flight take 3 rounds, not 21
+        assert elapsed < 0.5
+
+    def test_default_async_variant_wraps_sync_call(self):
+        provider = SlowProvider(api_key="key", model="slow")
+
+        assert run_async(provider.agenerate_chat([{"role": "user", "content": "hi"}])) == "sync:hi"
+
+    def test_run_async_refuses_to_block_the_loop(self):
+        async def nested():
+            return run_async(asyncio.sleep(0))
+
+        with pytest.raises(RuntimeError):
+            run_async(nested())
+
+
+class TestStreamingResponse:
+    """Tests for create_sse_response."""
+
+    def test_streams_chunks_on_shared_loop(self):
+        loops = []
+
+        async def chunks():
+            for chunk in ["Hello", " world"]:
+                loops.append(asyncio.get_running_loop())
+                await asyncio.sleep(0)
+                yield chunk
+
+        with Flask(__name__).test_request_context():
+            response = create_sse_response(chunks())
+            body = response.get_data(as_text=True)
+
+        assert body == "data: Hello\n\ndata:  world\n\ndata: [DONE]\n\n"
+        assert set(loops) == {get_shared_loop()}
+
+    def test_closing_stream_closes_generator(self):
+        closed = []
+
+        async def endless():
+            try:
+                while True:
+                    await asyncio.sleep(0)
+                    yield "x"
+            finally:
+                closed.append(True)
+
+        stream = iterate_async(endless())
+        assert next(stream) == "x"
+        stream.close()
+
+        assert closed == [True]
@@ -0,0 +1,187 @@
+"""
+Unit tests for document chunk manifests and partial, idempotent reindexing.
+"""
+from types import SimpleNamespace
+import pytest
+
+from app.services.docling_chunking_service import DocumentChunk
+
+
+class FakeHybridSearch:
+    """Records the vector writes of a sync instead of embedding."""
+
+    enabled = True
+
+    def __init__(self, model_version='dense-v1+bm25'):
+        self.embedding_model_version = model_version
+        self.points = {}
+        self.upserted = []
+        self.deleted = []
+        self.fail_upsert = False
+
+    def upsert_document_chunks(self, chunks, org_id):
+        self.upserted.append([chunk.chunk_id for chunk in chunks])
+        if self.fail_upsert:
+            return len(chunks) - 1
+        for chunk in chunks:
+            self.points[chunk.chunk_id] = chunk.content
+        return len(chunks)
+
+    def delete_chunks(self, chunk_ids, org_id):
+        self.deleted.append(list(chunk_ids))
+        for chunk_id in chunk_ids:
+            self.points.pop(chunk_id, None)
+        return True
+
+    def delete_document_chunks(self, file_id, org_id, keep_chunk_ids=None):
+        self.points = {k: v for k, v in self.points.items() if k in (keep_chunk_ids or [])}
+        return True
+
+
+def make_chunks(contents):
+    return [
+        DocumentChunk(
+            chunk_id=chunk_id, file_id='file-1', page_number=index + 1, chunk_index=0,
+            content=content, content_type='text'
+        )
+        for index, (chunk_id, content) in enumerate(contents.items())
+    ]
+
+
+@pytest.fixture
+def document(org):
+    """Document of a project in the shared organization."""
+    from app.extensions import db
+    from app.models import Project, Document
+
+    project = Project(name='RFP', organization_id=org.id, created_by=org.user_id)
+    db.session.add(project)
+    db.session.flush()
+    document = Document(
+        file_id='file-1', filename='rfp.pdf', original_filename='rfp.pdf', file_type='pdf',
+        project_id=project.id, uploaded_by=org.user_id
+    )
+    db.session.add(document)
+    db.session.commit()
+    return SimpleNamespace(document=document, org_id=org.id)
+
+
+def manifest(document):
+    return {entry.chunk_id: entry for entry in document.chunk_manifest}
+
+
+class TestSyncDocumentChunks:
+    """Tests for diffing chunks against the manifest."""
+
+    def test_reindex_embeds_only_changed_chunks(self, document):
+        from app.services.document_index_service import sync_document_chunks
+
+        doc, hybrid = document.document, FakeHybridSearch()
+        sync_document_chunks(doc, make_chunks({'a': 'alpha', 'b': 'beta', 'c': 'gamma'}), document.org_id, hybrid)
+
+        result = sync_document_chunks(
+            doc, make_chunks({'a': 'alpha', 'b': 'beta v2', 'd': 'delta'}), document.org_id, hybrid
+        )
+
+        assert result == {'embedded': 2, 'unchanged': 1, 'removed': 1}
+        assert hybrid.upserted[-1] == ['b', 'd']
+        assert hybrid.deleted == [['c']]
+        assert hybrid.points == {'a': 'alpha', 'b': 'beta v2', 'd': 'delta'}
+        assert set(manifest(doc)) == {'a', 'b', 'd'}
+        assert doc.chunk_count == 3
+        assert doc.embedding_status == 'completed'
+
+        # Idempotent
+        again = sync_document_chunks(
+            doc, make_chunks({'a': 'alpha', 'b': 'beta v2', 'd': 'delta'}), document.org_id, hybrid
+        )
+        assert again == {'embedded': 0, 'unchanged': 3, 'removed': 0}
+
+    def test_failed_upsert_keeps_previous_chunks(self, document):
+        from app.services.document_index_service import DocumentIndexError, sync_document_chunks
+
+        doc, hybrid = document.document, FakeHybridSearch()
+        sync_document_chunks(doc, make_chunks({'a': 'alpha', 'b': 'beta'}), document.org_id, hybrid)
+        hashes = {chunk_id: entry.content_hash for chunk_id, entry in manifest(doc).items()}
+
+        hybrid.fail_upsert = True
+        with pytest.raises(DocumentIndexError):
+            sync_document_chunks(doc, make_chunks({'a': 'alpha v2'}), document.org_id, hybrid)
+
+        # Nothing removed, manifest unchanged
+        assert hybrid.deleted == []
+        assert 'b' in hybrid.points
+        assert {chunk_id: entry.content_hash for chunk_id, entry in manifest(doc).items()} == hashes
+        assert doc.chunk_count == 2
+
+    def test_model_change_reembeds_outdated_documents(self, document):
+        from app.services.document_index_service import (
+            find_outdated_documents, get_embedding_status, sync_document_chunks
+        )
+
+        doc = document.document
+        chunks = make_chunks({'a': 'alpha', 'b': 'beta'})
+        sync_document_chunks(doc, chunks, document.org_id, FakeHybridSearch('dense-v1+bm25'))
+
+        assert find_outdated_documents('dense-v1+bm25') == []
+        assert find_outdated_documents('dense-v2+bm25') == [(doc.id, document.org_id)]
+        assert get_embedding_status(doc, 'dense-v2+bm25')['outdated_chunks'] == 2
+
+        upgraded = FakeHybridSearch('dense-v2+bm25')
+        result = sync_document_chunks(doc, chunks, document.org_id, upgraded)
+
+        assert result['embedded'] == 2
+        assert upgraded.deleted == []
+        assert find_outdated_documents('dense-v2+bm25') == []
+
+    def test_failing_documents_do_not_block_the_reembed_batch(self, document):
+        from datetime import datetime, timedelta
+        from app.extensions import db
+        from app.models import Document
+        from app.services.document_index_service import find_outdated_documents, sync_document_chunks
+
+        doc = document.document
+        other = Document(
+            file_id='file-2', filename='other.pdf', original_filename='other.pdf', file_type='pdf',
+            project_id=doc.project_id, uploaded_by=doc.uploaded_by
+        )
+        db.session.add(other)
+        db.session.commit()
+        for d in (doc, other):
+            sync_document_chunks(d, make_chunks({f'{d.file_id}-a': 'alpha'}), document.org_id, FakeHybridSearch())
+
+        # The first document's last reindex attempt just failed
+        doc.embedding_status = 'failed'
+        doc.embedding_started_at = datetime.utcnow()
+        other.embedding_started_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+
+        assert find_outdated_documents('dense-v2+bm25', limit=1) == [(other.id, document.org_id)]
+        assert len(find_outdated_documents('dense-v2+bm25')) == 2
+
+    def test_legacy_document_drops_unmanifested_chunks(self, document):
+        from app.extensions import db
+        from app.services.document_index_service import sync_document_chunks
+
+        doc, hybrid = document.document, FakeHybridSearch()
+        # Indexed before manifests existed
+        hybrid.points = {'a': 'alpha', 'old': 'stale'}
+        doc.chunk_count = 2
+        db.session.commit()
+
+        sync_document_chunks(doc, make_chunks({'a': 'alpha'}), document.org_id, hybrid)
+
+        assert hybrid.points == {'a': 'alpha'}
+        assert set(manifest(doc)) == {'a'}
+
+    def test_document_delete_removes_manifest(self, document):
+        from app.extensions import db
+        from app.models import DocumentChunkManifest
+        from app.services.document_index_service import sync_document_chunks
+
+        doc = document.document
+        sync_document_chunks(doc, make_chunks({'a': 'alpha'}), document.org_id, FakeHybridSearch())
+        db.session.delete(doc)
+        db.session.commit()
+
+        assert DocumentChunkManifest.query.count() == 0
@@ -0,0 +1,146 @@
+"""
+Unit tests for incremental content staleness scores and the freshness sweep.
+"""
+from datetime import datetime, timedelta
+import pytest
+
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def add_library_item(org, days_old, **kwargs):
+    from app.extensions import db
+    from app.models import AnswerLibraryItem
+
+    when = NOW - timedelta(days=days_old)
+    item = AnswerLibraryItem(
+        organization_id=org.id, created_by=org.user_id,
+        question_text=f'Question {days_old}', answer_text=f'Answer {days_old}',
+        created_at=when, updated_at=when, **kwargs
+    )
+    db.session.add(item)
+    db.session.commit()
+    return item
+
+
+class TestComputeStaleness:
+    """Tests for the staleness formula."""
+
+    def test_age_decay_and_next_check(self):
+        from app.models.freshness import compute_staleness, FRESHNESS_MAX_AGE_DAYS
+
+        fresh, fresh_next = compute_staleness(NOW, NOW)
+        half, _ = compute_staleness(NOW - timedelta(days=FRESHNESS_MAX_AGE_DAYS / 2), NOW, age_weight=1.0)
+        old, old_next = compute_staleness(NOW - timedelta(days=FRESHNESS_MAX_AGE_DAYS * 2), NOW, age_weight=1.0)
+
+        assert fresh == 0.0
+        assert NOW < fresh_next < NOW + timedelta(days=FRESHNESS_MAX_AGE_DAYS)
+        assert half == pytest.approx(0.5)
+        # Fully aged: only an edit or review can change the score
+        assert old == 1.0
+        assert old_next is None
+
+    def test_feedback_and_overdue_review(self):
+        from app.models.freshness import compute_staleness, FRESHNESS_STALE_THRESHOLD
+
+        unhelpful, _ = compute_staleness(NOW, NOW, times_used=10, times_helpful=0)
+        too_few_uses, _ = compute_staleness(NOW, NOW, times_used=2, times_helpful=0)
+        overdue, _ = compute_staleness(NOW, NOW, review_due=NOW - timedelta(days=1))
+        _, review_next = compute_staleness(NOW, NOW, review_due=NOW + timedelta(hours=1))
+
+        assert unhelpful == pytest.approx(0.2)
+        assert too_few_uses == 0.0
+        assert overdue == FRESHNESS_STALE_THRESHOLD
+        assert review_next == NOW + timedelta(hours=1)
+
+
+class TestStalenessEvents:
+    """Tests for scores maintained on insert and update."""
+
+    def test_insert_and_content_edit_score_item(self, org):
+        from app.extensions import db
+
+        item = add_library_item(org, days_old=300)
+        assert item.staleness_score is not None
+        assert item.staleness_score > 0.5
+        assert item.staleness_computed_at is not None
+
+        item.answer_text = 'Rewritten answer'
+        db.session.commit()
+        assert item.staleness_score == 0.0
+
+    def test_review_schedule_change_rescores(self, org):
+        from app.extensions import db
+
+        item = add_library_item(org, days_old=1)
+        assert item.staleness_score < 0.1
+
+        item.next_review_due = datetime.utcnow() - timedelta(days=1)
+        db.session.commit()
+        assert item.staleness_score >= 0.7
+
+
+class TestFreshnessService:
+    """Tests for the sweep and the stored-score queries."""
+
+    def test_sweep_only_rescores_due_items(self, org):
+        from app.extensions import db
+        from app.models import AnswerLibraryItem
+        from app.services.freshness_service import sweep_staleness
+
+        items = [add_library_item(org, days_old=d) for d in (10, 200, 400)]
+        due, not_due, done = items
+        AnswerLibraryItem.query.update({
+            AnswerLibraryItem.staleness_score: 0.0,
+            AnswerLibraryItem.staleness_next_check_at: NOW + timedelta(days=30),
+        })
+        AnswerLibraryItem.query.filter_by(id=due.id).update({AnswerLibraryItem.staleness_next_check_at: NOW})
+        AnswerLibraryItem.query.filter_by(id=done.id).update({AnswerLibraryItem.staleness_next_check_at: None})
+        db.session.commit()
+
+        counts = sweep_staleness(now=NOW, batch_size=1)
+
+        assert counts == {'answer_library_items': 1, 'knowledge_items': 0}
+        db.session.expire_all()
+        assert db.session.get(AnswerLibraryItem, due.id).staleness_next_check_at > NOW
+        assert db.session.get(AnswerLibraryItem, not_due.id).staleness_score == 0.0
+        assert db.session.get(AnswerLibraryItem, done.id).staleness_score == 0.0
+
+    def test_sweeps_and_usage_do_not_reset_age(self, org):
+        from app.extensions import db
+        from app.models import AnswerLibraryItem
+        from app.services.freshness_service import sweep_staleness
+
+        item = add_library_item(org, days_old=300)
+        inserted_score = item.staleness_score
+
+        for _ in range(2):
+            AnswerLibraryItem.query.filter_by(id=item.id).update({AnswerLibraryItem.staleness_next_check_at: NOW})
+            db.session.commit()
+            updated_at = db.session.get(AnswerLibraryItem, item.id).updated_at
+            sweep_staleness(now=NOW)
+            db.session.expire_all()
+            item = db.session.get(AnswerLibraryItem, item.id)
+            assert item.staleness_score >= inserted_score
+            # The sweep writes its columns without bumping updated_at
+            assert item.updated_at == updated_at
+
+        item.times_used = (item.times_used or 0) + 1
+        db.session.commit()
+        assert item.staleness_score >= inserted_score
+
+    def test_stale_items_and_summary(self, org):
+        from app.models import AnswerLibraryItem
+        from app.services.freshness_service import get_stale_items, get_freshness_summary, sweep_staleness
+
+        for days in (5, 200, 500, 900):
+            add_library_item(org, days_old=days)
+        sweep_staleness(now=NOW)
+
+        stale = get_stale_items(AnswerLibraryItem, org.id, min_score=0.5)
+        summary = get_freshness_summary(org.id)
+
+        assert {i.question_text for i in stale} == {'Question 500', 'Question 900'}
+        assert all(i.staleness_score >= 0.5 for i in stale)
+        assert summary['answer_library'] == {'fresh': 1, 'aging': 1, 'stale': 2}
+        assert summary['knowledge'] == {'fresh': 0, 'aging': 0, 'stale': 0}
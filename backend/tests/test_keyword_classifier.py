@@ -0,0 +1,99 @@
+"""
+Unit tests for the shared keyword classifier and its call sites.
+"""
+import random
+
+from app.utils.keyword_classifier import KeywordClassifier, best_label
+from app.services.classification_service import ClassificationService
+from app.services.chunking_service import ChunkingService
+
+
+def classification_keyword_sets():
+    keyword_sets = {}
+    for category, data in ClassificationService.CATEGORIES.items():
+        keyword_sets[category] = data['keywords']
+        for sub_cat, sub_keywords in data['sub_categories'].items():
+            keyword_sets[(category, sub_cat)] = sub_keywords
+    return keyword_sets
+
+
+def substring_scores(keyword_sets, text):
+    """Reference implementation: the old per-keyword substring loops."""
+    text_lower = text.lower()
+    scores = {}
+    for label, keywords in keyword_sets.items():
+        matches = sum(1 for kw in keywords if kw in text_lower)
+        if matches:
+            scores[label] = matches
+    return scores
+
+
+def random_questions(keyword_sets, count, seed=0):
+    rng = random.Random(seed)
+    keywords = sorted({kw for kws in keyword_sets.values() for kw in kws})
+    filler = ("please describe how your solution will handle the following "
+              "requirement for our organization including details").split()
+    return [
+        " ".join(rng.sample(filler, 8) + rng.sample(keywords, rng.randint(0, 3))).capitalize() + "?"
+        for _ in range(count)
+    ]
+
+
+class TestKeywordClassifier:
+    """Tests for KeywordClassifier."""
+
+    def test_counts_overlapping_and_nested_keywords(self):
+        classifier = KeywordClassifier({
+            'compliance': ['pci', 'pci-dss', 'soc 2', 'soc2'],
+            'security': ['encrypt', 'encryption', 'crypt'],
+        })
+
+        assert classifier.scores("Are you PCI-DSS certified and do you encrypt data?") == {
+            'compliance': 2, 'security': 2
+        }
+        assert classifier.scores("Describe your encryption.") == {'security': 3}
+        assert classifier.scores("Nothing relevant here") == {}
+
+    def test_matches_substring_loops(self):
+        keyword_sets = classification_keyword_sets()
+        classifier = KeywordClassifier(keyword_sets)
+
+        for text in random_questions(keyword_sets, 2000, seed=3):
+            assert classifier.scores(text) == substring_scores(keyword_sets, text)
+
+    def test_label_selection(self):
+        classifier = KeywordClassifier({'a': ['x'], 'b': ['y', 'z'], 'c': ['w']})
+
+        assert classifier.best("x y z") == 'b'
+        assert classifier.best("x w") == 'a'  # earliest label on ties
+        assert classifier.first_match("w y", default='general') == 'b'
+        assert classifier.first_match("none", default='general') == 'general'
+        assert classifier.matching("x y z", min_score=2) == ['b']
+        assert best_label({}, default='general') == 'general'
+
+    def test_classification_service_uses_sub_categories(self):
+        service = ClassificationService.__new__(ClassificationService)
+
+        result = service._keyword_classification(
+            "Do you encrypt data with AES and TLS, and support MFA for authentication?"
+        )
+
+        assert result['category'] == 'security'
+        assert result['sub_category'] == 'encryption'
+        assert 0.4 < result['confidence'] <= 0.95
+        assert service._keyword_classification("Tell us about your team")['category'] == 'general'
+
+    def test_chunking_detects_categories(self):
+        service = ChunkingService.__new__(ChunkingService)
+
+        assert service._detect_categories("Our API integration runs on AWS infrastructure") == ['technical']
+        assert service._detect_categories("Short note") == ['general']
+
+    def test_batch_matches_substring_loops_on_random_questions(self):
+        keyword_sets = classification_keyword_sets()
+        classifier = KeywordClassifier(keyword_sets)
+        questions = random_questions(keyword_sets, 2000)
+
+        expected = [substring_scores(keyword_sets, q) for q in questions]
+
+        assert classifier.scores_batch(questions) == expected
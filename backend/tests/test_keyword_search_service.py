@@ -0,0 +1,152 @@
+"""
+Unit tests for the indexed keyword fallback search.
+"""
+import time
+import pytest
+from types import SimpleNamespace
+
+from app.services.keyword_search_service import (
+    KeywordSearchService,
+    build_section_search_terms,
+    highlight,
+    search_knowledge_by_keywords,
+    text_search,
+)
+
+
+def add_item(org, title, content, **kwargs):
+    from app.extensions import db
+    from app.models import KnowledgeItem
+
+    item = KnowledgeItem(
+        title=title, content=content,
+        organization_id=org.id, created_by=org.user_id, **kwargs
+    )
+    db.session.add(item)
+    db.session.commit()
+    return item
+
+
+class TestKeywordSearchService:
+    """Tests for KeywordSearchService (in-process index on SQLite)."""
+
+    def test_build_section_search_terms(self):
+        section_type = SimpleNamespace(name='Functional Requirements', slug='functional_requirements')
+        terms = build_section_search_terms(section_type, 'cloud hosting on aws')
+
+        assert terms == {'functional', 'requirements', 'cloud', 'hosting'}
+
+    def test_ranks_title_matches_first(self, org):
+        add_item(org, 'Security Policy', 'We encrypt data at rest.')
+        add_item(org, 'Company Overview', 'Our security team runs security reviews 24/7.')
+        add_item(org, 'Pricing', 'Annual subscription.')
+
+        results = KeywordSearchService().search(org.id, ['security'])
+
+        assert [r['title'] for r in results] == ['Security Policy', 'Company Overview']
+        assert results[0]['score'] > results[1]['score']
+
+    def test_index_syncs_updates_and_deletes(self, org):
+        from app.extensions import db
+
+        service = KeywordSearchService()
+        item = add_item(org, 'Backup Strategy', 'Nightly backups.')
+        assert service.search(org.id, ['backup'])
+
+        item.title = 'Failover Plan'
+        item.content = 'Disaster recovery runbooks.'
+        db.session.commit()
+        assert service.search(org.id, ['backup']) == []
+        assert service.search(org.id, ['failover'])
+
+        db.session.delete(item)
+        db.session.commit()
+        assert service.search(org.id, ['failover']) == []
+
+    def test_no_match_returns_generic_items(self, org):
+        add_item(org, 'Pricing', 'Annual subscription.')
+
+        results = search_knowledge_by_keywords(org.id, ['zzzz'])
+
+        assert len(results) == 1
+        assert results[0]['score'] == 0.2
+
+    @pytest.mark.slow
+    def test_top_k_latency_at_100k_items(self, org):
+        from app.extensions import db
+        from app.models import KnowledgeItem
+
+        words = ['security', 'pricing', 'support', 'hosting', 'backup', 'network', 'audit', 'training']
+        db.session.bulk_insert_mappings(KnowledgeItem, [
+            {
+                'title': f'{words[i % 8].title()} item {i}',
+                'content': f'{words[(i * 3) % 8]} {words[(i * 5) % 8]} details ' * 20,
+                'organization_id': org.id,
+                'created_by': org.user_id,
+                'is_active': True,
+            }
+            for i in range(100_000)
+        ])
+        db.session.commit()
+
+        service = KeywordSearchService()
+        service.search(org.id, ['security'])  # initial index build
+
+        start = time.perf_counter()
+        results = service.search(org.id, ['security', 'audit'], limit=10)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 10
+        assert elapsed < 0.5
+
+
+class TestTextSearch:
+    """Tests for the shared text_search / highlight helpers."""
+
+    def test_sqlite_falls_back_to_ilike(self, org):
+        from app.models import KnowledgeItem
+
+        add_item(org, 'Security Policy', 'We encrypt data at rest.')
+        add_item(org, 'Pricing', 'Annual SECURITY review included.')
+        add_item(org, 'Overview', 'About us.')
+
+        criterion, rank = text_search(KnowledgeItem, 'security')
+        titles = {i.title for i in KnowledgeItem.query.filter(criterion)}
+
+        assert rank is None
+        assert titles == {'Security Policy', 'Pricing'}
+
+    def test_postgres_uses_search_vector_and_trigram(self, models_app, monkeypatch):
+        from sqlalchemy.dialects import postgresql
+        from app.models import AnswerLibraryItem
+
+        from app.services import keyword_search_service
+
+        thresholds = []
+        monkeypatch.setattr(KeywordSearchService, '_is_postgres', staticmethod(lambda: True))
+        monkeypatch.setattr(keyword_search_service, '_set_trigram_threshold', lambda: thresholds.append(True))
+        criterion, rank = text_search(AnswerLibraryItem, 'data retent')
+        compiled = AnswerLibraryItem.query.filter(criterion).order_by(rank.desc())\
+            .statement.compile(dialect=postgresql.dialect())
+        sql, params = str(compiled), compiled.params
+
+        assert 'answer_library_items.search_vector @@ to_tsquery(' in sql
+        # Percent signs are doubled for the pyformat paramstyle
+        assert '<%% answer_library_items.question_text' in sql
+        assert 'ts_rank(answer_library_items.search_vector' in sql
+        assert 'ILIKE' not in sql
+        assert 'data & retent:*' in params.values()
+        assert 'data retent' in params.values()
+        # <% uses TRIGRAM_MATCH_THRESHOLD, not the server default
+        assert thresholds == [True]
+
+    def test_highlight_marks_prefix_matches_around_first_hit(self):
+        text = 'Intro. ' * 40 + 'Our <b>security</b> policy secures data.'
+
+        snippet = highlight(text, 'secur', max_chars=80)
+
+        assert snippet.startswith('...')
+        assert '<mark>security</mark>' in snippet
+        assert '<mark>secures</mark>' in snippet
+        assert '&lt;b&gt;' in snippet
+        assert highlight('No match here', 'zzz') == 'No match here'
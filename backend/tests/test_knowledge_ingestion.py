@@ -0,0 +1,143 @@
+"""
+Unit tests for background knowledge ingestion of folder uploads.
+
+Chunking, storage and the vector index are replaced with local stand-ins.
+"""
+import io
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.services import knowledge_ingestion_service as ingestion
+from app.services.docling_chunking_service import DocumentChunk
+
+
+class FakeChunker:
+    """Two chunks per file; files named 'broken*' cannot be chunked."""
+
+    def chunk_document(self, file_path, file_id, original_filename, file_type):
+        if original_filename.startswith('broken'):
+            raise ValueError('unsupported layout')
+        with open(file_path) as f:
+            text = f.read()
+        chunks = [
+            DocumentChunk(chunk_id=f"{file_id}-{page}", file_id=file_id, page_number=page,
+                          chunk_index=0, content=f"{text} (page {page})", content_type='text')
+            for page in (1, 2)
+        ]
+        return SimpleNamespace(chunks=chunks, total_pages=2, total_words=len(text.split()) * 2)
+
+
+class FakeHybridSearch:
+    """Records upsert calls instead of embedding."""
+
+    enabled = True
+
+    def __init__(self):
+        self.calls = []
+
+    def upsert_document_chunks(self, chunks, org_id):
+        self.calls.append([c.chunk_id for c in chunks])
+        return len(chunks)
+
+
+def extract_text(path, content_type):
+    raise IOError('unreadable file')
+
+
+@pytest.fixture
+def folder(models_app):
+    """Knowledge folder with an editor to upload to it."""
+    from app.extensions import db
+    from app.models import Organization, User, KnowledgeFolder
+
+    org = Organization(name='Ingest Org', slug='ingest-org')
+    db.session.add(org)
+    db.session.flush()
+    user = User(email='ingest@example.com', name='Editor', organization_id=org.id, role='editor')
+    user.set_password('x')
+    db.session.add(user)
+    db.session.flush()
+    folder = KnowledgeFolder(name='Policies', organization_id=org.id, created_by=user.id)
+    db.session.add(folder)
+    db.session.commit()
+    return SimpleNamespace(folder=folder, user=user)
+
+
+@pytest.fixture
+def hybrid_search():
+    fake = FakeHybridSearch()
+    with patch('app.services.docling_chunking_service.get_docling_chunking_service', return_value=FakeChunker()), \
+         patch('app.services.extraction_text_service.extract_text_from_file', side_effect=extract_text), \
+         patch('app.services.storage_service.get_storage_service', return_value=SimpleNamespace(storage_type='local')), \
+         patch('app.services.hybrid_search_service.get_hybrid_search_service', return_value=fake):
+        yield fake
+
+
+def upload(name, text):
+    return FileStorage(stream=io.BytesIO(text.encode()), filename=name, content_type='text/plain')
+
+
+class TestKnowledgeIngestion:
+    """Tests for ingestion batches."""
+
+    def test_batch_stores_files_without_processing(self, folder, hybrid_search):
+        batch = ingestion.create_ingestion_batch(
+            folder.folder, folder.user, [upload('a.txt', 'Alpha policy'), upload('b.txt', 'Beta policy')],
+            {'geography': 'EU', 'unknown': 'dropped'}
+        )
+
+        data = batch.to_dict()
+        assert data['status'] == 'queued'
+        assert data['options'] == {'geography': 'EU'}
+        assert [f['status'] for f in data['files']] == ['queued', 'queued']
+        assert data['progress_percent'] == 0
+        assert hybrid_search.calls == []
+
+    def test_files_indexed_in_one_embedding_batch(self, folder, hybrid_search):
+        from app.models import KnowledgeItem
+
+        batch = ingestion.create_ingestion_batch(
+            folder.folder, folder.user, [upload('a.txt', 'Alpha policy'), upload('b.txt', 'Beta policy')],
+            {'geography': 'EU'}
+        )
+        result = ingestion.run_ingestion_batch(batch.id)
+
+        assert result['status'] == 'completed'
+        assert result['progress_percent'] == 100
+        # Chunks of both files share one upsert
+        assert len(hybrid_search.calls) == 1
+        assert len(hybrid_search.calls[0]) == 4
+
+        files = batch.files.all()
+        assert [(f.status, f.chunk_count, f.indexed_chunks) for f in files] == [('indexed', 2, 2)] * 2
+        assert all(f.file_data is None and f.chunk_data is None for f in files)
+
+        parent = KnowledgeItem.query.get(files[0].knowledge_item_id)
+        assert parent.geography == 'EU'
+        assert parent.file_data == b'Alpha policy'
+        assert parent.embedding_id.startswith('hybrid:')
+        assert KnowledgeItem.query.filter_by(parent_id=parent.id).count() == 2
+
+    def test_failed_file_does_not_fail_batch_and_can_be_retried(self, folder, hybrid_search):
+        batch = ingestion.create_ingestion_batch(
+            folder.folder, folder.user, [upload('a.txt', 'Alpha policy'), upload('broken.txt', 'Gamma')]
+        )
+        result = ingestion.run_ingestion_batch(batch.id)
+
+        assert result['status'] == 'completed_with_errors'
+        assert result['status_counts'] == {'indexed': 1, 'failed': 1}
+        failed = batch.files.filter_by(status='failed').one()
+        assert 'unreadable file' in failed.error
+        assert failed.file_data == b'Gamma'  # kept for a retry
+
+        assert [f.id for f in ingestion.retry_failed_files(batch)] == [failed.id]
+        assert failed.status == 'queued'
+        with patch('app.services.extraction_text_service.extract_text_from_file', return_value='Gamma policy text'):
+            result = ingestion.run_ingestion_batch(batch.id)
+
+        assert result['status'] == 'completed'
+        assert failed.status == 'indexed'
+        assert failed.attempts == 2
+        assert hybrid_search.calls[-1] == [f"{failed.knowledge_item_id}-0"]
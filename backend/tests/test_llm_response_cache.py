@@ -0,0 +1,150 @@
+"""
+Unit tests for the LLM response cache and the caching provider wrapper.
+
+The shared Redis tier is disabled; only the in-process LRU is exercised.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+
+from app.services import llm_response_cache
+from app.services.llm_providers.base_provider import BaseLLMProvider
+from app.services.llm_providers.cached_provider import CachedLLMProvider, with_response_cache
+from app.utils.async_loop import run_async
+
+
+class FakeProvider(BaseLLMProvider):
+    """Provider that counts calls instead of contacting a model."""
+
+    def __init__(self, **kwargs):
+        super().__init__(api_key='test', model='gpt-4o-mini', temperature=0.0, **kwargs)
+        self.calls = []
+
+    @property
+    def provider_name(self) -> str:
+        return 'fake'
+
+    def generate_content(self, prompt: str, **kwargs) -> str:
+        self.calls.append(prompt)
+        return f"answer {len(self.calls)}"
+
+    def generate_chat(self, messages, **kwargs) -> str:
+        self.calls.append(messages)
+        return f"reply {len(self.calls)}"
+
+
+@pytest.fixture(autouse=True)
+def local_cache():
+    """Response cache without the shared Redis tier."""
+    llm_response_cache.clear_cache()
+    llm_response_cache._local_stats.clear()
+    with patch.object(llm_response_cache, '_get_redis', return_value=None):
+        yield
+    llm_response_cache.clear_cache()
+    llm_response_cache._local_stats.clear()
+
+
+class TestResponseCache:
+    """Tests for cache keys and eviction."""
+
+    def test_key_ignores_whitespace_but_not_settings(self):
+        key = llm_response_cache.response_cache_key('openai', 'gpt-4o', 0.0, 'Extract  the\nquestions')
+
+        assert key == llm_response_cache.response_cache_key('openai', 'gpt-4o', 0, ' Extract the questions ')
+        assert key != llm_response_cache.response_cache_key('openai', 'gpt-4o', 0.7, 'Extract the questions')
+        assert key != llm_response_cache.response_cache_key('openai', 'gpt-4o-mini', 0.0, 'Extract the questions')
+        assert key != llm_response_cache.response_cache_key('openai', 'gpt-4o', 0.0, 'Extract the answers')
+
+    def test_round_trip_and_oversized_entries(self):
+        assert llm_response_cache.set_cached_response('k', '{"questions": []}')
+        assert llm_response_cache.get_cached_response('k') == '{"questions": []}'
+        assert llm_response_cache.get_cached_response('missing') is None
+
+        with patch.object(llm_response_cache, 'CACHE_MAX_ENTRY_BYTES', 16):
+            assert not llm_response_cache.set_cached_response('big', 'x' * 10 + 'lorem ipsum dolor sit amet' * 10)
+        assert llm_response_cache.get_cached_response('big') is None
+
+    def test_lru_is_bounded_by_entries_and_bytes(self):
+        with patch.object(llm_response_cache, 'CACHE_MAX_ENTRIES', 3):
+            for i in range(5):
+                llm_response_cache.set_cached_response(f'k{i}', f'response {i}')
+            assert llm_response_cache.get_cache_stats()['local_entries'] == 3
+            assert llm_response_cache.get_cached_response('k0') is None
+            assert llm_response_cache.get_cached_response('k4') == 'response 4'
+
+        llm_response_cache.clear_cache()
+        entry_size = len(llm_response_cache.zlib.compress(b'response 0'))
+        with patch.object(llm_response_cache, 'CACHE_MAX_BYTES', entry_size * 2):
+            for i in range(4):
+                llm_response_cache.set_cached_response(f'k{i}', f'response {i}')
+            stats = llm_response_cache.get_cache_stats()
+            assert stats['local_entries'] == 2
+            assert stats['local_size_bytes'] <= entry_size * 2
+
+    def test_expired_entries_are_dropped(self):
+        llm_response_cache.set_cached_response('k', 'response', ttl=60)
+        with patch.object(llm_response_cache.time, 'time', return_value=llm_response_cache.time.time() + 120):
+            assert llm_response_cache.get_cached_response('k') is None
+        assert llm_response_cache.get_cache_stats()['local_entries'] == 0
+
+
+class TestCachedProvider:
+    """Tests for CachedLLMProvider."""
+
+    def test_repeated_prompt_served_from_cache(self):
+        inner = FakeProvider()
+        provider = CachedLLMProvider(inner, org_id=1, agent_type='question_extraction')
+
+        assert provider.generate_content('Extract questions from: A') == 'answer 1'
+        assert provider.generate_content('Extract questions from:  A') == 'answer 1'
+        assert provider.generate_content('Extract questions from: B') == 'answer 2'
+        assert provider.generate_content('Extract questions from: A', temperature=0.9) == 'answer 3'
+        assert len(inner.calls) == 3
+        assert provider.provider_name == 'fake'
+
+        stats = llm_response_cache.get_response_cache_stats(1)
+        assert len(stats) == 1
+        assert stats[0]['agent_type'] == 'question_extraction'
+        assert (stats[0]['hits'], stats[0]['misses']) == (1, 3)
+        assert stats[0]['hit_rate'] == 0.25
+        assert stats[0]['saved_prompt_tokens'] > 0
+        assert llm_response_cache.get_response_cache_stats(2) == []
+
+    def test_chat_and_async_calls_are_cached(self):
+        inner = FakeProvider()
+        provider = CachedLLMProvider(inner, org_id=1)
+        messages = [{'role': 'user', 'content': 'Classify: Do you encrypt data?'}]
+
+        assert provider.generate_chat(messages) == 'reply 1'
+        assert run_async(provider.agenerate_chat(messages)) == 'reply 1'
+        assert run_async(provider.agenerate_content('Expand: SSO')) == 'answer 2'
+        assert provider.generate_content('Expand: SSO') == 'answer 2'
+        assert len(inner.calls) == 2
+
+    def test_async_calls_keep_cache_io_off_the_event_loop(self):
+        import asyncio
+
+        provider = CachedLLMProvider(FakeProvider(), org_id=1)
+        on_loop = []
+
+        def get_redis():
+            # Running inside a coroutine on the loop thread, not in the executor
+            on_loop.append(asyncio._get_running_loop() is not None)
+            return None
+
+        with patch.object(llm_response_cache, '_get_redis', side_effect=get_redis):
+            assert run_async(provider.agenerate_content('Expand: SSO')) == 'answer 1'
+            assert run_async(provider.agenerate_content('Expand: SSO')) == 'answer 1'
+
+        assert on_loop and not any(on_loop)
+
+    def test_cache_is_opt_in(self):
+        inner = FakeProvider()
+        disabled = SimpleNamespace(config_metadata={'temperature': 0.2})
+        enabled = SimpleNamespace(config_metadata={'response_cache': True, 'response_cache_ttl': 3600})
+
+        assert with_response_cache(inner, disabled) is inner
+        assert with_response_cache(inner, None) is inner
+        cached = with_response_cache(inner, enabled, org_id=1, agent_type='classification')
+        assert isinstance(cached, CachedLLMProvider)
+        assert cached.ttl == 3600
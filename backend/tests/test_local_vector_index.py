@@ -0,0 +1,192 @@
+"""
+Unit tests for the local NumPy vector index and its use by QdrantService.
+"""
+import time
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+
+def random_vectors(count, dimension=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(16, dimension))
+    return (centers[rng.integers(0, 16, count)] + 0.5 * rng.normal(size=(count, dimension))).astype(np.float32)
+
+
+def records(vectors, **payload):
+    from app.services.vectordb import VectorRecord
+
+    return [
+        VectorRecord(id=str(i), vector=v.tolist(), payload={'item_id': i, 'folder_id': i % 3, **payload})
+        for i, v in enumerate(vectors)
+    ]
+
+
+@pytest.fixture(params=['none', 'int8'])
+def adapter(request, tmp_path):
+    from app.services.vectordb import LocalVectorAdapter
+
+    adapter = LocalVectorAdapter(path=str(tmp_path), quantization=request.param, indexed_fields=['folder_id'])
+    adapter.create_collection('kb', 64)
+    return adapter
+
+
+class TestLocalVectorAdapter:
+    """Tests for LocalVectorAdapter."""
+
+    def test_query_filters_and_matches_brute_force(self, adapter):
+        vectors = random_vectors(300)
+        adapter.upsert('kb', records(vectors, tags=['security']))
+
+        results = adapter.query('kb', vectors[7].tolist(), top_k=5, filter={'folder_id': 1})
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = normalized @ normalized[7]
+        expected = [i for i in np.argsort(-scores) if i % 3 == 1][:5]
+
+        assert [r.id for r in results][0] == '7'
+        assert len(set(r.id for r in results) & set(map(str, expected))) >= 4
+        assert all(r.payload['folder_id'] == 1 for r in results)
+        # Lists match any value; unindexed fields fall back to a payload scan
+        assert len(adapter.query('kb', vectors[0].tolist(), top_k=500, filter={'folder_id': [0, 2]})) == 200
+        assert len(adapter.query('kb', vectors[0].tolist(), top_k=500, filter={'tags': 'security'})) == 300
+        assert adapter.query('kb', vectors[0].tolist(), top_k=5, filter={'folder_id': 9}) == []
+
+    def test_persists_across_reload_with_updates_and_deletes(self, adapter, tmp_path):
+        from app.services.vectordb import LocalVectorAdapter, VectorRecord
+
+        vectors = random_vectors(100)
+        adapter.upsert('kb', records(vectors))
+        adapter.delete('kb', ['1', '2'])
+        adapter.upsert('kb', [VectorRecord(id='3', vector=vectors[50].tolist(), payload={'folder_id': 2})])
+
+        reloaded = LocalVectorAdapter(path=str(tmp_path))
+        info = reloaded.get_collection_info('kb')
+        top = reloaded.query('kb', vectors[50].tolist(), top_k=2)
+
+        assert info.count == 98
+        assert {r.id for r in top} == {'3', '50'}
+        assert reloaded.query('kb', vectors[1].tolist(), top_k=1)[0].id != '1'
+        assert len(reloaded.query('kb', vectors[0].tolist(), top_k=100, filter={'folder_id': 2})) == 33
+
+    def test_freed_slots_are_reused(self, adapter):
+        vectors = random_vectors(64)
+        adapter.upsert('kb', records(vectors))
+        adapter.delete('kb', [str(i) for i in range(32)])
+        adapter.upsert('kb', records(vectors[:32]))
+
+        collection = adapter._get('kb')
+        assert collection.capacity == 64
+        assert collection.count == 64
+
+    def test_processes_sharing_a_path_see_each_others_writes(self, adapter, tmp_path):
+        from app.services.vectordb import LocalVectorAdapter
+
+        # A second adapter has its own in-memory state, like another worker process
+        other = LocalVectorAdapter(path=str(tmp_path), indexed_fields=['folder_id'])
+        vectors = random_vectors(200)
+        adapter.upsert('kb', records(vectors[:1]))
+
+        assert other.query('kb', vectors[0].tolist(), top_k=1)[0].id == '0'
+
+        # The other writer must not reuse slot 0, grows the file and compacts the log
+        other.upsert('kb', records(vectors)[1:150])
+        for _ in range(3):
+            other.delete('kb', [str(i) for i in range(100, 150)])
+            other.upsert('kb', records(vectors)[100:150])
+        # Compacted: fewer lines than were appended
+        assert other._get('kb').log_lines < 1 + 149 + 3 * 100
+        top = adapter.query('kb', vectors[0].tolist(), top_k=1)[0]
+
+        assert top.id == '0'
+        assert top.score > 0.9
+        assert adapter.get_collection_info('kb').count == 150
+        assert len(adapter.query('kb', vectors[0].tolist(), top_k=200, filter={'folder_id': 1})) == 50
+        assert LocalVectorAdapter(path=str(tmp_path)).get_collection_info('kb').count == 150
+
+
+class TestQdrantServiceLocalIndex:
+    """Tests for the local index behind QdrantService."""
+
+    def test_offline_upsert_search_delete(self, models_app, tmp_path, monkeypatch):
+        from app.services import qdrant_service
+        from app.services.vectordb import LocalVectorAdapter
+
+        vectors = random_vectors(20)
+        texts = {f'Title {i}\n\nContent {i}': v for i, v in enumerate(vectors)}
+
+        class FakeProvider:
+            def get_embedding(self, text):
+                return texts.get(text, vectors[int(text.split()[-1])]).tolist()
+
+        monkeypatch.setattr(qdrant_service, 'QDRANT_AVAILABLE', False)
+        monkeypatch.setattr(qdrant_service, '_get_local_index', lambda: LocalVectorAdapter(path=str(tmp_path)))
+        service = qdrant_service.QdrantService(org_id=None)
+        service.embedding_provider = FakeProvider()
+
+        for i in range(20):
+            service.upsert_item(i, org_id=1, title=f'Title {i}', content=f'Content {i}', folder_id=i % 2)
+        results = service.search('query 4', org_id=1, limit=3, score_threshold=0.0)
+        in_folder = service.search('query 4', org_id=1, folder_id=1, limit=3, score_threshold=0.0)
+        service.delete_item(4, org_id=1)
+
+        assert not service.enabled
+        assert results[0]['item_id'] == 4
+        assert results[0]['title'] == 'Title 4'
+        assert all(r['folder_id'] == 1 for r in in_folder)
+        assert service.search('query 4', org_id=1, limit=1, score_threshold=0.0)[0]['item_id'] != 4
+        assert service.search('query 4', org_id=2, limit=3) == []
+
+        # Knowledge item deletes reach the local index while Qdrant is down
+        monkeypatch.setattr(qdrant_service, '_qdrant_instance', service)
+        qdrant_service.delete_knowledge_item_vectors(SimpleNamespace(id=5, organization_id=1, embedding_id='x'))
+        assert 5 not in [r['item_id'] for r in service.search('query 5', org_id=1, limit=3, score_threshold=0.0)]
+
+
+@pytest.mark.slow
+class TestLocalIndexBenchmark:
+    """Recall and latency of the local index against Qdrant (local mode)."""
+
+    @pytest.mark.parametrize('quantization', ['none', 'int8'])
+    def test_recall_and_latency_against_qdrant(self, tmp_path, quantization):
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import (
+            Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+        )
+        from app.services.vectordb import LocalVectorAdapter
+
+        count, dimension, queries = 2000, 768, 50
+        vectors = random_vectors(count, dimension)
+        query_vectors = random_vectors(queries, dimension, seed=1)
+
+        local = LocalVectorAdapter(path=str(tmp_path), quantization=quantization, indexed_fields=['folder_id'])
+        local.create_collection('kb', dimension)
+        local.upsert('kb', records(vectors))
+
+        qdrant = QdrantClient(':memory:')
+        qdrant.create_collection('kb', vectors_config=VectorParams(size=dimension, distance=Distance.COSINE))
+        qdrant.upsert('kb', points=[
+            PointStruct(id=i, vector=v.tolist(), payload={'folder_id': i % 3}) for i, v in enumerate(vectors)
+        ])
+
+        recalls, local_time, qdrant_time = [], 0.0, 0.0
+        for q in query_vectors:
+            start = time.perf_counter()
+            expected = qdrant.query_points(
+                'kb', query=q.tolist(), limit=10,
+                query_filter=Filter(must=[FieldCondition(key='folder_id', match=MatchValue(value=1))])
+            ).points
+            qdrant_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            found = local.query('kb', q.tolist(), top_k=10, filter={'folder_id': 1})
+            local_time += time.perf_counter() - start
+
+            recalls.append(len({str(p.id) for p in expected} & {r.id for r in found}) / 10)
+
+        recall = sum(recalls) / len(recalls)
+        print(
+            f"\n{quantization}: recall@10 {recall:.3f}, "
+            f"local {local_time / queries * 1000:.2f}ms vs qdrant local mode {qdrant_time / queries * 1000:.2f}ms per query"
+        )
+        assert recall >= (0.99 if quantization == 'none' else 0.9)
+        assert local_time < qdrant_time
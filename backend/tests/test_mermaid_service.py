@@ -0,0 +1,84 @@
+"""
+Unit tests for the Mermaid rendering service cache and prefetch.
+
+The renderer endpoint is replaced with a local stand-in; no network access.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services import mermaid_service
+
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'0' * 16
+
+
+@pytest.fixture(autouse=True)
+def local_renderer():
+    """Point the service at a fake renderer with no shared cache."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_get(url, timeout=None, headers=None):
+        with lock:
+            calls.append(url)
+        time.sleep(0.05)
+        return Mock(status_code=200, content=PNG_BYTES)
+
+    mermaid_service.clear_cache()
+    with patch.object(mermaid_service, 'MERMAID_INK_URL', 'http://renderer.test/img/'), \
+         patch.object(mermaid_service, '_get_redis', return_value=None), \
+         patch.object(mermaid_service.requests, 'get', side_effect=fake_get):
+        yield calls
+    mermaid_service.clear_cache()
+
+
+class TestMermaidCache:
+    """Tests for the bounded diagram cache."""
+
+    def test_render_uses_configured_endpoint_and_caches(self, local_renderer):
+        assert mermaid_service.render_mermaid_to_png('graph TD; A-->B') == PNG_BYTES
+        assert mermaid_service.render_mermaid_to_png('graph TD; A-->B') == PNG_BYTES
+
+        assert len(local_renderer) == 1
+        assert local_renderer[0].startswith('http://renderer.test/img/')
+
+    def test_lru_is_bounded(self, local_renderer):
+        with patch.object(mermaid_service, 'CACHE_MAX_ENTRIES', 2):
+            for i in range(4):
+                mermaid_service.render_mermaid_to_png(f'graph TD; A{i}-->B')
+
+            assert mermaid_service.get_cache_stats()['local_entries'] == 2
+            # Oldest entry was evicted and must be re-rendered
+            mermaid_service.render_mermaid_to_png('graph TD; A0-->B')
+            assert len(local_renderer) == 5
+
+
+class TestMermaidPrefetch:
+    """Tests for concurrent diagram prefetch."""
+
+    def test_extract_mermaid_blocks(self):
+        content = "Intro\n```mermaid\ngraph TD; A-->B\n```\ntext\n```python\nx = 1\n```"
+        assert mermaid_service.extract_mermaid_blocks(content) == ['graph TD; A-->B\n']
+
+    def test_prefetch_renders_unique_diagrams_concurrently(self, local_renderer):
+        codes = [f'graph TD; N{i}-->M' for i in range(8)] + ['graph TD; N0-->M']
+        # Each render waits for a second one in flight; serial rendering breaks the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def paired_get(url, timeout=None, headers=None):
+            local_renderer.append(url)
+            barrier.wait()
+            return Mock(status_code=200, content=PNG_BYTES)
+
+        with patch.object(mermaid_service.requests, 'get', side_effect=paired_get):
+            results = mermaid_service.prefetch_diagrams(codes, max_workers=8)
+
+        assert len(results) == 8
+        assert all(png == PNG_BYTES for png in results.values())
+        assert len(local_renderer) == 8
+
+        # Subsequent inline renders are cache hits
+        mermaid_service.render_mermaid_to_png('graph TD; N3-->M')
+        assert len(local_renderer) == 8
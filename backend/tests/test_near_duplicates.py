@@ -0,0 +1,94 @@
+"""
+Unit tests for near-duplicate detection and document windowing.
+"""
+import random
+import time
+import pytest
+
+from app.utils.near_duplicates import NearDuplicateIndex, word_set, dice_similarity
+from app.agents.utils.windowing import split_into_windows
+
+
+def brute_force_unique(texts, threshold=0.8):
+    """Reference implementation: the old pairwise word-overlap scan."""
+    kept, seen = [], []
+    for text in texts:
+        words = word_set(text)
+        if not any(dice_similarity(words, other) > threshold for other in seen):
+            kept.append(text)
+            seen.append(words)
+    return kept
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex."""
+    
+    def test_detects_reworded_duplicates(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        
+        assert index.add_if_new("Describe your data encryption methodology at rest")
+        assert not index.add_if_new("describe your data encryption methodology at rest.")
+        assert not index.add_if_new("Please describe your data encryption methodology at rest")
+        assert index.add_if_new("Describe your disaster recovery plan")
+        assert len(index) == 2
+    
+    def test_matches_pairwise_scan(self):
+        rng = random.Random(7)
+        vocab = [f"w{i}" for i in range(60)]
+        base = [" ".join(rng.sample(vocab, rng.randint(3, 15))) for _ in range(150)]
+        # Add perturbed copies so there are plenty of near duplicates
+        texts = base + [
+            " ".join(t.split()[:-1] + [rng.choice(vocab)]) for t in base
+        ]
+        rng.shuffle(texts)
+        
+        index = NearDuplicateIndex(threshold=0.8)
+        fast = [t for t in texts if index.add_if_new(t)]
+        
+        assert fast == brute_force_unique(texts)
+    
+    @pytest.mark.slow
+    def test_scales_to_large_question_sets(self):
+        rng = random.Random(1)
+        vocab = [f"term{i}" for i in range(5000)]
+        texts = [" ".join(rng.sample(vocab, 12)) for _ in range(10000)]
+        
+        start = time.perf_counter()
+        index = NearDuplicateIndex(threshold=0.8)
+        unique = sum(1 for t in texts if index.add_if_new(t))
+        elapsed = time.perf_counter() - start
+        
+        assert unique == len(texts)
+        assert elapsed < 2.0
+
+
+class TestSplitIntoWindows:
+    """Tests for split_into_windows."""
+    
+    def test_short_text_is_single_window(self):
+        windows = split_into_windows("Just a short RFP.", window_chars=1000)
+        
+        assert len(windows) == 1
+        assert windows[0].text == "Just a short RFP."
+    
+    def test_windows_cover_text_and_overlap(self):
+        text = "\n".join(
+            f"SECTION {i}\n" + "Requirement text line.\n" * 30 for i in range(20)
+        )
+        windows = split_into_windows(text, window_chars=2000, overlap_chars=200)
+        
+        assert windows[0].start == 0
+        assert windows[-1].end == len(text)
+        for prev, nxt in zip(windows, windows[1:]):
+            assert nxt.start < prev.end  # overlapping
+            assert len(prev.text) <= 2000
+        assert [w.position for w in (windows[0], windows[-1])] == ["beginning", "end"]
+    
+    def test_prefers_heading_boundaries(self):
+        text = "\n".join(
+            f"SECTION {i}\n" + "Requirement text line.\n" * 30 for i in range(20)
+        )
+        windows = split_into_windows(text, window_chars=2000, overlap_chars=0)
+        
+        for window in windows[1:]:
+            assert window.text.startswith("SECTION")
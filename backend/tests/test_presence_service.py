@@ -0,0 +1,104 @@
+"""
+Unit tests for realtime presence and content delta encoding.
+"""
+import time
+import pytest
+
+from app.services.presence_service import (
+    PresenceStore,
+    ContentDeltaEncoder,
+    compute_splice,
+    apply_splice,
+)
+
+
+@pytest.fixture
+def store():
+    """In-memory presence store (Redis unreachable)."""
+    return PresenceStore(redis_url='redis://127.0.0.1:1/0', ttl=60)
+
+
+class TestPresenceStore:
+    """Tests for PresenceStore (in-memory fallback)."""
+
+    def test_join_and_leave(self, store):
+        users = store.join(1, 'sid-a', {'user_id': 1, 'name': 'A', 'cursor': None})
+        store.join(1, 'sid-b', {'user_id': 2, 'name': 'B', 'cursor': None})
+
+        assert set(users) == {'sid-a'}
+        assert set(store.get_project_users('1')) == {'sid-a', 'sid-b'}
+
+        remaining = store.leave(1, 'sid-a')
+        assert set(remaining) == {'sid-b'}
+
+    def test_remove_sid_uses_reverse_index(self, store):
+        store.join(1, 'sid-a', {'user_id': 1, 'name': 'A'})
+        store.join(2, 'sid-a', {'user_id': 1, 'name': 'A'})
+        store.join(3, 'sid-b', {'user_id': 2, 'name': 'B'})
+
+        assert sorted(store.remove_sid('sid-a')) == ['1', '2']
+        assert store.get_project_users(1) == {}
+        assert set(store.get_project_users(3)) == {'sid-b'}
+
+    def test_stale_entries_are_pruned(self, store):
+        store.join(1, 'sid-a', {'user_id': 1, 'name': 'A'})
+        store._projects['1']['sid-a']['last_seen'] = time.time() - 120
+
+        assert store.get_project_users(1) == {}
+
+    def test_cursor_update_refreshes_entry(self, store):
+        store.join(1, 'sid-a', {'user_id': 1, 'name': 'A', 'cursor': None})
+        entry = store.update_cursor(1, 'sid-a', {'section_id': 5, 'field': 'content'})
+
+        assert entry['cursor'] == {'section_id': 5, 'field': 'content'}
+        assert store.update_cursor(1, 'sid-missing', {}) is None
+
+
+class TestContentDeltaEncoder:
+    """Tests for content delta encoding."""
+
+    def test_splice_roundtrip(self):
+        old = "The quick brown fox"
+        new = "The quick red fox jumps"
+        assert apply_splice(old, compute_splice(old, new)) == new
+
+    def test_first_version_is_keyframe_then_deltas(self):
+        encoder = ContentDeltaEncoder(keyframe_every=10)
+        base = "x" * 200
+
+        first = encoder.encode('s', base)
+        second = encoder.encode('s', base + "y")
+
+        assert first == {'content': base}
+        assert second['delta'] == {'start': 200, 'end': 200, 'text': 'y'}
+        assert second['base_length'] == 200
+
+    def test_periodic_keyframes(self):
+        encoder = ContentDeltaEncoder(keyframe_every=3)
+        payloads = [encoder.encode('s', "x" * 200 + str(i)) for i in range(4)]
+
+        assert ['content' in p for p in payloads] == [True, False, False, True]
+
+    def test_delta_offsets_are_utf16_code_units(self):
+        encoder = ContentDeltaEncoder(keyframe_every=10)
+        base = "\U0001F600 smile " + "x" * 200
+
+        encoder.encode('s', base)
+        delta = encoder.encode('s', base.replace('smile', 'grin'))
+
+        # The emoji is one code point but two UTF-16 units (JavaScript string indices)
+        assert delta['delta'] == {'start': 3, 'end': 8, 'text': 'grin'}
+        assert delta['base_length'] == len(base) + 1
+        assert delta['length'] == len(base)
+
+    def test_latest_versions_by_key_prefix(self):
+        encoder = ContentDeltaEncoder()
+        encoder.encode(('sid-a', '1', 10), 'first')
+        encoder.encode(('sid-a', '1', 10), 'second')
+        encoder.encode(('sid-a', '1', 11), 'other section')
+        encoder.encode(('sid-a', '2', 10), 'other project')
+
+        assert encoder.latest(('sid-a', '1')) == {
+            ('sid-a', '1', 10): 'second',
+            ('sid-a', '1', 11): 'other section',
+        }
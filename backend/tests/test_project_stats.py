@@ -0,0 +1,169 @@
+"""
+Unit tests for aggregated project list stats and cursor pagination.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+
+@pytest.fixture
+def org(org):
+    """The shared organization with a section type, a knowledge profile and knowledge items."""
+    from app.extensions import db
+    from app.models import User, RFPSectionType, KnowledgeProfile, KnowledgeItem
+
+    section_type = RFPSectionType(name='Overview', slug='overview')
+    profile = KnowledgeProfile(name='EU', organization_id=org.id, created_by=org.user_id)
+    db.session.add_all([section_type, profile])
+    db.session.flush()
+    db.session.add_all([
+        KnowledgeItem(title=f'Item {i}', content='x', organization_id=org.id, created_by=org.user_id,
+                      knowledge_profile_id=profile.id, is_active=i < 2)
+        for i in range(3)
+    ])
+    db.session.commit()
+    return SimpleNamespace(id=org.id, user_id=org.user_id, user=db.session.get(User, org.user_id),
+                           section_type=section_type, profile=profile)
+
+
+def add_projects(org, count, start=datetime(2026, 1, 1)):
+    """Projects with a mix of sections, legacy questions and documents."""
+    from app.extensions import db
+    from app.models import Project, Question, RFPSection, Document
+
+    projects = []
+    for i in range(count):
+        project = Project(name=f'Project {i}', organization_id=org.id, created_by=org.user.id,
+                          updated_at=start + timedelta(minutes=i // 2))
+        db.session.add(project)
+        db.session.flush()
+        if i % 3 == 0:
+            db.session.add_all([
+                RFPSection(project_id=project.id, section_type_id=org.section_type.id,
+                           content='Drafted' if j % 2 else None, status='approved' if j == 0 else 'draft')
+                for j in range(4)
+            ])
+        if i % 3 != 2:
+            db.session.add_all([
+                Question(project_id=project.id, text=f'Q{j}', status=['pending', 'answered', 'approved'][j % 3])
+                for j in range(5)
+            ])
+        db.session.add(Document(project_id=project.id, filename=f'{i}.pdf', original_filename=f'{i}.pdf',
+                                file_type='pdf', uploaded_by=org.user.id))
+        if i % 4 == 0:
+            project.reviewers.append(org.user)
+            project.knowledge_profiles.append(org.profile)
+        projects.append(project)
+    db.session.commit()
+    return projects
+
+
+@contextmanager
+def count_queries():
+    """SQL statements executed inside the block (for the current test's engine)."""
+    from app.extensions import db
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def client(models_client):
+    from app.routes import projects
+
+    return models_client(projects.bp, url_prefix='/api/projects')
+
+
+class TestProjectListStats:
+    """Tests for Project.load_list_stats."""
+
+    def test_aggregates_match_per_project_stats(self, org):
+        from app.extensions import db
+
+        projects = add_projects(org, 12)
+        stats = type(projects[0]).load_list_stats(p.id for p in projects)
+        db.session.expire_all()
+
+        for project in projects:
+            assert project.to_dict(include_stats=True, stats=stats[project.id]) == project.to_dict(include_stats=True)
+
+        by_name = {p.name: p.to_dict(include_stats=True, stats=stats[p.id]) for p in projects}
+        assert (by_name['Project 0']['question_count'], by_name['Project 0']['answered_count'],
+                by_name['Project 0']['approved_count']) == (4, 2, 1)  # sections take priority
+        assert (by_name['Project 1']['question_count'], by_name['Project 1']['answered_count']) == (5, 3)
+        assert by_name['Project 2']['question_count'] == 0
+        assert by_name['Project 0']['knowledge_profiles'][0]['items_count'] == 2
+        assert by_name['Project 0']['knowledge_profile_ids'] == [org.profile.id]
+
+    def test_query_count_does_not_grow_with_projects(self, org):
+        from app.models import Project
+
+        project_ids = [p.id for p in add_projects(org, 40)]
+        with count_queries() as statements:
+            Project.load_list_stats(project_ids)
+
+        assert len(statements) <= 6
+
+    def test_list_serialization_runs_a_fixed_number_of_queries(self, org):
+        from app.extensions import db
+        from app.models import Project
+
+        def serialize(aggregated):
+            """Stats of every project and the statements it took, from a fresh session."""
+            db.session.expire_all()
+            projects = Project.query.order_by(Project.id).all()
+            with count_queries() as statements:
+                if aggregated:
+                    stats = Project.load_list_stats(p.id for p in projects)
+                    data = [p.to_dict(include_stats=True, stats=stats[p.id]) for p in projects]
+                else:
+                    data = [p.to_dict(include_stats=True) for p in projects]
+            return data, len(statements)
+
+        add_projects(org, 5)
+        few, few_queries = serialize(aggregated=True)
+        expected_few, loading_few = serialize(aggregated=False)
+        add_projects(org, 45, start=datetime(2026, 2, 1))
+        many, many_queries = serialize(aggregated=True)
+        expected_many, loading_many = serialize(aggregated=False)
+
+        assert few == expected_few
+        assert many == expected_many
+        assert many_queries == few_queries
+        # Relationship loading issues queries per project
+        assert loading_many > loading_few
+
+
+class TestProjectListPagination:
+    """Tests for cursor pagination of GET /api/projects."""
+
+    def test_pages_cover_all_projects_once(self, org, client):
+        add_projects(org, 7)  # pairs of projects share updated_at
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(org.user.id))}'}
+
+        all_names = [p['name'] for p in client.get('/api/projects', headers=headers).get_json()['projects']]
+        assert len(all_names) == 7
+
+        names, cursor = [], None
+        while True:
+            url = '/api/projects?limit=3' + (f'&cursor={cursor}' if cursor else '')
+            data = client.get(url, headers=headers).get_json()
+            names += [p['name'] for p in data['projects']]
+            cursor = data['next_cursor']
+            assert data['has_more'] == (cursor is not None)
+            if not cursor:
+                break
+
+        assert names == all_names
+        assert client.get('/api/projects?cursor=not-a-cursor', headers=headers).status_code == 400
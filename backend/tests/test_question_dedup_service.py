@@ -0,0 +1,42 @@
+"""
+Unit tests for question deduplication before answer generation.
+"""
+import numpy as np
+
+from app.services.question_dedup_service import (
+    QuestionDedupService, cluster_by_similarity, normalize_question
+)
+
+
+class TestQuestionDedup:
+    """Tests for cluster_by_similarity and QuestionDedupService."""
+
+    def test_clusters_join_most_similar_leader(self):
+        vectors = np.array([
+            [1.0, 0.0], [0.0, 1.0], [0.99, 0.05], [0.1, 0.99], [0.7, 0.7]
+        ])
+
+        assert cluster_by_similarity(vectors, 0.95) == [0, 1, 0, 1, 4]
+        assert cluster_by_similarity(vectors, 1.01) == [0, 1, 2, 3, 4]
+        assert cluster_by_similarity(np.zeros((0, 2)), 0.9) == []
+
+    def test_different_numbers_never_share_a_cluster(self):
+        texts = ["Restore within 4 hours?", "Restore within 24 hours?", "Restore within 4 hours, please?"]
+        vectors = np.ones((3, 4))
+
+        assert cluster_by_similarity(vectors, 0.9, texts) == [0, 1, 0]
+
+    def test_plan_without_embeddings_groups_identical_questions(self):
+        questions = [
+            {"id": 1, "text": "Do you support SSO?"},
+            {"id": 2, "text": "Do you support  SSO"},
+            {"id": 3, "text": "Do you support MFA?"},
+        ]
+
+        plan = QuestionDedupService().plan(questions)
+
+        assert normalize_question("Do you support SSO?") == "do you support sso"
+        assert plan["generate"] == [1, 3]
+        assert plan["duplicates"] == [[2, 1]]
+        assert plan["reused"] == []
+        assert plan["stats"]["method"] == "exact"
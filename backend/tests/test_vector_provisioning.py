@@ -0,0 +1,286 @@
+"""
+Unit tests for Qdrant collection provisioning and alias migrations
+(against qdrant-client's in-process mode).
+"""
+import warnings
+import pytest
+
+from app.services.vectordb.provisioning import (
+    CollectionSpec,
+    DOCUMENT_CHUNKS,
+    ensure_collection,
+    estimate_vector_memory,
+    get_quantization_config,
+    get_search_params,
+    migrate_collection,
+)
+
+
+SPEC = CollectionSpec(alias='kb', payload_indexes={'org_id': 'integer', 'industry': 'keyword'})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """In-memory Qdrant client recording payload index creation."""
+    from qdrant_client import QdrantClient
+
+    client = QdrantClient(':memory:')
+    client.created_indexes = []
+    create_payload_index = client.create_payload_index
+
+    def record_index(collection_name, field_name, field_schema=None, **kwargs):
+        client.created_indexes.append((collection_name, field_name, str(field_schema)))
+        return create_payload_index(collection_name, field_name, field_schema=field_schema, **kwargs)
+
+    monkeypatch.setattr(client, 'create_payload_index', record_index)
+    with warnings.catch_warnings():
+        # Local mode warns that payload indexes and search params have no effect
+        warnings.simplefilter('ignore', UserWarning)
+        yield client
+
+
+def add_points(client, collection, ids, dimension=4):
+    from qdrant_client.models import PointStruct
+
+    client.upsert(collection, points=[
+        PointStruct(id=i, vector=[float(i + 1)] + [0.5] * (dimension - 1), payload={'org_id': i % 2})
+        for i in ids
+    ])
+
+
+def aliases(client):
+    return {a.alias_name: a.collection_name for a in client.get_aliases().aliases}
+
+
+class TestProvisioning:
+    """Tests for collection settings and ensure_collection."""
+
+    def test_quantization_and_search_params(self):
+        assert get_quantization_config('scalar').scalar.always_ram is True
+        assert get_quantization_config('binary').binary.always_ram is True
+        assert get_quantization_config('none') is None
+        params = get_search_params('scalar')
+        assert params.quantization.rescore is True
+        assert get_search_params('none') is None
+
+    def test_memory_estimate(self):
+        full = estimate_vector_memory(1000, 768, 'none', on_disk=False)
+        scalar = estimate_vector_memory(1000, 768, 'scalar', on_disk=True)
+        binary = estimate_vector_memory(1000, 768, 'binary', on_disk=True)
+
+        assert full == 1000 * 768 * 4
+        assert scalar == full // 4
+        assert binary == full // 32
+
+    def test_ensure_collection_creates_alias_and_indexes(self, client):
+        physical = ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(4))
+
+        assert aliases(client) == {'kb': physical}
+        assert client.count(physical).count == 4
+        assert {(c, f) for c, f, _ in client.created_indexes} == {(physical, 'org_id'), (physical, 'industry')}
+        # Idempotent
+        assert ensure_collection(client, SPEC, dimension=4) == physical
+
+    def test_named_dense_and_sparse_vectors(self, client):
+        physical = ensure_collection(client, DOCUMENT_CHUNKS, dimension=8)
+        config = client.get_collection(physical).config.params
+
+        assert config.vectors['dense'].size == 8
+        assert config.vectors['dense'].on_disk is True
+        assert 'sparse' in config.sparse_vectors
+        assert {f for _, f, _ in client.created_indexes} == {'org_id', 'status', 'file_id'}
+
+
+class TestMigrateCollection:
+    """Tests for alias-switching migrations."""
+
+    def test_legacy_collection_moves_behind_alias(self, client):
+        from qdrant_client.models import VectorParams, Distance
+
+        client.create_collection('kb', vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+        add_points(client, 'kb', range(10))
+
+        result = migrate_collection(client, SPEC, quantization='scalar', batch_size=3)
+
+        assert result['points'] == 10
+        assert aliases(client) == {'kb': result['target']}
+        assert client.count('kb').count == 10
+        assert client.query_points('kb', query=[1.0, 0.5, 0.5, 0.5], limit=1).points[0].id == 0
+
+    def test_alias_switch_drops_old_collection(self, client):
+        first = ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(5))
+
+        result = migrate_collection(client, SPEC, quantization='binary', settle_seconds=0)
+
+        assert result['source'] == first
+        assert aliases(client) == {'kb': result['target']}
+        assert not client.collection_exists(first)
+        assert client.count('kb').count == 5
+
+    def test_writes_before_the_alias_switch_are_kept(self, client, monkeypatch):
+        from qdrant_client.models import PointIdsList
+
+        first = ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(5))
+        update_collection_aliases = client.update_collection_aliases
+
+        def write_then_switch(**kwargs):
+            # Requests served by the old collection after the catch-up pass
+            add_points(client, 'kb', [7])
+            client.set_payload('kb', payload={'industry': 'legal'}, points=[2])
+            client.delete('kb', points_selector=PointIdsList(points=[3]))
+            return update_collection_aliases(**kwargs)
+
+        monkeypatch.setattr(client, 'update_collection_aliases', write_then_switch)
+        result = migrate_collection(client, SPEC, batch_size=2, settle_seconds=0)
+
+        points = {p.id: p.payload for p in client.scroll('kb', limit=100)[0]}
+        assert result['source'] == first
+        assert set(points) == {0, 1, 2, 4, 7}
+        assert points[2]['industry'] == 'legal'
+        assert not client.collection_exists(first)
+
+
+class TestTenancy:
+    """Tests for tenant routing and moves between shared and dedicated collections."""
+
+    def test_shared_collection_routes_by_filter(self, client, monkeypatch):
+        from app.services.vectordb.tenancy import TenantRouter
+
+        created = {}
+        create_collection = client.create_collection
+
+        def record_collection(collection_name, **kwargs):
+            created.update(kwargs)
+            return create_collection(collection_name, **kwargs)
+
+        monkeypatch.setattr(client, 'create_collection', record_collection)
+        ensure_collection(client, SPEC, dimension=4)
+        router = TenantRouter(client, SPEC, ttl=0)
+
+        # Per-tenant graphs only (local mode ignores HNSW settings, so check the request)
+        assert created['hnsw_config'].m == 0
+        assert created['hnsw_config'].payload_m == 16
+        assert router.route(1) == ('kb', None)
+        assert router.prepare(1) == ('kb', None)
+
+    def test_move_tenant_to_dedicated_and_back(self, client):
+        from app.services.vectordb.tenancy import (
+            TenantRouter, move_tenant_to_dedicated, move_tenant_to_shared, tenant_filter
+        )
+
+        ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(10))
+        router = TenantRouter(client, SPEC, ttl=0)
+
+        result = move_tenant_to_dedicated(client, SPEC, org_id=1, batch_size=2, settle_seconds=0)
+
+        assert result['points'] == 5
+        assert router.route(1) == ('kb_org_1', None)
+        assert router.route(0) == ('kb', None)
+        assert client.count('kb_org_1').count == 5
+        assert client.count('kb', count_filter=tenant_filter(1)).count == 0
+        assert client.count('kb').count == 5
+
+        move_tenant_to_shared(client, SPEC, org_id=1, settle_seconds=0)
+
+        assert router.route(1) == ('kb', None)
+        assert client.count('kb').count == 10
+        assert not client.collection_exists(result['collection'])
+
+    def test_writes_and_deletes_during_moves_are_kept(self, client, monkeypatch):
+        from qdrant_client.models import PointIdsList
+        from app.services.vectordb import tenancy
+
+        ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(10))
+
+        def settle_with(stale_collection, new_collection):
+            # A delete racing the switch hits the old location, later writes the new one
+            def settle(_):
+                client.delete(stale_collection, points_selector=PointIdsList(points=[settle.delete_id]))
+                add_points(client, new_collection, [settle.add_id])
+            return settle
+
+        settle = settle_with('kb', 'kb_org_1')
+        settle.delete_id, settle.add_id = 3, 11
+        monkeypatch.setattr(tenancy, '_settle', settle)
+        tenancy.move_tenant_to_dedicated(client, SPEC, org_id=1, batch_size=2)
+
+        ids = {p.id for p in client.scroll('kb_org_1', limit=100)[0]}
+        assert ids == {1, 5, 7, 9, 11}
+
+        settle = settle_with(aliases(client)['kb_org_1'], 'kb')
+        settle.delete_id, settle.add_id = 5, 13
+        monkeypatch.setattr(tenancy, '_settle', settle)
+        tenancy.move_tenant_to_shared(client, SPEC, org_id=1, batch_size=2)
+
+        ids = {p.id for p in client.scroll('kb', scroll_filter=tenancy.tenant_filter(1), limit=100)[0]}
+        assert ids == {1, 7, 9, 11, 13}
+
+    def test_updates_through_the_new_route_during_moves_are_kept(self, client, monkeypatch):
+        from app.services.vectordb import tenancy
+
+        ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(10))
+
+        def settle_with(stale_collection, new_collection):
+            # A router still on the old route updates one point, a reloaded one another
+            def settle(_):
+                client.set_payload(stale_collection, payload={'industry': 'old route'}, points=[settle.stale_id])
+                client.set_payload(new_collection, payload={'industry': 'new route'}, points=[settle.new_id])
+            return settle
+
+        def industries(collection):
+            points = client.scroll(collection, scroll_filter=tenancy.tenant_filter(1), limit=100)[0]
+            return {p.id: p.payload.get('industry') for p in points}
+
+        settle = settle_with('kb', 'kb_org_1')
+        settle.stale_id, settle.new_id = 3, 5
+        monkeypatch.setattr(tenancy, '_settle', settle)
+        tenancy.move_tenant_to_dedicated(client, SPEC, org_id=1, batch_size=2)
+
+        assert industries('kb_org_1') == {1: None, 3: 'old route', 5: 'new route', 7: None, 9: None}
+
+        settle = settle_with(aliases(client)['kb_org_1'], 'kb')
+        settle.stale_id, settle.new_id = 7, 3
+        monkeypatch.setattr(tenancy, '_settle', settle)
+        tenancy.move_tenant_to_shared(client, SPEC, org_id=1, batch_size=2)
+
+        assert industries('kb') == {1: None, 3: 'new route', 5: 'new route', 7: 'old route', 9: None}
+
+    def test_stale_route_is_retried_after_move_back(self, client):
+        from app.services.vectordb.tenancy import (
+            TenantRouter, move_tenant_to_dedicated, move_tenant_to_shared, tenant_filter
+        )
+
+        ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(10))
+        move_tenant_to_dedicated(client, SPEC, org_id=1, settle_seconds=0)
+        # Another process's router, cached before the move back
+        router = TenantRouter(client, SPEC, ttl=3600)
+        assert router.route(1) == ('kb_org_1', None)
+
+        move_tenant_to_shared(client, SPEC, org_id=1, settle_seconds=0)
+        count = router.run(1, lambda route: client.count(route.collection, count_filter=tenant_filter(1)).count)
+
+        assert count == 5
+        assert router.route(1) == ('kb', None)
+        with pytest.raises(ValueError):
+            router.run(1, lambda route: client.count('missing'))
+
+    def test_delete_tenant(self, client):
+        from app.services.vectordb.tenancy import TenantRouter, move_tenant_to_dedicated
+
+        ensure_collection(client, SPEC, dimension=4)
+        add_points(client, 'kb', range(9))
+        move_tenant_to_dedicated(client, SPEC, org_id=1, settle_seconds=0)
+        router = TenantRouter(client, SPEC, ttl=0)
+
+        assert router.delete_tenant(1)
+        assert router.delete_tenant(0)
+
+        assert aliases(client) == {'kb': aliases(client)['kb']}
+        assert client.count('kb').count == 0
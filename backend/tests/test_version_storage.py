@@ -0,0 +1,245 @@
+"""
+Unit tests for delta-compressed section history and content-addressed
+proposal version storage.
+"""
+import io
+import uuid
+from types import SimpleNamespace
+import pytest
+
+
+@pytest.fixture
+def project(models_app):
+    """Project with a user and three sections."""
+    from app.extensions import db
+    from app.models import Organization, User, Project, RFPSectionType, RFPSection
+
+    org = Organization(name='Version Org', slug='version-org')
+    db.session.add(org)
+    db.session.flush()
+    user = User(email='versions@example.com', name='Editor', organization_id=org.id, role='editor')
+    user.set_password('x')
+    section_type = RFPSectionType(name='Approach', slug='approach')
+    db.session.add_all([user, section_type])
+    db.session.flush()
+    project = Project(name='Versioned', organization_id=org.id, created_by=user.id)
+    db.session.add(project)
+    db.session.flush()
+    db.session.add_all([
+        RFPSection(project_id=project.id, section_type_id=section_type.id, title=f'Section {i}',
+                   order=i, content=long_text(i))
+        for i in range(3)
+    ])
+    db.session.commit()
+    return SimpleNamespace(id=project.id, user=user, model=project)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """In-memory object storage."""
+    from app.services import storage_service
+
+    files = {}
+
+    class FakeStorage:
+        def upload(self, file, original_filename, content_type=None, metadata=None):
+            file_id = uuid.uuid4().hex
+            files[file_id] = file.read()
+            return SimpleNamespace(file_id=file_id)
+
+        def download(self, file_id):
+            if file_id not in files:
+                raise FileNotFoundError(file_id)
+            return files[file_id], None
+
+        def delete(self, file_id):
+            return files.pop(file_id, None) is not None
+
+    monkeypatch.setattr(storage_service, 'get_storage_service', lambda: FakeStorage())
+    return files
+
+
+def long_text(seed, paragraphs=40):
+    return '\n'.join(f'Paragraph {p} of section {seed}: we deliver the requirement on time.' for p in range(paragraphs))
+
+
+def test_text_delta_round_trip():
+    from app.utils.text_delta import make_delta, apply_delta, encode_delta, decode_delta
+
+    base = long_text(1)
+    target = base.replace('Paragraph 7 ', 'Revised paragraph 7 ') + '\nClosing line\r\n'
+    encoded = encode_delta(make_delta(base, target))
+
+    assert apply_delta(base, decode_delta(encoded)) == target
+    assert len(encoded) < len(target) / 5
+    assert apply_delta('', make_delta('', 'new')) == 'new'
+    assert apply_delta('old', make_delta('old', '')) == ''
+
+
+def test_section_history_uses_delta_chain_with_keyframes(project, monkeypatch):
+    from app.extensions import db
+    from app.models import RFPSection, SectionVersion, save_section_version
+    from app.models import section_version
+
+    monkeypatch.setattr(section_version, 'SECTION_KEYFRAME_INTERVAL', 4)
+    section = RFPSection.query.filter_by(project_id=project.id).first()
+    contents = []
+    for i in range(10):
+        section.content = long_text(0).replace(f'Paragraph {i} ', f'Edited paragraph {i} ')
+        section.version = i + 1
+        contents.append(section.content)
+        save_section_version(section, project.user.id)
+        db.session.commit()
+
+    versions = SectionVersion.query.filter_by(section_id=section.id).order_by(SectionVersion.id).all()
+    assert [v.delta_depth for v in versions] == [0, 1, 2, 3, 0, 1, 2, 3, 0, 1]
+    assert [v.is_keyframe for v in versions].count(True) == 3
+
+    db.session.expire_all()
+    cache = {}
+    assert [v.get_content(cache) for v in reversed(versions)] == list(reversed(contents))
+    assert [v.to_dict()['content'] for v in versions] == contents
+
+
+def test_snapshots_share_unchanged_section_bodies(project):
+    from app.extensions import db
+    from app.models import ContentBlob, RFPSection
+    from app.services.version_storage_service import build_snapshot, expand_snapshot
+
+    sections = RFPSection.query.filter_by(project_id=project.id).order_by(RFPSection.order).all()
+    first = build_snapshot(sections)
+    sections[1].content = 'Rewritten'
+    second = build_snapshot(sections)
+    db.session.commit()
+
+    assert ContentBlob.query.count() == 4
+    assert 'content' not in first[0]
+    assert first[0]['content_hash'] == second[0]['content_hash']
+    assert [s['content'] for s in expand_snapshot(second)] == [long_text(0), 'Rewritten', long_text(2)]
+    # Snapshots written before content addressing keep inline content
+    assert expand_snapshot([{'title': 'Old', 'content': 'Inline'}]) == [{'title': 'Old', 'content': 'Inline'}]
+
+
+def test_concurrent_store_of_same_content_keeps_one_blob(project, monkeypatch):
+    from app.extensions import db
+    from app.models import ContentBlob
+    from app.services.version_storage_service import store_content
+
+    digest = store_content('Shared body')
+    db.session.commit()
+    # Another writer stored the same content after this one checked for it
+    db.session.expunge_all()
+    monkeypatch.setattr(db.session, 'get', lambda model, key: None)
+
+    assert store_content('Shared body') == digest
+    db.session.commit()
+    assert ContentBlob.query.count() == 1
+
+
+def test_prune_keeps_referenced_and_recent_blobs(project):
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.models import ContentBlob, ProposalVersion
+    from app.services.version_storage_service import load_contents, prune_unreferenced_blobs, store_content
+
+    kept = ProposalVersion(project_id=project.id, version_number=1, title='v1', created_by=project.user.id,
+                           sections_snapshot=[{'title': 'A', 'content_hash': store_content('Referenced')}])
+    db.session.add(kept)
+    orphan, recent = store_content('Deleted version body'), store_content('Snapshot in progress')
+    db.session.commit()
+    ContentBlob.query.filter(ContentBlob.hash != recent)\
+        .update({ContentBlob.created_at: datetime.utcnow() - timedelta(days=1)})
+    db.session.commit()
+
+    assert prune_unreferenced_blobs() == 1
+    assert {b.hash for b in ContentBlob.query} == {kept.sections_snapshot[0]['content_hash'], recent}
+    assert load_contents([orphan]) == {}
+    assert prune_unreferenced_blobs(grace_minutes=0) == 1
+
+
+def test_reused_blob_is_not_pruned(project):
+    from datetime import datetime, timedelta
+    from app.extensions import db
+    from app.models import ContentBlob
+    from app.services.version_storage_service import prune_unreferenced_blobs, store_content
+
+    digest = store_content('Restored body')
+    db.session.commit()
+    ContentBlob.query.update({ContentBlob.created_at: datetime.utcnow() - timedelta(days=1)})
+    db.session.commit()
+    db.session.expunge_all()
+
+    # A new snapshot stores the same body before referencing it
+    assert store_content('Restored body') == digest
+    db.session.commit()
+
+    assert prune_unreferenced_blobs() == 0
+    assert db.session.get(ContentBlob, digest) is not None
+
+
+def test_version_file_in_object_storage_is_regenerated_when_missing(project, storage, monkeypatch):
+    from app.extensions import db
+    from app.models import ProposalVersion, RFPSection
+    from app.services import export_service
+    from app.services.version_storage_service import (
+        build_snapshot, store_version_file, load_version_file, delete_version_file
+    )
+
+    rendered = []
+
+    def fake_docx(project, sections, include_qa, questions, organization):
+        rendered.append([s.content for s in sections])
+        return io.BytesIO('|'.join(s.title for s in sections).encode())
+
+    monkeypatch.setattr(export_service, 'generate_proposal_docx', fake_docx)
+    sections = RFPSection.query.filter_by(project_id=project.id).order_by(RFPSection.order).all()
+    versions = []
+    for number in (1, 2):
+        version = ProposalVersion(project_id=project.id, version_number=number, title=f'v{number}',
+                                  created_by=project.user.id, export_options={'include_qa': False},
+                                  sections_snapshot=build_snapshot(sections))
+        db.session.add(version)
+        store_version_file(version, b'docx-bytes')
+        versions.append(version)
+    db.session.commit()
+
+    # Identical exports share one stored file
+    assert versions[0].file_data is None
+    assert versions[0].file_id == versions[1].file_id and len(storage) == 1
+    assert load_version_file(versions[0]) == b'docx-bytes'
+
+    storage.clear()
+    assert load_version_file(versions[1]) == b'Section 0|Section 1|Section 2'
+    assert rendered == [[long_text(i) for i in range(3)]]
+    assert storage[versions[1].file_id] == b'Section 0|Section 1|Section 2'
+
+    delete_version_file(versions[1])
+    assert len(storage) == 0
+
+
+@pytest.mark.slow
+def test_version_storage_savings(project, storage):
+    """Measure stored versus logical bytes for a typical editing history."""
+    from app.extensions import db
+    from app.models import ProposalVersion, RFPSection, save_section_version
+    from app.services.version_storage_service import build_snapshot, store_version_file, get_version_storage_stats
+
+    sections = RFPSection.query.filter_by(project_id=project.id).order_by(RFPSection.order).all()
+    for number in range(1, 21):
+        edited = sections[number % 3]
+        edited.content = edited.content.replace(f'Paragraph {number} ', f'Paragraph {number} (rev {number}) ')
+        edited.version = (edited.version or 1) + 1
+        save_section_version(edited, project.user.id)
+        version = ProposalVersion(project_id=project.id, version_number=number, title=f'v{number}',
+                                  created_by=project.user.id, sections_snapshot=build_snapshot(sections))
+        db.session.add(version)
+        store_version_file(version, b'docx' * 5000)
+        db.session.commit()
+
+    stats = get_version_storage_stats(project.id)
+    print(f"\nversion storage: {stats['logical_bytes']} logical bytes, "
+          f"{stats['stored_bytes']} stored ({stats['savings_ratio']:.0%} saved)")
+    assert stats['section_history_bytes']['stored'] < stats['section_history_bytes']['logical'] / 3
+    assert stats['snapshot_bytes']['stored'] < stats['snapshot_bytes']['logical'] / 3
+    assert stats['file_bytes']['database'] == 0
+    assert stats['savings_ratio'] > 0.8
@@ -50,3 +50,98 @@ class TestDocumentValidation:
             data={}
         )
         assert response.status_code in [400, 422]
+
+
+class TestQuestionIngestion:
+    """Tests for question classification and batched inserts."""
+    
+    @pytest.mark.unit
+    def test_classify_first_matching_category_wins(self):
+        """Test categories are checked in declaration order."""
+        from app.routes.documents import classify_question_category
+        
+        assert classify_question_category('Describe your API security model') == (
+            'security', 'Security & Compliance'
+        )
+        assert classify_question_category('What is the annual license cost?') == (
+            'pricing', 'Pricing & Commercial'
+        )
+        assert classify_question_category('Tell us about yourselves', 'Intro') == ('general', 'Intro')
+    
+    @pytest.mark.unit
+    def test_bulk_insert_questions_in_batches(self, models_app, monkeypatch):
+        """Test questions are inserted in batches with progress reports."""
+        from app.extensions import db
+        from app.models import Organization, User, Project, Document, Question
+        from app.routes import documents
+        
+        org = Organization(name='Ingest Org', slug='ingest-org')
+        db.session.add(org)
+        db.session.flush()
+        user = User(email='ingest@example.com', name='Ingest', organization_id=org.id)
+        user.set_password('x')
+        db.session.add(user)
+        db.session.flush()
+        project = Project(name='RFP', organization_id=org.id, created_by=user.id)
+        db.session.add(project)
+        db.session.flush()
+        document = Document(
+            filename='rfp.pdf', original_filename='rfp.pdf', file_type='pdf',
+            project_id=project.id, uploaded_by=user.id
+        )
+        db.session.add(document)
+        db.session.commit()
+        
+        monkeypatch.setattr(documents, 'QUESTION_INSERT_BATCH_SIZE', 2)
+        questions_data = [
+            {'text': 'Do you support SSO authentication?', 'order': 1},
+            {'text': 'Describe the deployment timeline.', 'order': 2},
+            {'text': 'Anything else?', 'order': 3, 'section': 'General'},
+        ]
+        progress = []
+        documents._bulk_insert_questions(
+            document, questions_data, lambda stage, meta: progress.append(meta['questions_saved'])
+        )
+        
+        rows = Question.query.filter_by(document_id=document.id).order_by(Question.order).all()
+        assert [(q.category, q.section) for q in rows] == [
+            ('security', 'Security & Compliance'),
+            ('implementation', 'Implementation Plan'),
+            ('general', 'General'),
+        ]
+        assert progress == [2, 3]
+    
+    @pytest.mark.unit
+    def test_failed_batch_removes_questions_of_the_parse(self, org, monkeypatch):
+        """Test a failing batch does not leave the document with part of its questions."""
+        from app.extensions import db
+        from app.models import Project, Document, Question
+        from app.routes import documents
+        
+        project = Project(name='RFP', organization_id=org.id, created_by=org.user_id)
+        db.session.add(project)
+        db.session.flush()
+        document = Document(
+            filename='rfp.pdf', original_filename='rfp.pdf', file_type='pdf',
+            project_id=project.id, uploaded_by=org.user_id
+        )
+        db.session.add(document)
+        db.session.flush()
+        db.session.add(Question(project_id=project.id, document_id=document.id, text='Kept?'))
+        db.session.commit()
+        
+        classify = documents.classify_question_category
+        
+        def failing_classify(text, default_section=None):
+            if text == 'Broken?':
+                raise RuntimeError('classification failed')
+            return classify(text, default_section)
+        
+        monkeypatch.setattr(documents, 'QUESTION_INSERT_BATCH_SIZE', 2)
+        monkeypatch.setattr(documents, 'classify_question_category', failing_classify)
+        with pytest.raises(RuntimeError):
+            documents._bulk_insert_questions(document, [
+                {'text': 'First?'}, {'text': 'Second?'}, {'text': 'Broken?'}
+            ])
+        
+        assert [q.text for q in Question.query.filter_by(document_id=document.id)] == ['Kept?']
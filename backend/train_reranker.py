@@ -0,0 +1,111 @@
+"""
+Train the Knowledge Reranker
+
+Learns the score-fusion weights used by the local reranker from approved
+answers: for each approved answer, the question is searched again and the
+candidates the answer actually cited are labelled as relevant.
+
+Usage:
+    python train_reranker.py [output_path]
+
+The output path defaults to RERANK_WEIGHTS_PATH (or rerank_weights.json).
+"""
+import os
+import sys
+
+import numpy as np
+
+from app import create_app
+from app.models import Answer, Project, Question
+from app.services.qdrant_service import get_qdrant_service
+from app.services.rerank_service import (
+    extract_features, load_item_priors, save_weights, train_weights, FEATURES
+)
+
+CANDIDATES_PER_QUESTION = 10
+MAX_ANSWERS = 2000
+
+
+def _is_cited(candidate, answer) -> bool:
+    """Whether an approved answer used this candidate."""
+    source_ids = {
+        str(s.get('item_id')) for s in (answer.sources or [])
+        if isinstance(s, dict) and s.get('item_id') is not None
+    }
+    if str(candidate.get('item_id')) in source_ids:
+        return True
+    title = candidate.get('title')
+    return bool(title) and f'[Source: {title}]' in (answer.content or '')
+
+
+def train_reranker(output_path: str):
+    """Build a training set from approved answers and fit the weights."""
+    app = create_app()
+
+    with app.app_context():
+        answers = (
+            Answer.query.filter_by(status='approved')
+            .order_by(Answer.updated_at.desc())
+            .limit(MAX_ANSWERS)
+            .all()
+        )
+        print(f'Found {len(answers)} approved answers')
+
+        rows, labels = [], []
+        qdrant_by_org = {}
+        for i, answer in enumerate(answers, 1):
+            question = Question.query.get(answer.question_id)
+            project = Project.query.get(question.project_id) if question else None
+            if not project:
+                continue
+
+            org_id = project.organization_id
+            if org_id not in qdrant_by_org:
+                qdrant_by_org[org_id] = get_qdrant_service(org_id=org_id)
+            qdrant = qdrant_by_org[org_id]
+            if not qdrant.enabled:
+                continue
+
+            dimensions = {
+                'geography': project.geography,
+                'client_type': project.client_type,
+                'industry': project.industry,
+            }
+            candidates = qdrant.search(
+                query=question.text,
+                org_id=org_id,
+                limit=CANDIDATES_PER_QUESTION,
+                score_threshold=0.0
+            )
+            cited = [_is_cited(c, answer) for c in candidates]
+            # Questions with no cited candidate carry no ranking signal
+            if not any(cited):
+                continue
+
+            priors = load_item_priors(c.get('item_id') for c in candidates)
+            candidates = [{**c, **priors.get(c.get('item_id'), {})} for c in candidates]
+            rows.append(extract_features(question.text, candidates, dimensions))
+            labels.extend(int(c) for c in cited)
+
+            if i % 100 == 0:
+                print(f'[{i}/{len(answers)}] {len(labels)} samples')
+
+        if not rows:
+            print('❌ No training samples (no approved answers cite search results)')
+            return
+
+        features = np.vstack(rows)
+        weights = train_weights(features, np.array(labels))
+        save_weights(weights, output_path, samples=len(labels))
+
+        print(f'\n✅ Trained on {len(labels)} samples ({sum(labels)} positive) from {len(rows)} questions')
+        for name in ('bias',) + FEATURES:
+            print(f'   {name}: {weights[name]:.3f}')
+        print(f'Saved to {output_path}')
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else (
+        os.environ.get('RERANK_WEIGHTS_PATH') or 'rerank_weights.json'
+    )
+    train_reranker(path)
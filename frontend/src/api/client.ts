@@ -144,6 +144,36 @@ export const projectsApi = {
 // Documents API
 // ===============================
 
+// A parse job that failed, ran too long, or never left the queue; message is shown to the user
+export class ParseWaitError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'ParseWaitError';
+    }
+}
+
+export interface WaitForParseOptions {
+    intervalMs?: number;
+    // Give up after this long in total
+    timeoutMs?: number;
+    // Give up if the job has not started after this long (no worker picked it up)
+    pendingTimeoutMs?: number;
+    signal?: AbortSignal;
+}
+
+const sleep = (ms: number, signal?: AbortSignal) =>
+    new Promise<void>((resolve, reject) => {
+        const timer = setTimeout(() => {
+            signal?.removeEventListener('abort', onAbort);
+            resolve();
+        }, ms);
+        const onAbort = () => {
+            clearTimeout(timer);
+            reject(new DOMException('Aborted', 'AbortError'));
+        };
+        signal?.addEventListener('abort', onAbort, { once: true });
+    });
+
 export const documentsApi = {
     list: (projectId: number) =>
         api.get('/documents', { params: { project_id: projectId } }),
@@ -163,6 +193,32 @@ export const documentsApi = {
     parse: (id: number) =>
         api.post(`/documents/${id}/parse`),
 
+    // Poll a background parse job (job_id returned by upload/parse) until it finishes.
+    // Rejects with ParseWaitError on failure or timeout, and with an AbortError when signal aborts.
+    waitForParse: async (
+        jobId: string,
+        onProgress?: (progress: { stage?: string; progress_percent?: number }) => void,
+        { intervalMs = 1000, timeoutMs = 10 * 60 * 1000, pendingTimeoutMs = 60 * 1000, signal }: WaitForParseOptions = {}
+    ) => {
+        const startedAt = Date.now();
+        for (;;) {
+            signal?.throwIfAborted();
+            const { data } = await api.get(`/agents/job-status/${jobId}`, { signal });
+            if (data.status === 'SUCCESS') return data.result;
+            if (data.status === 'FAILURE') throw new ParseWaitError(data.error || 'Document parsing failed');
+            if (data.status === 'PROGRESS' && data.progress) onProgress?.(data.progress);
+
+            const elapsed = Date.now() - startedAt;
+            if (data.status === 'PENDING' && elapsed >= pendingTimeoutMs) {
+                throw new ParseWaitError('Document parsing has not started yet. Please try again in a few minutes.');
+            }
+            if (elapsed >= timeoutMs) {
+                throw new ParseWaitError('Document parsing is taking too long. Please check back later.');
+            }
+            await sleep(intervalMs, signal);
+        }
+    },
+
     delete: (id: number) =>
         api.delete(`/documents/${id}`),
 
@@ -8,6 +8,7 @@ import {
     CheckCircleIcon,
     ExclamationCircleIcon,
     ChevronDownIcon,
+    ArrowPathIcon,
 } from '@heroicons/react/24/outline';
 import clsx from 'clsx';
 import api from '../../api/client';
@@ -15,11 +16,49 @@ import toast from 'react-hot-toast';
 
 interface UploadFile {
     file: File;
-    status: 'pending' | 'uploading' | 'success' | 'error';
+    status: 'pending' | 'uploading' | 'queued' | 'processing' | 'success' | 'error';
     progress: number;
     error?: string;
+    // IngestionFile id once the file is part of a batch
+    batchFileId?: number;
 }
 
+export interface IngestionFileStatus {
+    id: number;
+    filename: string;
+    status: string; // queued, processing, chunked, indexed, failed
+    error?: string | null;
+}
+
+export interface IngestionBatch {
+    id: string;
+    status: string; // queued, processing, indexing, completed, completed_with_errors, failed
+    progress_percent: number;
+    files: IngestionFileStatus[];
+}
+
+// Files the upload request refused (e.g. invalid type); only passed with the first status
+interface RejectedFile {
+    filename: string;
+    error: string;
+}
+
+export type IngestionStatusHandler = (batch: IngestionBatch, rejected?: RejectedFile[]) => void;
+
+const FILE_STATUS: Record<string, UploadFile['status']> = {
+    queued: 'queued',
+    processing: 'processing',
+    chunked: 'processing',
+    indexed: 'success',
+    failed: 'error',
+};
+
+const STATUS_LABEL: Partial<Record<UploadFile['status'], string>> = {
+    uploading: 'Uploading...',
+    queued: 'Queued',
+    processing: 'Processing...',
+};
+
 interface DimensionOption {
     id: number;
     code: string;
@@ -27,7 +66,7 @@ interface DimensionOption {
     icon?: string;
 }
 
-interface DimensionTags {
+export interface DimensionTags {
     geography?: string;
     client_type?: string;
     industry?: string;
@@ -39,7 +78,15 @@ interface FileUploadModalProps {
     onClose: () => void;
     folderId: number;
     folderName: string;
-    onUpload: (file: File, dimensions?: DimensionTags) => Promise<void>;
+    // Upload the files as one batch and resolve once it has finished processing
+    onUpload: (
+        files: File[],
+        dimensions: DimensionTags,
+        onStatus: IngestionStatusHandler,
+        signal?: AbortSignal
+    ) => Promise<IngestionBatch>;
+    // Process the failed files of a batch again
+    onRetry: (batchId: string, onStatus: IngestionStatusHandler, signal?: AbortSignal) => Promise<IngestionBatch>;
 }
 
 export default function FileUploadModal({
@@ -48,11 +95,15 @@ export default function FileUploadModal({
     folderId,
     folderName,
     onUpload,
+    onRetry,
 }: FileUploadModalProps) {
     const [files, setFiles] = useState<UploadFile[]>([]);
     const [isDragging, setIsDragging] = useState(false);
     const [isUploading, setIsUploading] = useState(false);
+    const [batchId, setBatchId] = useState<string | null>(null);
     const inputRef = useRef<HTMLInputElement>(null);
+    // Stops polling the batch when the modal is closed
+    const abortRef = useRef<AbortController | null>(null);
 
     // Dimension state
     const [dimensions, setDimensions] = useState<{
@@ -84,6 +135,8 @@ export default function FileUploadModal({
         }
     }, [isOpen]);
 
+    useEffect(() => () => abortRef.current?.abort(), []);
+
     const handleFiles = (newFiles: FileList | null) => {
         if (!newFiles) return;
 
@@ -93,7 +146,83 @@ export default function FileUploadModal({
             progress: 0,
         }));
 
-        setFiles((prev) => [...prev, ...uploadFiles]);
+        // Files added after a batch was sent start a new batch
+        setFiles((prev) => (batchId ? uploadFiles : [...prev, ...uploadFiles]));
+        setBatchId(null);
+    };
+
+    const resetForm = () => {
+        setFiles([]);
+        setBatchId(null);
+        setSelectedGeography('');
+        setSelectedClientType('');
+        setSelectedIndustry('');
+        setSelectedProfileId(undefined);
+    };
+
+    const handleClose = () => {
+        // Processing continues on the server; stop following it
+        abortRef.current?.abort();
+        if (batchId) resetForm();
+        onClose();
+    };
+
+    // Show the batch's per-file status; files are matched to batch files in upload order
+    const applyBatch: IngestionStatusHandler = (batch, rejected) => {
+        setBatchId(batch.id);
+        setFiles((prev) => {
+            let current = prev;
+            if (rejected) {
+                const remaining = [...rejected];
+                let next = 0;
+                current = prev.map((f) => {
+                    const index = remaining.findIndex((r) => r.filename === f.file.name);
+                    if (index >= 0) {
+                        const [{ error }] = remaining.splice(index, 1);
+                        return { ...f, status: 'error' as const, error };
+                    }
+                    return { ...f, batchFileId: batch.files[next++]?.id };
+                });
+            }
+            return current.map((f) => {
+                const entry = batch.files.find((b) => b.id === f.batchFileId);
+                if (!entry) return f;
+                const status = FILE_STATUS[entry.status] || 'processing';
+                return {
+                    ...f,
+                    status,
+                    progress: status === 'success' ? 100 : 50,
+                    error: status === 'error' ? entry.error || 'Processing failed' : undefined,
+                };
+            });
+        });
+    };
+
+    const finishBatch = (batch: IngestionBatch) => {
+        // Close after a short delay if every file was indexed
+        if (batch.status === 'completed') {
+            setTimeout(() => {
+                onClose();
+                resetForm();
+            }, 1000);
+        }
+    };
+
+    // Mark files that did not finish with the error of a failed request
+    const failUnfinished = (error: any) => {
+        const message = error.response?.data?.error || error.message || 'Upload failed';
+        const rejected: RejectedFile[] = error.response?.data?.errors || [];
+        setFiles((prev) =>
+            prev.map((f) =>
+                f.status === 'success' || f.status === 'error'
+                    ? f
+                    : {
+                        ...f,
+                        status: 'error' as const,
+                        error: rejected.find((r) => r.filename === f.file.name)?.error || message,
+                    }
+            )
+        );
     };
 
     const handleDrop = (e: React.DragEvent) => {
@@ -133,73 +262,51 @@ export default function FileUploadModal({
         if (selectedIndustry) dimensionTags.industry = selectedIndustry;
         if (selectedProfileId) dimensionTags.knowledge_profile_id = selectedProfileId;
 
-        // Upload files concurrently with individual progress tracking
-        const uploadPromises = files.map(async (uploadFile, index) => {
-            // Mark this file as uploading
-            setFiles((prev) =>
-                prev.map((f, i) =>
-                    i === index
-                        ? { ...f, status: 'uploading' as const, progress: 50 }
-                        : f
-                )
-            );
-
-            try {
-                await onUpload(uploadFile.file, dimensionTags);
-
-                // Mark this file as success
-                setFiles((prev) =>
-                    prev.map((f, i) =>
-                        i === index
-                            ? { ...f, status: 'success' as const, progress: 100 }
-                            : f
-                    )
-                );
-                return { success: true };
-            } catch (error: any) {
-                // Mark this file as error
-                setFiles((prev) =>
-                    prev.map((f, i) =>
-                        i === index
-                            ? {
-                                ...f,
-                                status: 'error' as const,
-                                error: error.message || 'Upload failed',
-                            }
-                            : f
-                    )
-                );
-                return { success: false };
-            }
-        });
-
-        // Wait for all uploads to complete
-        const results = await Promise.allSettled(uploadPromises);
+        setFiles((prev) => prev.map((f) => ({ ...f, status: 'uploading' as const, progress: 25, error: undefined })));
+        const controller = new AbortController();
+        abortRef.current = controller;
+
+        // All files go in one request; the server processes them as one ingestion batch
+        try {
+            finishBatch(await onUpload(files.map((f) => f.file), dimensionTags, applyBatch, controller.signal));
+        } catch (error: any) {
+            if (controller.signal.aborted) return;
+            failUnfinished(error);
+        } finally {
+            setIsUploading(false);
+        }
+    };
 
-        setIsUploading(false);
+    const handleRetry = async () => {
+        if (!batchId) return;
 
-        // Check if all files were successful
-        const allSuccess = results.every(
-            (result) => result.status === 'fulfilled' && result.value.success
+        setIsUploading(true);
+        setFiles((prev) =>
+            prev.map((f) =>
+                f.status === 'error' && f.batchFileId !== undefined
+                    ? { ...f, status: 'queued' as const, progress: 25, error: undefined }
+                    : f
+            )
         );
-
-        // Close after delay if all successful
-        if (allSuccess) {
-            setTimeout(() => {
-                onClose();
-                setFiles([]);
-                // Reset selections
-                setSelectedGeography('');
-                setSelectedClientType('');
-                setSelectedIndustry('');
-                setSelectedProfileId(undefined);
-            }, 1000);
+        const controller = new AbortController();
+        abortRef.current = controller;
+
+        try {
+            finishBatch(await onRetry(batchId, applyBatch, controller.signal));
+        } catch (error: any) {
+            if (controller.signal.aborted) return;
+            failUnfinished(error);
+        } finally {
+            setIsUploading(false);
         }
     };
 
+    const canRetry = !isUploading && batchId !== null
+        && files.some((f) => f.status === 'error' && f.batchFileId !== undefined);
+
     return (
         <Transition appear show={isOpen} as={Fragment}>
-            <Dialog as="div" className="relative z-50" onClose={onClose}>
+            <Dialog as="div" className="relative z-50" onClose={handleClose}>
                 <Transition.Child
                     as={Fragment}
                     enter="ease-out duration-300"
@@ -232,7 +339,7 @@ export default function FileUploadModal({
                                         </Dialog.Title>
                                         <p className="text-sm text-text-muted">to {folderName}</p>
                                     </div>
-                                    <button onClick={onClose} className="p-1.5 rounded-lg hover:bg-background">
+                                    <button onClick={handleClose} className="p-1.5 rounded-lg hover:bg-background">
                                         <XMarkIcon className="h-5 w-5 text-text-muted" />
                                     </button>
                                 </div>
@@ -382,6 +489,9 @@ export default function FileUploadModal({
                                                         </p>
                                                         <p className="text-xs text-text-muted">
                                                             {(file.file.size / 1024).toFixed(1)} KB
+                                                            {STATUS_LABEL[file.status] && (
+                                                                <span className="ml-2">{STATUS_LABEL[file.status]}</span>
+                                                            )}
                                                             {file.error && (
                                                                 <span className="text-error ml-2">{file.error}</span>
                                                             )}
@@ -403,16 +513,22 @@ export default function FileUploadModal({
 
                                 {/* Footer */}
                                 <div className="flex items-center justify-end gap-3 px-6 py-4 border-t border-border bg-background">
-                                    <button onClick={onClose} className="btn-secondary">
-                                        Cancel
+                                    <button onClick={handleClose} className="btn-secondary">
+                                        {batchId ? 'Close' : 'Cancel'}
                                     </button>
+                                    {canRetry && (
+                                        <button onClick={handleRetry} className="btn-secondary flex items-center gap-1.5">
+                                            <ArrowPathIcon className="h-4 w-4" />
+                                            Retry failed
+                                        </button>
+                                    )}
                                     <button
                                         onClick={handleUpload}
-                                        disabled={files.length === 0 || isUploading || !selectedProfileId}
+                                        disabled={files.length === 0 || isUploading || !selectedProfileId || batchId !== null}
                                         className="btn-primary"
                                     >
                                         {isUploading
-                                            ? 'Uploading...'
+                                            ? (batchId ? 'Processing...' : 'Uploading...')
                                             : `Upload ${files.length} file${files.length !== 1 ? 's' : ''}`}
                                     </button>
                                 </div>
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import {
     EyeIcon,
@@ -9,7 +9,7 @@ import {
     ChatBubbleLeftRightIcon,
 } from '@heroicons/react/24/outline';
 import clsx from 'clsx';
-import { documentsApi } from '@/api/client';
+import { documentsApi, ParseWaitError } from '@/api/client';
 import { DocumentPreviewModal } from '@/components/ui/DocumentPreview';
 import toast from 'react-hot-toast';
 
@@ -43,6 +43,7 @@ export default function DocumentActions({
     const navigate = useNavigate();
     const [showPreview, setShowPreview] = useState(false);
     const [showMenu, setShowMenu] = useState(false);
+    const reparseAbortRef = useRef<AbortController | null>(null);
     const [isDeleting, setIsDeleting] = useState(false);
     const [isReparsing, setIsReparsing] = useState(false);
 
@@ -81,16 +82,27 @@ export default function DocumentActions({
         }
     };
 
+    // Stop waiting for a re-parse when the component goes away
+    useEffect(() => () => reparseAbortRef.current?.abort(), []);
+
     const handleReparse = async () => {
         if (!onReparse) return;
 
+        const controller = new AbortController();
+        reparseAbortRef.current = controller;
         setIsReparsing(true);
         try {
-            await documentsApi.parse(documentId);
+            const { data } = await documentsApi.parse(documentId);
+            if (data.job_id) {
+                await documentsApi.waitForParse(data.job_id, undefined, { signal: controller.signal });
+            }
             toast.success('Document re-parsed successfully');
             onReparse();
         } catch (error: any) {
-            toast.error(error.response?.data?.error || 'Failed to re-parse document');
+            if (controller.signal.aborted) return;
+            toast.error(error instanceof ParseWaitError
+                ? error.message
+                : error.response?.data?.error || 'Failed to re-parse document');
         } finally {
             setIsReparsing(false);
             setShowMenu(false);
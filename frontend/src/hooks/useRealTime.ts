@@ -4,6 +4,7 @@ import { io, Socket } from "socket.io-client";
 import { useAuthStore } from "@/store/authStore";
 
 const SOCKET_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
+const HEARTBEAT_INTERVAL_MS = 30000;
 
 export interface RemoteUser {
     sid: string;
@@ -20,6 +21,8 @@ export function useRealTime(projectId: number | string | undefined) {
     const socketRef = useRef<Socket | null>(null);
     const [activeUsers, setActiveUsers] = useState<Record<string, RemoteUser>>({});
     const [lastRemoteChange, setLastRemoteChange] = useState<any>(null);
+    // Last known content per remote editor + section, used to apply deltas
+    const remoteContentRef = useRef<Record<string, string>>({});
 
     useEffect(() => {
         if (!projectId || !user) return;
@@ -51,13 +54,43 @@ export function useRealTime(projectId: number | string | undefined) {
             }));
         });
 
+        socket.on('content_keyframe_request', (data: { sid: string }) => {
+            // Someone joined; the server sends them our latest content in full
+            socket.emit('content_keyframe', {
+                project_id: projectId,
+                to: data.sid,
+                user_id: user.id,
+                user_name: user.name
+            });
+        });
+
         socket.on('remote_content_change', (data: any) => {
-            setLastRemoteChange(data);
+            // Server sends full keyframes ({content}) or splices ({delta, base_length})
+            // with offsets in UTF-16 code units, which is how JS strings index
+            const key = `${data.sid}:${data.section_id}`;
+            let content: string | undefined = data.content;
+            if (content === undefined && data.delta) {
+                const base = remoteContentRef.current[key];
+                if (base === undefined || base.length !== data.base_length) {
+                    return; // Missing base; wait for the next keyframe
+                }
+                const { start, end, text } = data.delta;
+                content = base.slice(0, start) + text + base.slice(end);
+            }
+            if (content === undefined) return;
+            remoteContentRef.current[key] = content;
+            setLastRemoteChange({ ...data, content });
         });
 
+        const heartbeat = setInterval(() => {
+            socket.emit('presence_heartbeat');
+        }, HEARTBEAT_INTERVAL_MS);
+
         return () => {
+            clearInterval(heartbeat);
             socket.emit('leave_project', { project_id: projectId });
             socket.disconnect();
+            remoteContentRef.current = {};
         };
     }, [projectId, user]);
 
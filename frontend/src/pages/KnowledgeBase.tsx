@@ -17,12 +17,36 @@ import {
 } from '@heroicons/react/24/outline';
 import FolderTree from '../components/knowledge/FolderTree';
 import CreateFolderModal from '../components/knowledge/CreateFolderModal';
-import FileUploadModal from '../components/knowledge/FileUploadModal';
+import FileUploadModal, { DimensionTags, IngestionBatch, IngestionStatusHandler } from '../components/knowledge/FileUploadModal';
 import KnowledgePreviewModal from '../components/knowledge/KnowledgePreviewModal';
 import api from '../api/client';
 import toast from 'react-hot-toast';
 import clsx from 'clsx';
 
+const INGESTION_POLL_MS = 2000;
+const INGESTION_MAX_WAIT_MS = 30 * 60 * 1000;
+const INGESTION_DONE_STATUSES = ['completed', 'completed_with_errors', 'failed'];
+
+// Poll an ingestion batch until all of its files are indexed or failed
+const pollIngestionBatch = async (
+    statusUrl: string,
+    onStatus: IngestionStatusHandler,
+    signal?: AbortSignal
+): Promise<IngestionBatch> => {
+    const startedAt = Date.now();
+    for (;;) {
+        // status_url includes the /api prefix the client adds
+        const { data } = await api.get(statusUrl.replace(/^\/api/, ''), { signal });
+        onStatus(data.batch);
+        if (INGESTION_DONE_STATUSES.includes(data.batch.status)) return data.batch;
+        if (Date.now() - startedAt >= INGESTION_MAX_WAIT_MS) {
+            throw new Error('Processing is taking longer than expected; the files will appear when indexed');
+        }
+        await new Promise(resolve => setTimeout(resolve, INGESTION_POLL_MS));
+        signal?.throwIfAborted();
+    }
+};
+
 interface Folder {
     id: number;
     name: string;
@@ -214,16 +238,40 @@ export default function KnowledgeBasePage() {
         setIsUploadOpen(true);
     };
 
-    const handleUpload = async (file: File, dimensions?: { geography?: string; client_type?: string; industry?: string; knowledge_profile_id?: number }) => {
-        if (!uploadFolderId) return;
+    const handleUpload = async (
+        files: File[],
+        dimensions: DimensionTags,
+        onStatus: IngestionStatusHandler,
+        signal?: AbortSignal
+    ) => {
+        if (!uploadFolderId) throw new Error('No folder selected');
         const formData = new FormData();
-        formData.append('files', file);
-        if (dimensions?.geography) formData.append('geography', dimensions.geography);
-        if (dimensions?.client_type) formData.append('client_type', dimensions.client_type);
-        if (dimensions?.industry) formData.append('industry', dimensions.industry);
-        if (dimensions?.knowledge_profile_id) formData.append('knowledge_profile_id', dimensions.knowledge_profile_id.toString());
-        await api.post(`/folders/${uploadFolderId}/upload`, formData, { headers: { 'Content-Type': 'multipart/form-data' } });
-        await loadItems();
+        files.forEach((file) => formData.append('files', file));
+        if (dimensions.geography) formData.append('geography', dimensions.geography);
+        if (dimensions.client_type) formData.append('client_type', dimensions.client_type);
+        if (dimensions.industry) formData.append('industry', dimensions.industry);
+        if (dimensions.knowledge_profile_id) formData.append('knowledge_profile_id', dimensions.knowledge_profile_id.toString());
+        const { data } = await api.post(`/folders/${uploadFolderId}/upload`, formData, { headers: { 'Content-Type': 'multipart/form-data' } });
+        onStatus(data.batch, data.errors || []);
+        try {
+            return await pollIngestionBatch(data.status_url, onStatus, signal);
+        } finally {
+            await loadItems();
+        }
+    };
+
+    const handleRetryUpload = async (
+        batchId: string,
+        onStatus: IngestionStatusHandler,
+        signal?: AbortSignal
+    ) => {
+        const { data } = await api.post(`/folders/ingestion/${batchId}/retry`);
+        onStatus(data.batch);
+        try {
+            return await pollIngestionBatch(`/folders/ingestion/${batchId}`, onStatus, signal);
+        } finally {
+            await loadItems();
+        }
     };
 
     const handleSelectItem = (item: KnowledgeItem) => {
@@ -581,6 +629,7 @@ export default function KnowledgeBasePage() {
                 folderId={uploadFolderId || 0}
                 folderName={selectedFolder?.name || 'Knowledge Base'}
                 onUpload={handleUpload}
+                onRetry={handleRetryUpload}
             />
 
             {previewItem && (
@@ -1,6 +1,6 @@
-import { useState, useEffect, useCallback, useMemo } from 'react';
+import { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
-import { projectsApi, documentsApi, questionsApi, agentsApi, sectionsApi } from '@/api/client';
+import { projectsApi, documentsApi, questionsApi, agentsApi, sectionsApi, ParseWaitError } from '@/api/client';
 import { Project, Document, Question } from '@/types';
 import toast from 'react-hot-toast';
 import { useDropzone } from 'react-dropzone';
@@ -51,6 +51,8 @@ export default function ProjectDetail() {
     const [uploadState, setUploadState] = useState<UploadState>('uploading');
     const [uploadPercent, setUploadPercent] = useState(0);
     const [currentFileName, setCurrentFileName] = useState('');
+    // Stops waiting for background parse jobs when the page is left
+    const uploadAbortRef = useRef<AbortController | null>(null);
 
     // Knowledge profile sidebar state
     const [selectedProfile, setSelectedProfile] = useState<any>(null);
@@ -90,9 +92,14 @@ export default function ProjectDetail() {
         // eslint-disable-next-line react-hooks/exhaustive-deps
     }, [id]); // Intentionally only depend on id to prevent duplicate calls
 
+    useEffect(() => () => uploadAbortRef.current?.abort(), []);
+
     const onDrop = useCallback(async (acceptedFiles: File[]) => {
         if (!id || acceptedFiles.length === 0) return;
 
+        const controller = new AbortController();
+        uploadAbortRef.current = controller;
+
         setIsUploading(true);
         setShowProgressModal(true);
         setUploadState('uploading');
@@ -131,9 +138,14 @@ export default function ProjectDetail() {
                     const uploadResult = await documentsApi.upload(Number(id), file);
                     const uploadedDoc = uploadResult.data.document;
 
-                    // Step 2: Parse document
+                    // Step 2: Parse document (in the background; wait for its questions)
                     setUploadState('parsing');
                     setUploadPercent(10);
+                    if (uploadResult.data.job_id) {
+                        await documentsApi.waitForParse(uploadResult.data.job_id, (progress) => {
+                            setUploadPercent(5 + Math.round((progress.progress_percent || 0) / 10));
+                        }, { signal: controller.signal });
+                    }
 
                     // Step 3: Start async orchestrator analysis (full 11-agent pipeline)
                     setUploadState('document_analysis');
@@ -259,8 +271,11 @@ export default function ProjectDetail() {
                     setUploadPercent(100);
 
                 } catch (fileError) {
+                    if (controller.signal.aborted) return;
                     console.error(`Error processing ${file.name}:`, fileError);
-                    toast.error(`Failed to process ${file.name}`);
+                    toast.error(fileError instanceof ParseWaitError
+                        ? `${file.name}: ${fileError.message}`
+                        : `Failed to process ${file.name}`);
                 }
             }
 